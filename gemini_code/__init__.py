@@ -6,47 +6,35 @@ Sistema completo de desenvolvimento com IA
 __version__ = "1.0.0"
 __author__ = "Gemini Code Team"
 
-# Core modules
-from .core.gemini_client import GeminiClient
-from .core.project_manager import ProjectManager
-from .core.nlp_enhanced import NLPEnhanced
-from .core.file_manager import FileManagementSystem
-from .core.workspace_manager import WorkspaceManager
-
-# Analysis modules - Core only for now
-try:
-    from .analysis.error_detector import ErrorDetector
-except ImportError:
-    ErrorDetector = None
-
-try:
-    from .analysis.performance import PerformanceAnalyzer
-except ImportError:
-    PerformanceAnalyzer = None
-
-# Database and utilities
-try:
-    from .database.database_manager import DatabaseManager
-except ImportError:
-    DatabaseManager = None
-
-# Monitoring and security
-try:
-    from .security.security_scanner import SecurityScanner
-except ImportError:
-    SecurityScanner = None
-
-# Metrics and analytics
-try:
-    from .metrics.business_metrics import BusinessMetrics
-except ImportError:
-    BusinessMetrics = None
-
-# Collaboration
-try:
-    from .collaboration.team_manager import TeamManager
-except ImportError:
-    TeamManager = None
+from .core.lazy_loader import lazy_exports
+
+# Os módulos são importados no primeiro acesso ao nome (PEP 562), para que
+# `import gemini_code` não carregue pandas, matplotlib etc. na partida.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    # Core modules
+    {
+        "GeminiClient": ".core.gemini_client",
+        "ProjectManager": ".core.project_manager",
+        "NLPEnhanced": ".core.nlp_enhanced",
+        "FileManagementSystem": ".core.file_manager",
+        "WorkspaceManager": ".core.workspace_manager",
+    },
+    # Optional modules (None if import fails)
+    optional={
+        # Analysis modules - Core only for now
+        "ErrorDetector": ".analysis.error_detector",
+        "PerformanceAnalyzer": ".analysis.performance",
+        # Database and utilities
+        "DatabaseManager": ".database.database_manager",
+        # Monitoring and security
+        "SecurityScanner": ".security.security_scanner",
+        # Metrics and analytics
+        "BusinessMetrics": ".metrics.business_metrics",
+        # Collaboration
+        "TeamManager": ".collaboration.team_manager",
+    },
+)
 
 __all__ = [
     # Core modules (always available)
@@ -63,4 +51,4 @@ __all__ = [
     "SecurityScanner",
     "BusinessMetrics",
     "TeamManager"
-]
\ No newline at end of file
+]
@@ -11,6 +11,7 @@ from pathlib import Path
 
 from ..core.gemini_client import GeminiClient
 from ..core.memory_system import MemorySystem
+from ..core.token_counter import get_token_counter
 
 
 @dataclass
@@ -47,6 +48,7 @@ class ContextCompactor:
     def __init__(self, gemini_client: GeminiClient, memory_system: MemorySystem):
         self.gemini = gemini_client
         self.memory = memory_system
+        self.token_counter = get_token_counter()
         
         # Configurações de compactação
         self.target_compression_ratio = 0.3  # Reduzir para 30% do tamanho original
@@ -77,7 +79,7 @@ class ContextCompactor:
     
     async def should_compact(self, context_items: List[ContextItem]) -> bool:
         """Determina se o contexto deve ser compactado."""
-        total_tokens = sum(item.tokens_estimate for item in context_items)
+        total_tokens = sum(self._item_tokens(item) for item in context_items)
         
         # Verifica se excedeu limite
         if total_tokens > self.max_context_tokens * self.compaction_trigger_threshold:
@@ -115,8 +117,8 @@ class ContextCompactor:
         summary = await self._generate_summary(items_to_compact, instructions)
         
         # 5. Calcula métricas
-        original_tokens = sum(item.tokens_estimate for item in context_items)
-        preserved_tokens = sum(item.tokens_estimate for item in items_to_preserve)
+        original_tokens = sum(self._item_tokens(item) for item in context_items)
+        preserved_tokens = sum(self._item_tokens(item) for item in items_to_preserve)
         summary_tokens = self._estimate_tokens(summary)
         
         compacted_tokens = preserved_tokens + summary_tokens
@@ -422,8 +424,13 @@ class ContextCompactor:
     
     def _estimate_tokens(self, text: str) -> int:
         """Estima número de tokens de um texto."""
-        # Estimativa simples: ~4 caracteres por token
-        return len(text) // 4
+        return self.token_counter.estimate(text)
+    
+    def _item_tokens(self, item: ContextItem) -> int:
+        """Tokens do item, preenchendo tokens_estimate quando ainda não calculado."""
+        if not item.tokens_estimate and item.content:
+            item.tokens_estimate = self._estimate_tokens(item.content)
+        return item.tokens_estimate
     
     def _get_preservation_criteria(self) -> Dict[str, Any]:
         """Retorna critérios de preservação utilizados."""
@@ -3,10 +3,15 @@ Módulo de análise do Gemini Code.
 Responsável por análise de código, detecção de erros e otimização.
 """
 
-from .error_detector import ErrorDetector
-from .performance import PerformanceAnalyzer
-from .code_navigator import CodeNavigator
-from .health_monitor import HealthMonitor
+from ..core.lazy_loader import lazy_exports
+
+# Submódulos importados no primeiro acesso
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ErrorDetector': '.error_detector',
+    'PerformanceAnalyzer': '.performance',
+    'CodeNavigator': '.code_navigator',
+    'HealthMonitor': '.health_monitor',
+})
 
 __all__ = [
     'ErrorDetector',
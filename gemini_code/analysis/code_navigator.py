@@ -3,6 +3,7 @@ Navegador de código que ajuda a entender e explorar projetos.
 """
 
 import ast
+import asyncio
 import re
 import json
 from typing import List, Dict, Any, Optional, Tuple, Set
@@ -11,7 +12,9 @@ from dataclasses import dataclass
 from collections import defaultdict
 
 from ..core.gemini_client import GeminiClient
+from ..core.prompt_batcher import is_json_list
 from ..core.file_manager import FileManagementSystem
+from ..core.ast_cache import get_ast_cache
 
 
 @dataclass
@@ -77,11 +80,8 @@ class CodeNavigator:
     async def _analyze_file(self, file_path: Path) -> None:
         """Analisa um arquivo específico."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Parse AST
-            tree = ast.parse(content)
+            # Parse AST (compartilhada via cache)
+            tree = get_ast_cache().get(file_path).get_tree()
             
             # Extrai elementos
             elements = []
@@ -344,54 +344,63 @@ class CodeNavigator:
         """Encontra código similar no projeto."""
         similar_sections = []
         
-        try:
-            # Usa IA para encontrar semelhanças
-            for file_path, elements in self.code_map.items():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Análise com IA (simplificada para demonstração)
-                if len(content) < 20000:  # Evita arquivos muito grandes
-                    prompt = f"""
-                    Compare este trecho de código com o arquivo completo e encontre seções similares:
+        # Arquivos comparados em paralelo: os prompts vão juntos em lotes
+        results = await asyncio.gather(*(
+            self._find_similar_in_file(code_snippet, file_path, threshold) for file_path in self.code_map
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Erro ao buscar código similar: {result}")
+            else:
+                similar_sections.extend(result)
+        
+        return sorted(similar_sections, key=lambda x: x.get('similarity_score', 0), reverse=True)
+    
+    async def _find_similar_in_file(self, code_snippet: str, file_path: str, threshold: float) -> List[Dict[str, Any]]:
+        """Seções de um arquivo similares ao trecho."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Análise com IA (simplificada para demonstração)
+        if len(content) >= 20000:  # Evita arquivos muito grandes
+            return []
+        
+        prompt = f"""
+        Compare este trecho de código com o arquivo completo e encontre seções similares:
 
-                    Trecho de referência:
-                    ```python
-                    {code_snippet}
-                    ```
+        Trecho de referência:
+        ```python
+        {code_snippet}
+        ```
 
-                    Arquivo completo:
-                    ```python
-                    {content}
-                    ```
+        Arquivo completo:
+        ```python
+        {content}
+        ```
 
-                    Retorne seções similares em JSON:
-                    [
-                      {{
-                        "similarity_score": 0.8,
-                        "start_line": 10,
-                        "end_line": 20,
-                        "description": "descrição da similaridade"
-                      }}
-                    ]
+        Retorne seções similares em JSON:
+        [
+          {{
+            "similarity_score": 0.8,
+            "start_line": 10,
+            "end_line": 20,
+            "description": "descrição da similaridade"
+          }}
+        ]
 
-                    Apenas se similaridade > {threshold}
-                    """
-                    
-                    response = await self.gemini_client.generate_response(prompt)
-                    
-                    # Extrai JSON (simplificado)
-                    json_match = re.search(r'\[.*\]', response, re.DOTALL)
-                    if json_match:
-                        matches = json.loads(json_match.group())
-                        for match in matches:
-                            match['file_path'] = file_path
-                            similar_sections.append(match)
-                            
-        except Exception as e:
-            print(f"Erro ao buscar código similar: {e}")
-        
-        return sorted(similar_sections, key=lambda x: x.get('similarity_score', 0), reverse=True)
+        Apenas se similaridade > {threshold}
+        """
+        
+        response = await self.gemini_client.batcher.submit(prompt, validate=is_json_list)
+        
+        # Extrai JSON (simplificado)
+        matches = []
+        json_match = re.search(r'\[.*\]', response, re.DOTALL)
+        if json_match:
+            matches = json.loads(json_match.group())
+            for match in matches:
+                match['file_path'] = file_path
+        return matches
     
     async def get_project_overview(self) -> str:
         """Gera visão geral do projeto."""
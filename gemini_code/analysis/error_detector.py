@@ -2,7 +2,6 @@
 Detector de erros inteligente que encontra e corrige problemas automaticamente.
 """
 
-import ast
 import re
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
@@ -12,7 +11,9 @@ import json
 from dataclasses import dataclass
 
 from ..core.gemini_client import GeminiClient
+from ..core.prompt_batcher import is_json_list
 from ..core.file_manager import FileManagementSystem
+from ..core.ast_cache import get_ast_cache
 
 
 @dataclass
@@ -100,12 +101,11 @@ class ErrorDetector:
         
         for file_path in python_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                parsed = get_ast_cache().get(file_path)
                 
                 # Verifica sintaxe Python
                 try:
-                    ast.parse(content)
+                    parsed.get_tree()
                 except SyntaxError as e:
                     errors.append(Error(
                         file_path=str(file_path),
@@ -168,69 +168,75 @@ class ErrorDetector:
     
     async def _check_logic_errors(self, project_path: str) -> List[Error]:
         """Usa IA para detectar erros de lógica."""
-        errors = []
         python_files = list(Path(project_path).rglob("*.py"))
         
-        for file_path in python_files[:5]:  # Limita para não sobrecarregar
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if len(content) > 10000:  # Arquivo muito grande
-                    continue
-                
-                # Analisa com IA
-                prompt = f"""
-                Analise este código Python e identifique possíveis erros de lógica:
+        # Arquivos analisados em paralelo: os prompts vão juntos em lotes
+        results = await asyncio.gather(*(
+            self._check_file_logic_errors(file_path) for file_path in python_files[:5]  # Limita para não sobrecarregar
+        ))
+        return [error for file_errors in results for error in file_errors]
+    
+    async def _check_file_logic_errors(self, file_path: Path) -> List[Error]:
+        """Erros de lógica de um arquivo."""
+        errors = []
+        try:
+            content = get_ast_cache().get(file_path).source
+            
+            if len(content) > 10000:  # Arquivo muito grande
+                return errors
+            
+            # Analisa com IA
+            prompt = f"""
+            Analise este código Python e identifique possíveis erros de lógica:
 
-                ```python
-                {content}
-                ```
+            ```python
+            {content}
+            ```
 
-                Retorne uma lista JSON com erros encontrados no formato:
-                [
-                  {{
-                    "line": número_da_linha,
-                    "error_type": "tipo_do_erro",
-                    "message": "descrição_do_erro",
-                    "severity": "critical|high|medium|low",
-                    "suggestion": "sugestão_de_correção"
-                  }}
-                ]
+            Retorne uma lista JSON com erros encontrados no formato:
+            [
+              {{
+                "line": número_da_linha,
+                "error_type": "tipo_do_erro",
+                "message": "descrição_do_erro",
+                "severity": "critical|high|medium|low",
+                "suggestion": "sugestão_de_correção"
+              }}
+            ]
 
-                Foque em:
-                - Variáveis não definidas
-                - Loops infinitos possíveis
-                - Divisão por zero
-                - Índices fora do range
-                - Condições sempre falsas/verdadeiras
-                """
-                
-                response = await self.gemini_client.generate_response(prompt)
-                
-                try:
-                    # Extrai JSON da resposta
-                    json_match = re.search(r'\[.*\]', response, re.DOTALL)
-                    if json_match:
-                        logic_errors = json.loads(json_match.group())
-                        
-                        for error in logic_errors:
-                            errors.append(Error(
-                                file_path=str(file_path),
-                                line_number=error.get('line', 0),
-                                column=0,
-                                error_type=error.get('error_type', 'LogicError'),
-                                message=error.get('message', ''),
-                                severity=error.get('severity', 'medium'),
-                                suggestion=error.get('suggestion'),
-                                auto_fixable=True
-                            ))
-                            
-                except Exception as e:
-                    print(f"Erro ao processar resposta IA para {file_path}: {e}")
+            Foque em:
+            - Variáveis não definidas
+            - Loops infinitos possíveis
+            - Divisão por zero
+            - Índices fora do range
+            - Condições sempre falsas/verdadeiras
+            """
+            
+            response = await self.gemini_client.batcher.submit(prompt, validate=is_json_list)
+            
+            try:
+                # Extrai JSON da resposta
+                json_match = re.search(r'\[.*\]', response, re.DOTALL)
+                if json_match:
+                    logic_errors = json.loads(json_match.group())
                     
+                    for error in logic_errors:
+                        errors.append(Error(
+                            file_path=str(file_path),
+                            line_number=error.get('line', 0),
+                            column=0,
+                            error_type=error.get('error_type', 'LogicError'),
+                            message=error.get('message', ''),
+                            severity=error.get('severity', 'medium'),
+                            suggestion=error.get('suggestion'),
+                            auto_fixable=True
+                        ))
+                        
             except Exception as e:
-                print(f"Erro ao analisar lógica em {file_path}: {e}")
+                print(f"Erro ao processar resposta IA para {file_path}: {e}")
+                
+        except Exception as e:
+            print(f"Erro ao analisar lógica em {file_path}: {e}")
         
         return errors
     
@@ -248,10 +254,7 @@ class ErrorDetector:
         
         for file_path in python_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                lines = content.split('\n')
+                lines = get_ast_cache().get(file_path).lines
                 for line_num, line in enumerate(lines, 1):
                     for pattern, suggestion in performance_patterns:
                         if re.search(pattern, line, re.IGNORECASE):
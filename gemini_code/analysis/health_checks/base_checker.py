@@ -11,6 +11,7 @@ from datetime import datetime
 
 from ...core.gemini_client import GeminiClient
 from ...core.file_manager import FileManagementSystem
+from ...core.ast_cache import ParsedSource, get_ast_cache
 
 
 @dataclass
@@ -90,6 +91,10 @@ class BaseHealthChecker(ABC):
         
         return valid_python_files
     
+    def _parse_file(self, file_path: Path) -> ParsedSource:
+        """Get source and AST from the shared parse cache."""
+        return get_ast_cache().get(file_path)
+    
     async def _analyze_with_gemini(self, prompt: str, context: str = "") -> str:
         """Use Gemini for analysis if available."""
         try:
@@ -87,10 +87,7 @@ class CodeQualityChecker(BaseHealthChecker):
     def _analyze_file_quality(self, file_path: Path, quality_metrics: Dict) -> float:
         """Analyze quality of a single file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+            tree = self._parse_file(file_path).get_tree()
             
             # Initialize file score
             file_score = 100
@@ -93,10 +93,7 @@ class DocumentationChecker(BaseHealthChecker):
     def _analyze_file_documentation(self, file_path: Path) -> Dict[str, Any]:
         """Analyze documentation in a single file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+            tree = self._parse_file(file_path).get_tree()
             
             total_functions = 0
             documented_functions = 0
@@ -100,11 +100,8 @@ class ErrorChecker(BaseHealthChecker):
     def _check_syntax(self, file_path: Path) -> Dict[str, Any]:
         """Check for syntax errors."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Try to parse the AST
-            ast.parse(content)
+            self._parse_file(file_path).get_tree()
             return None
             
         except SyntaxError as e:
@@ -126,10 +123,7 @@ class ErrorChecker(BaseHealthChecker):
     def _check_imports(self, file_path: Path) -> Dict[str, Any]:
         """Check for import errors."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+            tree = self._parse_file(file_path).get_tree()
             
             # Extract imports
             imports = []
@@ -179,10 +173,7 @@ class ErrorChecker(BaseHealthChecker):
         issues = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+            tree = self._parse_file(file_path).get_tree()
             
             for node in ast.walk(tree):
                 # Check for bare except clauses
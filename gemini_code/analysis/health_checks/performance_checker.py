@@ -88,10 +88,7 @@ class PerformanceChecker(BaseHealthChecker):
     def _analyze_file_performance(self, file_path: Path, issues: Dict) -> float:
         """Analyze performance of a single file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+            tree = self._parse_file(file_path).get_tree()
             penalty = 0
             
             # Check for performance anti-patterns
@@ -15,6 +15,7 @@ import hashlib
 
 from ..core.gemini_client import GeminiClient
 from ..core.file_manager import FileManagementSystem
+from ..core.ast_cache import get_ast_cache
 from .error_detector import ErrorDetector
 from .performance import PerformanceAnalyzer
 from ..utils.error_humanizer import humanize_error
@@ -320,11 +321,7 @@ class HealthMonitor:
             
             for file_path in valid_python_files:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    import ast
-                    tree = ast.parse(content)
+                    tree = get_ast_cache().get(file_path).get_tree()
                     
                     for node in ast.walk(tree):
                         if isinstance(node, ast.FunctionDef):
@@ -495,11 +492,7 @@ class HealthMonitor:
             
             for file_path in valid_python_files:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    import ast
-                    tree = ast.parse(content)
+                    tree = get_ast_cache().get(file_path).get_tree()
                     
                     for node in ast.walk(tree):
                         if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
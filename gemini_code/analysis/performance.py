@@ -14,7 +14,9 @@ import subprocess
 import json
 
 from ..core.gemini_client import GeminiClient
+from ..core.prompt_batcher import is_json_list
 from ..core.file_manager import FileManagementSystem
+from ..core.ast_cache import get_ast_cache
 
 
 @dataclass
@@ -148,8 +150,7 @@ class PerformanceAnalyzer:
         for file_path in Path(project_path).rglob("*.py"):
             file_count += 1
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    total_lines += len(f.readlines())
+                total_lines += len(get_ast_cache().get(file_path).source.splitlines())
             except:
                 continue
         
@@ -165,24 +166,28 @@ class PerformanceAnalyzer:
     
     async def _find_performance_issues(self, project_path: str) -> List[PerformanceIssue]:
         """Encontra problemas de performance no código."""
-        issues = []
         python_files = list(Path(project_path).rglob("*.py"))
         
-        for file_path in python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Verifica padrões conhecidos
-                file_issues = await self._check_performance_patterns(file_path, content)
-                issues.extend(file_issues)
-                
-                # Análise com IA para problemas complexos
-                ai_issues = await self._ai_performance_analysis(file_path, content)
-                issues.extend(ai_issues)
-                
-            except Exception as e:
-                print(f"Erro ao analisar {file_path}: {e}")
+        # Arquivos analisados em paralelo: os prompts da IA vão juntos em lotes
+        results = await asyncio.gather(*(self._find_file_performance_issues(f) for f in python_files))
+        return [issue for file_issues in results for issue in file_issues]
+    
+    async def _find_file_performance_issues(self, file_path: Path) -> List[PerformanceIssue]:
+        """Problemas de performance de um arquivo."""
+        issues = []
+        try:
+            content = get_ast_cache().get(file_path).source
+            
+            # Verifica padrões conhecidos
+            file_issues = await self._check_performance_patterns(file_path, content)
+            issues.extend(file_issues)
+            
+            # Análise com IA para problemas complexos
+            ai_issues = await self._ai_performance_analysis(file_path, content)
+            issues.extend(ai_issues)
+            
+        except Exception as e:
+            print(f"Erro ao analisar {file_path}: {e}")
         
         return issues
     
@@ -191,8 +196,9 @@ class PerformanceAnalyzer:
         issues = []
         lines = content.split('\n')
         
-        patterns = self.performance_patterns['python']['slow_patterns']
-        patterns.extend(self.performance_patterns['python']['memory_patterns'])
+        # Nova lista: extend na lista do dicionário a fazia crescer a cada arquivo
+        patterns = (self.performance_patterns['python']['slow_patterns']
+                    + self.performance_patterns['python']['memory_patterns'])
         
         for line_num, line in enumerate(lines, 1):
             for pattern_info in patterns:
@@ -244,7 +250,7 @@ class PerformanceAnalyzer:
             ]
             """
             
-            response = await self.gemini_client.generate_response(prompt)
+            response = await self.gemini_client.batcher.submit(prompt, validate=is_json_list)
             
             # Extrai JSON da resposta
             json_match = re.search(r'\[.*\]', response, re.DOTALL)
@@ -275,11 +281,8 @@ class PerformanceAnalyzer:
         
         for file_path in Path(project_path).rglob("*.py"):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Calcula complexidade usando AST
-                tree = ast.parse(content)
+                # Calcula complexidade usando AST (compartilhada entre analisadores)
+                tree = get_ast_cache().get(file_path).get_tree()
                 complexity = self._calculate_cyclomatic_complexity(tree)
                 total_complexity += complexity
                 file_count += 1
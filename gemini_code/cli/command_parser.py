@@ -281,16 +281,18 @@ class CommandParser:
         action = 'list'  # default
         
         if args:
-            if args[0].lower() in ['list', 'switch', 'delete', 'export', 'import']:
+            if args[0].lower() in ['list', 'more', 'search', 'switch', 'delete', 'export', 'import']:
                 action = args[0].lower()
                 args = args[1:]
         
-        session_id = args[0] if args else None
+        positional = self._positional_args(args)
+        session_id = positional[0] if positional else None
         
         return {
             'type': 'sessions',
             'action': action,
             'session_id': session_id,
+            'query': ' '.join(positional),
             'limit': self._extract_limit(args),
             'active_only': '--active' in args
         }
@@ -422,6 +424,19 @@ class CommandParser:
     
     # Métodos utilitários
     
+    def _positional_args(self, args: List[str], valued_flags: Tuple[str, ...] = ('--limit', '--format')) -> List[str]:
+        """Argumentos sem as flags (e sem o valor de flags como --limit 5)."""
+        positional = []
+        skip_next = False
+        for arg in args:
+            if skip_next:
+                skip_next = False
+            elif arg in valued_flags:
+                skip_next = True
+            elif not arg.startswith('--'):
+                positional.append(arg)
+        return positional
+    
     def _extract_limit(self, args: List[str], default: int = 10) -> int:
         """Extrai parâmetro --limit dos argumentos."""
         for i, arg in enumerate(args):
@@ -470,7 +485,7 @@ class CommandParser:
             'bug': 'Reporta um bug ou problema\nUso: /bug [descrição] [--logs] [--config]',
             'memory': 'Gerencia memória do sistema\nUso: /memory [show|clear|export|search] [termo] [--limit=N]',
             'config': 'Gerencia configurações\nUso: /config [show|get|set|reset] [chave] [valor] [--global|--local]',
-            'sessions': 'Gerencia sessões\nUso: /sessions [list|switch|delete|export] [id] [--active] [--limit=N]',
+            'sessions': 'Gerencia sessões\nUso: /sessions [list|more|search|switch|delete|export] [id|termos] [--active] [--limit=N]',
             'export': 'Exporta dados\nUso: /export [session|memory|config|all] [arquivo] [--format=json|yaml] [--zip]',
             'exit': 'Sai do REPL\nUso: /exit [--no-save] [--force]',
             'context': 'Informações sobre contexto\nUso: /context [show|size|usage|optimize] [--detailed] [--tokens]',
@@ -35,6 +35,7 @@ from ..core.memory_system import MemorySystem
 from ..core.config import ConfigManager
 from ..core.nlp_enhanced import NLPEnhanced
 from ..utils.logger import Logger
+from ..interface.stream_renderer import StreamRenderer
 
 
 class RealGeminiREPL:
@@ -282,6 +283,7 @@ class RealGeminiREPL:
                 }
                 
                 # 3. Processa com sistema mestre (IA REAL)
+                renderer = None
                 if hasattr(self.master_system, 'process_natural_command'):
                     response = await self.master_system.process_natural_command(command, context)
                 else:
@@ -295,10 +297,15 @@ Diretório de trabalho: {self.project_path}
 
 Processe este comando de forma natural e útil. Responda em português de forma conversacional.
 """
-                    response = await self.gemini_client.generate_response(prompt)
+                    # Resposta em streaming: aparece enquanto é gerada
+                    with StreamRenderer(self.console, progress=progress, transient=False) as renderer:
+                        response = await self.gemini_client.generate_response(
+                            prompt, stream=True, on_chunk=renderer
+                        )
                 
-                # 4. Exibe resposta
-                self.console.print(f"[green]🤖 Gemini Code:[/green] {response}")
+                # 4. Exibe resposta (se ainda não foi exibida via streaming)
+                if renderer is None or not renderer.started:
+                    self.console.print(f"[green]🤖 Gemini Code:[/green] {response}")
                 
                 # 5. Salva no histórico e memória
                 self.conversation_history.append({
@@ -55,6 +55,7 @@ class GeminiREPL:
         self.running = False
         self.current_session = None
         self.context_memory = []
+        self._sessions_cursor: Optional[str] = None  # última página de /sessions
         
         # Configuração do readline
         if READLINE_AVAILABLE:
@@ -233,7 +234,7 @@ class GeminiREPL:
         elif result['type'] == 'config':
             await self._show_config()
         elif result['type'] == 'sessions':
-            await self._show_sessions()
+            await self._show_sessions(result)
         elif result['type'] == 'export':
             await self._export_session()
         elif result['type'] == 'exit':
@@ -283,7 +284,7 @@ Digite comandos naturais em português ou use comandos slash para funções espe
 ### 🔧 Controle de Sessão
 - `/help` - Mostra esta ajuda
 - `/clear` - Limpa a sessão atual
-- `/sessions` - Lista sessões ativas
+- `/sessions` - Lista sessões (`more`, `search <termos>`, `switch <id>`)
 - `/export` - Exporta sessão atual
 - `/exit` - Sair do REPL
 
@@ -492,27 +493,54 @@ Digite comandos naturais em português ou use comandos slash para funções espe
         
         self.console.print(panel)
     
-    async def _show_sessions(self):
-        """Lista sessões ativas."""
-        sessions_info = """
-# 📋 Sessões Ativas
-
-**Sessão Atual:**
-- ID: abc123ef
-- Iniciada: 14:35:20
-- Comandos: 12
-- Status: ✅ Ativa
-
-**Sessões Recentes:**
-- def456gh (13:20:15) - 8 comandos
-- hij789kl (12:05:10) - 15 comandos  
-- mno012pq (11:45:30) - 23 comandos
-
-**Total hoje:** 4 sessões, 58 comandos
-        """
+    async def _show_sessions(self, result: Dict[str, Any]):
+        """Lista, busca ou retoma sessões salvas."""
+        action = result.get('action', 'list')
+        limit = result.get('limit', 10)
+        
+        if action == 'switch':
+            if not result.get('session_id') or not await self.session_manager.switch_session(result['session_id']):
+                self.console.print(f"[red]❌ Sessão não encontrada: {result.get('session_id')}[/red]")
+                return
+            # Retomada preguiçosa: só o fim do contexto vem do banco
+            self.current_session = self.session_manager.get_current_session()
+            self.context_memory = self.current_session['context']
+            self.console.print(f"[green]✅ Sessão retomada: {self.current_session['name']} "
+                               f"({len(self.context_memory)} itens carregados)[/green]")
+            return
+        
+        if action == 'search':
+            if not result.get('query'):
+                self.console.print("[yellow]⚠️ Uso: /sessions search <termos>[/yellow]")
+                return
+            sessions = await self.session_manager.search_sessions(result['query'], limit=limit)
+            lines = [f"# 🔎 Sessões com \"{result['query']}\"", ""]
+            for session in sessions:
+                lines.append(f"- `{session['id'][:8]}` **{session['name']}** "
+                             f"({session['last_active']:%d/%m %H:%M}) - {session.get('matches', 0)} trechos")
+                if session.get('snippet'):
+                    lines.append(f"  > {session['snippet']}")
+        else:
+            after = self._sessions_cursor if action == 'more' else None
+            sessions = await self.session_manager.list_sessions(
+                limit=limit, active_only=result.get('active_only', False), after=after
+            )
+            if sessions:
+                self._sessions_cursor = sessions[-1]['cursor']
+            lines = ["# 📋 Sessões", ""]
+            for session in sessions:
+                marker = " ⬅️ atual" if session['is_current'] else ""
+                lines.append(f"- `{session['id'][:8]}` **{session['name']}** "
+                             f"({session['last_active']:%d/%m %H:%M}) - "
+                             f"{session['command_count']} comandos{marker}")
+            if len(sessions) == limit:
+                lines += ["", "_/sessions more para a próxima página_"]
+        
+        if not sessions:
+            lines.append("_Nenhuma sessão encontrada_")
         
         panel = Panel(
-            Markdown(sessions_info),
+            Markdown("\n".join(lines)),
             title="📋 Sessões",
             border_style="cyan",
             padding=(1, 2)
@@ -1,14 +1,110 @@
 """
 Session Manager - Gerenciamento de sessões estilo Claude Code
+
+A persistência é incremental: o gerenciador lembra quais itens do contexto
+já estão no banco (e em quais linhas) e cada save_session grava só a
+diferença - itens novos no fim, itens que saíram do começo (compactação) ou
+do fim - numa única transação. Comandos registrados ficam em buffer e são
+gravados em lote no próximo save ou checkpoint.
+
+A busca usa índices FTS5 (BM25 com trechos destacados) sobre nomes e
+contexto, a listagem é paginada por chave (last_active, id) e retomar uma
+sessão carrega só o fim do contexto; páginas anteriores vêm sob demanda.
 """
 
+import atexit
 import json
+import time
 import uuid
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import hashlib
+import re
+import unicodedata
+
+from ..core.sqlite_pool import get_pool
+
+
+# Gerenciadores com comandos em buffer, esvaziados no encerramento do processo
+_LIVE_MANAGERS: 'weakref.WeakSet[SessionManager]' = weakref.WeakSet()
+
+# Posições iniciais testadas ao procurar o trecho do contexto que continua salvo
+_MAX_ALIGN_CANDIDATES = 16
+
+# Migrações versionadas via PRAGMA user_version, aplicadas uma vez e em ordem
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+SESSION_MIGRATIONS = [
+    # 1: busca FTS5 em nomes e contexto, paginação por chave
+    [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS session_context_fts USING fts5(
+            content,
+            content='session_context', content_rowid='id',
+            tokenize='{FTS_TOKENIZER}'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS session_context_fts_ai AFTER INSERT ON session_context BEGIN
+            INSERT INTO session_context_fts(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS session_context_fts_ad AFTER DELETE ON session_context BEGIN
+            INSERT INTO session_context_fts(session_context_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS session_context_fts_au AFTER UPDATE OF content ON session_context BEGIN
+            INSERT INTO session_context_fts(session_context_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO session_context_fts(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS session_names_fts USING fts5(
+            name,
+            content='sessions', content_rowid='rowid',
+            tokenize='{FTS_TOKENIZER}'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS session_names_fts_ai AFTER INSERT ON sessions BEGIN
+            INSERT INTO session_names_fts(rowid, name) VALUES (new.rowid, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS session_names_fts_ad AFTER DELETE ON sessions BEGIN
+            INSERT INTO session_names_fts(session_names_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+        END
+        """,
+        # Só mudanças de nome: last_active/command_count mudam a cada save
+        """
+        CREATE TRIGGER IF NOT EXISTS session_names_fts_au AFTER UPDATE OF name ON sessions BEGIN
+            INSERT INTO session_names_fts(session_names_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+            INSERT INTO session_names_fts(rowid, name) VALUES (new.rowid, new.name);
+        END
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_sessions_keyset ON sessions(last_active, id)",
+        "CREATE INDEX IF NOT EXISTS idx_context_session_id ON session_context(session_id, id)",
+        # Indexa o histórico existente
+        "INSERT INTO session_context_fts(session_context_fts) VALUES ('rebuild')",
+        "INSERT INTO session_names_fts(session_names_fts) VALUES ('rebuild')",
+    ],
+]
+
+
+@dataclass
+class _PersistedContext:
+    """Itens do contexto já gravados, na ordem da lista, com o id de cada linha."""
+    row_ids: List[int] = field(default_factory=list)
+    keys: List[tuple] = field(default_factory=list)
+    unloaded: int = 0   # linhas mais antigas que ficaram no banco (carregamento preguiçoso)
 
 
 class SessionManager:
@@ -16,7 +112,13 @@ class SessionManager:
     Gerencia sessões do REPL, permitindo salvar, carregar e alternar entre sessões.
     """
     
-    def __init__(self, project_path: Path):
+    # Itens do contexto carregados ao retomar uma sessão (o resto vem por load_context_page)
+    context_page_size = 200
+    # Trechos mais recentes que casam considerados por busca
+    search_candidates = 500
+    
+    def __init__(self, project_path: Path, command_batch_size: int = 32,
+                 checkpoint_interval: float = 5.0):
         self.project_path = project_path
         self.sessions_dir = project_path / '.gemini_code' / 'sessions'
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
@@ -28,10 +130,20 @@ class SessionManager:
         # Sessão atual
         self.current_session_id: Optional[str] = None
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
+
+        # Estado persistido por sessão e comandos ainda não gravados
+        self._persisted: Dict[str, _PersistedContext] = {}
+        self._pending_commands: List[tuple] = []
+        self.command_batch_size = command_batch_size
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = time.monotonic()
+        self.save_stats = {'saves': 0, 'rows_inserted': 0, 'rows_deleted': 0,
+                           'commands_written': 0, 'checkpoints': 0}
+        _LIVE_MANAGERS.add(self)
     
     def _init_database(self):
         """Inicializa banco de dados de sessões."""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Tabela de sessões
@@ -86,6 +198,26 @@ class SessionManager:
         
         conn.commit()
         conn.close()
+        self._run_migrations()
+    
+    def _run_migrations(self):
+        """Aplica migrações pendentes (PRAGMA user_version)."""
+        conn = get_pool(self.db_path).connect()
+        try:
+            self.schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, statements in enumerate(SESSION_MIGRATIONS[self.schema_version:],
+                                                 start=self.schema_version + 1):
+                with conn:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {target}")
+                self.schema_version = target
+        except sqlite3.OperationalError:
+            # SQLite sem FTS5: busca continua via LIKE
+            pass
+        finally:
+            conn.close()
+        self.fts_enabled = self.schema_version >= 1
     
     async def create_session(self, name: Optional[str] = None) -> Dict[str, Any]:
         """Cria nova sessão."""
@@ -111,7 +243,7 @@ class SessionManager:
         }
         
         # Salva no banco
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -131,13 +263,19 @@ class SessionManager:
         
         # Adiciona às sessões ativas
         self.active_sessions[session_id] = session_data
+        self._persisted[session_id] = _PersistedContext()
         self.current_session_id = session_id
         
         return session_data
     
-    async def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Carrega sessão existente."""
-        conn = sqlite3.connect(str(self.db_path))
+    async def load_session(self, session_id: str, full_context: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Carrega sessão existente com os últimos context_page_size itens do
+        contexto (ou todos, com full_context). `has_more_context` indica que há
+        itens anteriores, disponíveis via load_context_page.
+        """
+        self.checkpoint()
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Carrega dados da sessão
@@ -163,77 +301,148 @@ class SessionManager:
             'context': []
         }
         
-        # Carrega contexto da sessão
+        # Carrega o fim do contexto (as linhas são gravadas na ordem da lista)
         cursor.execute("""
-            SELECT timestamp, message_type, content, metadata, token_count
+            SELECT id, timestamp, message_type, content, metadata, token_count
             FROM session_context 
             WHERE session_id = ? 
-            ORDER BY timestamp ASC
-        """, (session_id,))
+            ORDER BY id DESC
+            LIMIT ?
+        """, (session_id, -1 if full_context else self.context_page_size))
         
-        context_rows = cursor.fetchall()
-        for ctx_row in context_rows:
-            session_data['context'].append({
-                'timestamp': datetime.fromisoformat(ctx_row[0]),
-                'type': ctx_row[1],
-                'content': ctx_row[2],
-                'metadata': json.loads(ctx_row[3]) if ctx_row[3] else {},
-                'token_count': ctx_row[4]
-            })
+        persisted = _PersistedContext()
+        for ctx_row in reversed(cursor.fetchall()):
+            item = self._context_item(ctx_row)
+            session_data['context'].append(item)
+            persisted.row_ids.append(ctx_row[0])
+            persisted.keys.append(self._context_key(item))
+        
+        if persisted.row_ids:
+            cursor.execute("SELECT COUNT(*) FROM session_context WHERE session_id = ? AND id < ?",
+                           (session_id, persisted.row_ids[0]))
+            persisted.unloaded = cursor.fetchone()[0]
+        session_data['has_more_context'] = persisted.unloaded > 0
         
         conn.close()
         
         # Adiciona às sessões ativas
         self.active_sessions[session_id] = session_data
+        self._persisted[session_id] = persisted
         
         return session_data
     
+    async def load_context_page(self, session_id: str, before_id: Optional[int] = None,
+                                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Itens do contexto anteriores a `before_id` (o 'id' do item mais antigo já
+        carregado), em ordem cronológica. Só leitura: itens que voltam ao começo
+        do contexto com o 'id' intacto contam como já gravados no próximo save.
+        """
+        self.checkpoint()
+        conn = get_pool(self.db_path).connect()
+        try:
+            rows = conn.execute("""
+                SELECT id, timestamp, message_type, content, metadata, token_count
+                FROM session_context
+                WHERE session_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (session_id, before_id if before_id is not None else 2 ** 63 - 1,
+                  limit or self.context_page_size)).fetchall()
+        finally:
+            conn.close()
+        return [self._context_item(row) for row in reversed(rows)]
+    
     async def save_session(self, session_id: str, context: List[Dict[str, Any]]):
-        """Salva contexto da sessão."""
+        """
+        Salva contexto da sessão gravando só o que mudou desde o último save.
+
+        Itens são comparados por tipo, conteúdo e token_count; alterar só o
+        metadata de um item já salvo não o regrava.
+        """
         if session_id not in self.active_sessions:
             return False
         
         session = self.active_sessions[session_id]
+        session['context'] = context
+        persisted = self._persisted.setdefault(session_id, _PersistedContext())
+        self._absorb_loaded_history(persisted, context)
+        
+        keys = [self._context_key(item) for item in context]
+        start, common = self._align(persisted.keys, keys)
+        head_removed = start
+        tail_removed = len(persisted.keys) - start - common
+        new_items = context[common:]
+        
+        if not (head_removed or tail_removed or new_items or self._pending_commands):
+            return True
+        
+        conn = get_pool(self.db_path).connect()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                
+                # Remove o que saiu do contexto: um intervalo no começo e/ou no fim
+                if common == 0:
+                    cursor.execute("DELETE FROM session_context WHERE session_id = ?", (session_id,))
+                else:
+                    if head_removed:
+                        cursor.execute("DELETE FROM session_context WHERE session_id = ? AND id < ?",
+                                       (session_id, persisted.row_ids[start]))
+                    if tail_removed:
+                        cursor.execute("DELETE FROM session_context WHERE session_id = ? AND id >= ?",
+                                       (session_id, persisted.row_ids[start + common]))
+                
+                # Acrescenta os itens novos em um único executemany
+                row_ids = persisted.row_ids[start:start + common]
+                if new_items:
+                    cursor.executemany("""
+                        INSERT INTO session_context (session_id, timestamp, message_type, content, metadata, token_count)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, [
+                        (
+                            session_id,
+                            item.get('timestamp', datetime.now()),
+                            item.get('type', 'unknown'),
+                            self._context_content(item),
+                            json.dumps(item.get('metadata', {})),
+                            item.get('token_count', 0)
+                        )
+                        for item in new_items
+                    ])
+                    # A transação segura o lock de escrita, então os ids são consecutivos
+                    last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    row_ids.extend(range(last_id - len(new_items) + 1, last_id + 1))
+                
+                self._write_pending_commands(cursor)
+
+                # Atualiza dados da sessão
+                # Apagar o começo (ou tudo) leva junto as linhas não carregadas
+                unloaded = persisted.unloaded if common and not head_removed else 0
+                cursor.execute("""
+                    UPDATE sessions 
+                    SET last_active = ?, command_count = ?, context_size = ?
+                    WHERE id = ?
+                """, (
+                    datetime.now(),
+                    session['command_count'],
+                    unloaded + len(context),
+                    session_id
+                ))
+        finally:
+            conn.close()
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        # Atualiza dados da sessão
-        cursor.execute("""
-            UPDATE sessions 
-            SET last_active = ?, command_count = ?, context_size = ?
-            WHERE id = ?
-        """, (
-            datetime.now(),
-            session['command_count'],
-            len(context),
-            session_id
-        ))
-        
-        # Remove contexto antigo
-        cursor.execute("DELETE FROM session_context WHERE session_id = ?", (session_id,))
-        
-        # Salva novo contexto
-        for item in context:
-            cursor.execute("""
-                INSERT INTO session_context (session_id, timestamp, message_type, content, metadata, token_count)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                session_id,
-                item.get('timestamp', datetime.now()),
-                item.get('type', 'unknown'),
-                item.get('input') or item.get('output') or item.get('content', ''),
-                json.dumps(item.get('metadata', {})),
-                item.get('token_count', 0)
-            ))
-        
-        conn.commit()
-        conn.close()
-        
+        persisted.row_ids = row_ids
+        persisted.keys = keys
+        persisted.unloaded = unloaded
+        self.save_stats['saves'] += 1
+        self.save_stats['rows_inserted'] += len(new_items)
+        self.save_stats['rows_deleted'] += head_removed + tail_removed
         return True
     
     async def switch_session(self, session_id: str) -> bool:
-        """Alterna para sessão específica."""
+        """Alterna para sessão específica (aceita um prefixo único do id)."""
+        session_id = self.resolve_session_id(session_id) or session_id
         # Carrega sessão se não estiver em memória
         if session_id not in self.active_sessions:
             session = await self.load_session(session_id)
@@ -243,7 +452,7 @@ class SessionManager:
         self.current_session_id = session_id
         
         # Atualiza last_active
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         cursor.execute("""
             UPDATE sessions SET last_active = ? WHERE id = ?
@@ -255,7 +464,10 @@ class SessionManager:
     
     async def delete_session(self, session_id: str) -> bool:
         """Remove sessão."""
-        conn = sqlite3.connect(str(self.db_path))
+        self._pending_commands = [c for c in self._pending_commands if c[0] != session_id]
+        self._persisted.pop(session_id, None)
+        
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Remove contexto
@@ -280,21 +492,36 @@ class SessionManager:
         
         return True
     
-    async def list_sessions(self, limit: int = 20, active_only: bool = False) -> List[Dict[str, Any]]:
-        """Lista sessões disponíveis."""
-        conn = sqlite3.connect(str(self.db_path))
+    async def list_sessions(self, limit: int = 20, active_only: bool = False,
+                            after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lista sessões disponíveis, mais recentes primeiro.
+
+        Paginação por chave: passe em `after` o 'cursor' do último item da
+        página anterior; o custo não depende de quantas páginas já passaram.
+        """
+        self.checkpoint()
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         query = """
             SELECT id, name, created_at, last_active, command_count, status, context_size
             FROM sessions
         """
-        params = []
+        where = []
+        params: List[Any] = []
         
         if active_only:
-            query += " WHERE status = 'active'"
-        
-        query += " ORDER BY last_active DESC LIMIT ?"
+            where.append("status = 'active'")
+        if after:
+            last_active, _, last_id = after.rpartition('|')
+            # Comparação de row values: busca direto no índice (last_active, id)
+            where.append("(last_active, id) < (?, ?)")
+            params.extend([last_active, last_id])
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        
+        query += " ORDER BY last_active DESC, id DESC LIMIT ?"
         params.append(limit)
         
         cursor.execute(query, params)
@@ -311,14 +538,16 @@ class SessionManager:
                 'command_count': row[4],
                 'status': row[5],
                 'context_size': row[6],
-                'is_current': row[0] == self.current_session_id
+                'is_current': row[0] == self.current_session_id,
+                'cursor': f"{row[3]}|{row[0]}"
             })
         
         return sessions
     
     async def get_session_stats(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Obtém estatísticas de uma sessão."""
-        conn = sqlite3.connect(str(self.db_path))
+        self.checkpoint()
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Dados básicos da sessão
@@ -385,12 +614,13 @@ class SessionManager:
     
     async def export_session(self, session_id: str, format: str = 'json') -> Optional[Dict[str, Any]]:
         """Exporta dados de uma sessão."""
-        session = await self.load_session(session_id)
+        session = await self.load_session(session_id, full_context=True)
         if not session:
             return None
         
         # Busca comandos executados
-        conn = sqlite3.connect(str(self.db_path))
+        self.checkpoint()
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -444,8 +674,9 @@ class SessionManager:
     async def cleanup_old_sessions(self, days: int = 30):
         """Remove sessões antigas."""
         cutoff_date = datetime.now() - timedelta(days=days)
+        self.checkpoint()
         
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Busca sessões antigas
@@ -455,6 +686,8 @@ class SessionManager:
         """, (cutoff_date,))
         
         old_session_ids = [row[0] for row in cursor.fetchall()]
+        for session_id in old_session_ids:
+            self._persisted.pop(session_id, None)
         
         # Remove cada sessão antiga
         for session_id in old_session_ids:
@@ -468,62 +701,339 @@ class SessionManager:
         return len(old_session_ids)
     
     async def search_sessions(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Busca sessões por conteúdo."""
-        conn = sqlite3.connect(str(self.db_path))
+        """
+        Busca sessões por conteúdo e nome.
+
+        Com FTS5, as sessões vêm ordenadas por relevância (BM25 somado dos
+        trechos do contexto e BM25 do nome, fundidos por reciprocal rank fusion)
+        e cada uma traz o `snippet` mais relevante com os termos destacados e o
+        número de `matches`.
+        """
+        self.checkpoint()
+        fts_query = self._fts_query(query)
+        if not fts_query:
+            return []
+        
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
-        # Busca em nomes de sessões e contexto
+        if not self.fts_enabled:
+            # Fallback sem FTS5: LIKE em nomes e contexto
+            cursor.execute("""
+                SELECT DISTINCT s.id, s.name, s.created_at, s.last_active, s.command_count
+                FROM sessions s
+                LEFT JOIN session_context sc ON s.id = sc.session_id
+                WHERE s.name LIKE ? OR sc.content LIKE ?
+                ORDER BY s.last_active DESC
+                LIMIT ?
+            """, (f'%{query}%', f'%{query}%', limit))
+            results = [self._search_result(row) for row in cursor.fetchall()]
+            conn.close()
+            return results
+        
+        # Trechos do contexto que casam, dos mais novos para os mais antigos: o FTS5
+        # percorre o índice em ordem de rowid e para no limite, então termos muito
+        # comuns não custam mais que os raros (ranqueiam-se os candidatos mais recentes)
+        cursor.execute("""
+            SELECT sc.session_id, session_context_fts.rowid, session_context_fts.rank
+            FROM session_context_fts
+            JOIN session_context sc ON sc.id = session_context_fts.rowid
+            WHERE session_context_fts MATCH ?
+            ORDER BY session_context_fts.rowid DESC
+            LIMIT ?
+        """, (fts_query, max(limit * 20, self.search_candidates)))
+        best_rowid: Dict[str, int] = {}
+        best_rank: Dict[str, float] = {}
+        matches: Dict[str, int] = {}
+        relevance: Dict[str, float] = {}
+        for session_id, rowid, rank in cursor.fetchall():
+            if session_id not in best_rank or rank < best_rank[session_id]:
+                best_rank[session_id] = rank
+                best_rowid[session_id] = rowid
+            matches[session_id] = matches.get(session_id, 0) + 1
+            relevance[session_id] = relevance.get(session_id, 0.0) - rank  # bm25: menor é melhor
+        by_content = sorted(relevance, key=lambda session_id: -relevance[session_id])
+        
+        # Nomes: mesmo limite de candidatos (sessões mais novas), ordenados por BM25
         cursor.execute("""
-            SELECT DISTINCT s.id, s.name, s.created_at, s.last_active, s.command_count
-            FROM sessions s
-            LEFT JOIN session_context sc ON s.id = sc.session_id
-            WHERE s.name LIKE ? OR sc.content LIKE ?
-            ORDER BY s.last_active DESC
+            SELECT s.id, session_names_fts.rank FROM session_names_fts
+            JOIN sessions s ON s.rowid = session_names_fts.rowid
+            WHERE session_names_fts MATCH ?
+            ORDER BY session_names_fts.rowid DESC
             LIMIT ?
-        """, (f'%{query}%', f'%{query}%', limit))
+        """, (fts_query, self.search_candidates))
+        by_name = [session_id for session_id, _ in sorted(cursor.fetchall(), key=lambda row: row[1])][:limit]
+        
+        # Reciprocal rank fusion das duas listas
+        scores: Dict[str, float] = {}
+        for ranking in (by_content, by_name):
+            for rank, session_id in enumerate(ranking):
+                scores[session_id] = scores.get(session_id, 0.0) + 1 / (60 + rank)
+        ranked = sorted(scores, key=lambda session_id: -scores[session_id])[:limit]
+        
+        rows, snippets = {}, {}
+        if ranked:
+            cursor.execute(f"""
+                SELECT id, name, created_at, last_active, command_count
+                FROM sessions WHERE id IN ({','.join('?' * len(ranked))})
+            """, ranked)
+            rows = {row[0]: row for row in cursor.fetchall()}
+            
+            # Trecho destacado só do melhor item das sessões exibidas (snippet() do
+            # FTS5 percorreria de novo todas as ocorrências do termo)
+            rowids = [best_rowid[session_id] for session_id in ranked if session_id in best_rowid]
+            if rowids:
+                cursor.execute(f"""
+                    SELECT id, content FROM session_context WHERE id IN ({','.join('?' * len(rowids))})
+                """, rowids)
+                terms = self._search_terms(query)
+                snippets = {row_id: self._snippet(content or '', terms) for row_id, content in cursor.fetchall()}
+        conn.close()
         
         results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row[0],
-                'name': row[1],
-                'created_at': datetime.fromisoformat(row[2]),
-                'last_active': datetime.fromisoformat(row[3]),
-                'command_count': row[4]
-            })
-        
-        conn.close()
+        for session_id in ranked:
+            if session_id not in rows:
+                continue
+            result = self._search_result(rows[session_id])
+            result['score'] = scores[session_id]
+            result['snippet'] = snippets.get(best_rowid.get(session_id))
+            result['matches'] = matches.get(session_id, 0)
+            results.append(result)
         return results
     
+    @staticmethod
+    def _search_result(row: tuple) -> Dict[str, Any]:
+        return {
+            'id': row[0],
+            'name': row[1],
+            'created_at': datetime.fromisoformat(row[2]),
+            'last_active': datetime.fromisoformat(row[3]),
+            'command_count': row[4]
+        }
+    
+    @staticmethod
+    def _fold(text: str) -> str:
+        """Minúsculas sem acentos, como o tokenizer do FTS (remove_diacritics)."""
+        return ''.join(c for c in unicodedata.normalize('NFKD', text.lower())
+                       if not unicodedata.combining(c))
+    
+    @classmethod
+    def _search_terms(cls, text: str, max_terms: int = 10) -> List[str]:
+        terms = []
+        for token in re.findall(r'\w+', text.lower()):
+            if token not in terms:
+                terms.append(token)
+            if len(terms) >= max_terms:
+                break
+        return terms
+    
+    @classmethod
+    def _fts_query(cls, text: str, max_terms: int = 10) -> str:
+        """Converte texto livre em consulta FTS5 (todos os termos, com prefixo)."""
+        return " ".join(f'"{term}"*' for term in cls._search_terms(text, max_terms))
+    
+    @classmethod
+    def _snippet(cls, content: str, terms: List[str], window: int = 12) -> str:
+        """Janela de até `window` palavras em torno da primeira ocorrência, com os termos em negrito."""
+        folded_terms = [cls._fold(term) for term in terms]
+        words = list(re.finditer(r'\w+', content))
+        if not words:
+            return content[:80]
+        hits = [any(cls._fold(word.group()).startswith(term) for term in folded_terms) for word in words]
+        first = hits.index(True) if True in hits else 0
+        start = max(0, min(first - window // 3, len(words) - window))
+        end = min(len(words), start + window)
+        
+        parts, position = [], words[start].start()
+        for word, hit in zip(words[start:end], hits[start:end]):
+            parts.append(content[position:word.start()])
+            parts.append(f"**{word.group()}**" if hit else word.group())
+            position = word.end()
+        return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(words) else '')
+    
+    def resolve_session_id(self, prefix: str) -> Optional[str]:
+        """Id completo da única sessão cujo id começa com `prefix` (faixa da chave primária)."""
+        if not prefix:
+            return None
+        conn = get_pool(self.db_path).connect()
+        try:
+            rows = conn.execute(
+                "SELECT id FROM sessions WHERE id >= ? AND id < ? LIMIT 2",
+                (prefix, prefix + '\uffff')
+            ).fetchall()
+        finally:
+            conn.close()
+        return rows[0][0] if len(rows) == 1 else None
+    
     def get_current_session(self) -> Optional[Dict[str, Any]]:
         """Retorna sessão atual."""
         if self.current_session_id and self.current_session_id in self.active_sessions:
             return self.active_sessions[self.current_session_id]
         return None
     
+    async def save_current_session(self) -> bool:
+        """Salva a sessão atual com o último contexto recebido e grava os comandos em buffer."""
+        session = self.get_current_session()
+        if session is None:
+            self.checkpoint()
+            return False
+        return await self.save_session(session['id'], session.get('context', []))
+    
+    async def clear_current_session(self) -> bool:
+        """Esvazia o contexto salvo da sessão atual."""
+        if self.get_current_session() is None:
+            return False
+        return await self.save_session(self.current_session_id, [])
+    
     async def log_command(self, session_id: str, command: str, command_type: str, 
                          result: str, execution_time_ms: int, success: bool):
-        """Registra comando executado."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        """Registra comando executado (gravado em lote no próximo save ou checkpoint)."""
+        # Mesmo formato do CURRENT_TIMESTAMP que o banco usaria na inserção
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self._pending_commands.append(
+            (session_id, timestamp, command, command_type, result, execution_time_ms, success)
+        )
         
-        cursor.execute("""
-            INSERT INTO session_commands 
-            (session_id, command, command_type, result, execution_time_ms, success)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (session_id, command, command_type, result, execution_time_ms, success))
+        # Atualiza em memória
+        if session_id in self.active_sessions:
+            self.active_sessions[session_id]['command_count'] += 1
+            self.active_sessions[session_id]['last_active'] = datetime.now()
         
-        # Atualiza contador de comandos da sessão
-        cursor.execute("""
+        if (len(self._pending_commands) >= self.command_batch_size
+                or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+            self.checkpoint()
+    
+    def checkpoint(self) -> int:
+        """Grava os comandos em buffer numa única transação. Retorna quantos foram gravados."""
+        self._last_checkpoint = time.monotonic()
+        if not self._pending_commands:
+            return 0
+        
+        conn = get_pool(self.db_path).connect()
+        try:
+            with conn:
+                written = self._write_pending_commands(conn.cursor())
+        finally:
+            conn.close()
+        return written
+    
+    def _write_pending_commands(self, cursor: sqlite3.Cursor) -> int:
+        """Insere os comandos em buffer e atualiza os contadores das sessões (na transação do chamador)."""
+        pending = self._pending_commands
+        self._last_checkpoint = time.monotonic()
+        if not pending:
+            return 0
+        
+        cursor.executemany("""
+            INSERT INTO session_commands 
+            (session_id, timestamp, command, command_type, result, execution_time_ms, success)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, pending)
+        
+        # Atualiza contador de comandos das sessões
+        counts: Dict[str, int] = {}
+        for command in pending:
+            counts[command[0]] = counts.get(command[0], 0) + 1
+        now = datetime.now()
+        cursor.executemany("""
             UPDATE sessions 
-            SET command_count = command_count + 1, last_active = ?
+            SET command_count = command_count + ?, last_active = ?
             WHERE id = ?
-        """, (datetime.now(), session_id))
-        
-        conn.commit()
-        conn.close()
+        """, [(count, now, session_id) for session_id, count in counts.items()])
         
-        # Atualiza em memória
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id]['command_count'] += 1
-            self.active_sessions[session_id]['last_active'] = datetime.now()
\ No newline at end of file
+        self._pending_commands = []
+        self.save_stats['commands_written'] += len(pending)
+        self.save_stats['checkpoints'] += 1
+        return len(pending)
+    
+    @staticmethod
+    def _context_item(row: tuple) -> Dict[str, Any]:
+        """Item do contexto a partir de (id, timestamp, message_type, content, metadata, token_count)."""
+        return {
+            'id': row[0],
+            'timestamp': datetime.fromisoformat(row[1]),
+            'type': row[2],
+            'content': row[3],
+            'metadata': json.loads(row[4]) if row[4] else {},
+            'token_count': row[5]
+        }
+    
+    @staticmethod
+    def _context_content(item: Dict[str, Any]) -> str:
+        return item.get('input') or item.get('output') or item.get('content', '')
+    
+    @classmethod
+    def _context_key(cls, item: Dict[str, Any]) -> tuple:
+        """Identidade de um item do contexto para comparar com o que já foi salvo."""
+        return (item.get('type', 'unknown'), cls._context_content(item), item.get('token_count', 0))
+    
+    @classmethod
+    def _absorb_loaded_history(cls, persisted: _PersistedContext, context: List[Dict[str, Any]]):
+        """
+        Itens no começo do contexto com 'id' anterior à primeira linha conhecida
+        vieram de load_context_page: já estão no banco, então passam a contar
+        como persistidos em vez de parecerem um contexto novo (o que apagaria
+        as linhas ainda não carregadas).
+        """
+        if not persisted.row_ids:
+            return
+        first = persisted.row_ids[0]
+        count = 0
+        previous = None
+        for item in context:
+            row_id = item.get('id')
+            if not isinstance(row_id, int) or row_id >= first or (previous is not None and row_id <= previous):
+                break
+            previous = row_id
+            count += 1
+        if not count:
+            return
+        loaded = context[:count]
+        persisted.row_ids = [item['id'] for item in loaded] + persisted.row_ids
+        persisted.keys = [cls._context_key(item) for item in loaded] + persisted.keys
+        persisted.unloaded = max(0, persisted.unloaded - count)
+    
+    @staticmethod
+    def _align(saved: List[tuple], current: List[tuple]) -> Tuple[int, int]:
+        """
+        Acha o trecho salvo que continua valendo: retorna (início, comum) tal que
+        saved[início:início + comum] == current[:comum].
+
+        Cobre os casos do REPL: só acréscimos (início 0), compactação que
+        descarta o começo da lista (o resto salvo é um sufixo) e troca/remoção
+        dos últimos itens. Qualquer outra coisa regrava a partir da divergência.
+        """
+        if not saved or not current:
+            return 0, 0
+        
+        # Prefixo comum a partir do começo
+        common = 0
+        limit = min(len(saved), len(current))
+        while common < limit and saved[common] == current[common]:
+            common += 1
+        if common == len(saved) or common == len(current):
+            return 0, common
+        
+        # O começo foi descartado: procura onde o contexto atual começa no salvo
+        first = current[0]
+        candidates = 0
+        for start in range(1, len(saved)):
+            if saved[start] != first:
+                continue
+            overlap = len(saved) - start
+            if overlap <= len(current) and saved[start:] == current[:overlap] and overlap > common:
+                return start, overlap
+            candidates += 1
+            if candidates >= _MAX_ALIGN_CANDIDATES:
+                break
+        return 0, common
+
+
+@atexit.register
+def _checkpoint_all_on_exit():
+    """Comandos em buffer não se perdem num encerramento normal do processo."""
+    for manager in list(_LIVE_MANAGERS):
+        try:
+            manager.checkpoint()
+        except Exception:
+            pass
@@ -74,6 +74,7 @@ from ..metrics.dashboard_generator import DashboardGenerator
 
 # Utils imports
 from ..utils.logger import Logger
+from ..interface.stream_renderer import StreamRenderer
 
 
 class ProcessingMode(Enum):
@@ -756,11 +757,14 @@ class SupremeGeminiREPL:
                 # Monta prompt supremo
                 supreme_prompt = self._build_supreme_prompt(command, context, results)
                 
-                # Gera resposta
-                response = await self.gemini_client.generate_response(
-                    supreme_prompt,
-                    thinking_budget=16384 if self.processing_mode == ProcessingMode.SUPREME else 8192
-                )
+                # Gera resposta em streaming (parcial visível enquanto é gerada)
+                with StreamRenderer(self.console, title="🏆 Gemini Code SUPREMO", progress=progress) as renderer:
+                    response = await self.gemini_client.generate_response(
+                        supreme_prompt,
+                        thinking_budget=16384 if self.processing_mode == ProcessingMode.SUPREME else 8192,
+                        stream=True,
+                        on_chunk=renderer
+                    )
                 
                 progress.update(main_task, advance=80)
                 
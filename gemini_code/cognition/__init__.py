@@ -2,11 +2,16 @@
 Módulo de Cognição Avançada - Reasoning e Inteligência Superior
 """
 
-from .architectural_reasoning import ArchitecturalReasoning
-from .complexity_analyzer import ComplexityAnalyzer
-from .design_pattern_engine import DesignPatternEngine
-from .problem_solver import ProblemSolver
-from .learning_engine import LearningEngine
+from ..core.lazy_loader import lazy_exports
+
+# Submódulos importados no primeiro acesso
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ArchitecturalReasoning': '.architectural_reasoning',
+    'ComplexityAnalyzer': '.complexity_analyzer',
+    'DesignPatternEngine': '.design_pattern_engine',
+    'ProblemSolver': '.problem_solver',
+    'LearningEngine': '.learning_engine',
+})
 
 __all__ = [
     'ArchitecturalReasoning',
@@ -2,19 +2,24 @@
 Sistema de Raciocínio Arquitetural - Análise e Design de Alto Nível
 """
 
+from __future__ import annotations
+
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import json
 from pathlib import Path
-import networkx as nx
 from datetime import datetime
 
 from ..core.gemini_client import GeminiClient
 from ..core.project_manager import ProjectManager
 from ..analysis.code_navigator import CodeNavigator
 from ..utils.logger import Logger
+from ..core.lazy_loader import lazy_import
+
+# networkx só é carregado na primeira análise de dependências
+nx = lazy_import('networkx')
 
 
 class ArchitecturePattern(Enum):
@@ -13,6 +13,7 @@ import math
 
 from ..core.gemini_client import GeminiClient
 from ..core.project_manager import ProjectManager
+from ..core.ast_cache import get_ast_cache
 from ..utils.logger import Logger
 
 
@@ -173,7 +174,7 @@ class ComplexityAnalyzer:
     async def _analyze_python_complexity(self, content: str, file_path: str) -> Dict[str, Any]:
         """Analisa complexidade de código Python."""
         try:
-            tree = ast.parse(content)
+            tree = get_ast_cache().parse_source(content, file_path).get_tree()
             
             analyzer = PythonComplexityVisitor()
             analyzer.visit(tree)
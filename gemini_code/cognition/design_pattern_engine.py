@@ -12,6 +12,7 @@ import re
 
 from ..core.gemini_client import GeminiClient
 from ..core.project_manager import ProjectManager
+from ..core.ast_cache import get_ast_cache
 from ..utils.logger import Logger
 
 
@@ -224,11 +225,11 @@ class DesignPatternEngine:
                 continue
             
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                parsed = get_ast_cache().get(file_path)
+                content = parsed.source
                 
                 # Análise AST para Python
-                tree = ast.parse(content)
+                tree = parsed.get_tree()
                 
                 # Detecta padrões baseado em estrutura
                 file_patterns = self._analyze_ast_for_patterns(tree, file_path)
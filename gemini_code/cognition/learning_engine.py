@@ -8,12 +8,13 @@ from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 import json
-import sqlite3
 from pathlib import Path
 import statistics
 
 from ..core.gemini_client import GeminiClient
 from ..core.memory_system import MemorySystem
+from ..core.sqlite_pool import get_pool
+from ..core.similarity_index import SimilarityIndex
 from ..utils.logger import Logger
 
 
@@ -100,13 +101,18 @@ class LearningEngine:
         # Configurações de aprendizado
         self.min_confidence_threshold = 0.6
         self.pattern_detection_threshold = 3  # Mínimo de ocorrências
+        self.similarity_threshold = 0.3  # cosseno mínimo entre contextos "similares"
+        
+        # Índice de similaridade dos contextos (chave = rowid em learning_entries)
+        self.similarity = SimilarityIndex(self.db_path.with_suffix('.simidx'), autosave_every=500)
         
         # Carrega dados existentes
         self._load_learned_data()
+        self._sync_similarity_index()
     
     def _init_database(self):
         """Inicializa banco de dados de aprendizado."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Tabela de aprendizados
@@ -167,7 +173,7 @@ class LearningEngine:
     
     def _load_learned_data(self):
         """Carrega dados aprendidos do banco."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Carrega padrões
@@ -203,6 +209,25 @@ class LearningEngine:
         
         self.logger.info(f"📚 Carregados {len(self.patterns)} padrões e {len(self.user_preferences)} preferências")
     
+    def _sync_similarity_index(self):
+        """Indexa as entradas gravadas depois do último save do índice."""
+        conn = get_pool(self.db_path).connect()
+        try:
+            max_rowid = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM learning_entries').fetchone()[0]
+            if self.similarity.watermark > max_rowid:
+                # Banco recriado: reindexa do zero
+                self.similarity.clear()
+            rows = conn.execute(
+                'SELECT rowid, context FROM learning_entries WHERE rowid > ? ORDER BY rowid',
+                (self.similarity.watermark,)
+            ).fetchall()
+        finally:
+            conn.close()
+        self.similarity.add_many(rows)
+        self.similarity.watermark = max_rowid
+        if rows:
+            self.similarity.save()
+    
     async def learn_from_interaction(self, interaction: Dict[str, Any]) -> LearningEntry:
         """
         Aprende com uma interação.
@@ -304,7 +329,7 @@ class LearningEngine:
     
     def _save_learning_entry(self, entry: LearningEntry):
         """Salva entrada de aprendizado no banco."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -324,6 +349,9 @@ class LearningEngine:
         
         conn.commit()
         conn.close()
+        
+        self.similarity.add(cursor.lastrowid, entry.context)
+        self.similarity.watermark = max(self.similarity.watermark, cursor.lastrowid)
     
     async def _process_learning(self, entry: LearningEntry):
         """Processa entrada de aprendizado."""
@@ -356,20 +384,23 @@ class LearningEngine:
                 self.logger.info(f"🎯 Novo padrão detectado: {pattern.description}")
     
     def _find_similar_entries(self, entry: LearningEntry) -> List[LearningEntry]:
-        """Encontra entradas similares."""
-        conn = sqlite3.connect(self.db_path)
+        """Encontra entradas similares (cosseno dos contextos, mesmo tipo)."""
+        hits = self.similarity.search(entry.context, k=100, min_score=self.similarity_threshold)
+        if not hits:
+            return []
+        rank = {hit.key: position for position, hit in enumerate(hits)}
+        
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
-        # Busca por contexto similar
-        cursor.execute('''
-        SELECT * FROM learning_entries
-        WHERE type = ? AND context LIKE ?
-        ORDER BY timestamp DESC
-        LIMIT 20
-        ''', (entry.type.value, f"%{entry.context.split()[0]}%"))
+        cursor.execute(f'''
+        SELECT rowid, * FROM learning_entries
+        WHERE type = ? AND rowid IN ({','.join('?' * len(hits))})
+        ''', [entry.type.value] + [hit.key for hit in hits])
         
+        rows = sorted(cursor.fetchall(), key=lambda row: rank[row[0]])[:20]
         similar = []
-        for row in cursor.fetchall():
+        for rowid, *row in rows:
             similar_entry = LearningEntry(
                 id=row[0],
                 type=LearningType(row[1]),
@@ -419,7 +450,7 @@ class LearningEngine:
     
     def _save_pattern(self, pattern: Pattern):
         """Salva padrão no banco."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -509,7 +540,7 @@ Return None if no clear preference.
     
     def _save_preference(self, preference: UserPreference):
         """Salva preferência no banco."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -535,7 +566,7 @@ Return None if no clear preference.
         operation = entry.context.split()[0]  # Primeira palavra como operação
         execution_time = entry.metadata['execution_time']
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Busca métricas existentes
@@ -570,7 +601,7 @@ Return None if no clear preference.
     
     def _update_performance_cache(self, operation: str):
         """Atualiza cache de performance."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM performance_metrics WHERE operation = ?', (operation,))
@@ -701,7 +732,7 @@ Be specific and actionable.
     def get_performance_insights(self) -> Dict[str, PerformanceInsight]:
         """Retorna insights de performance."""
         # Atualiza cache se necessário
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT operation FROM performance_metrics')
@@ -12,6 +12,7 @@ import json
 from ..core.gemini_client import GeminiClient
 from ..core.project_manager import ProjectManager
 from ..analysis.error_detector import ErrorDetector
+from ..core.similarity_index import SimilarityIndex
 from ..utils.logger import Logger
 
 
@@ -106,6 +107,10 @@ class ProblemSolver:
         self.problem_history: List[Problem] = []
         self.solution_history: List[Solution] = []
         self.resolution_history: List[ResolutionResult] = []
+        self._problems_by_id: Dict[str, Problem] = {}
+        
+        # Problemas resolvidos com sucesso (chave = posição em resolution_history)
+        self.resolved_index = SimilarityIndex()
         
         # Padrões de solução conhecidos
         self.solution_patterns = self._load_solution_patterns()
@@ -198,6 +203,7 @@ class ProblemSolver:
         
         # Adiciona ao histórico
         self.problem_history.append(problem)
+        self._problems_by_id[problem.id] = problem
         
         return problem
     
@@ -402,15 +408,14 @@ Return only the category name.
         """Busca soluções em histórico."""
         solutions = []
         
-        # Busca problemas similares resolvidos
-        for past_problem, past_solution, result in zip(
-            self.problem_history[-50:],  # Últimos 50
-            self.solution_history[-50:],
-            self.resolution_history[-50:]
-        ):
-            if past_problem.type == problem.type and result.success:
+        # Busca problemas similares resolvidos (índice de similaridade, todo o histórico)
+        for hit in self.resolved_index.search(problem.description, k=20):
+            result = self.resolution_history[hit.key]
+            past_problem = self._problems_by_id.get(result.problem_id)
+            past_solution = result.solution_applied
+            if past_problem is not None and past_solution is not None and past_problem.type == problem.type:
                 # Calcula similaridade
-                similarity = self._calculate_problem_similarity(problem, past_problem)
+                similarity = self._calculate_problem_similarity(problem, past_problem, hit.score)
                 
                 if similarity > 0.7:
                     # Adapta solução anterior
@@ -430,7 +435,8 @@ Return only the category name.
         
         return solutions
     
-    def _calculate_problem_similarity(self, p1: Problem, p2: Problem) -> float:
+    def _calculate_problem_similarity(self, p1: Problem, p2: Problem,
+                                      text_similarity: Optional[float] = None) -> float:
         """Calcula similaridade entre problemas."""
         score = 0.0
         
@@ -438,15 +444,10 @@ Return only the category name.
         if p1.type == p2.type:
             score += 0.3
         
-        # Similaridade de descrição (simplificado)
-        words1 = set(p1.description.lower().split())
-        words2 = set(p2.description.lower().split())
-        
-        if words1 and words2:
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            jaccard = intersection / union
-            score += 0.4 * jaccard
+        # Similaridade de descrição (cosseno de n-gramas: pega flexões e paráfrases)
+        if text_similarity is None:
+            text_similarity = self.resolved_index.similarity(p1.description, p2.description)
+        score += 0.4 * text_similarity
         
         # Arquivos relacionados similares
         if p1.related_files and p2.related_files:
@@ -655,6 +656,9 @@ Be specific and actionable.
         
         # Adiciona ao histórico
         self.resolution_history.append(resolution_result)
+        problem = self._problems_by_id.get(resolution_result.problem_id)
+        if resolution_result.success and problem is not None:
+            self.resolved_index.add(len(self.resolution_history) - 1, problem.description)
         
         return resolution_result
     
@@ -0,0 +1,296 @@
+"""
+Cache compartilhado de ASTs endereçado por conteúdo.
+
+Um único serviço por processo entrega árvore sintática, texto-fonte e tabela
+de linhas para todos os analisadores (erros, performance, segurança, health
+checks, navegação, complexidade e padrões). As árvores são indexadas pelo hash
+do conteúdo e persistidas em disco, então uma execução "quente" não parseia
+nenhum arquivo novamente.
+
+O cache em disco fica no diretório de cache do usuário, fora do projeto
+analisado, e cada entrada é assinada com HMAC usando uma chave privada do
+usuário: um .pickle plantado num repositório clonado nunca é desserializado.
+"""
+import ast
+import bisect
+import hashlib
+import hmac
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+# A serialização de ASTs muda entre versões do Python
+_CACHE_NAMESPACE = f"py{sys.version_info[0]}{sys.version_info[1]}"
+
+_KEY_SIZE = 32
+_MAC_SIZE = hashlib.sha256().digest_size
+
+
+def user_cache_dir() -> Path:
+    """Diretório de cache do usuário ($XDG_CACHE_HOME ou ~/.cache)/gemini_code."""
+    base = os.environ.get('XDG_CACHE_HOME') or (Path.home() / '.cache')
+    return Path(base) / 'gemini_code'
+
+
+def _load_or_create_key(key_path: Path) -> Optional[bytes]:
+    """
+    Lê (ou cria com permissão 0600) a chave HMAC do cache. Retorna None se o
+    arquivo não for confiável (de outro usuário ou legível por outros).
+    """
+    try:
+        key_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        try:
+            fd = os.open(str(key_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(os.urandom(_KEY_SIZE))
+
+        info = os.stat(key_path)
+        if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+            return None
+        with open(key_path, 'rb') as f:
+            key = f.read()
+        return key if len(key) == _KEY_SIZE else None
+    except OSError:
+        return None
+
+
+@dataclass
+class ParsedSource:
+    """Resultado do parse de um arquivo ou trecho de código."""
+    content_hash: str
+    source: str
+    tree: Optional[ast.Module] = None
+    error: Optional[Exception] = None
+    path: Optional[str] = None
+    _lines: Optional[List[str]] = field(default=None, repr=False)
+    _line_offsets: Optional[List[int]] = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        """Indica se o parse foi bem-sucedido."""
+        return self.tree is not None
+
+    @property
+    def lines(self) -> List[str]:
+        """Linhas do fonte (equivalente a source.split('\\n'))."""
+        if self._lines is None:
+            self._lines = self.source.split('\n')
+        return self._lines
+
+    @property
+    def line_offsets(self) -> List[int]:
+        """Offset (em caracteres) do início de cada linha."""
+        if self._line_offsets is None:
+            offsets = [0]
+            for line in self.lines[:-1]:
+                offsets.append(offsets[-1] + len(line) + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def line_of_offset(self, offset: int) -> int:
+        """Converte offset de caractere em número de linha (1-based)."""
+        return bisect.bisect_right(self.line_offsets, offset)
+
+    def get_tree(self) -> ast.Module:
+        """Retorna a AST ou relança o erro original, como ast.parse faria."""
+        if self.error is not None:
+            raise type(self.error)(*self.error.args)
+        return self.tree
+
+
+class ASTCache:
+    """Serviço de parse compartilhado com cache em memória (LRU) e em disco."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_memory_entries: int = 8192,
+        persist: bool = True,
+        key_path: Optional[Union[str, Path]] = None
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir() / 'ast_cache'
+        self.cache_dir = self.cache_dir / _CACHE_NAMESPACE
+        self.max_memory_entries = max_memory_entries
+        self.key_path = Path(key_path) if key_path else user_cache_dir() / 'ast_cache.key'
+        # Sem chave confiável, nada é lido nem gravado em disco
+        self._key = _load_or_create_key(self.key_path) if persist else None
+        self.persist = persist and self._key is not None
+
+        # hash -> (tree, error)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'requests': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'parse_errors': 0,
+            'disk_writes': 0,
+        }
+
+    @staticmethod
+    def hash_content(data: Union[str, bytes]) -> str:
+        """Hash do conteúdo usado como chave do cache."""
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='surrogatepass')
+        return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+    def get(self, file_path: Union[str, Path], encoding: str = 'utf-8') -> ParsedSource:
+        """Lê e parseia um arquivo, reaproveitando a AST se o conteúdo não mudou.
+
+        Erros de leitura/decodificação são propagados como em open().read().
+        """
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        source = raw.decode(encoding)
+        # Mantém a normalização de quebras de linha do modo texto
+        if '\r' in source:
+            source = source.replace('\r\n', '\n').replace('\r', '\n')
+        # A chave vem do texto normalizado, igual a parse_source()
+        return self._lookup(self.hash_content(source), source, str(file_path))
+
+    def parse_source(self, source: str, path: Optional[str] = None) -> ParsedSource:
+        """Parseia um texto já carregado em memória."""
+        return self._lookup(self.hash_content(source), source, path)
+
+    def _lookup(self, content_hash: str, source: str, path: Optional[str]) -> ParsedSource:
+        with self._lock:
+            self._stats['requests'] += 1
+            entry = self._memory.get(content_hash)
+            if entry is not None:
+                self._memory.move_to_end(content_hash)
+                self._stats['memory_hits'] += 1
+
+        if entry is None:
+            entry = self._load_from_disk(content_hash)
+            if entry is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+            else:
+                entry = self._parse(source)
+                with self._lock:
+                    self._stats['misses'] += 1
+                    if entry[1] is not None:
+                        self._stats['parse_errors'] += 1
+                self._save_to_disk(content_hash, entry)
+            self._remember(content_hash, entry)
+
+        tree, error = entry
+        return ParsedSource(
+            content_hash=content_hash,
+            source=source,
+            tree=tree,
+            error=error,
+            path=path
+        )
+
+    @staticmethod
+    def _parse(source: str) -> tuple:
+        try:
+            return ast.parse(source), None
+        except (SyntaxError, ValueError) as e:
+            return None, e
+
+    def _remember(self, content_hash: str, entry: tuple) -> None:
+        with self._lock:
+            self._memory[content_hash] = entry
+            self._memory.move_to_end(content_hash)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / content_hash[:2] / f"{content_hash}.pickle"
+
+    def _sign(self, content_hash: str, payload: bytes) -> bytes:
+        return hmac.new(self._key, content_hash.encode('ascii') + payload, hashlib.sha256).digest()
+
+    def _load_from_disk(self, content_hash: str) -> Optional[tuple]:
+        if not self.persist:
+            return None
+        try:
+            with open(self._entry_path(content_hash), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        mac, payload = data[:_MAC_SIZE], data[_MAC_SIZE:]
+        # Só desserializa o que foi assinado com a chave deste usuário para este hash
+        if not hmac.compare_digest(mac, self._sign(content_hash, payload)):
+            return None
+        try:
+            return pickle.loads(payload)
+        except Exception:
+            # Entrada corrompida: será regenerada
+            return None
+
+    def _save_to_disk(self, content_hash: str, entry: tuple) -> None:
+        if not self.persist:
+            return
+        target = self._entry_path(content_hash)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(tmp, 'wb') as f:
+                f.write(self._sign(content_hash, payload) + payload)
+            os.replace(tmp, target)
+            with self._lock:
+                self._stats['disk_writes'] += 1
+        except Exception:
+            # Cache em disco é best-effort
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de acerto/falha do cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        stats['hit_rate'] = hits / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        """Zera as estatísticas (útil para medir uma execução isolada)."""
+        with self._lock:
+            self._stats = self._empty_stats()
+
+    def clear(self, disk: bool = False) -> None:
+        """Limpa o cache em memória e, opcionalmente, o cache em disco."""
+        with self._lock:
+            self._memory.clear()
+        if disk and self.cache_dir.exists():
+            import shutil
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+_default_cache: Optional[ASTCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_ast_cache() -> ASTCache:
+    """Retorna a instância de ASTCache compartilhada pelo processo."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ASTCache()
+    return _default_cache
+
+
+def set_ast_cache(cache: Optional[ASTCache]) -> None:
+    """Substitui a instância compartilhada (ex.: outro diretório ou testes)."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -2,26 +2,41 @@
 Sistema de chunking automático para processar projetos grandes.
 """
 
+import asyncio
 import json
-from typing import List, Dict, Any, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Tuple, Optional, Callable, Awaitable
 from pathlib import Path
-import tiktoken
+
+from .rate_limiter import RequestPriority
+from .token_counter import TokenCounter, get_token_counter
 
 
 class ChunkingSystem:
     """Divide tarefas grandes em chunks processáveis."""
     
-    def __init__(self, max_chunk_size: int = 50000, overlap: int = 1000):
+    def __init__(self, max_chunk_size: int = 50000, overlap: int = 1000, io_workers: int = 8,
+                 token_counter: Optional[TokenCounter] = None):
         self.max_chunk_size = max_chunk_size
         self.overlap = overlap
-        self.encoding = tiktoken.encoding_for_model("gpt-4")  # Aproximação
+        self.io_workers = io_workers
+        self.token_counter = token_counter or get_token_counter()
+    
+    @property
+    def encoding(self):
+        return self.token_counter.encoding
     
     def count_tokens(self, text: str) -> int:
-        """Conta tokens em um texto."""
-        return len(self.encoding.encode(text))
+        """Conta tokens em um texto (contagem exata, memorizada por conteúdo)."""
+        return self.token_counter.count(text)
     
     def chunk_text(self, text: str) -> List[str]:
         """Divide texto em chunks com overlap."""
+        # Contagem memorizada evita tokenizar de novo textos que cabem inteiros
+        if self.count_tokens(text) <= self.max_chunk_size:
+            return [text]
+        
         tokens = self.encoding.encode(text)
         chunks = []
         
@@ -55,56 +70,104 @@ class ChunkingSystem:
         
         return chunks
     
+    def _read_and_count(self, file_path: Path) -> Tuple[Path, Optional[str], int, Optional[Exception]]:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            return file_path, content, self.count_tokens(content), None
+        except Exception as e:
+            return file_path, None, 0, e
+    
+    def _load_files(self, files: List[Path]) -> Iterator[Tuple[Path, Optional[str], int, Optional[Exception]]]:
+        """Lê e tokeniza arquivos em paralelo, preservando a ordem.
+        
+        Trabalha em janelas para não manter o projeto inteiro em memória.
+        """
+        window = max(1, self.io_workers * 4)
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+            for i in range(0, len(files), window):
+                yield from executor.map(self._read_and_count, files[i:i + window])
+    
     def chunk_files(self, files: List[Path]) -> Iterator[Tuple[List[Path], str]]:
         """Agrupa arquivos em chunks processáveis."""
         current_chunk = []
         current_size = 0
         current_content = []
         
-        for file_path in files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                file_tokens = self.count_tokens(content)
-                
-                # Se arquivo sozinho é muito grande, processa individualmente
-                if file_tokens > self.max_chunk_size:
-                    # Yield chunk atual se houver
-                    if current_chunk:
-                        yield current_chunk, '\n'.join(current_content)
-                        current_chunk = []
-                        current_content = []
-                        current_size = 0
-                    
-                    # Processa arquivo grande em chunks
-                    chunks = self.chunk_text(content)
-                    for i, chunk in enumerate(chunks):
-                        yield [file_path], f"# Chunk {i+1}/{len(chunks)} de {file_path.name}\n{chunk}"
+        for file_path, content, file_tokens, error in self._load_files(list(files)):
+            if error is not None:
+                print(f"Erro ao processar {file_path}: {error}")
+                continue
+            
+            # Se arquivo sozinho é muito grande, processa individualmente
+            if file_tokens > self.max_chunk_size:
+                # Yield chunk atual se houver
+                if current_chunk:
+                    yield current_chunk, '\n'.join(current_content)
+                    current_chunk = []
+                    current_content = []
+                    current_size = 0
                 
-                # Se adicionar arquivo excede limite
-                elif current_size + file_tokens > self.max_chunk_size:
-                    # Yield chunk atual
+                # Processa arquivo grande em chunks
+                chunks = self.chunk_text(content)
+                for i, chunk in enumerate(chunks):
+                    yield [file_path], f"# Chunk {i+1}/{len(chunks)} de {file_path.name}\n{chunk}"
+            
+            # Se adicionar arquivo excede limite
+            elif current_size + file_tokens > self.max_chunk_size:
+                # Yield chunk atual
+                if current_chunk:
                     yield current_chunk, '\n'.join(current_content)
-                    
-                    # Começa novo chunk
-                    current_chunk = [file_path]
-                    current_content = [f"# {file_path}\n{content}"]
-                    current_size = file_tokens
                 
-                # Adiciona ao chunk atual
-                else:
-                    current_chunk.append(file_path)
-                    current_content.append(f"# {file_path}\n{content}")
-                    current_size += file_tokens
-                    
-            except Exception as e:
-                print(f"Erro ao processar {file_path}: {e}")
+                # Começa novo chunk
+                current_chunk = [file_path]
+                current_content = [f"# {file_path}\n{content}"]
+                current_size = file_tokens
+            
+            # Adiciona ao chunk atual
+            else:
+                current_chunk.append(file_path)
+                current_content.append(f"# {file_path}\n{content}")
+                current_size += file_tokens
         
         # Yield último chunk
         if current_chunk:
             yield current_chunk, '\n'.join(current_content)
     
+    def create_chunk_tasks(
+        self,
+        files: List[Path],
+        description: str,
+        task_type: str = 'analysis_chunk'
+    ) -> List[Dict[str, Any]]:
+        """Cria uma sub-tarefa por chunk de arquivos (fase "map").
+        
+        Com mais de um chunk, adiciona uma tarefa final de consolidação
+        (fase "reduce") que recebe o resultado parcial mesclado.
+        """
+        tasks = []
+        for i, (chunk_files, content) in enumerate(self.chunk_files(files)):
+            tasks.append({
+                'type': task_type,
+                'chunk_id': i + 1,
+                'description': description,
+                'files': [str(f) for f in chunk_files],
+                'content': content
+            })
+        
+        for task in tasks:
+            task['total_chunks'] = len(tasks)
+        
+        if len(tasks) > 1:
+            tasks.append({
+                'type': 'analysis_summary',
+                'chunk_id': len(tasks) + 1,
+                'description': f"Consolidar resultados: {description}",
+                'consolidate': True
+            })
+        
+        return tasks
+    
     def chunk_task(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Divide tarefa complexa em sub-tarefas."""
         task_type = task.get('type', 'generic')
@@ -253,79 +316,282 @@ class ChunkingSystem:
         
         return groups
     
+
     def merge_chunk_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Mescla resultados de chunks processados."""
+        merger = ChunkResultMerger()
+        for result in results:
+            merger.add(result)
+        return merger.snapshot()
+
+
+class ChunkResultMerger:
+    """Mescla resultados de chunks à medida que chegam (fase "reduce").
+    
+    O tipo de mesclagem (analysis/refactor/feature) é definido pelo primeiro
+    resultado recebido, como em ChunkingSystem.merge_chunk_results.
+    """
+    
+    FEATURE_KEYS = ('components', 'files_created', 'files_modified', 'tests', 'documentation')
+    
+    def __init__(self):
+        self.results: List[Dict[str, Any]] = []
+        self.kind: Optional[str] = None
+        self.errors: List[Any] = []
+        self.issues: List[Any] = []
+        self.metrics: Dict[str, Any] = {}
+        self.recommendations: Dict[Any, None] = {}
+        self.changes: List[Any] = []
+        self.feature: Dict[str, List[Any]] = {key: [] for key in self.FEATURE_KEYS}
+    
+    def add(self, result: Dict[str, Any]):
+        """Incorpora um resultado."""
+        self.results.append(result)
+        if len(self.results) == 1:
+            self.kind = result.get('type')
+        
+        if self.kind == 'analysis':
+            self.issues.extend(result.get('issues', []))
+            self.metrics.update(result.get('metrics', {}))
+            for recommendation in result.get('recommendations', []):
+                self.recommendations[recommendation] = None
+        elif self.kind == 'refactor':
+            self.changes.extend(result.get('changes', []))
+        elif self.kind == 'feature':
+            for key in self.FEATURE_KEYS:
+                if key in result:
+                    if isinstance(result[key], list):
+                        self.feature[key].extend(result[key])
+                    else:
+                        self.feature[key].append(result[key])
+        
+        if result.get('errors'):
+            self.errors.extend(result['errors'])
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado mesclado atual (pode ser chamado a qualquer momento)."""
         merged = {
-            'success': all(r.get('success', False) for r in results),
-            'total_chunks': len(results),
-            'processed_chunks': sum(1 for r in results if r.get('success', False)),
-            'results': [],
-            'errors': [],
+            'success': all(r.get('success', False) for r in self.results),
+            'total_chunks': len(self.results),
+            'processed_chunks': sum(1 for r in self.results if r.get('success', False)),
+            'results': sorted(self.results, key=lambda r: r.get('chunk_id', 0)),
+            'errors': list(self.errors),
             'summary': ''
         }
         
-        # Mescla resultados específicos por tipo
-        if results and results[0].get('type') == 'analysis':
-            merged['analysis'] = self._merge_analysis_results(results)
-        elif results and results[0].get('type') == 'refactor':
-            merged['changes'] = self._merge_refactor_results(results)
-        elif results and results[0].get('type') == 'feature':
-            merged['feature'] = self._merge_feature_results(results)
-        
-        # Coleta erros
-        for result in results:
-            if result.get('errors'):
-                merged['errors'].extend(result['errors'])
+        if self.kind == 'analysis':
+            merged['analysis'] = {
+                'issues': list(self.issues),
+                'metrics': dict(self.metrics),
+                'recommendations': list(self.recommendations)
+            }
+        elif self.kind == 'refactor':
+            merged['changes'] = list(self.changes)
+        elif self.kind == 'feature':
+            merged['feature'] = {key: list(values) for key, values in self.feature.items()}
         
         return merged
+
+
+ChunkWorker = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class ChunkExecutionStats:
+    """Métricas de uma execução map-reduce."""
+    total_tasks: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    cancelled: int = 0
+    max_parallel: int = 0
+    elapsed: float = 0.0
+    task_times: Dict[int, float] = field(default_factory=dict)
+
+
+class ChunkExecutor:
+    """Executa sub-tarefas de chunking em paralelo (map-reduce).
     
-    def _merge_analysis_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Mescla resultados de análise."""
-        analysis = {
-            'issues': [],
-            'metrics': {},
-            'recommendations': []
-        }
+    - concorrência limitada por semáforo;
+    - dependências respeitadas: tarefas com 'input' esperam as que produzem
+      esses 'output'; tarefas com 'consolidate' esperam todas as demais e
+      recebem o parcial mesclado em task['partial'];
+    - resultados mesclados incrementalmente conforme chegam (on_result);
+    - retry por chunk com backoff;
+    - cancelamento via cancel() ou cancelando a corrotina run().
+    """
+    
+    def __init__(
+        self,
+        worker: ChunkWorker,
+        max_concurrency: int = 4,
+        max_retries: int = 2,
+        retry_delay: float = 0.5
+    ):
+        self.worker = worker
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.stats = ChunkExecutionStats()
+        self._cancelled = False
+        self._running: List[asyncio.Task] = []
+    
+    def cancel(self):
+        """Cancela a execução em andamento."""
+        self._cancelled = True
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        for task in self._running:
+            # A própria tarefa que chamou cancel() (ex.: dentro de on_result) termina normalmente
+            if task is not current:
+                task.cancel()
+    
+    async def run(
+        self,
+        tasks: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """Executa as tarefas e retorna o resultado mesclado.
         
-        for result in results:
-            if 'issues' in result:
-                analysis['issues'].extend(result['issues'])
-            if 'metrics' in result:
-                analysis['metrics'].update(result['metrics'])
-            if 'recommendations' in result:
-                analysis['recommendations'].extend(result['recommendations'])
+        on_result(resultado, parcial_mesclado) é chamado a cada chunk concluído.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.stats = ChunkExecutionStats(total_tasks=len(tasks))
+        self._cancelled = False
         
-        # Remove duplicatas
-        analysis['recommendations'] = list(set(analysis['recommendations']))
+        merger = ChunkResultMerger()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done_events = {id(task): asyncio.Event() for task in tasks}
+        producers = {}
+        for task in tasks:
+            outputs = task.get('output')
+            for output in ([outputs] if isinstance(outputs, str) else outputs or []):
+                producers[output] = task
+        outputs_by_name: Dict[str, Dict[str, Any]] = {}
+        active = 0
         
-        return analysis
-    
-    def _merge_refactor_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Mescla resultados de refatoração."""
-        all_changes = []
+        def dependencies(task) -> List[Dict[str, Any]]:
+            if task.get('consolidate'):
+                return [other for other in tasks if other is not task and not other.get('consolidate')]
+            inputs = task.get('input')
+            names = [inputs] if isinstance(inputs, str) else inputs or []
+            return [producers[name] for name in names if name in producers and producers[name] is not task]
         
-        for result in results:
-            if 'changes' in result:
-                all_changes.extend(result['changes'])
+        async def execute(task: Dict[str, Any]):
+            nonlocal active
+            for dependency in dependencies(task):
+                await done_events[id(dependency)].wait()
+            
+            prepared = dict(task)
+            inputs = task.get('input')
+            names = [inputs] if isinstance(inputs, str) else inputs or []
+            if names:
+                prepared['inputs'] = {name: outputs_by_name.get(name) for name in names}
+            if task.get('consolidate'):
+                prepared['partial'] = merger.snapshot()
+            
+            try:
+                async with semaphore:
+                    active += 1
+                    self.stats.max_parallel = max(self.stats.max_parallel, active)
+                    task_start = loop.time()
+                    try:
+                        result = await self._run_with_retry(prepared)
+                    finally:
+                        active -= 1
+                    self.stats.task_times[task.get('chunk_id', 0)] = loop.time() - task_start
+                
+                if result.get('success', False):
+                    self.stats.completed += 1
+                else:
+                    self.stats.failed += 1
+                
+                outputs = task.get('output')
+                for name in ([outputs] if isinstance(outputs, str) else outputs or []):
+                    outputs_by_name[name] = result
+                
+                merger.add(result)
+                if on_result is not None:
+                    callback = on_result(result, merger.snapshot())
+                    if asyncio.iscoroutine(callback):
+                        await callback
+            finally:
+                done_events[id(task)].set()
         
-        return all_changes
-    
-    def _merge_feature_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Mescla resultados de implementação de feature."""
-        feature = {
-            'components': [],
-            'files_created': [],
-            'files_modified': [],
-            'tests': [],
-            'documentation': []
-        }
+        self._running = [asyncio.create_task(execute(task)) for task in tasks]
+        try:
+            outcomes = await asyncio.gather(*self._running, return_exceptions=True)
+        except asyncio.CancelledError:
+            self.cancel()
+            await asyncio.gather(*self._running, return_exceptions=True)
+            raise
+        finally:
+            self._running = []
+            self.stats.elapsed = loop.time() - start
         
-        for result in results:
-            for key in feature:
-                if key in result:
-                    if isinstance(result[key], list):
-                        feature[key].extend(result[key])
-                    else:
-                        feature[key].append(result[key])
+        self.stats.cancelled = sum(1 for outcome in outcomes if isinstance(outcome, asyncio.CancelledError))
+        merged = merger.snapshot()
+        merged['total_chunks'] = len(tasks)
+        merged['cancelled'] = self._cancelled
+        if self._cancelled:
+            merged['success'] = False
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                merged['success'] = False
+                merged['errors'].append(str(outcome))
+        return merged
+    
+    async def _run_with_retry(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                result = await self.worker(task)
+                result.setdefault('chunk_id', task.get('chunk_id'))
+                return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    return {
+                        'success': False,
+                        'chunk_id': task.get('chunk_id'),
+                        'type': task.get('type'),
+                        'errors': [f"Chunk {task.get('chunk_id')}: {e}"]
+                    }
+                attempt += 1
+                self.stats.retries += 1
+                await asyncio.sleep(self.retry_delay * (2 ** (attempt - 1)))
+
+
+def make_gemini_worker(gemini_client, priority=None) -> ChunkWorker:
+    """Worker padrão: envia cada sub-tarefa ao GeminiClient."""
+    priority = RequestPriority.NORMAL if priority is None else priority
+    
+    async def worker(task: Dict[str, Any]) -> Dict[str, Any]:
+        parts = [task.get('description', '')]
+        if task.get('files'):
+            parts.append(f"Arquivos: {', '.join(map(str, task['files']))}")
+        if task.get('content'):
+            parts.append(task['content'])
+        if task.get('inputs'):
+            parts.append(f"Entradas: {json.dumps(task['inputs'], ensure_ascii=False, default=str)[:4000]}")
+        if task.get('partial'):
+            responses = [r.get('response', '') for r in task['partial'].get('results', [])]
+            parts.append("Resultados parciais:\n" + "\n---\n".join(responses))
         
-        return feature
\ No newline at end of file
+        response = await gemini_client.generate_response("\n\n".join(parts), priority=priority)
+        if response.startswith('❌'):
+            # generate_response devolve o erro como texto; exceção faz o executor refazer o chunk
+            raise RuntimeError(response)
+        task_type = task.get('type', '')
+        return {
+            'success': True,
+            'type': task_type.split('_')[0] if '_' in task_type else task_type,
+            'chunk_id': task.get('chunk_id'),
+            'response': response
+        }
+    
+    return worker
@@ -17,6 +17,27 @@ class ModelConfig:
     temperature: float = 0.3
     max_output_tokens: int = 8192
     context_window: int = 1048576
+    response_cache: bool = True
+    response_cache_ttl: int = 21600
+    response_cache_max_entries: int = 5000
+    response_cache_max_mb: int = 200
+    requests_per_minute: int = 60
+    tokens_per_minute: int = 1000000
+    max_concurrent_requests: int = 8
+    max_retries: int = 5
+    coalesce_requests: bool = True
+    massive_context_tokens: int = 32768
+    context_budget_tokens: int = 0  # 0 = janela do modelo
+    batch_prompts: bool = True
+    batch_window_ms: int = 50
+    batch_max_tokens: int = 16000
+    batch_max_items: int = 16
+    backend: str = "gemini"  # gemini, record, replay, synthetic
+    backend_path: str = ""
+    backend_options: Dict[str, Any] = field(default_factory=dict)
+    pricing: Dict[str, List[float]] = field(default_factory=dict)  # USD/1M tokens: prefixo -> [entrada, saída]
+    routing: bool = False
+    routing_tiers: List[Dict[str, Any]] = field(default_factory=list)  # vazio = fast (flash-lite) + deep (name)
 
 
 @dataclass
@@ -172,6 +193,27 @@ class ConfigManager:
                 'temperature': config.model.temperature,
                 'max_output_tokens': config.model.max_output_tokens,
                 'context_window': config.model.context_window,
+                'response_cache': config.model.response_cache,
+                'response_cache_ttl': config.model.response_cache_ttl,
+                'response_cache_max_entries': config.model.response_cache_max_entries,
+                'response_cache_max_mb': config.model.response_cache_max_mb,
+                'requests_per_minute': config.model.requests_per_minute,
+                'tokens_per_minute': config.model.tokens_per_minute,
+                'max_concurrent_requests': config.model.max_concurrent_requests,
+                'max_retries': config.model.max_retries,
+                'coalesce_requests': config.model.coalesce_requests,
+                'massive_context_tokens': config.model.massive_context_tokens,
+                'context_budget_tokens': config.model.context_budget_tokens,
+                'batch_prompts': config.model.batch_prompts,
+                'batch_window_ms': config.model.batch_window_ms,
+                'batch_max_tokens': config.model.batch_max_tokens,
+                'batch_max_items': config.model.batch_max_items,
+                'backend': config.model.backend,
+                'backend_path': config.model.backend_path,
+                'backend_options': config.model.backend_options,
+                'pricing': config.model.pricing,
+                'routing': config.model.routing,
+                'routing_tiers': config.model.routing_tiers,
             },
             'user': {
                 'mode': config.user.mode,
@@ -212,7 +254,7 @@ class ConfigManager:
         gitignore_path = self.config_dir / ".gitignore"
         if not gitignore_path.exists():
             with open(gitignore_path, 'w') as f:
-                f.write("memory.db\n*.log\n")
+                f.write("memory.db\n*.log\ncache/\nproject_index.db*\nsearch_index.db*\n")
     def migrate_config(self, from_version: str = None) -> bool:
         """Migra configuração entre versões."""
         try:
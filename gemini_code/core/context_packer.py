@@ -0,0 +1,254 @@
+"""
+Empacotamento de contexto por relevância dentro de um orçamento de tokens.
+
+Em vez de "últimas N mensagens cortadas em M caracteres", cada candidato
+(turno do histórico, memória recuperada, arquivo do projeto, saída de
+ferramenta...) recebe um valor — relevância lexical para a mensagem atual
+(BM25), recência e peso do tipo — e o packer escolhe o conjunto de maior
+valor que cabe no orçamento (mochila gulosa por densidade valor/token, com
+truncamento do último item quando vale a pena).
+"""
+
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .token_counter import TokenCounter, get_token_counter
+
+
+DEFAULT_KIND_WEIGHTS = {
+    'history': 1.0,
+    'file': 1.0,
+    'tool': 0.9,
+    'memory': 0.8,
+    'system': 0.6,
+}
+# Ordem das seções no prompt final
+_KIND_ORDER = ('system', 'memory', 'file', 'tool', 'history')
+
+_TERM = re.compile(r'\w{3,}')
+_STOPWORDS = frozenset("""
+    que para com uma por mais como mas foi ele ela isso esse essa este esta sao tem ser nao sim
+    dos das nos nas num numa seu sua voce the and for with this that from are was you your
+""".split())
+
+
+def _terms(text: str) -> List[str]:
+    """Termos normalizados (minúsculas, sem acentos, sem stopwords)."""
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+    return [term for term in _TERM.findall(normalized) if term not in _STOPWORDS]
+
+
+@dataclass
+class ContextCandidate:
+    """Item que pode entrar no prompt."""
+    content: str
+    kind: str = 'history'          # history, memory, file, tool, system
+    role: str = 'system'
+    source: str = ''               # caminho, id da memória, nome da ferramenta...
+    recency: float = 0.0           # 0..1, informado por quem monta os candidatos
+    priority: float = 0.0          # bônus fixo somado ao valor
+    pinned: bool = False           # entra sempre que couber
+    truncatable: bool = False      # pode entrar cortado se não couber inteiro
+    tokens: int = 0
+    relevance: float = 0.0
+    value: float = 0.0
+    order: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class PackedContext:
+    """Resultado do empacotamento."""
+    messages: List[Dict[str, str]]
+    selected: List[ContextCandidate]
+    dropped: List[ContextCandidate]
+    tokens: int
+    budget: int
+    value: float
+    elapsed_ms: float
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+class ContextPacker:
+    """
+    Seleciona o contexto de maior valor que cabe em um orçamento de tokens.
+
+    valor = peso_do_tipo * (w_rel * relevância + w_rec * recência) + prioridade
+
+    Candidatos abaixo de `min_value` ficam de fora mesmo com orçamento
+    sobrando: em turnos simples, contexto irrelevante só custa tokens.
+    """
+
+    def __init__(self, token_counter: Optional[TokenCounter] = None,
+                 kind_weights: Optional[Dict[str, float]] = None,
+                 relevance_weight: float = 0.7, recency_weight: float = 0.3,
+                 min_value: float = 0.15, min_fragment_tokens: int = 64,
+                 message_overhead_tokens: int = 4, term_cache_size: int = 2048):
+        self.token_counter = token_counter or get_token_counter()
+        self.kind_weights = dict(DEFAULT_KIND_WEIGHTS, **(kind_weights or {}))
+        self.relevance_weight = relevance_weight
+        self.recency_weight = recency_weight
+        self.min_value = min_value
+        self.min_fragment_tokens = min_fragment_tokens
+        self.message_overhead_tokens = message_overhead_tokens
+        # Termos por conteúdo: o mesmo histórico/arquivo é pontuado turno após turno
+        self.term_cache_size = term_cache_size
+        self._term_cache: 'OrderedDict[str, Counter]' = OrderedDict()
+
+    def score(self, query: str, candidates: List[ContextCandidate], k1: float = 1.2, b: float = 0.75):
+        """Calcula relevance (BM25 normalizado em 0..1), tokens e value de cada candidato."""
+        query_terms = set(_terms(query))
+        documents = [self._term_counts(c.content) for c in candidates]
+        lengths = [sum(doc.values()) for doc in documents]
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        idf = {}
+        for term in query_terms:
+            df = sum(1 for doc in documents if term in doc)
+            if df:
+                idf[term] = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+
+        raw_scores = []
+        for doc, length in zip(documents, lengths):
+            score = 0.0
+            norm = 1 - b + b * (length / avg_length if avg_length else 1)
+            for term, term_idf in idf.items():
+                tf = doc.get(term, 0)
+                if tf:
+                    score += term_idf * tf * (k1 + 1) / (tf + k1 * norm)
+            raw_scores.append(score)
+
+        best = max(raw_scores, default=0.0)
+        for index, (candidate, raw) in enumerate(zip(candidates, raw_scores)):
+            candidate.order = index
+            candidate.relevance = raw / best if best > 0 else 0.0
+            candidate.tokens = self.token_counter.estimate(candidate.content) + self.message_overhead_tokens
+            weight = self.kind_weights.get(candidate.kind, 0.5)
+            candidate.value = (
+                weight * (self.relevance_weight * candidate.relevance + self.recency_weight * candidate.recency)
+                + candidate.priority
+            )
+
+    def _term_counts(self, content: str) -> Counter:
+        counts = self._term_cache.get(content)
+        if counts is None:
+            counts = self._term_cache[content] = Counter(_terms(content))
+            if len(self._term_cache) > self.term_cache_size:
+                self._term_cache.popitem(last=False)
+        else:
+            self._term_cache.move_to_end(content)
+        return counts
+
+    def pack(self, query: str, candidates: List[ContextCandidate], budget_tokens: int) -> PackedContext:
+        """Escolhe os candidatos de maior valor dentro de budget_tokens."""
+        start = time.perf_counter()
+        candidates = self._deduplicate(candidates)
+        self.score(query, candidates)
+
+        eligible = [c for c in candidates if c.pinned or c.value >= self.min_value]
+        selected: List[ContextCandidate] = []
+        remaining = budget_tokens
+
+        # 1) Fixos (ex.: último turno), por valor
+        for candidate in sorted((c for c in eligible if c.pinned), key=lambda c: -c.value):
+            if candidate.tokens <= remaining:
+                selected.append(candidate)
+                remaining -= candidate.tokens
+
+        # 2) Demais por densidade de valor, truncando o que não cabe inteiro
+        others = sorted((c for c in eligible if not c.pinned),
+                        key=lambda c: (-c.value / max(c.tokens, 1), c.order))
+        for candidate in others:
+            if candidate.tokens <= remaining:
+                selected.append(candidate)
+                remaining -= candidate.tokens
+            elif candidate.truncatable and remaining >= self.min_fragment_tokens:
+                fragment = self._truncate(query, candidate, remaining)
+                if fragment.tokens <= remaining:
+                    selected.append(fragment)
+                    remaining -= fragment.tokens
+
+        # 3) Um único item valioso pode valer mais que vários pequenos
+        free = [c for c in selected if not c.pinned]
+        pinned_tokens = sum(c.tokens for c in selected if c.pinned)
+        best_single = max(
+            (c for c in others if c.tokens <= budget_tokens - pinned_tokens),
+            key=lambda c: c.value, default=None
+        )
+        if best_single is not None and best_single.value > sum(c.value for c in free):
+            selected = [c for c in selected if c.pinned] + [best_single]
+
+        chosen_orders = {c.order for c in selected}
+        dropped = [c for c in candidates if c.order not in chosen_orders]
+        selected.sort(key=lambda c: (_KIND_ORDER.index(c.kind) if c.kind in _KIND_ORDER else 0, c.order))
+
+        tokens = sum(c.tokens for c in selected)
+        return PackedContext(
+            messages=[{'role': c.role, 'content': c.content} for c in selected],
+            selected=selected,
+            dropped=dropped,
+            tokens=tokens,
+            budget=budget_tokens,
+            value=sum(c.value for c in selected),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            stats={
+                'candidates': len(candidates),
+                'selected': len(selected),
+                'truncated': sum(1 for c in selected if c.truncated),
+                'by_kind': dict(Counter(c.kind for c in selected)),
+            }
+        )
+
+    def pack_messages(self, query: str, messages: List[Dict[str, Any]], budget_tokens: int,
+                      pin_last: int = 2, half_life: float = 6.0) -> List[Dict[str, Any]]:
+        """Atalho para listas de mensagens {'role', 'content'} (mais recentes no fim)."""
+        total = len(messages)
+        candidates = [
+            ContextCandidate(
+                content=str(msg.get('content', '')),
+                kind='history',
+                role=msg.get('role', 'user'),
+                recency=0.5 ** ((total - 1 - index) / half_life),
+                pinned=index >= total - pin_last,
+                truncatable=True,
+            )
+            for index, msg in enumerate(messages)
+        ]
+        return self.pack(query, candidates, budget_tokens).messages
+
+    def _truncate(self, query: str, candidate: ContextCandidate, tokens: int) -> ContextCandidate:
+        """Trecho do candidato com ~tokens, centrado no primeiro termo da consulta encontrado."""
+        content = candidate.content
+        chars = max(1, int(len(content) * (tokens - self.message_overhead_tokens - 8) / max(candidate.tokens, 1)))
+        anchor = 0
+        lowered = content.lower()
+        for term in _terms(query):
+            position = lowered.find(term)
+            if position >= 0:
+                anchor = position
+                break
+        begin = max(0, min(anchor - chars // 4, len(content) - chars))
+        snippet = content[begin:begin + chars]
+        prefix = "[…] " if begin > 0 else ""
+        suffix = " […]" if begin + chars < len(content) else ""
+
+        fragment = ContextCandidate(**{**candidate.__dict__, 'content': prefix + snippet + suffix, 'truncated': True})
+        fragment.tokens = self.token_counter.estimate(fragment.content) + self.message_overhead_tokens
+        fragment.value = candidate.value * min(1.0, fragment.tokens / max(candidate.tokens, 1))
+        return fragment
+
+    @staticmethod
+    def _deduplicate(candidates: List[ContextCandidate]) -> List[ContextCandidate]:
+        seen = set()
+        unique = []
+        for candidate in candidates:
+            key = candidate.content.strip()
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(candidate)
+        return unique
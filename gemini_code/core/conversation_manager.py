@@ -3,13 +3,16 @@ Sistema de gerenciamento de conversas com memória contextual.
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
 from .memory_system import MemorySystem
 from .gemini_client import GeminiClient
 from .nlp_enhanced import NLPEnhanced
+from .context_packer import ContextCandidate, ContextPacker, PackedContext
 
 
 @dataclass
@@ -32,7 +35,10 @@ class ConversationContext:
 class ConversationManager:
     """Gerencia conversas com memória contextual."""
     
-    def __init__(self, project_path: str, gemini_client: GeminiClient):
+    # Intenções que recebem o orçamento de contexto inteiro (as demais, 1/4)
+    COMPLEX_INTENTS = ['create_feature', 'refactor', 'analyze_project', 'fix_error', 'modify_code']
+    
+    def __init__(self, project_path: str, gemini_client: GeminiClient, context_budget_tokens: int = 16384):
         self.project_path = project_path
         self.gemini_client = gemini_client
         self.memory_system = MemorySystem(project_path)
@@ -49,6 +55,13 @@ class ConversationManager:
         self.context_cache = {}
         self.max_context_messages = 20
         
+        # Empacotamento de contexto por relevância
+        self.context_packer = ContextPacker()
+        self.context_budget_tokens = context_budget_tokens
+        self.max_file_chars = 200_000
+        self.tool_outputs: deque = deque(maxlen=10)
+        self.last_context_pack: Optional[PackedContext] = None
+        
         # Carrega preferências e padrões do usuário
         self._load_user_context()
     
@@ -79,8 +92,16 @@ class ConversationManager:
                 for conv in recent_conversations[:3]
             ]
     
-    async def process_message(self, user_input: str) -> Dict[str, Any]:
-        """Processa mensagem do usuário com contexto completo."""
+    async def process_message(
+        self,
+        user_input: str,
+        on_chunk: Optional[Callable[[str], Any]] = None
+    ) -> Dict[str, Any]:
+        """Processa mensagem do usuário com contexto completo.
+        
+        Se on_chunk for informado, a resposta é gerada em streaming e cada
+        trecho é entregue assim que chega (útil para renderização progressiva).
+        """
         
         # 1. Analisa intenção
         intent_data = await self.nlp.identify_intent(user_input)
@@ -96,7 +117,9 @@ class ConversationManager:
             response = await self.gemini_client.generate_response(
                 user_input,
                 context=full_context,
-                thinking_budget=self._calculate_thinking_budget(intent_data)
+                thinking_budget=self._calculate_thinking_budget(intent_data),
+                stream=on_chunk is not None,
+                on_chunk=on_chunk
             )
             
             success = True
@@ -120,6 +143,7 @@ class ConversationManager:
             'response': response,
             'intent': intent_data,
             'context_used': relevant_context,
+            'context_tokens': self.last_context_pack.tokens if self.last_context_pack else 0,
             'success': success,
             'conversation_id': self.current_context.conversation_id
         }
@@ -156,50 +180,109 @@ class ConversationManager:
     
     def _prepare_context_for_gemini(self, user_input: str, intent_data: Dict[str, Any], 
                                    relevant_context: Dict[str, Any]) -> List[Dict[str, str]]:
-        """Prepara contexto formatado para o Gemini."""
-        context_messages = []
-        
-        # Adiciona histórico recente da conversa atual
-        recent_messages = self.current_context.messages[-10:]  # Últimas 10 mensagens
-        for msg in recent_messages:
-            context_messages.append({
-                'role': 'user' if msg['role'] == 'user' else 'assistant',
-                'content': msg['content'][:500]  # Limita tamanho
-            })
-        
-        # Adiciona contexto de conversas similares se relevante
-        if relevant_context['similar_conversations']:
-            context_messages.append({
-                'role': 'system',
-                'content': f"📚 Conversas similares anteriores: {len(relevant_context['similar_conversations'])} encontradas. "
-                          f"Última: '{relevant_context['similar_conversations'][0]['user_input'][:100]}...'"
-            })
-        
-        # Adiciona soluções de erro se relevante
-        if relevant_context['error_solutions']:
-            solutions_text = "; ".join([sol['solution'][:100] for sol in relevant_context['error_solutions'][:2]])
-            context_messages.append({
-                'role': 'system',
-                'content': f"🔧 Soluções anteriores para erros similares: {solutions_text}"
-            })
-        
-        # Adiciona preferências do usuário
-        if relevant_context['user_preferences']:
-            prefs_text = str(relevant_context['user_preferences'])[:200]
-            context_messages.append({
-                'role': 'system', 
-                'content': f"⚙️ Preferências do usuário: {prefs_text}"
-            })
-        
-        # Adiciona padrões do projeto
-        if relevant_context['project_patterns']:
-            patterns_text = "; ".join([p['description'][:50] for p in relevant_context['project_patterns'][:3]])
-            context_messages.append({
-                'role': 'system',
-                'content': f"🎯 Padrões do projeto: {patterns_text}"
-            })
-        
-        return context_messages
+        """Prepara contexto para o Gemini: os itens mais relevantes que cabem no orçamento."""
+        candidates = self._build_context_candidates(relevant_context)
+        packed = self.context_packer.pack(user_input, candidates, self._context_budget(intent_data))
+        self.last_context_pack = packed
+        return packed.messages
+    
+    def _context_budget(self, intent_data: Dict[str, Any]) -> int:
+        """Orçamento de tokens do contexto: turnos simples recebem menos."""
+        if intent_data.get('intent') in self.COMPLEX_INTENTS:
+            return self.context_budget_tokens
+        return self.context_budget_tokens // 4
+    
+    def _build_context_candidates(self, relevant_context: Dict[str, Any]) -> List[ContextCandidate]:
+        """Candidatos: histórico, memórias, arquivos ativos e saídas de ferramentas."""
+        candidates = []
+        
+        # Histórico da conversa atual (o último turno sempre entra)
+        messages = self.current_context.messages
+        for index, msg in enumerate(messages):
+            age = len(messages) - 1 - index
+            candidates.append(ContextCandidate(
+                content=msg['content'],
+                kind='history',
+                role='user' if msg['role'] == 'user' else 'assistant',
+                recency=0.5 ** (age / 4),
+                pinned=age < 2,
+                truncatable=True
+            ))
+        
+        # Conversas similares lembradas
+        for conv in relevant_context.get('similar_conversations') or []:
+            content = f"📚 Conversa anterior - Usuário: {conv.get('user_input', '')}"
+            if conv.get('assistant_response'):
+                content += f"\nAssistente: {conv['assistant_response']}"
+            candidates.append(ContextCandidate(
+                content=content, kind='memory', source=str(conv.get('id', '')), truncatable=True
+            ))
+        
+        # Soluções de erros similares
+        for sol in (relevant_context.get('error_solutions') or [])[:5]:
+            candidates.append(ContextCandidate(
+                content=f"🔧 Solução anterior para '{sol.get('error', '')}': {sol.get('solution', '')}",
+                kind='memory', priority=0.1, truncatable=True
+            ))
+        
+        # Preferências do usuário
+        if relevant_context.get('user_preferences'):
+            candidates.append(ContextCandidate(
+                content=f"⚙️ Preferências do usuário: {str(relevant_context['user_preferences'])[:500]}",
+                kind='system', priority=0.2
+            ))
+        
+        # Padrões do projeto
+        for pattern in (relevant_context.get('project_patterns') or [])[:5]:
+            candidates.append(ContextCandidate(
+                content=f"🎯 Padrão do projeto: {pattern.get('description', '')}",
+                kind='system', priority=0.05
+            ))
+        
+        # Arquivos ativos do projeto
+        for index, file_name in enumerate(self.current_context.active_files):
+            content = self._read_project_file(file_name)
+            if content:
+                candidates.append(ContextCandidate(
+                    content=f"📄 {file_name}:\n{content}", kind='file', source=file_name,
+                    recency=0.5 ** ((len(self.current_context.active_files) - 1 - index) / 4),
+                    truncatable=True
+                ))
+        
+        # Saídas de ferramentas/comandos recentes
+        for index, (name, output) in enumerate(self.tool_outputs):
+            candidates.append(ContextCandidate(
+                content=f"🛠️ Saída de {name}:\n{output}", kind='tool', source=name,
+                recency=0.5 ** ((len(self.tool_outputs) - 1 - index) / 2),
+                truncatable=True
+            ))
+        
+        return candidates
+    
+    def record_tool_output(self, name: str, output: str):
+        """Registra saída de ferramenta/comando para entrar no contexto dos próximos turnos."""
+        if output:
+            self.tool_outputs.append((name, output))
+    
+    def _project_file(self, file_name: str) -> Optional[Path]:
+        """Caminho do arquivo se ele existir dentro do projeto."""
+        root = Path(self.project_path).resolve()
+        try:
+            path = (root / file_name).resolve()
+            path.relative_to(root)
+        except (OSError, ValueError):
+            return None
+        return path if path.is_file() else None
+    
+    def _read_project_file(self, file_name: str) -> Optional[str]:
+        path = self._project_file(file_name)
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(self.max_file_chars)
+        except OSError:
+            return None
     
     def _calculate_thinking_budget(self, intent_data: Dict[str, Any]) -> int:
         """Calcula budget de thinking baseado na complexidade."""
@@ -230,6 +313,7 @@ class ConversationManager:
         for pattern in file_patterns:
             matches = re.findall(r'\S*' + pattern, user_input + ' ' + response)
             files_affected.extend(matches)
+        self._track_active_files(files_affected)
         
         self.memory_system.remember_conversation(
             user_input=user_input,
@@ -244,6 +328,17 @@ class ConversationManager:
         if error and success:  # Erro resolvido
             self.memory_system.remember_error_solution(error, response, True)
     
+    def _track_active_files(self, files: List[str]):
+        """Arquivos existentes mencionados na conversa viram candidatos de contexto."""
+        for file_name in files:
+            file_name = file_name.strip('`\'"()[],:')
+            if self._project_file(file_name) is None:
+                continue
+            if file_name in self.current_context.active_files:
+                self.current_context.active_files.remove(file_name)
+            self.current_context.active_files.append(file_name)
+        del self.current_context.active_files[:-10]
+    
     def _update_current_context(self, user_input: str, response: str, intent_data: Dict[str, Any]):
         """Atualiza contexto da conversa atual."""
         # Adiciona mensagens
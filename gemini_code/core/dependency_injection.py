@@ -3,16 +3,18 @@ Sistema de Injeção de Dependência para Gemini Code
 Facilita o gerenciamento e teste de componentes
 """
 
-from typing import Dict, Any, Type, Optional, Callable
+from typing import Dict, Any, Type, Optional, Callable, Union
 from dataclasses import dataclass
 import logging
 from pathlib import Path
 
+from .lazy_loader import StartupProfiler, get_startup_profiler
+
 
 @dataclass
 class ServiceConfig:
     """Configuração para um serviço"""
-    service_class: Type
+    service_class: Union[Type, str]  # classe ou caminho 'pacote.modulo.Classe' (importado no 1º uso)
     dependencies: Dict[str, str] = None  # nome_param: nome_servico
     singleton: bool = True
     lazy_init: bool = False
@@ -22,20 +24,22 @@ class ServiceConfig:
 class DependencyContainer:
     """Container de injeção de dependência"""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None,
+                 profiler: Optional[StartupProfiler] = None):
         self._services: Dict[str, ServiceConfig] = {}
         self._instances: Dict[str, Any] = {}
         self._factories: Dict[str, Callable] = {}
+        self.profiler = profiler or get_startup_profiler()
         self.logger = logging.getLogger('DependencyContainer')
         
         if config_path and config_path.exists():
             self._load_config(config_path)
     
-    def register(self, name: str, service_class: Type, 
+    def register(self, name: str, service_class: Union[Type, str], 
                  dependencies: Dict[str, str] = None,
                  singleton: bool = True,
                  config: Dict[str, Any] = None):
-        """Registra um serviço"""
+        """Registra um serviço. Com um caminho em string, o módulo só é importado no primeiro get()."""
         self._services[name] = ServiceConfig(
             service_class=service_class,
             dependencies=dependencies or {},
@@ -78,7 +82,13 @@ class DependencyContainer:
         
         # Cria instância
         try:
-            instance = service_config.service_class(**kwargs)
+            if isinstance(service_config.service_class, str):
+                service_config.service_class = self.profiler.import_object(
+                    name, service_config.service_class
+                )
+            
+            with self.profiler.measure(name):
+                instance = service_config.service_class(**kwargs)
             self.logger.debug(f"Created instance of {name}")
             
             # Armazena se for singleton
@@ -91,6 +101,14 @@ class DependencyContainer:
             self.logger.error(f"Failed to create {name}: {e}", exc_info=True)
             raise
     
+    def is_registered(self, name: str) -> bool:
+        """Indica se há serviço ou factory com esse nome"""
+        return name in self._services or name in self._factories
+    
+    def is_loaded(self, name: str) -> bool:
+        """Indica se o serviço já foi instanciado (sem instanciá-lo)"""
+        return name in self._instances
+    
     def reset(self):
         """Limpa todas as instâncias (útil para testes)"""
         self._instances.clear()
@@ -105,14 +123,10 @@ class DependencyContainer:
                 config = yaml.safe_load(f)
             
             for name, service_config in config.get('services', {}).items():
-                # Importa classe dinamicamente
-                module_path, class_name = service_config['class'].rsplit('.', 1)
-                module = __import__(module_path, fromlist=[class_name])
-                service_class = getattr(module, class_name)
-                
+                # Classe importada dinamicamente no primeiro uso
                 self.register(
                     name=name,
-                    service_class=service_class,
+                    service_class=service_config['class'],
                     dependencies=service_config.get('dependencies', {}),
                     singleton=service_config.get('singleton', True),
                     config=service_config.get('config', {})
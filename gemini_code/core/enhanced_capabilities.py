@@ -5,13 +5,56 @@ Implementa otimizações para máximo potencial com 1M input / 32K output tokens
 
 import asyncio
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
 from .gemini_client import GeminiClient
 from .memory_system import MemorySystem
 from .file_manager import FileManagementSystem
+from .chunking_system import ChunkingSystem, ChunkExecutor, make_gemini_worker
+
+
+# Instruções da análise completa (prompt único ou fases map/reduce por chunk)
+PROJECT_ANALYSIS_TASK = """🎯 TAREFA - ANÁLISE ARQUITETURAL PROFUNDA:
+
+Analise COMPLETAMENTE este projeto considerando:
+
+1. **ARQUITETURA GERAL**
+   - Padrões arquiteturais utilizados
+   - Qualidade da estrutura de diretórios
+   - Separação de responsabilidades
+   - Aderência a princípios SOLID
+
+2. **QUALIDADE DO CÓDIGO**
+   - Code smells e anti-patterns
+   - Complexidade ciclomática
+   - Duplicação de código
+   - Convenções de nomenclatura
+
+3. **FUNCIONALIDADES**
+   - Funcionalidades implementadas
+   - Funcionalidades incompletas ou TODOs
+   - Testes e cobertura
+   - Documentação
+
+4. **SEGURANÇA E PERFORMANCE**
+   - Vulnerabilidades potenciais
+   - Gargalos de performance
+   - Uso de recursos
+   - Práticas de segurança
+
+5. **MANUTENIBILIDADE**
+   - Facilidade de modificação
+   - Dependências externas
+   - Débito técnico
+   - Escalabilidade
+
+6. **RECOMENDAÇÕES ESTRATÉGICAS**
+   - Prioridades de melhoria
+   - Refatorações necessárias
+   - Novas funcionalidades sugeridas
+   - Roadmap de desenvolvimento"""
 
 
 @dataclass
@@ -33,6 +76,10 @@ class EnhancedCapabilities:
         self.metrics = CapabilityMetrics()
         self.is_enhanced_mode = True
         
+        # Projetos maiores que a janela do modelo: map-reduce por chunks de arquivos
+        self.chunking = ChunkingSystem()
+        self.chunk_concurrency = 4
+        
         # Ativa modo otimizado
         self.gemini.enable_massive_context_mode()
     
@@ -82,63 +129,34 @@ class EnhancedCapabilities:
 📁 ESTRUTURA E CONTEÚDO COMPLETO:
 {total_content}
 
-🎯 TAREFA - ANÁLISE ARQUITETURAL PROFUNDA:
-
-Analise COMPLETAMENTE este projeto considerando:
-
-1. **ARQUITETURA GERAL**
-   - Padrões arquiteturais utilizados
-   - Qualidade da estrutura de diretórios
-   - Separação de responsabilidades
-   - Aderência a princípios SOLID
-
-2. **QUALIDADE DO CÓDIGO**
-   - Code smells e anti-patterns
-   - Complexidade ciclomática
-   - Duplicação de código
-   - Convenções de nomenclatura
-
-3. **FUNCIONALIDADES**
-   - Funcionalidades implementadas
-   - Funcionalidades incompletas ou TODOs
-   - Testes e cobertura
-   - Documentação
-
-4. **SEGURANÇA E PERFORMANCE**
-   - Vulnerabilidades potenciais
-   - Gargalos de performance
-   - Uso de recursos
-   - Práticas de segurança
-
-5. **MANUTENIBILIDADE**
-   - Facilidade de modificação
-   - Dependências externas
-   - Débito técnico
-   - Escalabilidade
-
-6. **RECOMENDAÇÕES ESTRATÉGICAS**
-   - Prioridades de melhoria
-   - Refatorações necessárias
-   - Novas funcionalidades sugeridas
-   - Roadmap de desenvolvimento
+{PROJECT_ANALYSIS_TASK}
 
 Forneça uma análise COMPLETA e DETALHADA usando todo o contexto disponível.
 """
             
-            # Chama Gemini com contexto massivo
-            print(f"🧠 Enviando {self.gemini.estimate_tokens(context_prompt):,} tokens para análise...")
-            
-            response = await self.gemini.generate_response(
-                context_prompt,
-                thinking_budget=32768,  # Máximo thinking para análise completa
-                enable_massive_context=True
-            )
+            prompt_tokens = self.gemini.estimate_tokens(context_prompt)
+            chunk_stats = None
+            if prompt_tokens > self.gemini.context_budget_tokens:
+                # Não cabe numa chamada: cada chunk é analisado em paralelo e depois consolidado
+                print(f"🧩 {prompt_tokens:,} tokens excedem a janela do modelo - analisando em chunks...")
+                response, chunk_stats = await self._analyze_in_chunks(
+                    [Path(project_path) / f['path'] for f in project_files]
+                )
+            else:
+                # Chama Gemini com contexto massivo
+                print(f"🧠 Enviando {prompt_tokens:,} tokens para análise...")
+                
+                response = await self.gemini.generate_response(
+                    context_prompt,
+                    thinking_budget=32768,  # Máximo thinking para análise completa
+                    enable_massive_context=True
+                )
             
             # Métricas
             analysis_time = time.time() - start_time
             self.metrics.massive_context_requests += 1
             self.metrics.complex_analysis_requests += 1
-            self.metrics.total_context_tokens_used += self.gemini.estimate_tokens(context_prompt)
+            self.metrics.total_context_tokens_used += prompt_tokens
             
             analysis_result = {
                 'project_stats': {
@@ -146,12 +164,14 @@ Forneça uma análise COMPLETA e DETALHADA usando todo o contexto disponível.
                     'total_lines': sum(f['lines'] for f in project_files),
                     'total_size': sum(f['size'] for f in project_files),
                     'analysis_time': analysis_time,
-                    'tokens_used': self.gemini.estimate_tokens(context_prompt)
+                    'tokens_used': prompt_tokens
                 },
                 'files_analyzed': project_files,
                 'detailed_analysis': response,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
             }
+            if chunk_stats is not None:
+                analysis_result['project_stats']['chunks'] = chunk_stats
             
             print(f"✅ Análise concluída em {analysis_time:.2f}s")
             print(f"📊 {len(project_files)} arquivos analisados simultaneamente")
@@ -162,6 +182,24 @@ Forneça uma análise COMPLETA e DETALHADA usando todo o contexto disponível.
             print(f"❌ Erro na análise completa: {e}")
             return {'error': str(e)}
     
+    async def _analyze_in_chunks(self, files: List[Path]) -> Tuple[str, Dict[str, Any]]:
+        """Análise map-reduce: um chunk de arquivos por chamada e uma consolidação final."""
+        tasks = self.chunking.create_chunk_tasks(files, PROJECT_ANALYSIS_TASK)
+        executor = ChunkExecutor(make_gemini_worker(self.gemini), max_concurrency=self.chunk_concurrency)
+        merged = await executor.run(tasks)
+        
+        # Resultados vêm ordenados por chunk_id: com mais de um chunk, o último é a consolidação
+        responses = [result.get('response', '') for result in merged['results']]
+        stats = {
+            'chunks': len(tasks),
+            'failed': executor.stats.failed,
+            'retries': executor.stats.retries,
+            'errors': merged['errors'],
+            'max_parallel': executor.stats.max_parallel,
+            'elapsed': executor.stats.elapsed
+        }
+        return (responses[-1] if responses else ''), stats
+    
     async def massive_refactoring(self, project_path: str, refactoring_goal: str) -> Dict[str, Any]:
         """
         REFATORAÇÃO MASSIVA - MÚLTIPLOS ARQUIVOS SIMULTANEAMENTE
@@ -3,10 +3,13 @@ Cliente otimizado para API do Gemini
 """
 import os
 import asyncio
-from typing import Optional, List, Dict, Any, AsyncGenerator
+from typing import Optional, List, Dict, Any, AsyncGenerator, AsyncIterator, Callable, Mapping, Tuple
+from types import MappingProxyType
 from dataclasses import dataclass
 import json
+import hashlib
 import time
+import threading
 from pathlib import Path
 
 # Importação condicional do Google Generative AI
@@ -22,6 +25,28 @@ except ImportError:
     print("📦 Instale com: pip install google-generativeai")
 
 from .config import ConfigManager, Config
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter, RequestPriority
+from .single_flight import SingleFlight
+from .token_counter import get_token_counter
+from .local_backend import TIER_PROFILES, RecordingBackend, create_backend
+from .context_packer import ContextPacker
+from .prompt_batcher import PromptBatcher
+from .telemetry import ModelTelemetry, caller_subsystem
+from .model_router import ModelRouter, ModelTier
+
+
+# Versão do prefixo estável do prompt: mude ao alterar as instruções de sistema
+PROMPT_PREFIX_VERSION = 1
+
+# Marca o fim do streaming na fila entre a thread de trabalho e o event loop
+_STREAM_END = object()
+
+
+def _usage_tokens(response: Any, name: str) -> int:
+    """Contagem de tokens informada pela API (usage_metadata), ou 0 se ausente."""
+    value = getattr(getattr(response, 'usage_metadata', None), name, None)
+    return value if isinstance(value, int) else 0
 
 
 @dataclass
@@ -45,7 +70,8 @@ class ThinkingBudget:
 class GeminiClient:
     """Cliente OTIMIZADO para Gemini 2.5 Flash - POTENCIAL MÁXIMO 🚀"""
     
-    def __init__(self, api_key: Optional[str] = None, config_manager: Optional[ConfigManager] = None):
+    def __init__(self, api_key: Optional[str] = None, config_manager: Optional[ConfigManager] = None,
+                 backend: Any = None):
         self.config_manager = config_manager or ConfigManager()
         self.config = self.config_manager.config
         self.model = None
@@ -62,10 +88,69 @@ class GeminiClient:
         self.thinking_mode = getattr(self.config.model, 'thinking_mode', True)            # Sempre ativo 🧠
         self.show_reasoning = getattr(self.config.model, 'show_reasoning', True)          # Processo visível
         
+        # CONTAGEM DE TOKENS COMPARTILHADA (memorizada por conteúdo)
+        self.token_counter = get_token_counter()
+        self.massive_context_tokens = getattr(self.config.model, 'massive_context_tokens', 32768)
+        # Contexto acima disso é reduzido aos itens mais relevantes (0 = janela do modelo)
+        self.context_budget_tokens = getattr(self.config.model, 'context_budget_tokens', 0) or \
+            max(self.max_input_tokens - self.max_output_tokens, 0)
+        self.context_packer = ContextPacker(self.token_counter)
+        
         # MÉTRICAS DE PERFORMANCE
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.request_count = 0
+        self._prompt_prefix: Optional[Dict[str, Any]] = None
+        self.prompt_stats = {'builds': 0, 'prefix_builds': 0, 'prefix_reuses': 0, 'build_time_total': 0.0}
+        self.stream_stats = {
+            'streams': 0,
+            'streams_with_output': 0,
+            'ttft_total': 0.0,
+            'ttft_last': None,
+        }
+        
+        # CACHE DE RESPOSTAS 💾
+        self.response_cache: Optional[ResponseCache] = None
+        if getattr(self.config.model, 'response_cache', True):
+            try:
+                self.response_cache = ResponseCache(
+                    self.config_manager.config_dir / "cache" / "responses.db",
+                    ttl_seconds=getattr(self.config.model, 'response_cache_ttl', 21600),
+                    max_entries=getattr(self.config.model, 'response_cache_max_entries', 5000),
+                    max_bytes=getattr(self.config.model, 'response_cache_max_mb', 200) * 1024 * 1024
+                )
+            except Exception as e:
+                print(f"⚠️ Cache de respostas desativado: {e}")
+        self._base_generation_config: Dict[str, Any] = {}
+        
+        # LIMITE DE TAXA COMPARTILHADO (RPM/TPM + concorrência adaptativa) 🚦
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=getattr(self.config.model, 'requests_per_minute', 60),
+            tokens_per_minute=getattr(self.config.model, 'tokens_per_minute', 1000000),
+            max_concurrency=getattr(self.config.model, 'max_concurrent_requests', 8),
+            max_retries=getattr(self.config.model, 'max_retries', 5)
+        )
+        
+        # COALESCÊNCIA DE REQUISIÇÕES IDÊNTICAS EM ANDAMENTO 🔗
+        self.coalesce_requests = getattr(self.config.model, 'coalesce_requests', True)
+        self.single_flight = SingleFlight()
+        
+        # TELEMETRIA POR CHAMADA (latência, tokens e custo por subsistema) 📈
+        self.telemetry = ModelTelemetry(getattr(self.config.model, 'pricing', None))
+        
+        # LOTES DE PROMPTS PEQUENOS (análises automáticas) 📦
+        self.batcher = PromptBatcher(
+            self,
+            window_ms=getattr(self.config.model, 'batch_window_ms', 50),
+            max_batch_tokens=getattr(self.config.model, 'batch_max_tokens', 16000),
+            max_items=getattr(self.config.model, 'batch_max_items', 16),
+            enabled=getattr(self.config.model, 'batch_prompts', True)
+        )
+        
+        # ROTEAMENTO ENTRE MODELOS RÁPIDO/PROFUNDO 🧭
+        self.routing_enabled = getattr(self.config.model, 'routing', False)
+        self.router = ModelRouter(self._routing_tiers())
+        self._tier_models: Dict[str, Any] = {}
         
         # Usa api_key fornecida ou do config
         if api_key:
@@ -73,7 +158,81 @@ class GeminiClient:
         else:
             self._api_key = self.config_manager.get_api_key()
         
-        self._initialize_model()
+        # BACKEND: Gemini real ou local (record/replay/synthetic) 🧪
+        self.backend_name = os.getenv('GEMINI_CODE_BACKEND') or getattr(self.config.model, 'backend', 'gemini')
+        if isinstance(backend, Mapping):
+            # Um backend por tier (ex.: perfis de latência diferentes em testes de roteamento)
+            self._tier_models = dict(backend)
+            self.model = self._tier_models.get(self.router.tiers[-1].name) or next(iter(self._tier_models.values()))
+            self.backend_name = type(self.model).__name__
+        elif backend is not None:
+            # Backend injetado (ex.: SyntheticBackend em benchmarks de carga)
+            self.backend_name = type(backend).__name__
+            self.model = backend
+        elif self.backend_name in ('synthetic', 'replay'):
+            self._initialize_local_backend()
+        else:
+            self._initialize_model()
+    
+    def _routing_tiers(self) -> List[ModelTier]:
+        """Tiers configurados em model.routing_tiers (do mais rápido para o mais capaz)."""
+        configured = getattr(self.config.model, 'routing_tiers', None) or [
+            {'name': 'fast', 'model': 'gemini-2.5-flash-lite', 'max_complexity': 'medium', 'expected_latency': 1.5},
+            {'name': 'deep', 'model': self.config.model.name, 'max_complexity': 'very_complex', 'expected_latency': 8.0},
+        ]
+        return [ModelTier(**tier) for tier in configured]
+    
+    def _tier_model(self, tier: ModelTier) -> Any:
+        """Modelo que atende o tier (o principal quando é o modelo configurado), ou None."""
+        model = self._tier_models.get(tier.name)
+        if model is None and tier.model == self.config.model.name:
+            return self.model
+        return model
+    
+    def _initialize_tier_models(self, factory: Callable[[ModelTier], Any]):
+        """Cria os modelos dos tiers que não usam o modelo principal."""
+        if not self.routing_enabled:
+            return
+        for tier in self.router.tiers:
+            if tier.model != self.config.model.name:
+                try:
+                    self._tier_models[tier.name] = factory(tier)
+                except Exception as e:
+                    print(f"⚠️ Tier '{tier.name}' ({tier.model}) indisponível: {e}")
+    
+    def _route_request(
+        self, complexity: str, latency_budget: Optional[float] = None, model_tier: Optional[str] = None
+    ) -> List[Tuple[Optional[ModelTier], Any]]:
+        """(tier, modelo) a tentar em ordem: o escolhido pelo roteador e depois os fallbacks."""
+        available = [tier.name for tier in self.router.tiers if self._tier_model(tier) is not None]
+        if not self.routing_enabled or not available:
+            return [(None, self.model)]
+        decision = self.router.route(complexity, latency_budget, available, tier=model_tier)
+        return [(tier, self._tier_model(tier)) for tier in [decision.tier, *decision.fallbacks]]
+    
+    def _backend_path(self) -> Path:
+        """Arquivo de gravação usado pelos backends 'record' e 'replay'."""
+        path = getattr(self.config.model, 'backend_path', '')
+        return Path(path) if path else self.config_manager.config_dir / "recordings" / "session.jsonl"
+    
+    def _initialize_local_backend(self):
+        """Inicializa backend local, sem rede nem API key."""
+        options = dict(getattr(self.config.model, 'backend_options', None) or {})
+        try:
+            tier_options = options.pop('tiers', None) or {}
+            self.model = create_backend(self.backend_name, path=self._backend_path(), **options)
+            if self.backend_name == 'synthetic':
+                # Cada tier com seu próprio perfil de latência
+                self._initialize_tier_models(lambda tier: create_backend('synthetic', **{
+                    **options, **TIER_PROFILES.get(tier.name, {}), **tier_options.get(tier.name, {})
+                }))
+            else:
+                # Replay: a gravação responde por todos os tiers
+                self._initialize_tier_models(lambda tier: self.model)
+            print(f"🧪 Backend local '{self.backend_name}' ativo - nenhuma chamada de rede será feita")
+        except (OSError, ValueError, TypeError) as e:
+            print(f"⚠️ Backend local '{self.backend_name}' indisponível: {e}")
+            self.model = None
     
     def _initialize_model(self):
         """Inicializa modelo Gemini"""
@@ -124,6 +283,7 @@ class GeminiClient:
                 "enable_search": True,
                 "candidate_count": 1,  # Uma resposta de alta qualidade
             })
+        self._base_generation_config = dict(generation_config)
         
         # SISTEMA DE SEGURANÇA OTIMIZADO PARA DESENVOLVIMENTO 🔐
         safety_level = getattr(self.config.advanced, 'safety_settings', 'minimal') if hasattr(self.config, 'advanced') else 'minimal'
@@ -145,11 +305,20 @@ class GeminiClient:
                 {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"}
             ]
         
-        self.model = genai.GenerativeModel(
-            model_name=self.config.model.name,
-            generation_config=generation_config,
-            safety_settings=safety_settings,
-        )
+        def build(model_name: str) -> Any:
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+            )
+            if self.backend_name == 'record':
+                model = RecordingBackend(model, self._backend_path())
+            return model
+        
+        self.model = build(self.config.model.name)
+        self._initialize_tier_models(lambda tier: build(tier.model))
+        if self.backend_name == 'record':
+            print(f"⏺️ Gravando chamadas em {self._backend_path()}")
     
     def _detect_complexity(self, prompt: str) -> str:
         """DETECÇÃO INTELIGENTE DE COMPLEXIDADE 🧠"""
@@ -205,27 +374,28 @@ class GeminiClient:
         else:
             return "simple"
     
-    async def generate_response(
-        self, 
+    def _prepare_generation(
+        self,
         prompt: str,
-        context: Optional[List[Dict[str, str]]] = None,
-        thinking_budget: Optional[int] = None,
-        stream: bool = False,
-        enable_massive_context: bool = True
-    ) -> str:
-        """GERA RESPOSTA OTIMIZADA COM POTENCIAL MÁXIMO 🚀"""
-        
-        # Verifica se modelo está disponível
-        if not GENAI_AVAILABLE or self.model is None:
-            return self._simulate_response(prompt)
-        
+        context: Optional[List[Dict[str, str]]],
+        thinking_budget: Optional[int],
+        enable_massive_context: bool,
+        overrides: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, int, str, int, Mapping[str, Any]]:
+        """Prepara complexidade, thinking, prompt completo e configuração da chamada.
+
+        A configuração de geração é montada por chamada (base + ajustes +
+        overrides) e devolvida como mapeamento imutável: o modelo compartilhado
+        nunca é alterado, então chamadas concorrentes não trocam configurações.
+        """
         # DETECÇÃO INTELIGENTE DE COMPLEXIDADE E AJUSTE DE THINKING 🧠
         complexity = self._detect_complexity(prompt)  # Always detect complexity for logging
         if thinking_budget is None:
             thinking_budget = self.thinking_budget.adjust_for_complexity(complexity)
             
-            # Ajuste adicional para contexto massivo
-            if enable_massive_context and context and len(context) > 20:
+            # Ajuste adicional para contexto massivo (pelo tamanho em tokens, não em mensagens)
+            if enable_massive_context and context and \
+                    self.token_counter.count_messages(context) > self.massive_context_tokens:
                 thinking_budget = min(thinking_budget * 1.5, self.thinking_budget.maximum)
         
         # CONSTRUÇÃO DE PROMPT COM CONTEXTO MASSIVO
@@ -236,56 +406,252 @@ class GeminiClient:
         if estimated_input_tokens > self.max_input_tokens:
             print(f"⚠️ Aviso: Prompt muito longo ({estimated_input_tokens:,} tokens), pode ser truncado")
         
-        # LOGGING DE PERFORMANCE
-        self.request_count += 1
-        print(f"🚀 Request #{self.request_count} | Complexity: {complexity} | Thinking: {thinking_budget:,} tokens")
+        # CONFIGURAÇÃO DINÂMICA BASEADA EM CONTEXTO
+        dynamic_config = {
+            "max_output_tokens": self.max_output_tokens,
+            "temperature": getattr(self.config.model, 'temperature', 0.1)
+        }
         
-        try:
-            # CONFIGURAÇÃO DINÂMICA BASEADA EM CONTEXTO
-            dynamic_config = {
-                "max_output_tokens": self.max_output_tokens,
-                "temperature": getattr(self.config.model, 'temperature', 0.1)
-            }
-            
-            # Ajusta configuração para tarefas muito complexas
-            if thinking_budget > 24576:  # Tarefas muito complexas
-                dynamic_config["temperature"] = 0.05  # Mais determinístico
-                dynamic_config["max_output_tokens"] = self.max_output_tokens  # Resposta completa
+        # Ajusta configuração para tarefas muito complexas
+        if thinking_budget > 24576:  # Tarefas muito complexas
+            dynamic_config["temperature"] = 0.05  # Mais determinístico
+            dynamic_config["max_output_tokens"] = self.max_output_tokens  # Resposta completa
+        
+        generation_config = MappingProxyType({
+            **self._base_generation_config, **dynamic_config, **(overrides or {})
+        })
+        return complexity, thinking_budget, full_prompt, estimated_input_tokens, generation_config
+    
+    async def generate_response(
+        self, 
+        prompt: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        thinking_budget: Optional[int] = None,
+        stream: bool = False,
+        enable_massive_context: bool = True,
+        use_cache: bool = True,
+        on_chunk: Optional[Callable[[str], Any]] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        generation_config: Optional[Dict[str, Any]] = None,
+        subsystem: Optional[str] = None,
+        latency_budget: Optional[float] = None,
+        model_tier: Optional[str] = None
+    ) -> str:
+        """GERA RESPOSTA OTIMIZADA COM POTENCIAL MÁXIMO 🚀
+
+        Respostas não-streaming ficam no cache de respostas, indexadas por
+        modelo + configuração de geração + prompt completo. Use
+        use_cache=False para forçar uma nova chamada ao modelo.
+
+        Com stream=True a resposta é consumida via stream_response e cada
+        trecho é repassado a on_chunk (função ou corrotina) assim que chega;
+        o texto completo continua sendo retornado.
+
+        Todas as chamadas passam pelo rate_limiter; análises automáticas
+        devem usar priority=RequestPriority.BACKGROUND para não atrasar o
+        usuário.
+
+        generation_config sobrescreve parâmetros de geração só desta chamada
+        (ex.: {"max_output_tokens": 1024}); o cliente pode ser usado por
+        muitas corrotinas ao mesmo tempo.
+
+        Chamadas concorrentes com a mesma chave (modelo + configuração +
+        prompt completo) compartilham uma única requisição ao modelo, com o
+        mesmo resultado ou erro para todas (config.model.coalesce_requests).
+
+        Cada chamada ao modelo entra na telemetria (self.telemetry) marcada
+        com o subsistema chamador — detectado pela pilha ou informado em
+        subsystem.
+
+        Com model.routing ativo, o modelo (tier) é escolhido pela complexidade
+        detectada, pelo latency_budget (segundos) e pelas latências recentes
+        de cada tier; se o tier falhar, a chamada segue para o próximo.
+        model_tier força um tier pelo nome.
+        """
+        subsystem = subsystem or caller_subsystem()
+        
+        if stream:
+            parts = []
+            async for chunk in self.stream_response(
+                prompt, context, thinking_budget, enable_massive_context,
+                priority=priority, generation_config=generation_config, subsystem=subsystem,
+                latency_budget=latency_budget, model_tier=model_tier
+            ):
+                parts.append(chunk)
+                if on_chunk is not None:
+                    result = on_chunk(chunk)
+                    if asyncio.iscoroutine(result):
+                        await result
+            return "".join(parts)
+        
+        # Verifica se modelo (ou backend local) está disponível
+        if self.model is None:
+            return self._simulate_response(prompt)
+        
+        complexity, thinking_budget, full_prompt, estimated_input_tokens, request_config = \
+            self._prepare_generation(prompt, context, thinking_budget, enable_massive_context, generation_config)
+        
+        # ROTEAMENTO: tier escolhido primeiro, fallbacks depois
+        attempts = self._route_request(complexity, latency_budget, model_tier)
+        model_name = attempts[0][0].model if attempts[0][0] else self.config.model.name
+        
+        # CACHE DE RESPOSTAS
+        request_key = ResponseCache.make_key(model_name, dict(request_config), full_prompt)
+        write_cache = use_cache and self.response_cache is not None
+        if write_cache:
+            # SQLite fora do event loop: com várias requisições concorrentes, I/O síncrono travaria todas
+            cached = await asyncio.to_thread(self.response_cache.get, request_key)
+            if cached is not None:
+                print(f"💾 Resposta do cache | Complexity: {complexity}")
+                self.telemetry.record_cache_hit(subsystem, model_name)
+                return cached
+        
+        async def call_model() -> str:
+            # LOGGING DE PERFORMANCE
+            self.request_count += 1
+            print(f"🚀 Request #{self.request_count} | Complexity: {complexity} | "
+                  f"Thinking: {thinking_budget:,} tokens | Modelo: {model_name}")
             
             start_time = time.time()
-            
-            if stream:
-                response_text = await self._generate_streaming(full_prompt)
-            else:
-                # Aplicar configuração dinâmica temporariamente
-                original_config = self.model._generation_config
-                self.model._generation_config.update(dynamic_config)
+            for index, (tier, model) in enumerate(attempts):
+                tier_model_name = tier.model if tier else self.config.model.name
+                enqueued = time.perf_counter()
+                attempt_started = [enqueued]
                 
-                response = await asyncio.to_thread(
-                    self.model.generate_content,
-                    full_prompt
-                )
+                def attempt(model=model, attempt_started=attempt_started):
+                    attempt_started[0] = time.perf_counter()
+                    # Configuração desta chamada vai como argumento (cópia própria por tentativa)
+                    return asyncio.to_thread(
+                        model.generate_content, full_prompt, generation_config=dict(request_config)
+                    )
                 
-                # Restaurar configuração original
-                self.model._generation_config = original_config
+                try:
+                    response = await self.rate_limiter.run(
+                        attempt, estimated_tokens=estimated_input_tokens, priority=priority
+                    )
+                    response_text = response.text
+                except Exception:
+                    self.telemetry.record(
+                        subsystem, tier_model_name, latency=time.perf_counter() - enqueued,
+                        queue_wait=attempt_started[0] - enqueued, prompt_tokens=estimated_input_tokens, error=True
+                    )
+                    if tier is not None:
+                        self.router.observe(tier.name, error=True)
+                    if index == len(attempts) - 1:
+                        raise
+                    print(f"🔀 Modelo {tier_model_name} falhou - tentando {attempts[index + 1][0].model}")
+                    continue
                 
-                response_text = response.text
+                if tier is not None:
+                    self.router.observe(tier.name, latency=time.perf_counter() - attempt_started[0])
+                break
             
             # MÉTRICAS DE PERFORMANCE
             end_time = time.time()
             response_time = end_time - start_time
-            output_tokens = self.estimate_tokens(response_text)
+            output_tokens = _usage_tokens(response, 'candidates_token_count') or self.estimate_tokens(response_text)
             self.total_output_tokens += output_tokens
+            self.telemetry.record(
+                subsystem, tier_model_name, latency=time.perf_counter() - enqueued,
+                queue_wait=attempt_started[0] - enqueued,
+                prompt_tokens=_usage_tokens(response, 'prompt_token_count') or estimated_input_tokens,
+                output_tokens=output_tokens
+            )
             
             print(f"✅ Resposta gerada | Tempo: {response_time:.2f}s | Tokens saída: {output_tokens:,}")
             
+            if write_cache and response_text:
+                # Indexa pelo modelo que respondeu: um fallback não fica no lugar do tier rápido
+                cache_key = request_key if tier_model_name == model_name else \
+                    ResponseCache.make_key(tier_model_name, dict(request_config), full_prompt)
+                await asyncio.to_thread(self.response_cache.set, cache_key, response_text, model=tier_model_name)
+            
             return response_text
+        
+        try:
+            if not self.coalesce_requests:
+                return await call_model()
+            
+            # Prompt idêntico já em andamento: espera a mesma chamada em vez de pagar outra
+            if self.single_flight.is_in_flight(request_key):
+                print(f"🔗 Requisição idêntica em andamento - compartilhando resultado | Complexity: {complexity}")
+            return await self.single_flight.do(request_key, call_model, weight=estimated_input_tokens)
                 
         except Exception as e:
             error_msg = f"❌ Erro ao gerar resposta: {str(e)}"
             print(f"🔍 Debug info: Input tokens: ~{estimated_input_tokens:,}, Thinking: {thinking_budget:,}")
             return error_msg
     
+    async def stream_response(
+        self,
+        prompt: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        thinking_budget: Optional[int] = None,
+        enable_massive_context: bool = True,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        generation_config: Optional[Dict[str, Any]] = None,
+        subsystem: Optional[str] = None,
+        latency_budget: Optional[float] = None,
+        model_tier: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """STREAMING REAL DE TOKENS ⚡
+
+        Iterador assíncrono com os trechos da resposta à medida que o modelo
+        os produz. O iterador bloqueante do SDK roda em uma thread de trabalho,
+        então o event loop continua livre durante a geração. Registra o tempo
+        até o primeiro token (TTFT).
+        """
+        if self.model is None:
+            yield self._simulate_response(prompt)
+            return
+        subsystem = subsystem or caller_subsystem()
+        
+        complexity, thinking_budget, full_prompt, estimated_input_tokens, request_config = \
+            self._prepare_generation(prompt, context, thinking_budget, enable_massive_context, generation_config)
+        
+        # Streaming não muda de tier nem é refeito após erro (trechos já foram
+        # entregues), mas respeita fila, prioridade e limites de taxa
+        tier, model = self._route_request(complexity, latency_budget, model_tier)[0]
+        model_name = tier.model if tier else self.config.model.name
+        enqueued = time.perf_counter()
+        await self.rate_limiter.acquire(estimated_input_tokens, priority)
+        queue_wait = time.perf_counter() - enqueued
+        
+        self.request_count += 1
+        print(f"🚀 Request #{self.request_count} (stream) | Complexity: {complexity} | "
+              f"Thinking: {thinking_budget:,} tokens | Modelo: {model_name}")
+        
+        start_time = time.time()
+        first_token_time = None
+        output_tokens = 0
+        failed = False
+        
+        try:
+            async for chunk in self._generate_streaming(full_prompt, request_config, model):
+                if chunk.startswith("❌ Erro no streaming"):
+                    failed = True
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                    self.stream_stats['ttft_total'] += first_token_time
+                    self.stream_stats['ttft_last'] = first_token_time
+                output_tokens += self.estimate_tokens(chunk)
+                yield chunk
+        finally:
+            response_time = time.time() - start_time
+            await self.rate_limiter.release(response_time, error=failed)
+            if tier is not None:
+                self.router.observe(tier.name, latency=None if failed else response_time, error=failed)
+            self.total_output_tokens += output_tokens
+            self.telemetry.record(
+                subsystem, model_name, latency=queue_wait + response_time, queue_wait=queue_wait,
+                ttft=first_token_time, prompt_tokens=estimated_input_tokens, output_tokens=output_tokens,
+                error=failed
+            )
+            self.stream_stats['streams'] += 1
+            if first_token_time is not None:
+                self.stream_stats['streams_with_output'] += 1
+                print(f"✅ Stream concluído | TTFT: {first_token_time:.2f}s | Tempo: {response_time:.2f}s")
+    
     def _simulate_response(self, prompt: str) -> str:
         """Simula resposta quando Gemini não está disponível."""
         return f"""🤖 [MODO SIMULAÇÃO - Instale google-generativeai para funcionalidade completa]
@@ -307,15 +673,37 @@ Entendo sua solicitação. Para que eu possa processar adequadamente sua solicit
 Após a instalação, eu poderei processar sua solicitação adequadamente.
 """
     
-    def _build_prompt(
-        self, 
-        prompt: str, 
-        context: Optional[List[Dict[str, str]]] = None,
-        thinking_budget: int = 16384
-    ) -> str:
-        """CONSTRÓI PROMPT OTIMIZADO COM CONTEXTO MASSIVO 🚀"""
-        
-        # INSTRUÇÕES SYSTEM APRIMORADAS
+    def _prompt_prefix_key(self) -> Tuple[Any, ...]:
+        """Tudo de que o prefixo depende; se nada mudar, o prefixo é reutilizado."""
+        return (
+            PROMPT_PREFIX_VERSION, self.config.user.mode, self.max_input_tokens,
+            self.max_output_tokens, self.thinking_mode, self.show_reasoning
+        )
+
+    def get_prompt_prefix(self) -> Dict[str, Any]:
+        """PREFIXO ESTÁVEL DO PROMPT 📌
+
+        Instruções de sistema e capacidades não mudam entre turnos: são
+        montadas uma vez por sessão e identificadas por hash, para que caches
+        locais e o cache de contexto do provedor reaproveitem os mesmos bytes.
+        """
+        key = self._prompt_prefix_key()
+        if self._prompt_prefix is None or self._prompt_prefix['key'] != key:
+            text = self._build_prompt_prefix()
+            self._prompt_prefix = {
+                'key': key,
+                'version': PROMPT_PREFIX_VERSION,
+                'hash': hashlib.sha256(f"{PROMPT_PREFIX_VERSION}:{text}".encode('utf-8')).hexdigest()[:16],
+                'text': text,
+                'tokens': self.count_tokens(text),
+            }
+            self.prompt_stats['prefix_builds'] += 1
+        else:
+            self.prompt_stats['prefix_reuses'] += 1
+        return self._prompt_prefix
+
+    def _build_prompt_prefix(self) -> str:
+        """Monta o prefixo (só depende do modo e das constantes da sessão)."""
         if self.config.user.mode == "non-programmer":
             system_instructions = f"""
 🤖 GEMINI CODE - ASSISTENTE INTELIGENTE COM CONTEXTO MASSIVO
@@ -357,16 +745,34 @@ IMPORTANTE:
 CONFIGURAÇÃO OTIMIZADA:
 - Input: {self.max_input_tokens:,} tokens (contexto massivo)
 - Output: {self.max_output_tokens:,} tokens (soluções completas)
-- Thinking: {thinking_budget:,} tokens (raciocínio profundo)
+- Thinking: {'ATIVO' if self.thinking_mode else 'INATIVO'} (raciocínio profundo)
 
 MODO TÉCNICO ATIVO - Assuma conhecimento avançado de programação.
 Forneça soluções completas, detalhadas e tecnicamente precisas.
 """
+        return system_instructions
+
+    def _build_prompt(
+        self, 
+        prompt: str, 
+        context: Optional[List[Dict[str, str]]] = None,
+        thinking_budget: int = 16384
+    ) -> str:
+        """CONSTRÓI PROMPT OTIMIZADO COM CONTEXTO MASSIVO 🚀
+
+        prefixo estável (versionado, reaproveitado) + sufixo do turno
+        (contexto, thinking, solicitação e instruções finais).
+        """
+        start = time.perf_counter()
+        prefix = self.get_prompt_prefix()
         
-        # CONSTRUÇÃO DO PROMPT COM CONTEXTO MASSIVO
-        parts = [system_instructions]
+        # CONSTRUÇÃO DO SUFIXO DO TURNO COM CONTEXTO MASSIVO
+        parts = [prefix['text']]
         
         # CONTEXTO EXPANDIDO - Usar muito mais histórico
+        if context and self.token_counter.count_messages(context) > self.context_budget_tokens:
+            # Não cabe na janela: fica com o que é mais relevante para o prompt
+            context = self.context_packer.pack_messages(prompt, context, self.context_budget_tokens)
         if context:
             # Em vez de 10, usar até 50 mensagens anteriores se disponível
             context_limit = min(50, len(context))
@@ -407,6 +813,8 @@ Forneça soluções completas, detalhadas e tecnicamente precisas.
         parts.append("- Mantenha consistência com padrões do projeto")
         
         final_prompt = "\n".join(parts)
+        self.prompt_stats['builds'] += 1
+        self.prompt_stats['build_time_total'] += time.perf_counter() - start
         
         # TRACKING DE TOKENS
         estimated_tokens = self.estimate_tokens(final_prompt)
@@ -414,21 +822,65 @@ Forneça soluções completas, detalhadas e tecnicamente precisas.
         
         return final_prompt
     
-    async def _generate_streaming(self, prompt: str) -> AsyncGenerator[str, None]:
-        """Gera resposta em streaming"""
+    async def _generate_streaming(
+        self,
+        prompt: str,
+        generation_config: Optional[Mapping[str, Any]] = None,
+        model: Any = None
+    ) -> AsyncGenerator[str, None]:
+        """Gera resposta em streaming.
+
+        O iterador síncrono de generate_content(stream=True) é consumido em
+        uma thread de trabalho, que entrega cada trecho ao event loop por
+        uma fila. Se o consumidor parar antes do fim, a thread é avisada e
+        encerra na próxima iteração.
+        """
+        model = model or self.model
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop já encerrado
+                cancelled.set()
+        
+        def worker():
+            try:
+                kwargs = {'stream': True}
+                if generation_config:
+                    kwargs['generation_config'] = dict(generation_config)
+                response = model.generate_content(prompt, **kwargs)
+                for chunk in response:
+                    if cancelled.is_set():
+                        break
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Trecho sem partes de texto (ex.: bloqueio de segurança)
+                        continue
+                    if text:
+                        put(text)
+            except Exception as e:
+                put(e)
+            finally:
+                put(_STREAM_END)
+        
+        loop.run_in_executor(None, worker)
+        
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                prompt,
-                stream=True
-            )
-            
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-                    
-        except Exception as e:
-            yield f"❌ Erro no streaming: {str(e)}"
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    yield f"❌ Erro no streaming: {str(item)}"
+                    break
+                yield item
+        finally:
+            cancelled.set()
     
     async def analyze_code(
         self,
@@ -624,23 +1076,12 @@ Retorne:
         return tips[:5]  # Máximo 5 dicas (aumentado)
     
     def estimate_tokens(self, text: str) -> int:
-        """ESTIMATIVA MELHORADA DE TOKENS"""
-        # Estimativa mais precisa considerando:
-        # - Palavras em português: ~5-6 caracteres por token
-        # - Código: ~3-4 caracteres por token  
-        # - Texto misto: ~4.5 caracteres por token
-        
-        if not text:
-            return 0
-            
-        # Detecta se é principalmente código
-        code_indicators = ['def ', 'class ', 'import ', 'from ', '{\n', 'function']
-        is_code = any(indicator in text for indicator in code_indicators)
-        
-        if is_code:
-            return len(text) // 3.5  # Código é mais denso
-        else:
-            return len(text) // 4.5  # Texto em português
+        """ESTIMATIVA RÁPIDA DE TOKENS (calibrada e memorizada pelo TokenCounter)"""
+        return self.token_counter.estimate(text)
+    
+    def count_tokens(self, text: str) -> int:
+        """CONTAGEM EXATA DE TOKENS (tokenizador, quando disponível)"""
+        return self.token_counter.count(text)
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """ESTATÍSTICAS DE PERFORMANCE 📊"""
@@ -653,9 +1094,38 @@ Retorne:
             'max_input_capacity': self.max_input_tokens,
             'max_output_capacity': self.max_output_tokens,
             'thinking_mode': self.thinking_mode,
-            'show_reasoning': self.show_reasoning
+            'show_reasoning': self.show_reasoning,
+            'response_cache': self.response_cache.get_stats() if self.response_cache else {'enabled': False},
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'single_flight': self.single_flight.get_stats(),
+            'batching': self.batcher.get_stats(),
+            'telemetry': self.telemetry.summary(),
+            'routing': {'enabled': self.routing_enabled, **self.router.get_stats()},
+            'token_counter': self.token_counter.get_stats(),
+            'prompt': {
+                'builds': self.prompt_stats['builds'],
+                'avg_build_ms': self.prompt_stats['build_time_total'] * 1000 / max(1, self.prompt_stats['builds']),
+                'prefix_version': PROMPT_PREFIX_VERSION,
+                'prefix_hash': self._prompt_prefix['hash'] if self._prompt_prefix else None,
+                'prefix_tokens': self._prompt_prefix['tokens'] if self._prompt_prefix else 0,
+                'prefix_builds': self.prompt_stats['prefix_builds'],
+                'prefix_reuse_rate': self.prompt_stats['prefix_reuses'] / max(
+                    1, self.prompt_stats['prefix_reuses'] + self.prompt_stats['prefix_builds']),
+            },
+            'streaming': {
+                'streams': self.stream_stats['streams'],
+                'avg_time_to_first_token': (
+                    self.stream_stats['ttft_total'] / self.stream_stats['streams_with_output']
+                    if self.stream_stats['streams_with_output'] else None
+                ),
+                'last_time_to_first_token': self.stream_stats['ttft_last'],
+            }
         }
     
+    def export_metrics(self, path: Optional[Path] = None) -> Path:
+        """Exporta a telemetria das chamadas (percentis, tokens e custo) em JSON."""
+        return self.telemetry.export(path or self.config_manager.config_dir / "metrics" / "model_calls.json")
+    
     def validate_response(self, response: str) -> Dict[str, Any]:
         """VALIDAÇÃO AVANÇADA DE RESPOSTA 🔍"""
         validation_result = {
@@ -0,0 +1,232 @@
+"""
+Carregamento sob demanda de subsistemas e bibliotecas pesadas.
+
+Bibliotecas como pandas, networkx e matplotlib só são importadas no primeiro
+uso, e cada etapa da inicialização é cronometrada (importação e criação
+separadas) para o relatório de partida.
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class StageTiming:
+    """Tempo gasto por uma etapa de inicialização."""
+    name: str
+    import_seconds: float = 0.0
+    init_seconds: float = 0.0
+    modules_imported: int = 0
+    deferred: bool = False  # carregada depois da partida, no primeiro uso
+
+    @property
+    def total_seconds(self) -> float:
+        return self.import_seconds + self.init_seconds
+
+
+class StartupProfiler:
+    """Registra o tempo de importação e inicialização de cada etapa."""
+
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.stages: Dict[str, StageTiming] = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @contextmanager
+    def measure(self, stage: str, phase: str = 'init'):
+        """
+        Cronometra um bloco como fase 'import' ou 'init' de uma etapa.
+
+        Medições aninhadas (ex.: um módulo sob demanda importado durante a
+        criação de um serviço) são descontadas do bloco externo.
+        """
+        stack = self._stack()
+        stack.append([0.0, 0])  # tempo e módulos das medições internas
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            modules = max(0, len(sys.modules) - modules_before)
+            nested_seconds, nested_modules = stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+                stack[-1][1] += modules
+            self._record(stage, phase, elapsed - nested_seconds, modules - nested_modules)
+
+    def _stack(self) -> List[List[float]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, stage: str, phase: str, seconds: float, modules: int):
+        with self._lock:
+            timing = self.stages.get(stage)
+            if timing is None:
+                timing = StageTiming(stage, deferred=self.ready_at is not None)
+                self.stages[stage] = timing
+            if phase == 'import':
+                timing.import_seconds += seconds
+            else:
+                timing.init_seconds += seconds
+            timing.modules_imported += max(0, modules)
+
+    def import_object(self, stage: str, path: str) -> Any:
+        """Importa 'pacote.modulo.Nome' (ou só o módulo) contabilizando na etapa."""
+        with self.measure(stage, 'import'):
+            return import_object(path)
+
+    def mark_ready(self):
+        """Marca o fim da partida; etapas seguintes contam como sob demanda."""
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+
+    @property
+    def startup_seconds(self) -> float:
+        end = self.ready_at if self.ready_at is not None else time.perf_counter()
+        return end - self.created_at
+
+    def report(self) -> Dict[str, Any]:
+        """Relatório por etapa, na ordem em que foram carregadas."""
+        with self._lock:
+            stages = list(self.stages.values())
+        return {
+            'startup_seconds': self.startup_seconds,
+            'ready': self.ready_at is not None,
+            'stages': [dict(asdict(stage), total_seconds=stage.total_seconds) for stage in stages],
+        }
+
+    def format_report(self) -> str:
+        """Tabela legível do relatório de partida."""
+        report = self.report()
+        lines = [
+            "⏱️ PERFIL DE INICIALIZAÇÃO",
+            f"{'etapa':<28} {'import':>9} {'init':>9} {'módulos':>8}",
+        ]
+        for stage in report['stages']:
+            marker = " (sob demanda)" if stage['deferred'] else ""
+            lines.append(
+                f"{stage['name'] + marker:<28} {stage['import_seconds']:>8.3f}s "
+                f"{stage['init_seconds']:>8.3f}s {stage['modules_imported']:>8}"
+            )
+        lines.append(f"🚀 Pronto em {report['startup_seconds']:.3f}s")
+        return "\n".join(lines)
+
+
+class LazyModule:
+    """Proxy que só importa o módulo no primeiro acesso a um atributo."""
+
+    def __init__(self, name: str, stage: Optional[str] = None):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_stage'] = stage or f"import {name}"
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    with get_startup_profiler().measure(self._lazy_stage, 'import'):
+                        module = importlib.import_module(self._lazy_name)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.is_loaded else "não carregado"
+        return f"<LazyModule {self._lazy_name!r} ({state})>"
+
+
+def lazy_import(name: str, stage: Optional[str] = None):
+    """Retorna o módulo se já importado, senão um proxy carregado no primeiro uso."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name, stage)
+
+
+def is_available(name: str) -> bool:
+    """Verifica se um módulo pode ser importado, sem importá-lo."""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def import_object(path: str) -> Any:
+    """Importa um módulo ou um atributo dele, dado como 'pacote.modulo.Nome'."""
+    try:
+        return importlib.import_module(path)
+    except ModuleNotFoundError as e:
+        # Só tenta 'modulo.Nome' se o que faltou foi o próprio caminho
+        if e.name != path or '.' not in path:
+            raise
+    module_path, attr = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_path), attr)
+
+
+def lazy_exports(package: str, exports: Dict[str, str], optional: Dict[str, str] = None):
+    """
+    Cria __getattr__/__dir__ (PEP 562) para um pacote que reexporta classes
+    de submódulos sem importá-los na carga do pacote.
+
+    Nomes em `optional` viram None se a importação falhar.
+    """
+    optional = optional or {}
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name], package), name)
+        elif name in optional:
+            try:
+                value = getattr(importlib.import_module(optional[name], package), name)
+            except ImportError:
+                value = None
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports) | set(optional))
+
+    return __getattr__, __dir__
+
+
+# Profiler global do processo
+_startup_profiler = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Obtém o profiler de partida global."""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+    return _startup_profiler
@@ -0,0 +1,397 @@
+"""
+Backends locais para o GeminiClient: gravação, replay e respostas sintéticas.
+
+Todos expõem a mesma interface usada do modelo do SDK
+(`generate_content(prompt, generation_config=None, stream=False)`, com
+`.text` na resposta e em cada trecho do streaming), então basta colocá-los
+em `GeminiClient.model` — ou configurar `model.backend` — para rodar a pilha
+inteira sem rede:
+
+- `RecordingBackend`: envolve o modelo real e grava cada chamada (trechos,
+  tempos e erros) em JSONL;
+- `ReplayBackend`: reproduz uma gravação de forma determinística, com os
+  mesmos tempos (ou acelerados);
+- `SyntheticBackend`: gera respostas com percentis de latência, vazão de
+  tokens e injeção de falhas configuráveis.
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+
+BACKENDS = ('gemini', 'record', 'replay', 'synthetic')
+
+# Perfil do backend sintético por tier de roteamento (somado às backend_options);
+# tiers sem perfil próprio usam as opções gerais
+TIER_PROFILES: Dict[str, Dict[str, Any]] = {
+    'fast': {'latency_p50': 0.25, 'latency_p95': 0.8, 'tokens_per_second': 250.0, 'output_tokens': 150},
+}
+
+# Gravações de vários modelos (um por tier) podem ir para o mesmo arquivo
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+_WORDS = (
+    "analisar", "projeto", "arquivo", "função", "classe", "teste", "código", "melhoria",
+    "contexto", "resultado", "erro", "ajuste", "módulo", "dados", "cliente", "sistema",
+)
+
+
+class LocalBackendError(Exception):
+    """Erro reproduzido ou injetado por um backend local."""
+
+
+_error_classes: Dict[str, type] = {}
+
+
+def _error_class(name: str) -> type:
+    """Classe de erro com o nome original (ex.: ResourceExhausted), para quem inspeciona o tipo."""
+    if not name or name == LocalBackendError.__name__:
+        return LocalBackendError
+    if name not in _error_classes:
+        _error_classes[name] = type(name, (LocalBackendError,), {})
+    return _error_classes[name]
+
+
+def request_key(prompt: str, generation_config: Optional[Mapping[str, Any]] = None) -> str:
+    """Chave estável de uma requisição (prompt + configuração de geração)."""
+    payload = json.dumps(
+        {'config': dict(generation_config or {}), 'prompt': prompt},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class LocalChunk:
+    """Trecho de streaming (mesma forma dos trechos do SDK)."""
+    text: str
+
+
+@dataclass
+class LocalResponse:
+    """Resposta completa (mesma forma da resposta do SDK)."""
+    text: str
+
+
+@dataclass
+class CallRecord:
+    """Uma chamada gravada: trechos, tempos relativos ao início e erro."""
+    key: str
+    stream: bool
+    chunks: List[str] = field(default_factory=list)
+    chunk_times: List[float] = field(default_factory=list)
+    latency: float = 0.0
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    prompt_chars: int = 0
+    prompt: Optional[str] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.chunks)
+
+
+class _LocalBackend:
+    """Base: contadores e espera com escala de tempo."""
+
+    def __init__(self, time_scale: float = 1.0):
+        # 1.0 = tempo real; 0 = sem esperas (útil em testes)
+        self.time_scale = time_scale
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'streams': 0, 'errors': 0}
+
+    def _sleep(self, seconds: float):
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _count(self, stream: bool):
+        with self._lock:
+            self.stats['calls'] += 1
+            if stream:
+                self.stats['streams'] += 1
+
+    def _fail(self, message: str, error_type: Optional[str] = None):
+        with self._lock:
+            self.stats['errors'] += 1
+        raise _error_class(error_type)(message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, backend=type(self).__name__)
+
+
+class RecordingBackend(_LocalBackend):
+    """
+    Envolve o modelo real e grava cada chamada em um arquivo JSONL.
+
+    Por padrão o texto do prompt não é gravado, só a chave e o tamanho
+    (record_prompts=True inclui o prompt).
+    """
+
+    def __init__(self, inner: Any, path: Union[str, Path], record_prompts: bool = False):
+        super().__init__()
+        self.inner = inner
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.record_prompts = record_prompts
+        with _PATH_LOCKS_GUARD:
+            self._write_lock = _PATH_LOCKS.setdefault(str(self.path.resolve()), threading.Lock())
+
+    def generate_content(self, prompt: str, generation_config: Optional[Mapping[str, Any]] = None,
+                         stream: bool = False, **kwargs):
+        self._count(stream)
+        record = CallRecord(
+            key=request_key(prompt, generation_config), stream=stream, prompt_chars=len(prompt),
+            prompt=prompt if self.record_prompts else None,
+            config=dict(generation_config or {}), timestamp=time.time()
+        )
+        if generation_config is not None:
+            kwargs['generation_config'] = generation_config
+        if stream:
+            kwargs['stream'] = True
+
+        start = time.perf_counter()
+        try:
+            response = self.inner.generate_content(prompt, **kwargs)
+            if stream:
+                return self._record_stream(response, record, start)
+            record.chunks.append(response.text)
+            record.chunk_times.append(time.perf_counter() - start)
+            return response
+        except Exception as e:
+            self._record_error(record, e)
+            raise
+        finally:
+            if not stream or record.error is not None:
+                record.latency = time.perf_counter() - start
+                self._write(record)
+
+    def _record_stream(self, response, record: CallRecord, start: float) -> Iterator[Any]:
+        try:
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    text = ''
+                if text:
+                    record.chunks.append(text)
+                    record.chunk_times.append(time.perf_counter() - start)
+                yield chunk
+        except Exception as e:
+            self._record_error(record, e)
+            raise
+        finally:
+            record.latency = time.perf_counter() - start
+            self._write(record)
+
+    def _record_error(self, record: CallRecord, error: Exception):
+        record.error = str(error)
+        record.error_type = type(error).__name__
+        with self._lock:
+            self.stats['errors'] += 1
+
+    def _write(self, record: CallRecord):
+        line = json.dumps(asdict(record), ensure_ascii=False, default=str)
+        with self._write_lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class ReplayBackend(_LocalBackend):
+    """
+    Reproduz chamadas gravadas pelo RecordingBackend.
+
+    Requisições iguais recebem as gravações na ordem em que foram feitas
+    (e recomeçam do início ao esgotar). Requisições não gravadas geram erro
+    com strict=True; caso contrário recebem uma gravação escolhida pelo hash
+    da chave, sempre a mesma para a mesma requisição.
+    """
+
+    def __init__(self, path: Union[str, Path], time_scale: float = 1.0, strict: bool = False):
+        super().__init__(time_scale)
+        self.path = Path(path)
+        self.strict = strict
+        self.records: List[CallRecord] = []
+        self._by_key: Dict[str, List[CallRecord]] = {}
+        self._cursor: Dict[str, int] = {}
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = CallRecord(**json.loads(line))
+                    self.records.append(record)
+                    self._by_key.setdefault(record.key, []).append(record)
+        if not self.records:
+            raise ValueError(f"Gravação vazia: {self.path}")
+        self.stats.update({'matched': 0, 'unmatched': 0})
+
+    def generate_content(self, prompt: str, generation_config: Optional[Mapping[str, Any]] = None,
+                         stream: bool = False, **kwargs):
+        self._count(stream)
+        record = self._pick(request_key(prompt, generation_config))
+        if stream:
+            return self._replay_stream(record)
+
+        self._sleep(record.latency)
+        if record.error is not None:
+            self._fail(record.error, record.error_type)
+        return LocalResponse(record.text)
+
+    def _pick(self, key: str) -> CallRecord:
+        with self._lock:
+            candidates = self._by_key.get(key)
+            if candidates:
+                self.stats['matched'] += 1
+                index = self._cursor.get(key, 0)
+                self._cursor[key] = index + 1
+                return candidates[index % len(candidates)]
+            self.stats['unmatched'] += 1
+        if self.strict:
+            self._fail(f"Requisição não encontrada na gravação {self.path.name} (chave {key[:12]})")
+        return self.records[int(key[:16], 16) % len(self.records)]
+
+    def _replay_stream(self, record: CallRecord) -> Iterator[LocalChunk]:
+        elapsed = 0.0
+        for text, at in zip(record.chunks, record.chunk_times):
+            self._sleep(at - elapsed)
+            elapsed = at
+            yield LocalChunk(text)
+        if record.error is not None:
+            self._sleep(record.latency - elapsed)
+            self._fail(record.error, record.error_type)
+
+
+@dataclass
+class SyntheticProfile:
+    """Perfil de carga do SyntheticBackend."""
+    latency_p50: float = 0.8         # segundos até o primeiro token (mediana)
+    latency_p95: float = 2.5         # percentil 95 do tempo até o primeiro token
+    tokens_per_second: float = 80.0  # vazão de saída
+    output_tokens: int = 400         # tamanho mediano da resposta
+    chunk_tokens: int = 20           # tokens por trecho no streaming
+    error_rate: float = 0.0          # falhas genéricas (500)
+    quota_error_rate: float = 0.0    # falhas de cota (429)
+    seed: int = 0
+
+
+class SyntheticBackend(_LocalBackend):
+    """
+    Gera respostas sintéticas com latência, vazão e falhas realistas.
+
+    O tempo até o primeiro token segue uma log-normal ajustada a p50/p95, e
+    o resto da resposta chega a `tokens_per_second`. Cada requisição é
+    sorteada com uma semente derivada de (seed, chave, ocorrência), então o
+    resultado não depende da ordem em que chamadas concorrentes chegam. Só os
+    `max_tracked_prompts` prompts mais recentes guardam a contagem de
+    ocorrências; um prompt esquecido volta a sortear a partir da primeira.
+    """
+
+    def __init__(self, profile: Optional[SyntheticProfile] = None, time_scale: float = 1.0,
+                 max_tracked_prompts: int = 10000, **options):
+        super().__init__(time_scale)
+        self.profile = profile or SyntheticProfile(**options)
+        p50 = max(self.profile.latency_p50, 1e-6)
+        p95 = max(self.profile.latency_p95, p50)
+        self._mu = math.log(p50)
+        self._sigma = (math.log(p95) - self._mu) / 1.6449  # z do percentil 95
+        self.max_tracked_prompts = max_tracked_prompts
+        self._occurrences: 'OrderedDict[str, int]' = OrderedDict()
+        self.stats.update({'quota_errors': 0, 'output_tokens': 0})
+
+    def generate_content(self, prompt: str, generation_config: Optional[Mapping[str, Any]] = None,
+                         stream: bool = False, **kwargs):
+        self._count(stream)
+        plan = self._plan(prompt, generation_config)
+        if stream:
+            return self._stream(plan)
+
+        if plan['fault']:
+            self._sleep(plan['fault_at'])
+            self._raise(plan['fault'])
+        self._sleep(plan['ttft'] + plan['tokens'] / self.profile.tokens_per_second)
+        with self._lock:
+            self.stats['output_tokens'] += plan['tokens']
+        return LocalResponse(' '.join(plan['words']))
+
+    def _plan(self, prompt: str, generation_config: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Sorteia latência, tamanho e falha da requisição."""
+        key = request_key(prompt, generation_config)
+        with self._lock:
+            occurrence = self._occurrences.pop(key, 0)
+            self._occurrences[key] = occurrence + 1
+            if len(self._occurrences) > self.max_tracked_prompts:
+                self._occurrences.popitem(last=False)
+        rng = random.Random(f"{self.profile.seed}:{key}:{occurrence}")
+
+        ttft = rng.lognormvariate(self._mu, self._sigma) if self._sigma > 0 else math.exp(self._mu)
+        tokens = max(1, int(rng.lognormvariate(math.log(max(self.profile.output_tokens, 1)), 0.5)))
+        max_tokens = (generation_config or {}).get('max_output_tokens')
+        if max_tokens:
+            tokens = min(tokens, int(max_tokens))
+
+        roll = rng.random()
+        fault = None
+        if roll < self.profile.quota_error_rate:
+            fault = 'quota'
+        elif roll < self.profile.quota_error_rate + self.profile.error_rate:
+            fault = 'error'
+
+        return {
+            'ttft': ttft,
+            'tokens': tokens,
+            'words': [rng.choice(_WORDS) for _ in range(tokens)],
+            'fault': fault,
+            # Cota falha logo; erros de servidor podem acontecer no meio da geração
+            'fault_at': ttft * 0.2 if fault == 'quota' else ttft,
+            'fault_chunk': 0 if fault == 'quota' else rng.randint(0, max(0, tokens // self.profile.chunk_tokens)),
+        }
+
+    def _stream(self, plan: Dict[str, Any]) -> Iterator[LocalChunk]:
+        size = max(1, self.profile.chunk_tokens)
+        words = plan['words']
+        self._sleep(plan['fault_at'] if plan['fault'] == 'quota' else plan['ttft'])
+        for index, start in enumerate(range(0, len(words), size)):
+            if plan['fault'] and index == plan['fault_chunk']:
+                self._raise(plan['fault'])
+            if index:
+                self._sleep(size / self.profile.tokens_per_second)
+            piece = words[start:start + size]
+            with self._lock:
+                self.stats['output_tokens'] += len(piece)
+            yield LocalChunk((' ' if start else '') + ' '.join(piece))
+        if plan['fault']:
+            self._raise(plan['fault'])
+
+    def _raise(self, fault: str):
+        if fault == 'quota':
+            with self._lock:
+                self.stats['quota_errors'] += 1
+            self._fail("429 Resource has been exhausted (e.g. check quota).", 'ResourceExhausted')
+        self._fail("500 An internal error has occurred.", 'InternalServerError')
+
+
+def create_backend(kind: str, path: Optional[Union[str, Path]] = None, inner: Any = None,
+                   **options) -> Any:
+    """Cria o backend pelo nome ('record', 'replay' ou 'synthetic')."""
+    if kind == 'synthetic':
+        return SyntheticBackend(**options)
+    if kind == 'replay':
+        if path is None:
+            raise ValueError("Backend 'replay' precisa do caminho da gravação")
+        return ReplayBackend(path, **options)
+    if kind == 'record':
+        if inner is None or path is None:
+            raise ValueError("Backend 'record' precisa do modelo real e do caminho da gravação")
+        return RecordingBackend(inner, path, **options)
+    raise ValueError(f"Backend desconhecido: {kind} (use um de {', '.join(BACKENDS)})")
@@ -4,48 +4,33 @@ Centraliza todas as capacidades para 100% de paridade + superioridade ao Claude
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 from pathlib import Path
 from datetime import datetime
 
-# Core imports
-from .gemini_client import GeminiClient
-from .project_manager import ProjectManager
-from .memory_system import MemorySystem
-from .config import Config, ConfigManager
-
-# CLI imports
-from ..cli.repl import GeminiREPL
-from ..cli.session_manager import SessionManager
-from ..cli.command_parser import CommandParser
-
-# Tools imports
-from ..tools.tool_registry import get_tool_registry, ToolRegistry
-
-# Security imports
-from ..security.permission_manager import PermissionManager
-from ..security.approval_system import get_approval_system
-
-# MCP imports
-from ..mcp.mcp_client import get_mcp_client
-
-# Advanced imports
-from ..advanced.context_compactor import ContextCompactor
-
-# Enterprise imports
-try:
-    from ..enterprise.bedrock_integration import get_bedrock_manager, BOTO3_AVAILABLE
-    BEDROCK_AVAILABLE = BOTO3_AVAILABLE
-except ImportError:
-    BEDROCK_AVAILABLE = False
+from .lazy_loader import StartupProfiler, get_startup_profiler, is_available
 
-# Analysis imports
-from ..analysis.health_monitor import HealthMonitor
-from ..analysis.error_detector import ErrorDetector
+# Core imports
+with get_startup_profiler().measure('core', 'import'):
+    from .gemini_client import GeminiClient
+    from .project_manager import ProjectManager
+    from .memory_system import MemorySystem
+    from .config import Config, ConfigManager
 
 # Utils imports
 from ..utils.logger import Logger
 
+# Os demais subsistemas são importados dentro de cada etapa de inicialização
+if TYPE_CHECKING:
+    from ..cli.repl import GeminiREPL
+    from ..cli.session_manager import SessionManager
+    from ..cli.command_parser import CommandParser
+    from ..tools.tool_registry import ToolRegistry
+    from ..security.permission_manager import PermissionManager
+
+# Enterprise: boto3 só é importado se a etapa enterprise for carregada
+BEDROCK_AVAILABLE = is_available('boto3')
+
 
 class GeminiCodeMasterSystem:
     """
@@ -53,15 +38,30 @@ class GeminiCodeMasterSystem:
     Oferece 100% de paridade com Claude Code + funcionalidades superiores.
     """
     
-    def __init__(self, project_path: str = None):
+    # Etapas carregadas no primeiro acesso a um de seus atributos
+    DEFERRED_STAGES = {
+        'advanced': ('context_compactor', 'mcp_client', 'architectural_reasoning',
+                     'complexity_analyzer', 'design_pattern_engine', 'problem_solver',
+                     'learning_engine'),
+        'enterprise': ('bedrock_manager',),
+        'monitoring': ('health_monitor', 'error_detector'),
+    }
+    _DEFERRED_ATTRIBUTES = {attr: stage for stage, attrs in DEFERRED_STAGES.items() for attr in attrs}
+    
+    def __init__(self, project_path: str = None, profiler: Optional[StartupProfiler] = None):
         self.project_path = Path(project_path or ".")
         self.logger = Logger()
+        self.startup_profiler = profiler or get_startup_profiler()
         
         # Estado do sistema
         self.is_initialized = False
         self.startup_time = None
         self.version = "1.0.0-supreme"
         
+        # Etapas adiadas ainda não carregadas / já carregadas
+        self._pending_stages = set()
+        self._loaded_stages = set()
+        
         # Componentes principais
         self.config: Optional[Config] = None
         self.config_manager: Optional[ConfigManager] = None
@@ -70,17 +70,13 @@ class GeminiCodeMasterSystem:
         self.memory_system: Optional[MemorySystem] = None
         self.file_manager = None
         
-        # Sistemas avançados
+        # Sistemas avançados (context_compactor e mcp_client são carregados sob demanda)
         self.tool_registry: Optional[ToolRegistry] = None
         self.permission_manager: Optional[PermissionManager] = None
         self.session_manager: Optional[SessionManager] = None
         self.command_parser: Optional[CommandParser] = None
-        self.context_compactor: Optional[ContextCompactor] = None
-        self.mcp_client = None
         
-        # Análise e monitoramento
-        self.health_monitor: Optional[HealthMonitor] = None
-        self.error_detector: Optional[ErrorDetector] = None
+        # Análise e monitoramento: health_monitor e error_detector sob demanda
         
         # Interface
         self.repl: Optional[GeminiREPL] = None
@@ -98,41 +94,60 @@ class GeminiCodeMasterSystem:
             'uptime_seconds': 0
         }
     
-    async def initialize(self) -> bool:
+    def __getattr__(self, name: str):
+        """Carrega a etapa adiada dona do atributo no primeiro acesso."""
+        stage = type(self)._DEFERRED_ATTRIBUTES.get(name)
+        if stage is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        
+        if stage in self.__dict__.get('_pending_stages', ()):
+            self._load_stage(stage)
+        
+        if stage in self.__dict__.get('_loaded_stages', ()):
+            # Componente indisponível na etapa já carregada
+            return self.__dict__.setdefault(name, None)
+        
+        # Sistema ainda não inicializado
+        return None
+    
+    async def initialize(self, lazy: bool = True) -> bool:
         """
         Inicializa TODOS os sistemas de forma coordenada.
+        
+        Com lazy=True as etapas de DEFERRED_STAGES só são carregadas no primeiro
+        uso de um de seus componentes.
         """
         self.startup_time = datetime.now()
         
         try:
             self.logger.info("🚀 Iniciando Gemini Code Master System...")
             
-            # 1. Configuração
-            await self._initialize_config()
-            
-            # 2. Core systems
-            await self._initialize_core_systems()
-            
-            # 3. Tools and security
-            await self._initialize_tools_and_security()
-            
-            # 4. Advanced features
-            await self._initialize_advanced_features()
-            
-            # 5. Enterprise features
-            await self._initialize_enterprise_features()
+            stages = [
+                ('config', self._initialize_config),                   # 1. Configuração
+                ('core', self._initialize_core_systems),               # 2. Core systems
+                ('tools_security', self._initialize_tools_and_security),  # 3. Tools and security
+                ('advanced', self._initialize_advanced_features),      # 4. Advanced features
+                ('enterprise', self._initialize_enterprise_features),  # 5. Enterprise features
+                ('monitoring', self._initialize_monitoring),           # 6. Monitoring and analysis
+                ('interface', self._initialize_interface),             # 7. Interface
+            ]
             
-            # 6. Monitoring and analysis
-            await self._initialize_monitoring()
-            
-            # 7. Interface
-            await self._initialize_interface()
+            for stage, initializer in stages:
+                if lazy and stage in self.DEFERRED_STAGES:
+                    self._pending_stages.add(stage)
+                    continue
+                
+                with self.startup_profiler.measure(stage):
+                    await initializer()
+                self._loaded_stages.add(stage)
             
             # 8. Health check final
-            health_status = await self.comprehensive_health_check()
+            with self.startup_profiler.measure('health_check'):
+                health_status = await self.comprehensive_health_check()
             
             self.is_initialized = True
             self.stats['startup_time'] = datetime.now()
+            self.startup_profiler.mark_ready()
             
             # Mostra status de inicialização
             self._show_initialization_summary(health_status)
@@ -143,6 +158,35 @@ class GeminiCodeMasterSystem:
             self.logger.error(f"❌ Falha na inicialização: {e}")
             return False
     
+    def _load_stage(self, stage: str):
+        """Carrega uma etapa adiada."""
+        self._pending_stages.discard(stage)
+        self._loaded_stages.add(stage)
+        
+        loaders = {
+            'advanced': self._load_advanced_features,
+            'enterprise': self._load_enterprise_features,
+            'monitoring': self._load_monitoring,
+        }
+        
+        try:
+            with self.startup_profiler.measure(stage):
+                loaders[stage]()
+        except Exception as e:
+            self.logger.error(f"❌ Falha ao carregar etapa '{stage}': {e}")
+    
+    def _stage_available(self, attribute: str) -> bool:
+        """Componente carregado ou disponível sob demanda (sem carregá-lo)."""
+        if self.__dict__.get(attribute) is not None:
+            return True
+        return self._DEFERRED_ATTRIBUTES.get(attribute) in self._pending_stages
+    
+    def get_startup_profile(self) -> Dict[str, Any]:
+        """Tempo de importação e inicialização de cada etapa."""
+        report = self.startup_profiler.report()
+        report['pending_stages'] = sorted(self._pending_stages)
+        return report
+    
     async def _initialize_config(self):
         """Inicializa sistema de configuração."""
         self.config_manager = ConfigManager(self.project_path)
@@ -151,11 +195,13 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_core_systems(self):
         """Inicializa sistemas centrais."""
+        with self.startup_profiler.measure('core', 'import'):
+            from ..core.file_manager import FileManagementSystem
+        
         # Gemini client
         self.gemini_client = GeminiClient()
         
         # File manager
-        from ..core.file_manager import FileManagementSystem
         self.file_manager = FileManagementSystem(self.gemini_client, Path(self.project_path))
         
         # Project manager
@@ -168,6 +214,13 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_tools_and_security(self):
         """Inicializa ferramentas e segurança."""
+        with self.startup_profiler.measure('tools_security', 'import'):
+            from ..tools.tool_registry import get_tool_registry
+            from ..security.permission_manager import PermissionManager
+            from ..security.approval_system import get_approval_system
+            from ..cli.session_manager import SessionManager
+            from ..cli.command_parser import CommandParser
+        
         # Tool registry
         self.tool_registry = get_tool_registry(str(self.project_path))
         
@@ -187,6 +240,18 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_advanced_features(self):
         """Inicializa funcionalidades avançadas."""
+        self._load_advanced_features()
+    
+    def _load_advanced_features(self):
+        with self.startup_profiler.measure('advanced', 'import'):
+            from ..advanced.context_compactor import ContextCompactor
+            from ..mcp.mcp_client import get_mcp_client
+            from ..cognition.architectural_reasoning import ArchitecturalReasoning
+            from ..cognition.complexity_analyzer import ComplexityAnalyzer
+            from ..cognition.design_pattern_engine import DesignPatternEngine
+            from ..cognition.problem_solver import ProblemSolver
+            from ..cognition.learning_engine import LearningEngine
+        
         # Context compactor
         self.context_compactor = ContextCompactor(
             self.gemini_client, 
@@ -197,12 +262,6 @@ class GeminiCodeMasterSystem:
         self.mcp_client = get_mcp_client(str(self.project_path))
         
         # Inicializa módulos de cognição
-        from ..cognition.architectural_reasoning import ArchitecturalReasoning
-        from ..cognition.complexity_analyzer import ComplexityAnalyzer
-        from ..cognition.design_pattern_engine import DesignPatternEngine
-        from ..cognition.problem_solver import ProblemSolver
-        from ..cognition.learning_engine import LearningEngine
-        
         self.architectural_reasoning = ArchitecturalReasoning(self.gemini_client, self.project_manager, self.file_manager)
         self.complexity_analyzer = ComplexityAnalyzer(self.gemini_client, self.project_manager)
         self.design_pattern_engine = DesignPatternEngine(self.gemini_client, self.project_manager)
@@ -213,7 +272,12 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_enterprise_features(self):
         """Inicializa funcionalidades empresariais."""
+        self._load_enterprise_features()
+    
+    def _load_enterprise_features(self):
         if BEDROCK_AVAILABLE:
+            with self.startup_profiler.measure('enterprise', 'import'):
+                from ..enterprise.bedrock_integration import get_bedrock_manager
             self.bedrock_manager = get_bedrock_manager()
             self.logger.info("✅ Integração enterprise (Bedrock) disponível")
         else:
@@ -221,6 +285,13 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_monitoring(self):
         """Inicializa monitoramento e análise."""
+        self._load_monitoring()
+    
+    def _load_monitoring(self):
+        with self.startup_profiler.measure('monitoring', 'import'):
+            from ..analysis.health_monitor import HealthMonitor
+            from ..analysis.error_detector import ErrorDetector
+        
         # Inicializa file manager se necessário para o health monitor
         if not hasattr(self, 'file_manager') or not self.file_manager:
             from ..core.file_manager import FileManagementSystem
@@ -233,13 +304,16 @@ class GeminiCodeMasterSystem:
     
     async def _initialize_interface(self):
         """Inicializa interface de usuário."""
+        with self.startup_profiler.measure('interface', 'import'):
+            from ..cli.repl import GeminiREPL
+            from ..interface.chat_interface import ChatInterface
+            from ..core.natural_language import NaturalLanguageCore
+            from ..core.workspace_manager import WorkspaceManager
+            from ..execution.command_executor import CommandExecutor
+        
         self.repl = GeminiREPL(str(self.project_path))
         
         # Inicializa interface de chat
-        from ..interface.chat_interface import ChatInterface
-        from ..core.natural_language import NaturalLanguageCore
-        from ..core.workspace_manager import WorkspaceManager
-        
         nlp_core = NaturalLanguageCore()
         workspace_manager = WorkspaceManager(self.project_path)
         
@@ -252,7 +326,6 @@ class GeminiCodeMasterSystem:
         )
         
         # Inicializa command executor
-        from ..execution.command_executor import CommandExecutor
         self.command_executor = CommandExecutor(self.gemini_client)
         
         # Conecta callbacks do sistema
@@ -285,22 +358,31 @@ class GeminiCodeMasterSystem:
         print(f"📁 Projeto: {self.project_path}")
         print(f"🔢 Versão: {self.version}")
         
+        print()
+        print(self.startup_profiler.format_report())
+        
         print("\n🧩 COMPONENTES ATIVOS:")
+        def deferred(stage):
+            return "⏳" if stage in self._pending_stages else "✅"
+        
         components = [
             ("Core Systems", "✅ Gemini Client, Project Manager, Memory System"),
             ("Tool Registry", f"✅ {len(self.tool_registry.tools)} ferramentas registradas"),
             ("Security", "✅ Permission Manager, Approval System"),
-            ("Advanced", "✅ Context Compactor, MCP Client"),
+            ("Advanced", f"{deferred('advanced')} Context Compactor, MCP Client"),
             ("Interface", "✅ Terminal REPL, Session Manager"),
-            ("Monitoring", "✅ Health Monitor, Error Detector")
+            ("Monitoring", f"{deferred('monitoring')} Health Monitor, Error Detector")
         ]
         
         if BEDROCK_AVAILABLE:
-            components.append(("Enterprise", "✅ AWS Bedrock Integration"))
+            components.append(("Enterprise", f"{deferred('enterprise')} AWS Bedrock Integration"))
         
         for name, status in components:
             print(f"  {name:15} {status}")
         
+        if self._pending_stages:
+            print("  ⏳ = carregado sob demanda no primeiro uso")
+        
         print("\n🎯 FUNCIONALIDADES IMPLEMENTADAS:")
         features = [
             "✅ Terminal REPL nativo com comandos slash",
@@ -331,9 +413,9 @@ class GeminiCodeMasterSystem:
             len(self.tool_registry.tools) >= 10,  # Tool system
             self.permission_manager is not None,  # Permissions
             self.session_manager is not None,  # Sessions
-            self.context_compactor is not None,  # Compaction
-            self.mcp_client is not None,  # MCP
-            self.health_monitor is not None,  # Monitoring
+            self._stage_available('context_compactor'),  # Compaction
+            self._stage_available('mcp_client'),  # MCP
+            self._stage_available('health_monitor'),  # Monitoring
             BEDROCK_AVAILABLE,  # Enterprise
         ]
         
@@ -496,7 +578,14 @@ class GeminiCodeMasterSystem:
         
         failed_systems = 0
         
+        # Etapas ainda não carregadas não são forçadas pelo health check
+        deferred_checks = {'advanced_features': 'advanced', 'monitoring': 'monitoring', 'enterprise': 'enterprise'}
+        
         for system_name, check_func in checks:
+            if deferred_checks.get(system_name) in self._pending_stages:
+                health_results['systems'][system_name] = {'status': 'healthy', 'deferred': True}
+                continue
+            
             try:
                 system_health = await check_func()
                 health_results['systems'][system_name] = system_health
@@ -607,7 +696,7 @@ class GeminiCodeMasterSystem:
         
         return {
             'status': 'available',
-            'bedrock_manager': hasattr(self, 'bedrock_manager')
+            'bedrock_manager': self.bedrock_manager is not None
         }
     
     def get_system_stats(self) -> Dict[str, Any]:
@@ -643,18 +732,18 @@ class GeminiCodeMasterSystem:
         """Encerra todos os sistemas graciosamente."""
         self.logger.info("🔄 Encerrando Gemini Code Master System...")
         
-        # Para servidores MCP
-        if self.mcp_client:
-            await self.mcp_client.stop_all_servers()
+        # Para servidores MCP (só se a etapa avançada chegou a ser carregada)
+        mcp_client = self.__dict__.get('mcp_client')
+        if mcp_client:
+            await mcp_client.stop_all_servers()
         
         # Salva sessões ativas
         if self.session_manager:
             await self.session_manager.save_current_session()
         
-        # Limpa caches e salva estado
+        # Grava o que ainda estiver na fila write-behind da memória
         if self.memory_system:
-            await self.memory_system.save_state()
-            await self.memory_system.cleanup_old_data()
+            self.memory_system.close()
         
         # Para todos os processos em execução
         if hasattr(self, 'command_executor'):
@@ -708,42 +797,61 @@ class GeminiCodeMasterSystem:
         
         stats = self.gemini_client.get_performance_stats()
         
-        # Estimativa de custos (ajustar conforme pricing real)
-        input_cost_per_1k = 0.00025  # $0.25 por 1M tokens
-        output_cost_per_1k = 0.001   # $1.00 por 1M tokens
+        # Custo calculado por chamada (tokens informados pela API e preço do modelo)
+        telemetry = stats['telemetry']
+        total = telemetry['total']
         
-        total_input_cost = (stats['total_input_tokens'] / 1000) * input_cost_per_1k
-        total_output_cost = (stats['total_output_tokens'] / 1000) * output_cost_per_1k
-        total_cost = total_input_cost + total_output_cost
+        def ms(value):
+            return f"{value * 1000:,.0f}ms" if value is not None else "-"
+        
+        def percentiles(summary):
+            return f"p50 {ms(summary['p50'])} | p95 {ms(summary['p95'])} | p99 {ms(summary['p99'])}"
+        
+        subsystem_lines = []
+        for name, group in sorted(telemetry['groups'].items(), key=lambda item: -item[1]['cost_total']):
+            subsystem_lines.append(
+                f"• {name}: {group['calls']} chamadas | ${group['cost_total']:.4f} | "
+                f"{group['prompt_tokens_total']:,} + {group['output_tokens_total']:,} tokens | "
+                f"latência p95 {ms(group['latency']['p95'])}"
+            )
+        
+        metrics_path = self.gemini_client.export_metrics()
         
         cost_info = f"""
 💰 **RELATÓRIO DE CUSTOS**
 
 📊 **Uso de Tokens:**
-• Tokens de entrada: {stats['total_input_tokens']:,}
-• Tokens de saída: {stats['total_output_tokens']:,}
-• Total de requests: {stats['total_requests']}
+• Tokens de entrada: {total['prompt_tokens_total']:,}
+• Tokens de saída: {total['output_tokens_total']:,}
+• Chamadas ao modelo: {total['calls']} ({total['errors']} com erro, {total['cache_hits']} do cache)
 
 💵 **Custos Estimados:**
-• Custo de entrada: ${total_input_cost:.4f}
-• Custo de saída: ${total_output_cost:.4f}
-• **TOTAL: ${total_cost:.4f}**
+• **TOTAL: ${total['cost_total']:.4f}**
+• Por chamada: p50 ${total['cost']['p50'] or 0:.5f} | p95 ${total['cost']['p95'] or 0:.5f} | p99 ${total['cost']['p99'] or 0:.5f}
+
+⏱️ **Latência:**
+• Total: {percentiles(total['latency'])}
+• Fila: {percentiles(total['queue_wait'])}
+• Primeiro token: {percentiles(total['ttft'])}
 
-📈 **Médias por Request:**
-• Entrada: {stats['avg_input_per_request']:.0f} tokens
-• Saída: {stats['avg_output_per_request']:.0f} tokens
+🧩 **Por subsistema:**
+{chr(10).join(subsystem_lines) or '• Nenhuma chamada ao modelo ainda'}
 
 ⚡ **Capacidades:**
 • Contexto máximo: {stats['max_input_capacity']:,} tokens
 • Saída máxima: {stats['max_output_capacity']:,} tokens
+
+📁 Métricas exportadas em: {metrics_path}
 """
         return {
             'success': True,
             'content': cost_info,
             'type': 'cost',
             'data': {
-                'total_cost': total_cost,
-                'tokens_used': stats['total_input_tokens'] + stats['total_output_tokens']
+                'total_cost': total['cost_total'],
+                'tokens_used': total['prompt_tokens_total'] + total['output_tokens_total'],
+                'by_subsystem': telemetry['groups'],
+                'metrics_file': str(metrics_path)
             }
         }
     
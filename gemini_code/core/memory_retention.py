@@ -0,0 +1,237 @@
+"""
+Retenção em camadas do memory.db.
+
+Sem retenção, a tabela de conversas só cresce e o recall fica mais lento a
+cada mês. A compactação mantém "quentes" as conversas recentes (até
+`hot_days` dias e no máximo `hot_max_conversations` linhas); as mais antigas
+viram um resumo por dia em `conversations_cold` e, se configurado, são
+copiadas para arquivos .jsonl.gz mensais depois que a remoção é confirmada.
+Decisões repetidas (a mesma solução para o mesmo erro, por exemplo) são
+fundidas em uma linha com contador de ocorrências, e as páginas liberadas
+voltam ao sistema de arquivos aos poucos via PRAGMA incremental_vacuum.
+
+Cada passada processa no máximo `batch_rows` conversas, então pode rodar na
+fila write-behind sem segurar o escritor por muito tempo.
+"""
+import gzip
+import json
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Colunas da chave de deduplicação de decisões (NULL conta como igual no GROUP BY)
+_DECISION_KEY = ('decision_type', 'description', 'reason', 'chosen_option', 'outcome')
+
+_CONVERSATION_COLUMNS = (
+    'id', 'timestamp', 'user_input', 'assistant_response', 'intent',
+    'entities', 'files_affected', 'success', 'error_message',
+)
+
+
+@dataclass
+class RetentionPolicy:
+    """Quanto fica na tabela quente e como o resto é tratado."""
+    hot_days: int = 30                   # conversas mais novas que isso ficam quentes
+    hot_max_conversations: int = 5000    # teto de linhas quentes, mesmo dentro de hot_days
+    archive: bool = True                 # copia conversas antigas para archive/*.jsonl.gz
+    dedup_decisions: bool = True
+    batch_rows: int = 2000               # conversas movidas por passada
+    vacuum_pages: int = 256              # páginas devolvidas ao disco por passada
+    auto_every_writes: int = 500         # passada automática a cada N gravações (0 desliga)
+    samples_per_period: int = 5          # perguntas guardadas no resumo de cada dia
+
+
+class MemoryRetention:
+    """Executa passadas de compactação sobre uma conexão do memory.db."""
+
+    def __init__(self, policy: Optional[RetentionPolicy] = None, archive_dir: Optional[Path] = None):
+        self.policy = policy or RetentionPolicy()
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+
+    def compact(self, conn: sqlite3.Connection, max_hot: Optional[int] = None,
+                now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Uma passada de compactação dentro da transação corrente de `conn`.
+
+        Retorna contadores; `remaining` indica que ainda há conversas antigas
+        para a próxima passada. Nada sai do banco aqui: depois do commit,
+        chame publish(result) para gravar o arquivo .jsonl.gz e avisar quem
+        indexa as conversas. Se a transação for desfeita, basta descartar o
+        resultado (uma nova passada refaz o trabalho).
+        """
+        start = time.perf_counter()
+        policy = self.policy
+        rows = self._expired_conversations(conn, max_hot if max_hot is not None else policy.hot_max_conversations,
+                                           now or datetime.now(timezone.utc))
+        result = {
+            'archived': 0,
+            'cold_periods': 0,
+            'decisions_deduplicated': 0,
+            'pages_freed': 0,
+            'remaining': len(rows) > policy.batch_rows,
+            'pending_archive': [],
+        }
+        rows = rows[:policy.batch_rows]
+
+        if rows:
+            result['cold_periods'] = self._roll_up(conn, rows)
+            conn.executemany("DELETE FROM conversations WHERE id = ?", [(row['id'],) for row in rows])
+            result['archived'] = len(rows)
+            result['pending_archive'] = rows
+
+        if policy.dedup_decisions:
+            result['decisions_deduplicated'] = self._deduplicate_decisions(conn)
+
+        result['pages_freed'] = self.incremental_vacuum(conn, policy.vacuum_pages)
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+
+    def publish(self, result: Dict[str, Any],
+                on_archived: Optional[Callable[[List[int]], None]] = None):
+        """
+        Efeitos de uma passada já confirmada no banco: acrescenta as conversas
+        ao arquivo mensal e chama `on_archived(ids)` (ex.: para tirá-las de um
+        índice derivado). Consome `pending_archive`, então chamar duas vezes
+        com o mesmo resultado não duplica o arquivo.
+        """
+        rows = result.pop('pending_archive', None)
+        if not rows:
+            return
+        if self.policy.archive and self.archive_dir is not None:
+            self._archive(rows)
+        if on_archived is not None:
+            on_archived([row['id'] for row in rows])
+
+    def _expired_conversations(self, conn: sqlite3.Connection, max_hot: int,
+                               now: datetime) -> List[Dict[str, Any]]:
+        """Conversas fora da janela quente (por idade ou por excesso), mais antigas primeiro."""
+        cutoff = (now - timedelta(days=self.policy.hot_days)).strftime('%Y-%m-%d %H:%M:%S')
+        boundary = conn.execute(
+            "SELECT id FROM conversations ORDER BY id DESC LIMIT 1 OFFSET ?", (max_hot,)
+        ).fetchone()
+        max_excess_id = boundary[0] if boundary else 0
+        cursor = conn.execute(f"""
+            SELECT {', '.join(_CONVERSATION_COLUMNS)} FROM conversations
+            WHERE id <= ? OR timestamp < ?
+            ORDER BY id
+            LIMIT ?
+        """, (max_excess_id, cutoff, self.policy.batch_rows + 1))
+        return [dict(zip(_CONVERSATION_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def _archive(self, rows: List[Dict[str, Any]]):
+        """Acrescenta as conversas ao arquivo do mês (membros gzip concatenados)."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_month.setdefault(str(row['timestamp'] or '')[:7] or 'unknown', []).append(row)
+        for month, items in by_month.items():
+            path = self.archive_dir / f"conversations-{month}.jsonl.gz"
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+
+    def _roll_up(self, conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> int:
+        """Funde as conversas no resumo diário da tabela fria."""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_day.setdefault(str(row['timestamp'] or '')[:10] or 'unknown', []).append(row)
+
+        for day, items in by_day.items():
+            existing = conn.execute("""
+                SELECT conversations, successes, first_id, last_id, started_at, ended_at,
+                       intents, files, samples
+                FROM conversations_cold WHERE period = ?
+            """, (day,)).fetchone()
+            if existing:
+                count, successes, first_id, last_id, started_at, ended_at = existing[:6]
+                intents = Counter(json.loads(existing[6] or '{}'))
+                files = Counter(json.loads(existing[7] or '{}'))
+                samples = json.loads(existing[8] or '[]')
+            else:
+                count, successes, first_id, last_id, started_at, ended_at = 0, 0, None, None, None, None
+                intents, files, samples = Counter(), Counter(), []
+
+            for item in items:
+                count += 1
+                successes += 1 if item['success'] else 0
+                first_id = item['id'] if first_id is None else min(first_id, item['id'])
+                last_id = item['id'] if last_id is None else max(last_id, item['id'])
+                timestamp = item['timestamp']
+                started_at = timestamp if started_at is None or (timestamp and timestamp < started_at) else started_at
+                ended_at = timestamp if ended_at is None or (timestamp and timestamp > ended_at) else ended_at
+                intent = self._intent_name(item['intent'])
+                if intent:
+                    intents[intent] += 1
+                for file_name in self._load_list(item['files_affected']):
+                    files[file_name] += 1
+                if len(samples) < self.policy.samples_per_period and item['user_input']:
+                    samples.append(item['user_input'][:120])
+
+            conn.execute("""
+                INSERT OR REPLACE INTO conversations_cold
+                (period, conversations, successes, first_id, last_id, started_at, ended_at,
+                 intents, files, samples)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                day, count, successes, first_id, last_id, started_at, ended_at,
+                json.dumps(dict(intents.most_common(20)), ensure_ascii=False),
+                json.dumps(dict(files.most_common(20)), ensure_ascii=False),
+                json.dumps(samples, ensure_ascii=False),
+            ))
+        return len(by_day)
+
+    @staticmethod
+    def _intent_name(raw: Optional[str]) -> Optional[str]:
+        if not raw:
+            return None
+        try:
+            intent = json.loads(raw)
+        except ValueError:
+            return None
+        return intent.get('intent') if isinstance(intent, dict) else None
+
+    @staticmethod
+    def _load_list(raw: Optional[str]) -> List[str]:
+        if not raw:
+            return []
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return []
+        return [str(v) for v in value] if isinstance(value, list) else []
+
+    @staticmethod
+    def _deduplicate_decisions(conn: sqlite3.Connection) -> int:
+        """Mantém a decisão mais recente de cada grupo repetido, somando as ocorrências."""
+        key = ', '.join(_DECISION_KEY)
+        groups = conn.execute(f"""
+            SELECT MAX(id), SUM(occurrences), COUNT(*) FROM decisions
+            GROUP BY {key}
+            HAVING COUNT(*) > 1
+        """).fetchall()
+        if not groups:
+            return 0
+        conn.executemany("UPDATE decisions SET occurrences = ? WHERE id = ?",
+                         [(total, keep) for keep, total, _ in groups])
+        removed = conn.execute(f"""
+            DELETE FROM decisions
+            WHERE id NOT IN (SELECT MAX(id) FROM decisions GROUP BY {key})
+        """).rowcount
+        return max(removed, 0)
+
+    @staticmethod
+    def incremental_vacuum(conn: sqlite3.Connection, pages: int) -> int:
+        """Devolve até `pages` páginas livres ao disco (requer auto_vacuum=INCREMENTAL)."""
+        if pages <= 0 or conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        to_free = min(pages, free)
+        # O módulo sqlite3 executa um único passo do PRAGMA, que libera uma página
+        for _ in range(to_free):
+            conn.execute("PRAGMA incremental_vacuum(1)")
+        return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
@@ -3,24 +3,148 @@ Sistema de memória persistente que lembra de todas as conversas e decisões.
 """
 
 import json
+import re
 import time
 import sqlite3
+import unicodedata
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import hashlib
 
+from .sqlite_pool import get_pool
+from .memory_writer import WriteBehindQueue
+from .memory_retention import MemoryRetention, RetentionPolicy
+from .similarity_index import SimilarityIndex
+
+
+# Migrações versionadas via PRAGMA user_version. Cada entrada é aplicada uma
+# única vez, em ordem, inclusive em bancos memory.db já existentes. A de FTS5
+# é opcional (nem todo SQLite tem FTS5) e roda à parte: sem ela o recall usa
+# LIKE e as demais migrações seguem normalmente.
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+FTS_MIGRATION = 1
+
+# Palavras que casam com quase tudo e só diluem o BM25 (comparadas sem acento)
+_FTS_STOPWORDS = frozenset("""
+    que para com uma por mais como mas foi ele ela isso esse essa este esta sao tem ser nao sim
+    dos das nos nas num numa seu sua voce pelo pela quando onde qual
+    the and for with this that from are was you your not but have has how what why
+""".split())
+
+MEMORY_MIGRATIONS = [
+    # 1: índices FTS5 (BM25) para conversas e decisões
+    [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+            user_input, assistant_response,
+            content='conversations', content_rowid='id',
+            tokenize='{FTS_TOKENIZER}'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_ai AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts(rowid, user_input, assistant_response)
+            VALUES (new.id, new.user_input, new.assistant_response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_ad AFTER DELETE ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, user_input, assistant_response)
+            VALUES ('delete', old.id, old.user_input, old.assistant_response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_au AFTER UPDATE ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, user_input, assistant_response)
+            VALUES ('delete', old.id, old.user_input, old.assistant_response);
+            INSERT INTO conversations_fts(rowid, user_input, assistant_response)
+            VALUES (new.id, new.user_input, new.assistant_response);
+        END
+        """,
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS decisions_fts USING fts5(
+            description, reason, chosen_option,
+            content='decisions', content_rowid='id',
+            tokenize='{FTS_TOKENIZER}'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS decisions_fts_ai AFTER INSERT ON decisions BEGIN
+            INSERT INTO decisions_fts(rowid, description, reason, chosen_option)
+            VALUES (new.id, new.description, new.reason, new.chosen_option);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS decisions_fts_ad AFTER DELETE ON decisions BEGIN
+            INSERT INTO decisions_fts(decisions_fts, rowid, description, reason, chosen_option)
+            VALUES ('delete', old.id, old.description, old.reason, old.chosen_option);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS decisions_fts_au AFTER UPDATE ON decisions BEGIN
+            INSERT INTO decisions_fts(decisions_fts, rowid, description, reason, chosen_option)
+            VALUES ('delete', old.id, old.description, old.reason, old.chosen_option);
+            INSERT INTO decisions_fts(rowid, description, reason, chosen_option)
+            VALUES (new.id, new.description, new.reason, new.chosen_option);
+        END
+        """,
+        # Indexa o histórico existente
+        "INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')",
+        "INSERT INTO decisions_fts(decisions_fts) VALUES ('rebuild')",
+    ],
+    # 2: retenção em camadas (resumo diário das conversas antigas, decisões deduplicadas)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS conversations_cold (
+            period TEXT PRIMARY KEY,
+            conversations INTEGER,
+            successes INTEGER,
+            first_id INTEGER,
+            last_id INTEGER,
+            started_at DATETIME,
+            ended_at DATETIME,
+            intents TEXT,
+            files TEXT,
+            samples TEXT
+        )
+        """,
+        "ALTER TABLE decisions ADD COLUMN occurrences INTEGER DEFAULT 1",
+        "CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp)",
+    ],
+]
+
 
 class MemorySystem:
     """Sistema de memória persistente do Gemini Code."""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, write_behind: bool = True, max_pending_writes: int = 10000,
+                 retention: Optional[RetentionPolicy] = None):
         self.project_path = Path(project_path)
         self.memory_dir = self.project_path / '.gemini_code' / 'memory'
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         
         self.db_path = self.memory_dir / 'memory.db'
+        self.fts_enabled = False
+        self.schema_version = 0
         self._init_database()
+        self._run_migrations()
+        
+        # Gravações saem do caminho da requisição (ver memory_writer). Leituras
+        # esperam até read_flush_timeout pelas gravações já enfileiradas (nunca
+        # pela compactação); se o tempo acabar, leem o que já foi confirmado
+        self.read_flush_timeout = 0.25
+        self.writer = WriteBehindQueue(self.db_path, max_pending=max_pending_writes) if write_behind else None
+        
+        # Retenção: passadas automáticas a cada N gravações, na mesma fila
+        self.retention = MemoryRetention(retention, archive_dir=self.memory_dir / 'archive')
+        self.last_compaction: Optional[Dict[str, Any]] = None
+        self._writes_since_compaction = 0
+        
+        # Índice de similaridade (paráfrases que o FTS não casa), ao lado do memory.db
+        self.similarity = SimilarityIndex(self.memory_dir / 'conversations.simidx')
+        self.min_similarity = 0.2  # cosseno mínimo para o recall por similaridade
+        self._sync_similarity_index()
         
         # Cache em memória
         self.short_term_memory: List[Dict[str, Any]] = []
@@ -28,7 +152,14 @@ class MemorySystem:
     
     def _init_database(self):
         """Inicializa banco de memória."""
-        conn = sqlite3.connect(str(self.db_path))
+        if not self.db_path.exists():
+            # auto_vacuum só pode ser escolhido antes do modo WAL e da primeira tabela
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA user_version = 0")
+            conn.close()
+        
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Tabela de conversas
@@ -88,20 +219,161 @@ class MemorySystem:
         conn.commit()
         conn.close()
     
+    def _run_migrations(self):
+        """Aplica migrações pendentes (PRAGMA user_version)."""
+        conn = get_pool(self.db_path).connect()
+        try:
+            self.schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, statements in enumerate(MEMORY_MIGRATIONS[self.schema_version:],
+                                                 start=self.schema_version + 1):
+                try:
+                    with conn:
+                        if target != FTS_MIGRATION:
+                            for statement in statements:
+                                conn.execute(statement)
+                        conn.execute(f"PRAGMA user_version = {target}")
+                except sqlite3.OperationalError as e:
+                    print(f"⚠️ Migração {target} do memory.db falhou: {e}")
+                    break
+                self.schema_version = target
+            
+            # FTS5 a cada abertura até existir (ex.: SQLite atualizado depois)
+            self.fts_enabled = self._has_table(conn, 'conversations_fts') or self._enable_fts(conn)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+    
+    @staticmethod
+    def _enable_fts(conn: sqlite3.Connection) -> bool:
+        """Cria os índices FTS5; False se o SQLite não tiver FTS5 (recall via LIKE)."""
+        try:
+            with conn:
+                for statement in MEMORY_MIGRATIONS[FTS_MIGRATION - 1]:
+                    conn.execute(statement)
+            return True
+        except sqlite3.OperationalError:
+            return False
+    
+    def _write(self, operation):
+        """Aplica `operation(conn)` em transação (na fila write-behind, se ativa)."""
+        every = self.retention.policy.auto_every_writes
+        self._writes_since_compaction += 1
+        operations = [(operation, None)]
+        if every and self._writes_since_compaction >= every and self.schema_version >= 2:
+            self._writes_since_compaction = 0
+            operations.append(self._compaction_pass())
+        
+        for index, (op, on_commit) in enumerate(operations):
+            if self.writer is not None:
+                # A passada de retenção é manutenção: não atrasa leituras do turno
+                self.writer.submit(op, on_commit=on_commit, background=index > 0)
+                continue
+            conn = get_pool(self.db_path).connect()
+            try:
+                with conn:
+                    op(conn)
+            finally:
+                conn.close()
+            if on_commit is not None:
+                on_commit()
+    
+    def _compaction_pass(self):
+        """Passada automática de retenção: (operação no escritor, efeitos após o commit)."""
+        state = {}
+        
+        def compact(conn):
+            # Um lote refeito roda de novo e substitui o resultado desfeito
+            state['result'] = self.retention.compact(conn)
+        
+        def publish():
+            result = state.pop('result')
+            self.retention.publish(result, on_archived=self.similarity.remove_many)
+            self.last_compaction = dict(result, at=datetime.now().isoformat())
+            if result['remaining']:
+                # Ainda há conversas antigas: a próxima gravação agenda outra passada
+                self._writes_since_compaction = self.retention.policy.auto_every_writes
+            self.similarity.save_if_dirty()
+        
+        return compact, publish
+    
+    @staticmethod
+    def _similarity_text(user_input: Optional[str], response: Optional[str]) -> str:
+        # A pergunta descreve o problema; o começo da resposta ajuda com sinônimos
+        return f"{user_input or ''}\n{(response or '')[:300]}"
+    
+    def _index_conversation(self, conversation_id: int, user_input: str, response: str):
+        self.similarity.add(conversation_id, self._similarity_text(user_input, response))
+        self.similarity.watermark = max(self.similarity.watermark, conversation_id)
+    
+    def _sync_similarity_index(self):
+        """Indexa as conversas gravadas depois do último save do índice."""
+        conn = get_pool(self.db_path).connect()
+        try:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM conversations").fetchone()[0]
+            if self.similarity.watermark > max_id:
+                # Banco recriado/restaurado: o índice não corresponde mais
+                self.similarity.clear()
+            rows = conn.execute("""
+                SELECT id, user_input, assistant_response FROM conversations
+                WHERE id > ?
+                ORDER BY id
+            """, (self.similarity.watermark,)).fetchall()
+        finally:
+            conn.close()
+        for conversation_id, user_input, response in rows:
+            self._index_conversation(conversation_id, user_input, response)
+        self.similarity.watermark = max(self.similarity.watermark, max_id)
+        if rows:
+            self.similarity.save()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera as gravações pendentes; False se o tempo acabou ou alguma falhou."""
+        return self.writer.flush(timeout) if self.writer is not None else True
+    
+    def _read_barrier(self):
+        """Antes de uma leitura do turno: gravações do usuário, com prazo curto e sem compactação."""
+        if self.writer is not None:
+            self.writer.flush(self.read_flush_timeout, background=False)
+    
+    def close(self):
+        """Grava o que estiver pendente e encerra o escritor em segundo plano."""
+        if self.writer is not None:
+            self.writer.close()
+        self.similarity.save_if_dirty()
+    
+    @staticmethod
+    def _fts_query(text: str, max_terms: int = 10) -> str:
+        """
+        Converte texto livre em consulta FTS5 (termos unidos por OR).
+
+        Stopwords e termos com menos de 3 letras ficam de fora. O prefixo `*`
+        vai só no último termo (ainda sendo digitado) e nos longos (flexões);
+        em termos curtos ele casaria com metade do vocabulário.
+        """
+        normalized = unicodedata.normalize('NFKD', text.lower())
+        normalized = ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+        terms = []
+        for token in re.findall(r'\w{3,}', normalized):
+            if token not in terms and token not in _FTS_STOPWORDS:
+                terms.append(token)
+            if len(terms) >= max_terms:
+                break
+        return " OR ".join(
+            f'"{term}"*' if len(term) >= 5 or index == len(terms) - 1 else f'"{term}"'
+            for index, term in enumerate(terms)
+        )
+    
     def remember_conversation(self, user_input: str, response: str, 
                             intent: Dict[str, Any] = None, 
                             files_affected: List[str] = None,
                             success: bool = True,
                             error: str = None):
         """Lembra de uma conversa."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO conversations 
-            (user_input, assistant_response, intent, entities, files_affected, success, error_message)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        # Parâmetros serializados já aqui: o chamador pode alterar intent depois
+        params = (
             user_input,
             response,
             json.dumps(intent) if intent else None,
@@ -109,10 +381,17 @@ class MemorySystem:
             json.dumps(files_affected) if files_affected else None,
             success,
             error
-        ))
+        )
         
-        conn.commit()
-        conn.close()
+        def insert(conn):
+            cursor = conn.execute("""
+                INSERT INTO conversations 
+                (user_input, assistant_response, intent, entities, files_affected, success, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, params)
+            self._index_conversation(cursor.lastrowid, user_input, response)
+        
+        self._write(insert)
         
         # Atualiza memória de curto prazo
         self.short_term_memory.append({
@@ -131,43 +410,35 @@ class MemorySystem:
                          reason: str, alternatives: List[str],
                          chosen: str, outcome: str = None):
         """Lembra de uma decisão tomada."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO decisions
-            (decision_type, description, reason, alternatives, chosen_option, outcome)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        params = (
             decision_type,
             description,
             reason,
             json.dumps(alternatives),
             chosen,
             outcome
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+        self._write(lambda conn: conn.execute("""
+            INSERT INTO decisions
+            (decision_type, description, reason, alternatives, chosen_option, outcome)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, params))
     
     def learn_preference(self, category: str, preference: str, 
                         value: str, confidence: float = 0.8):
         """Aprende uma preferência do usuário."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        self._write(lambda conn: conn.execute("""
             INSERT OR REPLACE INTO preferences
             (category, preference, value, confidence, last_updated)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (category, preference, value, confidence))
-        
-        conn.commit()
-        conn.close()
+        """, (category, preference, value, confidence)))
     
     def detect_pattern(self, pattern_type: str, pattern: str, description: str):
         """Detecta e armazena um padrão do projeto."""
-        conn = sqlite3.connect(str(self.db_path))
+        self._write(lambda conn: self._upsert_pattern(conn, pattern_type, pattern, description))
+    
+    @staticmethod
+    def _upsert_pattern(conn, pattern_type: str, pattern: str, description: str):
         cursor = conn.cursor()
         
         # Verifica se padrão já existe
@@ -192,45 +463,83 @@ class MemorySystem:
                 (pattern_type, pattern, description)
                 VALUES (?, ?, ?)
             """, (pattern_type, pattern, description))
-        
-        conn.commit()
-        conn.close()
     
     def recall_similar_conversations(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Lembra conversas similares."""
-        conn = sqlite3.connect(str(self.db_path))
+        """
+        Lembra conversas similares: BM25 (FTS5) ou palavras-chave, fundidos
+        com o índice de similaridade para pegar também as paráfrases.
+        """
+        self._read_barrier()
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Busca por palavras-chave
-        keywords = query.lower().split()
-        
-        # Constrói query
-        where_clauses = []
-        params = []
-        for keyword in keywords[:5]:  # Limita keywords
-            where_clauses.append("(LOWER(user_input) LIKE ? OR LOWER(assistant_response) LIKE ?)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
-        
-        where_sql = " OR ".join(where_clauses) if where_clauses else "1=1"
-        
-        cursor.execute(f"""
-            SELECT * FROM conversations
-            WHERE {where_sql}
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, params + [limit])
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(row))
+        fts_query = self._fts_query(query)
+        if not fts_query:
+            # Sem termos: conversas mais recentes
+            cursor.execute("""
+                SELECT * FROM conversations
+                ORDER BY id DESC
+                LIMIT ?
+            """, (limit,))
+            results = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return results
+        
+        if self.fts_enabled:
+            cursor.execute("""
+                SELECT c.* FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ?
+                ORDER BY bm25(conversations_fts), c.id DESC
+                LIMIT ?
+            """, (fts_query, limit))
+        else:
+            # Fallback sem FTS5: busca por palavras-chave
+            keywords = query.lower().split()
+            
+            # Constrói query
+            where_clauses = []
+            params = []
+            for keyword in keywords[:5]:  # Limita keywords
+                where_clauses.append("(LOWER(user_input) LIKE ? OR LOWER(assistant_response) LIKE ?)")
+                params.extend([f"%{keyword}%", f"%{keyword}%"])
+            
+            where_sql = " OR ".join(where_clauses) if where_clauses else "1=1"
+            
+            cursor.execute(f"""
+                SELECT * FROM conversations
+                WHERE {where_sql}
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, params + [limit])
+        
+        lexical = [dict(row) for row in cursor.fetchall()]
+        semantic = [hit.key for hit in self.similarity.search(query, k=limit, min_score=self.min_similarity)]
+        
+        # Reciprocal rank fusion das duas listas
+        scores: Dict[int, float] = {}
+        for ranking in ([row['id'] for row in lexical], semantic):
+            for rank, conversation_id in enumerate(ranking):
+                scores[conversation_id] = scores.get(conversation_id, 0.0) + 1 / (60 + rank)
+        ranked = sorted(scores, key=lambda conversation_id: -scores[conversation_id])[:limit]
+        
+        rows = {row['id']: row for row in lexical}
+        missing = [conversation_id for conversation_id in ranked if conversation_id not in rows]
+        if missing:
+            cursor.execute(
+                f"SELECT * FROM conversations WHERE id IN ({','.join('?' * len(missing))})", missing
+            )
+            rows.update((row['id'], dict(row)) for row in cursor.fetchall())
         
         conn.close()
-        return results
+        # Conversas arquivadas/apagadas podem ainda estar no índice: ficam de fora
+        return [rows[conversation_id] for conversation_id in ranked if conversation_id in rows]
     
     def get_preferences(self, category: str = None) -> Dict[str, Any]:
         """Obtém preferências aprendidas."""
-        conn = sqlite3.connect(str(self.db_path))
+        self._read_barrier()
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -262,7 +571,8 @@ class MemorySystem:
     
     def get_project_patterns(self, pattern_type: str = None) -> List[Dict[str, Any]]:
         """Obtém padrões detectados do projeto."""
-        conn = sqlite3.connect(str(self.db_path))
+        self._read_barrier()
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -301,29 +611,45 @@ class MemorySystem:
     
     def get_error_solutions(self, error: str) -> List[Dict[str, Any]]:
         """Busca soluções anteriores para erros similares."""
-        conn = sqlite3.connect(str(self.db_path))
+        fts_query = self._fts_query(error)
+        if not fts_query:
+            return []
+        
+        self._read_barrier()
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Busca por palavras-chave do erro
-        keywords = error.lower().split()[:5]
-        
-        where_clauses = []
-        params = []
-        for keyword in keywords:
-            where_clauses.append("LOWER(reason) LIKE ?")
-            params.append(f"%{keyword}%")
-        
-        where_sql = " OR ".join(where_clauses)
-        
-        cursor.execute(f"""
-            SELECT * FROM decisions
-            WHERE decision_type = 'error_solution' 
-            AND ({where_sql})
-            AND outcome = 'success'
-            ORDER BY timestamp DESC
-            LIMIT 5
-        """, params)
+        if self.fts_enabled:
+            cursor.execute("""
+                SELECT d.* FROM decisions_fts
+                JOIN decisions d ON d.id = decisions_fts.rowid
+                WHERE decisions_fts MATCH ?
+                AND d.decision_type = 'error_solution'
+                AND d.outcome = 'success'
+                ORDER BY bm25(decisions_fts), d.id DESC
+                LIMIT 5
+            """, (f"reason : ({fts_query})",))
+        else:
+            # Busca por palavras-chave do erro
+            keywords = error.lower().split()[:5]
+            
+            where_clauses = []
+            params = []
+            for keyword in keywords:
+                where_clauses.append("LOWER(reason) LIKE ?")
+                params.append(f"%{keyword}%")
+            
+            where_sql = " OR ".join(where_clauses)
+            
+            cursor.execute(f"""
+                SELECT * FROM decisions
+                WHERE decision_type = 'error_solution' 
+                AND ({where_sql})
+                AND outcome = 'success'
+                ORDER BY timestamp DESC
+                LIMIT 5
+            """, params)
         
         solutions = []
         for row in cursor.fetchall():
@@ -360,46 +686,77 @@ class MemorySystem:
             summary += "\n🔍 **Padrões do Projeto:**\n"
             for pattern in patterns[:3]:
                 summary += f"- {pattern['pattern_type']}: {pattern['description']}\n"
-    def compact_memory(self, max_entries: int = 1000):
-        """Compacta memória removendo entradas antigas."""
+        
+        return summary
+    
+    def compact_memory(self, max_entries: Optional[int] = None, max_passes: int = 100) -> Dict[str, Any]:
+        """
+        Compacta a memória agora: move conversas antigas para a camada fria,
+        deduplica decisões e devolve espaço ao disco.
+        
+        `max_entries` sobrepõe o teto de conversas quentes da política.
+        """
+        self.flush()
+        totals = {'archived': 0, 'cold_periods': 0, 'decisions_deduplicated': 0,
+                  'pages_freed': 0, 'passes': 0, 'vacuumed': False}
+        if self.schema_version < 2:
+            totals['error'] = 'schema sem suporte a retenção (migração 2 não aplicada)'
+            return totals
+        
+        start = time.perf_counter()
+        conn = get_pool(self.db_path).connect()
         try:
-            # Compacta conversas antigas
-            conversations_file = self.memory_dir / "conversations.json"
-            
-            if conversations_file.exists():
-                with open(conversations_file, 'r', encoding='utf-8') as f:
-                    conversations = json.load(f)
-                
-                if len(conversations) > max_entries:
-                    # Mantém apenas as mais recentes
-                    sorted_conversations = sorted(
-                        conversations, 
-                        key=lambda x: x.get('timestamp', 0), 
-                        reverse=True
-                    )
-                    
-                    compacted = sorted_conversations[:max_entries]
-                    
-                    with open(conversations_file, 'w', encoding='utf-8') as f:
-                        json.dump(compacted, f, indent=2, ensure_ascii=False)
-                    
-                    removed = len(conversations) - len(compacted)
-                    self.logger.info(f"Memória compactada: {removed} conversas removidas")
-            
-            # Compacta contexto
-            context_file = self.memory_dir / "context.json"
-            if context_file.exists() and context_file.stat().st_size > 1024 * 1024:  # > 1MB
-                # Limpa contexto muito grande
-                with open(context_file, 'w', encoding='utf-8') as f:
-                    json.dump({"compacted": True, "timestamp": time.time()}, f)
-                
-                self.logger.info("Contexto grande compactado")
+            for _ in range(max_passes):
+                with conn:
+                    result = self.retention.compact(conn, max_hot=max_entries)
+                self.retention.publish(result, on_archived=self.similarity.remove_many)
+                totals['passes'] += 1
+                for key in ('archived', 'cold_periods', 'decisions_deduplicated', 'pages_freed'):
+                    totals[key] += result[key]
+                if not result['remaining']:
+                    break
             
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Erro na compactação: {e}")
-            return False
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Banco criado antes da retenção: converte uma vez (VACUUM completo)
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                totals['vacuumed'] = True
+            else:
+                totals['pages_freed'] += self.retention.incremental_vacuum(conn, 1 << 30)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        finally:
+            conn.close()
+        
+        self.similarity.save_if_dirty()
+        totals['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        self.last_compaction = dict(totals, at=datetime.now().isoformat())
+        print(f"🗜️ Memória compactada: {totals['archived']} conversas para a camada fria, "
+              f"{totals['decisions_deduplicated']} decisões repetidas fundidas")
+        return totals
+    
+    def get_cold_summaries(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Resumos diários das conversas que saíram da camada quente (mais recentes primeiro)."""
+        if self.schema_version < 2:
+            return []
+        self.flush()
+        conn = get_pool(self.db_path).connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("""
+                SELECT * FROM conversations_cold
+                ORDER BY period DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        finally:
+            conn.close()
+        
+        summaries = []
+        for row in rows:
+            item = dict(row)
+            for key in ('intents', 'files', 'samples'):
+                item[key] = json.loads(item[key] or 'null')
+            summaries.append(item)
+        return summaries
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas de uso da memória."""
@@ -408,40 +765,54 @@ class MemorySystem:
                 'total_files': 0,
                 'total_size_mb': 0.0,
                 'conversations_count': 0,
-                'context_size_kb': 0.0
+                'hot_conversations': 0,
+                'cold_conversations': 0,
+                'cold_periods': 0,
+                'decisions': 0,
+                'archive_files': 0,
+                'db_size_mb': 0.0,
+                'free_pages': 0,
+                'pending_writes': self.writer.pending if self.writer is not None else 0,
+                'last_compaction': self.last_compaction,
             }
             
             if self.memory_dir.exists():
                 for file_path in self.memory_dir.rglob("*"):
                     if file_path.is_file():
                         stats['total_files'] += 1
-                        size_bytes = file_path.stat().st_size
-                        stats['total_size_mb'] += size_bytes / (1024 * 1024)
-                        
-                        if file_path.name == 'conversations.json':
-                            try:
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    conversations = json.load(f)
-                                    stats['conversations_count'] = len(conversations) if isinstance(conversations, list) else 1
-                            except:
-                                pass
-                        
-                        elif file_path.name == 'context.json':
-                            stats['context_size_kb'] = size_bytes / 1024
+                        stats['total_size_mb'] += file_path.stat().st_size / (1024 * 1024)
+                        if file_path.name.endswith('.jsonl.gz'):
+                            stats['archive_files'] += 1
+            
+            conn = get_pool(self.db_path).connect()
+            try:
+                stats['hot_conversations'] = conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+                stats['decisions'] = conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+                if self.schema_version >= 2:
+                    stats['cold_periods'], stats['cold_conversations'] = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(conversations), 0) FROM conversations_cold"
+                    ).fetchone()
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+                stats['free_pages'] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                stats['db_size_mb'] = page_size * page_count / (1024 * 1024)
+            finally:
+                conn.close()
+            stats['conversations_count'] = stats['hot_conversations'] + stats['cold_conversations']
             
             return stats
             
         except Exception as e:
-            self.logger.error(f"Erro ao obter estatísticas: {e}")
+            print(f"⚠️ Erro ao obter estatísticas da memória: {e}")
             return {'error': str(e)}
-        return summary
     
     def export_memory(self, export_path: str = None) -> str:
         """Exporta memória completa."""
         if not export_path:
             export_path = self.memory_dir / f"memory_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        conn = sqlite3.connect(str(self.db_path))
+        self.flush()
+        conn = get_pool(self.db_path).connect()
         
         # Exporta todas as tabelas
         export_data = {}
@@ -0,0 +1,282 @@
+"""
+Fila write-behind para gravações no SQLite fora do caminho da requisição.
+
+Cada gravação da memória (conversa, decisão, preferência, padrão) abria uma
+conexão e fazia o próprio commit dentro do turno do usuário. A fila recebe
+as operações na hora e uma thread única as aplica em lotes, um lote por
+transação (group commit). Como só há um escritor e a ordem é FIFO, o banco
+sempre contém um prefixo da sequência de gravações. Um encerramento normal
+esvazia a fila (atexit), mas uma queda do processo perde tudo o que ainda
+não foi confirmado: o lote em andamento e as gravações na fila. Quem
+precisa de durabilidade chama flush() e confere o retorno.
+
+Operações de manutenção (ex.: compactação) entram como `background`: rodam
+só com a fila principal vazia, cada uma na própria transação, e um
+flush(background=False) não espera por elas.
+"""
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+from .sqlite_pool import get_pool
+
+
+WriteOperation = Callable[[sqlite3.Connection], Any]
+CommitCallback = Optional[Callable[[], Any]]
+
+# Filas vivas, esvaziadas no encerramento do interpretador
+_LIVE_QUEUES: 'weakref.WeakSet[WriteBehindQueue]' = weakref.WeakSet()
+
+
+class WriteBehindQueue:
+    """
+    Aplica operações de escrita em segundo plano, agrupadas em transações.
+
+    writer = WriteBehindQueue(db_path)
+    writer.submit(lambda conn: conn.execute("INSERT ...", params))
+    writer.flush()   # antes de ler o que acabou de ser escrito
+
+    `on_commit` roda no escritor só depois que a transação com a operação
+    foi confirmada (efeitos fora do banco, como arquivos, não se repetem
+    quando um lote é refeito).
+
+    A fila é limitada a `max_pending` operações: quando enche, submit()
+    espera o escritor (contrapressão) em vez de descartar ou reordenar.
+    Operações `background` ficam numa fila à parte, sem limite, e não
+    preservam a ordem em relação às demais.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_pending: int = 10000,
+                 batch_size: int = 256, flush_interval_ms: int = 50, idle_timeout: float = 5.0,
+                 name: str = 'memory'):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.idle_timeout = idle_timeout  # escritor ocioso encerra a thread (recriada no próximo submit)
+        self.name = name
+
+        self._queue: Deque[Tuple[WriteOperation, CommitCallback]] = deque()
+        self._background: Deque[Tuple[WriteOperation, CommitCallback]] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0           # operações retiradas da fila e ainda não confirmadas
+        self._in_flight_background = False
+        self._flush_requested = False
+        self._closed = False
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'failed': 0,
+            'transactions': 0,
+            'retried_batches': 0,
+            'backpressure_waits': 0,
+            'max_pending_seen': 0,
+            'last_error': None,
+        }
+        self._failed_since_flush = 0
+        self._thread: Optional[threading.Thread] = None
+        _LIVE_QUEUES.add(self)
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue) + len(self._background) + self._in_flight
+
+    def submit(self, operation: WriteOperation, on_commit: CommitCallback = None, background: bool = False):
+        """Enfileira `operation(conn)`; ela roda dentro da transação do lote."""
+        with self._cond:
+            if not background and len(self._queue) >= self.max_pending and not self._closed:
+                self.stats['backpressure_waits'] += 1
+                self._flush_requested = True
+                self._cond.notify_all()
+                while len(self._queue) >= self.max_pending and not self._closed:
+                    self._cond.wait()
+            if self._closed:
+                # Encerrada: grava na hora, depois do que ainda estava na fila
+                while self._in_flight:
+                    self._cond.wait()
+                self._drain_locked()
+                self._write_now((operation, on_commit))
+                return
+            (self._background if background else self._queue).append((operation, on_commit))
+            self._ensure_thread()
+            self.stats['submitted'] += 1
+            self.stats['max_pending_seen'] = max(self.stats['max_pending_seen'], len(self._queue))
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None, background: bool = True) -> bool:
+        """
+        Espera tudo o que foi enfileirado até agora ser confirmado no banco.
+
+        Devolve False se o tempo acabou ou se alguma gravação falhou desde o
+        flush() anterior (o erro fica em get_stats()['last_error']). Com
+        background=False espera só a fila principal, sem as operações de
+        manutenção, e não consome o aviso de falha.
+        """
+        if threading.current_thread() is self._thread:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._busy(background):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if self._thread is None or not self._thread.is_alive():
+                    self._drain_locked()
+                    break
+                self._cond.wait(remaining)
+            if not background:
+                return not self._failed_since_flush
+            failed, self._failed_since_flush = self._failed_since_flush, 0
+        return not failed
+
+    def _busy(self, background: bool) -> bool:
+        if self._queue:
+            return True
+        if background:
+            return bool(self._background or self._in_flight)
+        return bool(self._in_flight) and not self._in_flight_background
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """Esvazia a fila e para o escritor; gravações posteriores viram síncronas."""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._cond:
+            self._drain_locked()
+        _LIVE_QUEUES.discard(self)
+        return flushed
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                idle_deadline = time.monotonic() + self.idle_timeout
+                while not self._queue and not self._background and not self._closed:
+                    remaining = idle_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._queue and not self._background:
+                    self._thread = None
+                    return
+                if self._queue:
+                    # Group commit: espera um pouco por mais gravações antes de abrir a transação
+                    deadline = time.monotonic() + self.flush_interval
+                    while (len(self._queue) < self.batch_size and not self._flush_requested
+                           and not self._closed):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                    self._in_flight_background = False
+                else:
+                    # Manutenção só com a fila principal vazia, sozinha na transação
+                    batch = [self._background.popleft()]
+                    self._in_flight_background = True
+                self._in_flight = len(batch)
+                if not self._queue:
+                    self._flush_requested = False
+                self._cond.notify_all()  # libera quem esperava espaço na fila
+
+            self._write_batch(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self._in_flight_background = False
+                self._cond.notify_all()
+
+    def _drain_locked(self):
+        """Grava o que restou na thread atual (escritor parado)."""
+        while self._queue:
+            self._write_now(self._queue.popleft())
+        while self._background:
+            self._write_now(self._background.popleft())
+
+    def _write_batch(self, batch):
+        conn = get_pool(self.db_path).connect()
+        try:
+            try:
+                with conn:
+                    for operation, _ in batch:
+                        operation(conn)
+                self.stats['transactions'] += 1
+                self.stats['written'] += len(batch)
+            except Exception:
+                # Uma operação ruim não derruba o lote: refaz uma a uma, na mesma ordem
+                self.stats['retried_batches'] += 1
+            else:
+                for _, on_commit in batch:
+                    self._committed(on_commit)
+                return
+            for item in batch:
+                self._apply(conn, item)
+        finally:
+            conn.close()
+
+    def _write_now(self, item):
+        conn = get_pool(self.db_path).connect()
+        try:
+            self._apply(conn, item)
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, item):
+        operation, on_commit = item
+        try:
+            with conn:
+                operation(conn)
+            self.stats['transactions'] += 1
+            self.stats['written'] += 1
+        except Exception as e:
+            with self._cond:
+                self.stats['failed'] += 1
+                self.stats['last_error'] = f"{type(e).__name__}: {e}"
+                self._failed_since_flush += 1
+            print(f"⚠️ Gravação em segundo plano ({self.name}) falhou: {e}")
+            return
+        self._committed(on_commit)
+
+    def _committed(self, on_commit: CommitCallback):
+        if on_commit is None:
+            return
+        try:
+            on_commit()
+        except Exception as e:
+            print(f"⚠️ Pós-commit em segundo plano ({self.name}) falhou: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e tamanho médio dos lotes."""
+        transactions = self.stats['transactions']
+        return {
+            **self.stats,
+            'pending': self.pending,
+            'avg_batch': self.stats['written'] / transactions if transactions else 0.0,
+            'writer_alive': self._thread is not None and self._thread.is_alive(),
+        }
+
+
+@atexit.register
+def _flush_all_on_exit():
+    """Nada enfileirado se perde num encerramento normal do processo."""
+    for writer in list(_LIVE_QUEUES):
+        try:
+            writer.close(timeout=10.0)
+        except Exception:
+            pass
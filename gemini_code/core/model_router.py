@@ -0,0 +1,174 @@
+"""
+Roteamento de requisições entre modelos rápidos e profundos.
+
+Cada requisição vai para o tier mais barato capaz de atender a complexidade
+detectada; um orçamento de latência informado pelo chamador pode trocar
+qualidade por tempo, usando as latências observadas recentemente em cada
+tier. Tiers com erros seguidos ou latência muito acima do esperado ficam
+"degradados" por um tempo e as requisições seguem para o próximo tier.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+
+COMPLEXITY_LEVELS = ('simple', 'medium', 'complex', 'very_complex')
+
+
+def _level(complexity: str) -> int:
+    return COMPLEXITY_LEVELS.index(complexity) if complexity in COMPLEXITY_LEVELS else len(COMPLEXITY_LEVELS) - 1
+
+
+@dataclass
+class ModelTier:
+    """Modelo disponível para roteamento (do mais rápido para o mais capaz)."""
+    name: str
+    model: str
+    max_complexity: str = 'very_complex'   # maior complexidade que o tier atende bem
+    expected_latency: float = 5.0          # palpite (s) enquanto não há observações
+
+
+@dataclass
+class RouteDecision:
+    """Tier escolhido, o motivo e a ordem de fallback."""
+    tier: ModelTier
+    reason: str                            # complexity, latency_budget, degraded, forced
+    fallbacks: List[ModelTier] = field(default_factory=list)
+
+
+@dataclass
+class _TierHealth:
+    samples: Deque[float]
+    calls: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    degraded_until: float = 0.0
+    routed: int = 0
+
+
+class ModelRouter:
+    """
+    Escolhe o tier por requisição: complexidade -> orçamento de latência -> saúde.
+
+    router = ModelRouter([ModelTier('fast', 'gemini-2.5-flash-lite', 'medium', 1.5),
+                          ModelTier('deep', 'gemini-2.5-pro', 'very_complex', 8.0)])
+    decision = router.route('simple', latency_budget=2.0)
+    ...
+    router.observe(decision.tier.name, latency=0.9)
+    """
+
+    def __init__(self, tiers: Iterable[ModelTier], window: int = 50, failure_threshold: int = 3,
+                 slow_factor: float = 4.0, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tiers = list(tiers)
+        if not self.tiers:
+            raise ValueError("ModelRouter precisa de pelo menos um tier")
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.slow_factor = slow_factor
+        self.cooldown = cooldown
+        self._clock = clock
+        self._health: Dict[str, _TierHealth] = {
+            tier.name: _TierHealth(deque(maxlen=window)) for tier in self.tiers
+        }
+        self.stats = {'routed': 0, 'by_latency_budget': 0, 'fallbacks': 0, 'degradations': 0}
+
+    def get_tier(self, name: str) -> Optional[ModelTier]:
+        return next((tier for tier in self.tiers if tier.name == name), None)
+
+    def predicted_latency(self, tier: ModelTier) -> float:
+        """p90 das latências recentes (ou a latência esperada, sem observações)."""
+        samples = sorted(self._health[tier.name].samples)
+        if len(samples) < 5:
+            return tier.expected_latency
+        return samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+
+    def is_degraded(self, tier: ModelTier) -> bool:
+        return self._clock() < self._health[tier.name].degraded_until
+
+    def route(self, complexity: str, latency_budget: Optional[float] = None,
+              available: Optional[Iterable[str]] = None, tier: Optional[str] = None) -> RouteDecision:
+        """
+        Decide o tier de uma requisição.
+
+        `available` restringe aos tiers com modelo disponível; `tier` força um
+        tier pelo nome (os demais viram fallback).
+        """
+        names = set(available) if available is not None else None
+        candidates = [t for t in self.tiers if names is None or t.name in names] or self.tiers[-1:]
+        healthy = [t for t in candidates if not self.is_degraded(t)]
+        pool = healthy or candidates  # todos degradados: melhor tentar do que falhar direto
+        self.stats['routed'] += 1
+
+        forced = self.get_tier(tier) if tier else None
+        if forced is not None and forced in candidates:
+            choice, reason = forced, 'forced'
+        else:
+            level = _level(complexity)
+            capable = [t for t in candidates if _level(t.max_complexity) >= level] or candidates[-1:]
+            choice, reason = capable[0], 'complexity'
+            if choice not in pool:
+                # Tier ideal degradado: o próximo capaz entre os saudáveis, senão o mais capaz deles
+                deeper = [t for t in pool if _level(t.max_complexity) >= level]
+                choice = deeper[0] if deeper else pool[-1]
+                reason = 'degraded'
+                self.stats['fallbacks'] += 1
+
+            if latency_budget is not None and self.predicted_latency(choice) > latency_budget:
+                fitting = [t for t in pool if self.predicted_latency(t) <= latency_budget]
+                faster = (max(fitting, key=lambda t: _level(t.max_complexity)) if fitting
+                          else min(pool, key=self.predicted_latency))
+                if faster is not choice:
+                    choice, reason = faster, 'latency_budget'
+                    self.stats['by_latency_budget'] += 1
+
+        self._health[choice.name].routed += 1
+        fallbacks = sorted((t for t in pool if t is not choice), key=lambda t: -_level(t.max_complexity))
+        return RouteDecision(choice, reason, fallbacks)
+
+    def observe(self, tier_name: str, latency: Optional[float] = None, error: bool = False):
+        """Registra o resultado de uma chamada ao tier."""
+        health = self._health.get(tier_name)
+        if health is None:
+            return
+        health.calls += 1
+        if error:
+            health.errors += 1
+            health.consecutive_errors += 1
+            if health.consecutive_errors >= self.failure_threshold:
+                self._degrade(tier_name, f"{health.consecutive_errors} erros seguidos")
+            return
+
+        health.consecutive_errors = 0
+        if latency is not None:
+            health.samples.append(latency)
+            tier = self.get_tier(tier_name)
+            if len(health.samples) >= 5 and self.predicted_latency(tier) > self.slow_factor * tier.expected_latency:
+                self._degrade(tier_name, f"latência p90 {self.predicted_latency(tier):.1f}s")
+
+    def _degrade(self, tier_name: str, cause: str):
+        health = self._health[tier_name]
+        health.degraded_until = self._clock() + self.cooldown
+        health.consecutive_errors = 0
+        # Depois da pausa o tier recomeça do palpite, sem as amostras ruins
+        health.samples.clear()
+        self.stats['degradations'] += 1
+        print(f"⚠️ Modelo '{tier_name}' degradado ({cause}) - usando outro tier por {self.cooldown:.0f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores gerais e estado de cada tier."""
+        return {
+            **self.stats,
+            'tiers': {
+                tier.name: {
+                    'model': tier.model,
+                    'routed': self._health[tier.name].routed,
+                    'calls': self._health[tier.name].calls,
+                    'errors': self._health[tier.name].errors,
+                    'predicted_latency': self.predicted_latency(tier),
+                    'degraded': self.is_degraded(tier),
+                }
+                for tier in self.tiers
+            }
+        }
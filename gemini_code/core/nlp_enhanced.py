@@ -3,10 +3,12 @@ Sistema NLP aprimorado para processamento 100% natural como Claude Code.
 """
 
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Set, FrozenSet
 from dataclasses import dataclass
 from enum import Enum
 
+from .search_index import required_literals
+
 
 class IntentType(Enum):
     """Tipos de intenção expandidos."""
@@ -92,12 +94,174 @@ class NLPIntent:
     suggested_action: Optional[str] = None
 
 
+# Padrões fixos usados a cada mensagem, compilados uma única vez
+_SPECIAL_CASES = [
+    (re.compile(r'criar\s+agente\s+\w+', re.IGNORECASE), IntentType.CREATE_AGENT, 0.95),
+    (re.compile(r'executar?\s+pytest', re.IGNORECASE), IntentType.RUN_COMMAND, 0.95),
+    (re.compile(r'rodar?\s+pytest', re.IGNORECASE), IntentType.RUN_COMMAND, 0.95),
+]
+_PATH_CHECK = re.compile(r'([A-Z]:[\\\/][^\s]+|\/[^\s]+|"[^"]+"|\'[^\']+\')', re.IGNORECASE)
+
+# Normalização: caminhos/arquivos são preservados, abreviações expandidas
+_REPLACEMENTS = {
+    'tá': 'está',
+    'pra': 'para',
+    'pro': 'para o',
+    'vc': 'você',
+    'tb': 'também',
+    'n': 'não',
+    'q': 'que',
+}
+_NORMALIZE_PATTERN = re.compile(
+    r'(?P<keep>[A-Z]:[\\\/][^\s]+|\/[^\s]+|\w+\.\w+)'
+    r'|\b(?P<word>' + '|'.join(sorted(map(re.escape, _REPLACEMENTS), key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+
+def _trie_regex(words: List[str]) -> str:
+    """Regex em forma de trie: no máximo um ramo é seguido por caractere."""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Quantificador guloso: no ponto de início casa o literal mais longo
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class IntentMatcher:
+    """Padrões de intenção compilados para avaliação em uma passada.
+
+    De cada regex são extraídos os literais obrigatórios; todos os literais
+    formam um único autômato (regex em trie) que percorre o texto uma vez e
+    indica quais padrões ainda podem casar. Só esses são executados, do maior
+    para o menor peso, parando no primeiro que casa em cada intenção: como o
+    ajuste de confiança é monotônico, o resultado é o mesmo de testar todos.
+    """
+
+    def __init__(self, patterns: Dict[IntentType, List[Tuple[str, float]]]):
+        self.intents: List[IntentType] = list(patterns)
+        # Por intenção: (peso, regex compilada, id do padrão) do maior para o menor peso
+        self.entries: Dict[IntentType, List[Tuple[float, Any, int]]] = {}
+        self._always: Set[int] = set()
+        # Literal "chave" de cada alternativa -> [(id do padrão, literais exigidos)]
+        self._triggers: Dict[int, List[Tuple[int, FrozenSet[int]]]] = {}
+        literal_ids: Dict[str, int] = {}
+
+        pattern_id = 0
+        for intent_type, intent_patterns in patterns.items():
+            entries = []
+            for pattern, base_confidence in intent_patterns:
+                requirement = self._requirement(pattern, literal_ids)
+                if requirement is None:
+                    self._always.add(pattern_id)
+                else:
+                    for alternative, key in requirement:
+                        self._triggers.setdefault(key, []).append((pattern_id, alternative))
+                entries.append((base_confidence, re.compile(pattern, re.IGNORECASE), pattern_id))
+                pattern_id += 1
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+            self.entries[intent_type] = entries
+
+        self._literals = literal_ids
+        # Literais contidos em cada literal (inclusive ele mesmo)
+        self._closure = {
+            literal: frozenset(literal_ids[other] for other in literal_ids if other in literal)
+            for literal in literal_ids
+        }
+        self._scanner = re.compile(
+            '(?=(' + _trie_regex(sorted(literal_ids)) + '))', re.IGNORECASE
+        ) if literal_ids else None
+
+    @staticmethod
+    def _requirement(pattern: str, literal_ids: Dict[str, int]) -> Optional[List[Tuple[FrozenSet[int], int]]]:
+        """Alternativas de literais exigidos, cada uma com seu literal chave."""
+        query = required_literals(pattern)
+        if query is None:
+            return None
+        alternatives = []
+        for alternative in query:
+            literals = {literal.lower() for literal in alternative if len(literal) >= 3}
+            if not literals:
+                # Alternativa sem literal útil: o padrão precisa ser sempre avaliado
+                return None
+            key = max(literals, key=len)
+            alternatives.append((
+                frozenset(literal_ids.setdefault(literal, len(literal_ids)) for literal in literals),
+                literal_ids[key]
+            ))
+        return alternatives
+
+    def scan(self, text: str) -> Set[int]:
+        """Ids dos literais presentes no texto (uma passada)."""
+        found: Set[int] = set()
+        if self._scanner is None:
+            return found
+        for match in self._scanner.finditer(text):
+            literal = match.group(1).lower()
+            closure = self._closure.get(literal)
+            if closure is None:
+                # Equivalências de caixa fora do ASCII (ex.: 'K' Kelvin)
+                closure = frozenset(
+                    literal_id for other, literal_id in self._literals.items()
+                    if re.search(re.escape(other), match.group(1), re.IGNORECASE)
+                )
+            found |= closure
+        return found
+
+    def candidates(self, text: str) -> Set[int]:
+        """Ids dos padrões que podem casar com o texto."""
+        found = self.scan(text)
+        candidates = set(self._always)
+        for literal_id in found:
+            for pattern_id, alternative in self._triggers.get(literal_id, ()):
+                if pattern_id not in candidates and alternative <= found:
+                    candidates.add(pattern_id)
+        return candidates
+
+    def matches(self, text: str, skip: Optional[Set[IntentType]] = None) -> List[Tuple[IntentType, float]]:
+        """(intenção, maior peso que casou) na ordem original das intenções."""
+        candidates = self.candidates(text)
+        results = []
+        for intent_type in self.intents:
+            if skip and intent_type in skip:
+                continue
+            for base_confidence, compiled, pattern_id in self.entries[intent_type]:
+                if pattern_id in candidates and compiled.search(text):
+                    results.append((intent_type, base_confidence))
+                    break
+        return results
+
+
+_MATCHER_CACHE: Dict[Tuple, IntentMatcher] = {}
+
+
+def get_intent_matcher(patterns: Dict[IntentType, List[Tuple[str, float]]]) -> IntentMatcher:
+    """IntentMatcher compartilhado para uma tabela de padrões."""
+    key = tuple((intent_type, tuple(intent_patterns)) for intent_type, intent_patterns in patterns.items())
+    matcher = _MATCHER_CACHE.get(key)
+    if matcher is None:
+        matcher = _MATCHER_CACHE[key] = IntentMatcher(patterns)
+    return matcher
+
+
 class NLPEnhanced:
     """Processador NLP aprimorado estilo Claude Code."""
     
     def __init__(self, gemini_client=None):
         self.gemini_client = gemini_client
         self.patterns = self._build_patterns()
+        self.matcher = get_intent_matcher(self.patterns)
         self.context_keywords = self._build_context_keywords()
         self.entity_patterns = self._build_entity_patterns()
         self.conversation_history = []
@@ -419,34 +583,18 @@ class NLPEnhanced:
         # Remove espaços extras mas mantém estrutura
         normalized = ' '.join(text.split())
         
-        # Salva caminhos e nomes de arquivos antes de normalizar
-        preserved_items = []
-        path_pattern = r'([A-Z]:[\\\/][^\s]+|\/[^\s]+|\w+\.\w+)'
-        for match in re.finditer(path_pattern, normalized, re.IGNORECASE):
-            preserved_items.append((match.start(), match.end(), match.group()))
-        
-        # Converte para lowercase primeiro
-        result = normalized.lower()
-        
-        # Padroniza algumas variações comuns
-        replacements = {
-            'tá': 'está',
-            'pra': 'para',
-            'pro': 'para o',
-            'vc': 'você',
-            'tb': 'também',
-            'n': 'não',
-            'q': 'que',
-        }
-        
-        for old, new in replacements.items():
-            result = re.sub(rf'\b{old}\b', new, result)
-        
-        # Restaura itens preservados com sua capitalização original
-        for start, end, original in sorted(preserved_items, key=lambda x: x[0], reverse=True):
-            result = result[:start] + original + result[end:]
-        
-        return result
+        # Uma passada: caminhos e nomes de arquivos mantêm a capitalização
+        # original, abreviações são expandidas e o resto vai para lowercase
+        parts = []
+        last = 0
+        for match in _NORMALIZE_PATTERN.finditer(normalized):
+            parts.append(normalized[last:match.start()].lower())
+            word = match.group('word')
+            parts.append(_REPLACEMENTS[word.lower()] if word else match.group('keep'))
+            last = match.end()
+        parts.append(normalized[last:].lower())
+        
+        return ''.join(parts)
     
     def _detect_intent(self, text: str) -> Tuple[IntentType, float]:
         """Detecta intenção com confiança."""
@@ -454,39 +602,30 @@ class NLPEnhanced:
         best_confidence = 0.0
         
         # Casos especiais com alta prioridade
-        special_cases = {
-            r'criar\s+agente\s+\w+': (IntentType.CREATE_AGENT, 0.95),
-            r'executar?\s+pytest': (IntentType.RUN_COMMAND, 0.95),
-            r'rodar?\s+pytest': (IntentType.RUN_COMMAND, 0.95),
-        }
-        
-        for pattern, (intent, conf) in special_cases.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern, intent, conf in _SPECIAL_CASES:
+            if pattern.search(text):
                 return intent, conf
         
         # Para NAVIGATE_FOLDER, primeiro verifica se realmente há um caminho
         has_valid_path = False
         if any(indicator in text.lower() for indicator in ['pasta', 'diretório', 'folder', 'trabalhar', 'cd']):
             # Verifica se há um caminho válido
-            path_check = re.search(r'([A-Z]:[\\\/][^\s]+|\/[^\s]+|"[^"]+"|\'[^\']+\')', text, re.IGNORECASE)
+            path_check = _PATH_CHECK.search(text)
             if path_check:
                 path_candidate = path_check.group(1).strip('"\'')
                 if ('\\' in path_candidate or '/' in path_candidate) and len(path_candidate) > 2:
                     has_valid_path = True
         
-        for intent_type, patterns in self.patterns.items():
-            # Skip NAVIGATE_FOLDER se não há caminho válido
-            if intent_type == IntentType.NAVIGATE_FOLDER and not has_valid_path:
-                continue
-                
-            for pattern, base_confidence in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    # Ajusta confiança baseado em contexto
-                    confidence = self._adjust_confidence(base_confidence, text, intent_type)
-                    
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_intent = intent_type
+        # Skip NAVIGATE_FOLDER se não há caminho válido
+        skip = None if has_valid_path else {IntentType.NAVIGATE_FOLDER}
+        
+        for intent_type, base_confidence in self.matcher.matches(text, skip):
+            # Ajusta confiança baseado em contexto
+            confidence = self._adjust_confidence(base_confidence, text, intent_type)
+            
+            if confidence > best_confidence:
+                best_confidence = confidence
+                best_intent = intent_type
         
         # Se confiança muito baixa, verifica contexto histórico
         if best_confidence < 0.5 and self.conversation_history:
@@ -0,0 +1,155 @@
+"""
+Índice persistente e incremental dos arquivos do projeto.
+
+Guarda em SQLite os registros FileInfo produzidos por ProjectManager junto com
+a "impressão digital" de stat de cada arquivo (mtime_ns, size, inode). Um novo
+scan só relê, recalcula hash e reanalisa arquivos cuja impressão mudou.
+"""
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .sqlite_pool import get_pool
+
+
+# Incrementar quando o formato dos registros mudar
+INDEX_SCHEMA_VERSION = 1
+
+Fingerprint = Tuple[int, int, int]
+
+
+def stat_fingerprint(stat_result) -> Fingerprint:
+    """Impressão digital de um os.stat_result: (mtime_ns, size, inode)."""
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class ProjectIndex:
+    """Armazena registros FileInfo validados por impressão digital de stat."""
+
+    _LIST_FIELDS = ('dependencies', 'imports', 'exports', 'functions', 'classes')
+
+    def __init__(self, project_root: Path, db_path: Optional[Path] = None):
+        self.project_root = Path(project_root)
+        self.db_path = Path(db_path) if db_path else self.project_root / '.gemini_code' / 'project_index.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.last_load_time = 0.0
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_pool(self.db_path).connect()
+
+    def _init_database(self):
+        """Cria tabelas e descarta índices de versões incompatíveis."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                rel_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                content_hash TEXT,
+                language TEXT,
+                modified TEXT,
+                dependencies TEXT,
+                imports TEXT,
+                exports TEXT,
+                functions TEXT,
+                classes TEXT
+            )
+        """)
+
+        cursor.execute("SELECT value FROM index_meta WHERE key = 'schema_version'")
+        row = cursor.fetchone()
+        if row is None or int(row[0]) != INDEX_SCHEMA_VERSION:
+            cursor.execute("DELETE FROM files")
+            cursor.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('schema_version', ?)",
+                (str(INDEX_SCHEMA_VERSION),)
+            )
+
+        conn.commit()
+        conn.close()
+
+    def load(self) -> Dict[str, Tuple[Fingerprint, Any]]:
+        """Carrega o índice: rel_path -> (impressão digital, FileInfo)."""
+        from .project_manager import FileInfo
+
+        start = time.perf_counter()
+        entries = {}
+
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT rel_path, mtime_ns, size, inode, content_hash, language, modified,
+                       dependencies, imports, exports, functions, classes
+                FROM files
+            """).fetchall()
+        finally:
+            conn.close()
+
+        for row in rows:
+            rel_path, mtime_ns, size, inode, content_hash, language, modified = row[:7]
+            lists = [json.loads(value) if value else [] for value in row[7:]]
+            file_info = FileInfo(
+                path=self.project_root / rel_path,
+                size=size,
+                modified=datetime.fromisoformat(modified),
+                content_hash=content_hash or "",
+                language=language,
+                **dict(zip(self._LIST_FIELDS, lists))
+            )
+            entries[rel_path] = ((mtime_ns, size, inode), file_info)
+
+        self.last_load_time = time.perf_counter() - start
+        return entries
+
+    def apply_changes(self, upserts: Iterable[Tuple[str, Fingerprint, Any]], deletions: Iterable[str]):
+        """Grava alterações de um scan em uma única transação."""
+        rows = []
+        for rel_path, fingerprint, file_info in upserts:
+            rows.append((
+                rel_path,
+                *fingerprint,
+                file_info.content_hash,
+                file_info.language,
+                file_info.modified.isoformat(),
+                *[json.dumps(getattr(file_info, name)) for name in self._LIST_FIELDS]
+            ))
+        deleted = [(rel_path,) for rel_path in deletions]
+
+        if not rows and not deleted:
+            return
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO files
+                    (rel_path, mtime_ns, size, inode, content_hash, language, modified,
+                     dependencies, imports, exports, functions, classes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.executemany("DELETE FROM files WHERE rel_path = ?", deleted)
+        finally:
+            conn.close()
+
+    def clear(self):
+        """Remove todos os registros (força reindexação completa)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM files")
+        finally:
+            conn.close()
@@ -3,6 +3,7 @@ Sistema de gerenciamento de projetos
 """
 import os
 import json
+import time
 import hashlib
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple, Any
@@ -14,6 +15,8 @@ from collections import defaultdict
 
 from .config import ConfigManager
 from .gemini_client import GeminiClient
+from .project_index import ProjectIndex, stat_fingerprint
+from .search_index import TrigramIndex
 
 
 @dataclass
@@ -66,6 +69,9 @@ class ProjectManager:
         '.git', '__pycache__', 'node_modules', '.env', 'venv',
         '*.pyc', '*.pyo', '*.pyd', '.DS_Store', 'thumbs.db',
         '.vscode', '.idea', '*.log', '*.tmp', '.gemini_code/cache',
+        '.gemini_code/project_index.db*',
+        '.gemini_code/search_index.db*',
+        '.gemini_code/project_memory.json',
         'dist', 'build', '*.egg-info', '.pytest_cache', '.mypy_cache',
         'coverage', '.coverage', 'htmlcov', '.tox', '.nox'
     ]
@@ -121,11 +127,15 @@ class ProjectManager:
         self.config_manager = config_manager or ConfigManager(self.project_root)
         self.structure: Optional[ProjectStructure] = None
         self.file_cache: Dict[str, str] = {}
+        self._cache_fingerprints: Dict[str, Tuple[int, int, int]] = {}
         self.analysis_cache: Dict[str, Any] = {}
         self.ignore_patterns = self.DEFAULT_IGNORE_PATTERNS.copy()
         self._load_gitignore()
         self._memory_file = self.project_root / ".gemini_code" / "project_memory.json"
         self._load_memory()
+        self.index = ProjectIndex(self.project_root)
+        self.last_scan_stats: Dict[str, Any] = {}
+        self.search_index: Optional[TrigramIndex] = None
     
     def _load_gitignore(self):
         """Carrega padrões do .gitignore"""
@@ -157,14 +167,25 @@ class ProjectManager:
         
         return False
     
-    def scan_project(self, force: bool = False) -> ProjectStructure:
-        """Escaneia projeto completo"""
+    def scan_project(self, force: bool = False, use_index: bool = True) -> ProjectStructure:
+        """Escaneia projeto completo
+        
+        Com use_index, arquivos cuja impressão digital de stat (mtime_ns, size,
+        inode) não mudou são reaproveitados do índice persistente, sem releitura,
+        hash ou nova análise. Só os arquivos alterados são gravados de volta.
+        """
         if self.structure and not force:
             return self.structure
         
         print("🔍 Escaneando projeto...")
+        start_time = time.perf_counter()
         self.structure = ProjectStructure(root=self.project_root)
         
+        indexed = self.index.load() if use_index else {}
+        upserts = []
+        seen = set()
+        reused = 0
+        
         for root, dirs, files in os.walk(self.project_root):
             root_path = Path(root)
             
@@ -185,13 +206,48 @@ class ProjectManager:
                     continue
                 
                 try:
-                    file_info = self._analyze_file(file_path)
+                    relative_path = str(file_path.relative_to(self.project_root))
+                    fingerprint = stat_fingerprint(file_path.stat())
+                    
+                    cached = indexed.get(relative_path)
+                    if cached and cached[0] == fingerprint:
+                        file_info = cached[1]
+                        reused += 1
+                    else:
+                        # Conteúdo em cache só continua válido se esta análise o reler
+                        # (_analyze_file só relê arquivos de código)
+                        self.file_cache.pop(relative_path, None)
+                        self._cache_fingerprints.pop(relative_path, None)
+                        file_info = self._analyze_file(file_path)
+                        if file_info:
+                            upserts.append((relative_path, fingerprint, file_info))
+                            if relative_path in self.file_cache:
+                                self._cache_fingerprints[relative_path] = fingerprint
+                    
                     if file_info:
                         self.structure.add_file(file_info)
+                        seen.add(relative_path)
                 except Exception as e:
                     print(f"⚠️  Erro ao analisar {file_path}: {e}")
         
-        print(f"✅ Projeto escaneado: {self.structure.total_files} arquivos")
+        deletions = [path for path in indexed if path not in seen]
+        if use_index:
+            try:
+                self.index.apply_changes(upserts, deletions)
+            except Exception as e:
+                print(f"⚠️  Erro ao atualizar índice do projeto: {e}")
+        
+        self.last_scan_stats = {
+            'files': self.structure.total_files,
+            'reused': reused,
+            'analyzed': len(upserts),
+            'removed': len(deletions),
+            'index_load_time': self.index.last_load_time if use_index else 0.0,
+            'scan_time': time.perf_counter() - start_time,
+        }
+        
+        print(f"✅ Projeto escaneado: {self.structure.total_files} arquivos "
+              f"({len(upserts)} analisados, {reused} do índice)")
         self._save_memory()
         return self.structure
     
@@ -319,20 +375,22 @@ class ProjectManager:
         path = Path(file_path)
         relative_path = str(path.relative_to(self.project_root))
         
-        # Verifica cache
+        # Verifica cache (mudanças detectadas por stat, sem re-hash)
+        try:
+            fingerprint = stat_fingerprint(path.stat())
+        except OSError:
+            return None
+        
         if relative_path in self.file_cache:
-            # Verifica se arquivo mudou
-            if self.structure and relative_path in self.structure.files:
-                file_info = self.structure.files[relative_path]
-                current_hash = self._calculate_file_hash(path)
-                if current_hash == file_info.content_hash:
-                    return self.file_cache[relative_path]
+            if self._cache_fingerprints.get(relative_path) == fingerprint:
+                return self.file_cache[relative_path]
         
         # Lê arquivo
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
             self.file_cache[relative_path] = content
+            self._cache_fingerprints[relative_path] = fingerprint
             return content
         except Exception:
             return None
@@ -352,8 +410,17 @@ class ProjectManager:
         
         return sorted(matching_files)
     
-    def search_in_files(self, pattern: str, file_pattern: Optional[str] = None) -> Dict[str, List[Tuple[int, str]]]:
-        """Busca padrão em arquivos"""
+    def search_in_files(
+        self,
+        pattern: str,
+        file_pattern: Optional[str] = None,
+        use_index: bool = True
+    ) -> Dict[str, List[Tuple[int, str]]]:
+        """Busca padrão em arquivos
+        
+        Com use_index, o índice de trigramas (.gemini_code/search_index.db)
+        restringe os arquivos candidatos antes da verificação por regex.
+        """
         import re
         
         if not self.structure:
@@ -362,10 +429,18 @@ class ProjectManager:
         results = defaultdict(list)
         
         # Filtra arquivos
-        files_to_search = self.structure.files.keys()
+        files_to_search = list(self.structure.files.keys())
         if file_pattern:
             files_to_search = [f for f in files_to_search if fnmatch.fnmatch(f, file_pattern)]
         
+        if use_index:
+            if self.search_index is None:
+                self.search_index = TrigramIndex(self.project_root)
+            candidates = self.search_index.filter_files(
+                [self.project_root / f for f in files_to_search], pattern, regex=True
+            )
+            files_to_search = [str(path.relative_to(self.project_root)) for path in candidates]
+        
         # Busca em cada arquivo
         for file_path in files_to_search:
             content = self.get_file_content(file_path)
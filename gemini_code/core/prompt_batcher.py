@@ -0,0 +1,243 @@
+"""
+Agrupamento de prompts pequenos e independentes em uma única chamada ao modelo.
+
+Análises automáticas (segurança de comandos, erros de lógica, performance,
+código similar) mandam um prompt curto por item; em projetos grandes isso
+vira milhares de idas e voltas. O PromptBatcher junta os prompts que chegam
+dentro de uma janela curta em uma requisição estruturada (dentro de um
+orçamento de tokens), separa a resposta por tarefa e entrega a cada chamador
+só o seu pedaço. Itens que não vierem na resposta, ou que não passarem na
+validação do chamador, são refeitos individualmente.
+"""
+import asyncio
+import json
+import re
+import textwrap
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .rate_limiter import RequestPriority
+from .response_cache import ResponseCache
+from .telemetry import caller_subsystem
+
+
+_ANSWER = re.compile(r'<<<RESPOSTA (\d+)>>>\s*(.*?)\s*<<<FIM \1>>>', re.DOTALL)
+_JSON_LIST = re.compile(r'\[.*\]', re.DOTALL)
+
+
+def is_json_list(response: str) -> bool:
+    """Validação para prompts que pedem uma lista JSON (o formato das análises)."""
+    match = _JSON_LIST.search(response)
+    if not match:
+        return False
+    try:
+        return isinstance(json.loads(match.group()), list)
+    except ValueError:
+        return False
+
+
+@dataclass
+class _BatchItem:
+    """Prompt aguardando o próximo lote."""
+    prompt: str
+    tokens: int
+    future: Optional[asyncio.Future]
+    validate: Optional[Callable[[str], bool]] = None
+    cache_key: str = ''
+    subsystem: str = 'other'
+
+
+class PromptBatcher:
+    """
+    Junta prompts pequenos em lotes de até `max_items` itens e
+    `max_batch_tokens` tokens, enviados `window_ms` após o primeiro item
+    (ou antes, quando o lote enche).
+
+    submit() tem o mesmo contrato de GeminiClient.generate_response: devolve
+    o texto da resposta (ou a mensagem de erro "❌ ..."), então os chamadores
+    continuam interpretando a resposta como antes.
+    """
+
+    def __init__(self, client, window_ms: int = 50, max_batch_tokens: int = 16000,
+                 max_items: int = 16, priority: RequestPriority = RequestPriority.BACKGROUND,
+                 enabled: bool = True):
+        self.client = client
+        self.window = window_ms / 1000
+        self.max_batch_tokens = max_batch_tokens
+        self.max_items = max_items
+        self.priority = priority
+        self.enabled = enabled
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_BatchItem] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            'submitted': 0,
+            'batches': 0,
+            'batched_items': 0,
+            'direct': 0,        # enviados sozinhos (desativado, grandes demais ou lote de um)
+            'fallbacks': 0,     # itens refeitos individualmente após o lote
+            'failed_batches': 0,
+            'cache_hits': 0,
+        }
+
+    async def submit(self, prompt: str, validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Enfileira `prompt` no próximo lote e devolve a resposta deste item.
+
+        `validate(resposta)` indica se a resposta do item é utilizável (ex.:
+        contém o JSON esperado); se não for, o item é refeito sozinho.
+        """
+        self.stats['submitted'] += 1
+        subsystem = caller_subsystem()
+        if not self.enabled or self.client.model is None:
+            self.stats['direct'] += 1
+            return await self.client.generate_response(prompt, priority=self.priority, subsystem=subsystem)
+
+        text = textwrap.dedent(prompt).strip()
+        cache = self.client.response_cache
+        cache_key = ResponseCache.make_key(self.client.config.model.name, {'batch_item': True}, text)
+        if cache is not None:
+            # SQLite fora do event loop, como em GeminiClient.generate_response
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None and (validate is None or validate(cached)):
+                self.stats['cache_hits'] += 1
+                return cached
+
+        tokens = self.client.estimate_tokens(text)
+        if tokens > self.max_batch_tokens:
+            self.stats['direct'] += 1
+            return await self._run_single(_BatchItem(text, tokens, None, validate, cache_key, subsystem))
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Novo event loop (ex.: outro asyncio.run): o que ficou pendente não tem mais dono
+            self._loop, self._pending, self._pending_tokens, self._timer = loop, [], 0, None
+
+        item = _BatchItem(text, tokens, loop.create_future(), validate, cache_key, subsystem)
+        if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+            self.flush()
+        self._pending.append(item)
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_items:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await item.future
+
+    def flush(self):
+        """Envia agora o lote pendente."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending, self._pending_tokens = self._pending, [], 0
+        if items:
+            task = self._loop.create_task(self._run_batch(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: List[_BatchItem]):
+        try:
+            if len(items) == 1:
+                self.stats['direct'] += 1
+                self._resolve(items[0], await self._run_single(items[0]))
+                return
+
+            self.stats['batches'] += 1
+            self.stats['batched_items'] += len(items)
+            subsystems = {item.subsystem for item in items}
+            response = await self.client.generate_response(
+                self.build_prompt(items), priority=self.priority,
+                subsystem=subsystems.pop() if len(subsystems) == 1 else 'batch'
+            )
+            if response.startswith("❌"):
+                # Erro da chamada (já retentada pelo rate limiter): mesmo resultado de chamadas avulsas
+                self.stats['failed_batches'] += 1
+                for item in items:
+                    self._resolve(item, response)
+                return
+
+            answers = self.split_response(response)
+            retry = []
+            answered = []
+            for index, item in enumerate(items, 1):
+                answer = answers.get(index)
+                if answer is None or (item.validate is not None and not item.validate(answer)):
+                    retry.append(item)
+                    continue
+                answered.append((item, answer))
+            # Grava antes de entregar: quem repetir o prompt logo depois já acha no cache
+            await self._store(answered)
+            for item, answer in answered:
+                self._resolve(item, answer)
+
+            # Falha de um item não derruba os outros: só ele é refeito sozinho
+            self.stats['fallbacks'] += len(retry)
+            results = await asyncio.gather(*(self._run_single(item) for item in retry))
+            for item, result in zip(retry, results):
+                self._resolve(item, result)
+        except Exception as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    async def _run_single(self, item: _BatchItem) -> str:
+        response = await self.client.generate_response(
+            item.prompt, priority=self.priority, subsystem=item.subsystem
+        )
+        if not response.startswith("❌") and (item.validate is None or item.validate(response)):
+            await self._store([(item, response)])
+        return response
+
+    async def _store(self, answered: List[Tuple[_BatchItem, str]]):
+        """Grava as respostas no cache numa thread (SQLite fora do event loop)."""
+        cache = self.client.response_cache
+        answered = [(item, answer) for item, answer in answered if answer]
+        if cache is None or not answered:
+            return
+        model = self.client.config.model.name
+
+        def write():
+            for item, answer in answered:
+                cache.set(item.cache_key, answer, model=model)
+
+        await asyncio.to_thread(write)
+
+    @staticmethod
+    def _resolve(item: _BatchItem, result: str):
+        if not item.future.done():  # o chamador pode ter desistido
+            item.future.set_result(result)
+
+    @staticmethod
+    def build_prompt(items: List[_BatchItem]) -> str:
+        """Prompt estruturado com uma seção numerada por tarefa."""
+        parts = [
+            f"Responda às {len(items)} tarefas INDEPENDENTES abaixo.",
+            "Cada resposta deve seguir exatamente as instruções da própria tarefa, "
+            "sem mencionar as outras.",
+            "Formato obrigatório, uma seção por tarefa e na mesma ordem:",
+            "<<<RESPOSTA 1>>>",
+            "(resposta da tarefa 1)",
+            "<<<FIM 1>>>",
+        ]
+        for index, item in enumerate(items, 1):
+            parts.append(f"\n=== TAREFA {index} ===\n{item.prompt}")
+        return "\n".join(parts)
+
+    @staticmethod
+    def split_response(response: str) -> Dict[int, str]:
+        """Resposta de cada tarefa, por número; seções truncadas ou ausentes ficam de fora."""
+        answers: Dict[int, str] = {}
+        for match in _ANSWER.finditer(response):
+            answers.setdefault(int(match.group(1)), match.group(2))
+        return answers
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e chamadas economizadas."""
+        return {
+            **self.stats,
+            'pending': len(self._pending),
+            'calls_saved': self.stats['batched_items'] - self.stats['batches'] - self.stats['fallbacks'],
+        }
@@ -0,0 +1,301 @@
+"""
+Limitador de taxa do lado do cliente para chamadas ao modelo.
+
+Combina dois token buckets (requisições/minuto e tokens/minuto), uma fila
+com prioridades (interativo antes de background), backoff exponencial com
+jitter para erros de cota (429) e concorrência adaptativa baseada na
+latência e na taxa de erros observadas.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+
+class RequestPriority(IntEnum):
+    """Classes de prioridade: valores menores são atendidos primeiro."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+# Sem 'quota' solto: erros permanentes (400/403 de faturamento, "quota not
+# configured") citam cota mas não melhoram com nova tentativa
+_QUOTA_MARKERS = ('resource exhausted', 'resource has been exhausted', 'resource_exhausted',
+                  'rate limit', 'too many requests')
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE),
+    re.compile(r'retry (?:after|in)\s*(\d+(?:\.\d+)?)\s*s', re.IGNORECASE),
+]
+# "429" só conta como status HTTP: no início da mensagem ("429 Resource has been
+# exhausted") ou logo após "HTTP"/"status"/"code"/"error" -- nunca portas, ids ou tamanhos.
+_QUOTA_STATUS_PATTERN = re.compile(r'^\s*429\b|\b(?:http|status|code|error)\W{0,3}429\b', re.IGNORECASE)
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """Indica se a exceção representa limite de cota/taxa do servidor."""
+    if getattr(error, 'code', None) == 429 or getattr(error, 'status_code', None) == 429:
+        return True
+    name = type(error).__name__
+    if name in ('ResourceExhausted', 'TooManyRequests'):
+        return True
+    message = str(error).lower()
+    if _QUOTA_STATUS_PATTERN.search(message):
+        return True
+    return any(marker in message for marker in _QUOTA_MARKERS)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Extrai o atraso sugerido pelo servidor, se houver."""
+    message = str(error)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Token bucket com reposição contínua."""
+
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até haver `amount` tokens disponíveis (0 se já há)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Limitador compartilhado por todas as chamadas ao modelo.
+
+    Uso típico:
+        result = await limiter.run(lambda: chamada(), estimated_tokens=1200,
+                                   priority=RequestPriority.BACKGROUND)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 1_000_000,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        target_latency: float = 20.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0, clock)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0, clock)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self._clock = clock
+
+        self._in_flight = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop = None
+
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.stats = {
+            'requests': 0,
+            'completed': 0,
+            'rate_limited': 0,
+            'errors': 0,
+            'retries': 0,
+            'gave_up': 0,
+            'queued_time': 0.0,
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            # Primitivas asyncio pertencem a um event loop; estado de um loop
+            # anterior (já encerrado) não vale mais.
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._waiters = []
+            self._in_flight = 0
+        return self._condition
+
+    def _wait_time(self, estimated_tokens: float) -> float:
+        return max(
+            self._blocked_until - self._clock(),
+            self.request_bucket.wait_time(1),
+            self.token_bucket.wait_time(estimated_tokens),
+            0.0
+        )
+
+    async def acquire(self, estimated_tokens: float = 0, priority: RequestPriority = RequestPriority.NORMAL):
+        """Aguarda vez na fila, vaga de concorrência e orçamento de taxa."""
+        condition = self._get_condition()
+        entry = (int(priority), next(self._sequence))
+        queued_at = self._clock()
+
+        async with condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry and self._in_flight < int(self.concurrency_limit):
+                        timeout = self._wait_time(estimated_tokens)
+                        if timeout <= 0:
+                            heapq.heappop(self._waiters)
+                            self.request_bucket.consume(1)
+                            self.token_bucket.consume(estimated_tokens)
+                            self._in_flight += 1
+                            self.stats['requests'] += 1
+                            self.stats['queued_time'] += self._clock() - queued_at
+                            condition.notify_all()
+                            return
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    condition.notify_all()
+                raise
+
+    async def release(
+        self,
+        latency: Optional[float] = None,
+        rate_limited: bool = False,
+        error: bool = False,
+        cancelled: bool = False
+    ):
+        """Libera a vaga e ajusta a concorrência com base no resultado.
+
+        A vaga é devolvida antes de qualquer `await`, então um cancelamento
+        durante a liberação não a perde. Chamadas canceladas não ajustam a
+        concorrência: não dizem nada sobre a saúde do servidor.
+        """
+        condition = self._get_condition()
+        self._in_flight = max(0, self._in_flight - 1)
+        if not cancelled:
+            self._adapt(latency, rate_limited, error)
+        # Blindado: quem espera vaga precisa ser acordado mesmo se quem libera for cancelado
+        await asyncio.shield(self._notify_waiters(condition))
+
+    @staticmethod
+    async def _notify_waiters(condition: asyncio.Condition):
+        async with condition:
+            condition.notify_all()
+
+    def _adapt(self, latency: Optional[float], rate_limited: bool, error: bool):
+        failed = rate_limited or error
+        self.error_rate = 0.9 * self.error_rate + (0.1 if failed else 0.0)
+
+        if rate_limited:
+            # Diminuição multiplicativa e pausa global curta
+            self.stats['rate_limited'] += 1
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+            self._blocked_until = max(self._blocked_until, self._clock() + self.base_delay)
+            return
+
+        if error:
+            self.stats['errors'] += 1
+            if self.error_rate > 0.2:
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit - 1)
+            return
+
+        self.stats['completed'] += 1
+        if latency is not None:
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+        if self.latency_ewma is not None and self.latency_ewma > 2 * self.target_latency:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * 0.9)
+        elif self.error_rate < 0.1:
+            # Aumento aditivo: ~+1 a cada "janela" de requisições bem-sucedidas
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+
+    def backoff_delay(self, attempt: int, suggested: Optional[float] = None) -> float:
+        """Backoff exponencial com jitter total (respeita atraso sugerido)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if suggested is not None:
+            delay = max(delay, min(suggested, self.max_delay))
+        return delay
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: float = 0,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        max_retries: Optional[int] = None
+    ) -> T:
+        """Executa `call` respeitando limites e refazendo em erros de cota."""
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            await self.acquire(estimated_tokens, priority)
+            start = self._clock()
+            try:
+                result = await call()
+            except Exception as e:
+                latency = self._clock() - start
+                if not is_quota_error(e):
+                    await self.release(latency, error=True)
+                    raise
+                await self.release(latency, rate_limited=True)
+                if attempt >= retries:
+                    self.stats['gave_up'] += 1
+                    raise
+                delay = self.backoff_delay(attempt, retry_after(e))
+                attempt += 1
+                self.stats['retries'] += 1
+                print(f"⏳ Limite de taxa atingido, nova tentativa {attempt}/{retries} em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelamento (timeout do chamador, SingleFlight, ChunkExecutor.cancel())
+                # ou interrupção: a vaga precisa voltar, senão o limitador trava de vez.
+                await self.release(cancelled=True)
+                raise
+            await self.release(self._clock() - start)
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado atual e contadores do limitador."""
+        return {
+            **self.stats,
+            'in_flight': self._in_flight,
+            'queued': len(self._waiters),
+            'concurrency_limit': round(self.concurrency_limit, 2),
+            'latency_ewma': self.latency_ewma,
+            'error_rate': round(self.error_rate, 3),
+        }
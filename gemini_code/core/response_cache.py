@@ -0,0 +1,168 @@
+"""
+Cache de respostas do modelo endereçado por conteúdo.
+
+A chave combina nome do modelo, configuração de geração e o prompt completo já
+construído; prompts idênticos (ex.: /doctor repetido, reanálise de arquivos
+inalterados, checagens de segurança do mesmo comando) são respondidos do disco
+sem nova chamada ao modelo.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .sqlite_pool import get_pool
+
+
+class ResponseCache:
+    """Cache persistente em SQLite com TTL e limites de tamanho (LRU)."""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        ttl_seconds: int = 6 * 3600,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_pool(self.db_path).connect()
+
+    def _init_database(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def make_key(model: str, generation_config: Dict[str, Any], prompt: str) -> str:
+        """Chave determinística para (modelo, configuração, prompt)."""
+        payload = json.dumps(
+            {'model': model, 'config': generation_config, 'prompt': prompt},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna a resposta armazenada ou None (ausente/expirada)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        conn.commit()
+                    self.misses += 1
+                    return None
+
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            finally:
+                conn.close()
+
+    def set(self, key: str, response: str, model: str = "") -> None:
+        """Armazena uma resposta e aplica os limites de tamanho."""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        INSERT OR REPLACE INTO responses
+                        (key, model, response, size, created_at, last_access)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (key, model, response, size, now, now))
+                    self._enforce_bounds(conn, now)
+                self.stores += 1
+            finally:
+                conn.close()
+
+    def _enforce_bounds(self, conn: sqlite3.Connection, now: float):
+        """Remove expirados e, se preciso, os menos usados recentemente."""
+        expired = conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        to_delete = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    def clear(self) -> None:
+        """Remove todas as respostas armazenadas."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM responses")
+            finally:
+                conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de uso do cache."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                entries, total = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            finally:
+                conn.close()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': total,
+        }
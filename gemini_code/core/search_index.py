@@ -0,0 +1,380 @@
+"""
+Índice de trigramas persistente para busca textual.
+
+Reduz o conjunto de arquivos candidatos antes da verificação por regex feita
+por GrepTool e ProjectManager.search_in_files. O índice é sempre conservador:
+um arquivo só é descartado quando é impossível que contenha o padrão, então o
+resultado final é idêntico ao da busca força-bruta.
+"""
+import os
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from .project_index import stat_fingerprint
+from .sqlite_pool import get_pool
+
+
+# Equivalências que re.IGNORECASE aceita mas str.lower() não produz
+_CASE_FOLD = str.maketrans({'ſ': 's', 'K': 'k', 'İ': 'i', 'ı': 'i'})
+
+# Limite de alternativas ao expandir regex com "|" aninhados
+_MAX_ALTERNATIVES = 64
+
+_REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, 'POSSESSIVE_REPEAT'):
+    _REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+
+
+def _normalize(text: str) -> str:
+    """Normalização usada tanto na indexação quanto nas consultas."""
+    return text.translate(_CASE_FOLD).lower()
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    """Conjunto de trigramas (normalizados) de um texto."""
+    text = _normalize(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _literal_query(parsed) -> Optional[List[List[str]]]:
+    """Extrai literais obrigatórios de uma regex parseada.
+
+    Retorna uma forma normal disjuntiva: lista de alternativas, cada uma com
+    os literais que precisam aparecer no texto. None significa que a regex não
+    impõe nenhum literal útil (todos os arquivos são candidatos).
+    """
+    alternatives: List[List[str]] = [[]]
+    run: List[str] = []
+
+    def flush():
+        if run:
+            literal = ''.join(run)
+            for alternative in alternatives:
+                alternative.append(literal)
+            run.clear()
+
+    def combine(sub_alternatives):
+        nonlocal alternatives
+        if sub_alternatives is None:
+            return
+        combined = [a + b for a in alternatives for b in sub_alternatives]
+        if len(combined) <= _MAX_ALTERNATIVES:
+            alternatives = combined
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL and av < 128:
+            run.append(chr(av))
+            continue
+
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            combine(_literal_query(av[-1]))
+        elif op is sre_constants.BRANCH:
+            branches = [_literal_query(branch) for branch in av[1]]
+            if all(branch is not None for branch in branches):
+                combine([alt for branch in branches for alt in branch])
+        elif op in _REPEAT_OPS and av[0] >= 1:
+            combine(_literal_query(av[2]))
+
+    flush()
+
+    if all(not any(len(literal) >= 3 for literal in alt) for alt in alternatives):
+        return None
+    return alternatives
+
+
+def required_literals(pattern: str, case_sensitive: bool = False) -> Optional[List[List[str]]]:
+    """Literais que um texto precisa conter para casar com a regex.
+
+    Mesmo formato de _literal_query (alternativas de literais obrigatórios);
+    None quando a regex é inválida ou não impõe literais úteis.
+    """
+    flags = 0 if case_sensitive else sre_constants.SRE_FLAG_IGNORECASE
+    try:
+        return _literal_query(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+
+
+class TrigramIndex:
+    """Índice invertido trigrama -> arquivos, persistido em SQLite.
+
+    Os conjuntos de trigramas de cada arquivo ficam em disco; as listas de
+    postings são reconstruídas em memória no carregamento. Arquivos alterados
+    recebem um novo id e o antigo vira "tombstone" até a próxima compactação.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        db_path: Optional[Union[str, Path]] = None,
+        max_file_size: int = 10 * 1024 * 1024
+    ):
+        self.root = Path(root).resolve()
+        self.db_path = Path(db_path) if db_path else self.root / '.gemini_code' / 'search_index.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_file_size = max_file_size
+        self._own_files_prefix = str(self.db_path.resolve())
+
+        self._postings: Dict[str, array] = {}
+        self._paths: Dict[int, str] = {}
+        self._by_path: Dict[str, Tuple[int, Tuple[int, int, int]]] = {}
+        self._unindexed: Set[int] = set()
+        self._tombstones: Set[int] = set()
+        self.stats = {
+            'load_time': 0.0,
+            'files_indexed': 0,
+            'files_removed': 0,
+            'queries': 0,
+            'candidates_returned': 0,
+        }
+
+        self._init_database()
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_pool(self.db_path).connect()
+
+    def _init_database(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS indexed_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT UNIQUE NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                trigrams BLOB
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Carrega o índice do disco e reconstrói as listas de postings."""
+        start = time.perf_counter()
+        self._postings.clear()
+        self._paths.clear()
+        self._by_path.clear()
+        self._unindexed.clear()
+        self._tombstones.clear()
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT id, path, mtime_ns, size, inode, trigrams FROM indexed_files ORDER BY id"
+            )
+            for file_id, path, mtime_ns, size, inode, trigrams in cursor:
+                if trigrams is not None:
+                    trigrams = trigrams.decode('utf-8')
+                self._register(file_id, path, (mtime_ns, size, inode), trigrams)
+        finally:
+            conn.close()
+
+        self.stats['load_time'] = time.perf_counter() - start
+
+    def _register(self, file_id: int, path: str, fingerprint, trigrams: Optional[str]):
+        self._paths[file_id] = path
+        self._by_path[path] = (file_id, fingerprint)
+        if trigrams is None:
+            self._unindexed.add(file_id)
+            return
+        postings = self._postings
+        for i in range(0, len(trigrams), 3):
+            trigram = trigrams[i:i + 3]
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = array('I', (file_id,))
+            else:
+                posting.append(file_id)
+
+    def _read_trigrams(self, path: str, size: int) -> Optional[str]:
+        if size > self.max_file_size:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return None
+        return ''.join(sorted(extract_trigrams(content)))
+
+    def refresh(self, files: Iterable[Union[str, Path]], prune_missing: bool = False) -> Dict[str, int]:
+        """Atualiza o índice para os arquivos informados.
+
+        Só arquivos novos ou cuja impressão digital de stat mudou são relidos.
+        Com prune_missing, arquivos indexados sob a raiz que não estão em
+        `files` são removidos.
+        """
+        seen = set()
+        changed = []
+        for file_path in files:
+            path = os.path.abspath(file_path)
+            seen.add(path)
+            if path.startswith(self._own_files_prefix):
+                continue
+            try:
+                fingerprint = stat_fingerprint(os.stat(path))
+            except OSError:
+                continue
+            current = self._by_path.get(path)
+            if current is None or current[1] != fingerprint:
+                changed.append((path, fingerprint))
+
+        removed = []
+        if prune_missing:
+            root = str(self.root)
+            removed = [
+                path for path in self._by_path
+                if path not in seen and path.startswith(root)
+            ]
+
+        if changed or removed:
+            self._apply(changed, removed)
+
+        return {'updated': len(changed), 'removed': len(removed)}
+
+    def update_file(self, file_path: Union[str, Path]):
+        """Reindexa um único arquivo (ex.: evento de watcher)."""
+        self.refresh([file_path])
+
+    def remove_file(self, file_path: Union[str, Path]):
+        """Remove um arquivo do índice (ex.: arquivo apagado)."""
+        path = os.path.abspath(file_path)
+        if path in self._by_path:
+            self._apply([], [path])
+
+    def _apply(self, changed: List[Tuple[str, Tuple[int, int, int]]], removed: List[str]):
+        conn = self._connect()
+        try:
+            with conn:
+                for path in removed:
+                    file_id, _ = self._by_path.pop(path)
+                    self._retire(file_id)
+                    conn.execute("DELETE FROM indexed_files WHERE id = ?", (file_id,))
+
+                for path, fingerprint in changed:
+                    previous = self._by_path.pop(path, None)
+                    if previous is not None:
+                        self._retire(previous[0])
+                        conn.execute("DELETE FROM indexed_files WHERE id = ?", (previous[0],))
+
+                    trigrams = self._read_trigrams(path, fingerprint[1])
+                    # BLOB preserva trigramas com NUL vindos de arquivos binários
+                    blob = trigrams.encode('utf-8') if trigrams is not None else None
+                    cursor = conn.execute(
+                        "INSERT INTO indexed_files (path, mtime_ns, size, inode, trigrams) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (path, *fingerprint, blob)
+                    )
+                    self._register(cursor.lastrowid, path, fingerprint, trigrams)
+        finally:
+            conn.close()
+
+        self.stats['files_indexed'] += len(changed)
+        self.stats['files_removed'] += len(removed)
+
+        if len(self._tombstones) > max(1000, len(self._paths) // 4):
+            self._load()
+
+    def _retire(self, file_id: int):
+        self._paths.pop(file_id, None)
+        self._unindexed.discard(file_id)
+        self._tombstones.add(file_id)
+
+    def _ids_for_literals(self, literals: List[str]) -> Optional[Set[int]]:
+        trigrams = set()
+        for literal in literals:
+            trigrams |= extract_trigrams(literal)
+        if not trigrams:
+            return None
+
+        postings = []
+        for trigram in trigrams:
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            if not ids:
+                break
+            ids.intersection_update(posting)
+        return ids
+
+    def candidate_paths(
+        self,
+        pattern: str,
+        regex: bool = True,
+        case_sensitive: bool = False
+    ) -> Optional[Set[str]]:
+        """Arquivos que podem conter o padrão.
+
+        Retorna None quando o índice não consegue restringir a busca (o
+        chamador deve então considerar todos os arquivos).
+        """
+        if regex:
+            query = required_literals(pattern, case_sensitive)
+        else:
+            query = [[pattern]]
+
+        if query is None:
+            return None
+
+        ids: Set[int] = set()
+        for literals in query:
+            alternative_ids = self._ids_for_literals(literals)
+            if alternative_ids is None:
+                return None
+            ids |= alternative_ids
+
+        ids -= self._tombstones
+        ids |= self._unindexed
+
+        paths = {self._paths[file_id] for file_id in ids if file_id in self._paths}
+        self.stats['queries'] += 1
+        self.stats['candidates_returned'] += len(paths)
+        return paths
+
+    def filter_files(
+        self,
+        files: List[Path],
+        pattern: str,
+        regex: bool = True,
+        case_sensitive: bool = False
+    ) -> List[Path]:
+        """Atualiza o índice para `files` e mantém apenas os candidatos.
+
+        Arquivos que não puderam ser indexados continuam sendo candidatos.
+        """
+        self.refresh(files)
+        candidates = self.candidate_paths(pattern, regex=regex, case_sensitive=case_sensitive)
+        if candidates is None:
+            return files
+
+        filtered = []
+        for file_path in files:
+            path = os.path.abspath(file_path)
+            if path in candidates or path not in self._by_path:
+                filtered.append(file_path)
+        return filtered
+
+    def get_stats(self) -> Dict[str, float]:
+        """Estatísticas do índice."""
+        return {
+            **self.stats,
+            'files': len(self._paths),
+            'trigrams': len(self._postings),
+            'tombstones': len(self._tombstones),
+        }
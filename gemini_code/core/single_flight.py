@@ -0,0 +1,93 @@
+"""
+Coalescência de requisições idênticas em andamento (single-flight).
+
+Quando várias corrotinas pedem a mesma coisa ao mesmo tempo (mesmo prompt,
+mesmo modelo, mesma configuração), só a primeira chega ao modelo; as demais
+aguardam a mesma chamada e recebem o mesmo resultado ou a mesma exceção.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+T = TypeVar('T')
+
+
+@dataclass
+class _Call:
+    """Chamada compartilhada e quantos chamadores ainda a aguardam."""
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Executa no máximo uma chamada por chave ao mesmo tempo.
+
+    Cancelar um chamador não cancela a chamada compartilhada enquanto outros
+    ainda aguardam; ela só é cancelada quando o último chamador desiste.
+    A chave sai do mapa assim que a chamada termina, então o resultado não
+    fica guardado (para isso existe o ResponseCache).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {
+            'calls': 0,
+            'executed': 0,
+            'coalesced': 0,      # chamadas economizadas
+            'saved_tokens': 0,   # tokens de entrada que não foram reenviados
+            'errors': 0,
+            'cancelled': 0,
+        }
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        call = self._calls.get(key)
+        return call is not None and not call.task.done()
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]], weight: int = 0) -> T:
+        """
+        Executa `factory()` ou se junta à chamada em andamento com a mesma chave.
+
+        `weight` (ex.: tokens estimados) é somado a saved_tokens quando a
+        chamada é compartilhada.
+        """
+        loop = asyncio.get_running_loop()
+        self.stats['calls'] += 1
+
+        call = self._calls.get(key)
+        if call is None or call.task.done() or call.task.get_loop() is not loop:
+            call = _Call(loop.create_task(self._run(factory)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+            self.stats['executed'] += 1
+        else:
+            self.stats['coalesced'] += 1
+            self.stats['saved_tokens'] += weight
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Ninguém mais espera o resultado: não vale a pena continuar pagando por ele
+                call.task.cancel()
+                self.stats['cancelled'] += 1
+
+    async def _run(self, factory: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await factory()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e número de chamadas em andamento."""
+        return {**self.stats, 'in_flight': sum(1 for c in self._calls.values() if not c.task.done())}
@@ -0,0 +1,224 @@
+"""
+Pool de conexões SQLite compartilhado por todos os stores.
+
+Cada store continuava abrindo um `sqlite3.connect` por chamada, com o journal
+padrão (rollback), então leitores e escritores se bloqueavam. O pool mantém
+conexões abertas por thread, em modo WAL e com pragmas ajustados, e o
+`close()` delas apenas devolve a conexão ao pool. Assim, trocar
+`sqlite3.connect(path)` por `get_pool(path).connect()` basta para adotar o pool.
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',         # leitores não esperam escritores
+    'synchronous': 'NORMAL',       # seguro com WAL e bem mais rápido que FULL
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,          # ~16 MB por conexão
+    'busy_timeout': 5000,          # ms esperando lock antes de 'database is locked'
+}
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexão sqlite3 que volta para o pool ao ser fechada.
+
+    É uma sqlite3.Connection de verdade (isinstance, `with conn:` e pandas
+    continuam funcionando); só `close()` muda de comportamento.
+    """
+
+    _pool: Optional['SQLitePool'] = None
+    _file_id: Optional[Tuple[int, int]] = None
+    _checked_out: bool = False
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+        elif self._checked_out:
+            pool._release(self)
+
+    def _close(self):
+        """Fecha de fato a conexão."""
+        self._pool = None
+        super().close()
+
+
+class SQLitePool:
+    """
+    Pool de conexões com afinidade de thread para um arquivo SQLite.
+
+    Cada thread reutiliza as próprias conexões ociosas (até `max_idle_per_thread`);
+    chamadas aninhadas na mesma thread recebem conexões distintas, então o
+    close() de uma não afeta a transação da outra.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_idle_per_thread: int = 4,
+                 pragmas: Optional[Dict[str, Any]] = None, cached_statements: int = 256,
+                 timeout: float = 30.0):
+        self.db_path = str(db_path)
+        self.max_idle_per_thread = max_idle_per_thread
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.cached_statements = cached_statements  # cache de prepared statements do sqlite3
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: 'weakref.WeakSet[PooledConnection]' = weakref.WeakSet()
+        self.stats = {'created': 0, 'reused': 0, 'released': 0, 'discarded': 0}
+
+    def connect(self) -> PooledConnection:
+        """Empresta uma conexão; devolva com close()."""
+        idle = self._idle()
+        file_id = self._file_id()
+
+        while idle:
+            conn = idle.pop()
+            if file_id is not None and conn._file_id == file_id:
+                conn._checked_out = True
+                self.stats['reused'] += 1
+                return conn
+            # Arquivo removido/recriado: a conexão aponta para o arquivo antigo
+            self._discard(conn)
+
+        conn = self._create()
+        conn._checked_out = True
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Conexão em bloco `with`: commit ao sair, rollback em exceção."""
+        conn = self.connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def execute(self, sql: str, parameters: Union[tuple, dict] = ()) -> List[tuple]:
+        """Executa uma instrução (com commit) e retorna todas as linhas."""
+        with self.connection() as conn:
+            return conn.execute(sql, parameters).fetchall()
+
+    def checkpoint(self, mode: str = 'TRUNCATE'):
+        """Copia o conteúdo do WAL para o arquivo principal (ex.: antes de um backup)."""
+        conn = self.connect()
+        try:
+            conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchall()
+        finally:
+            conn.close()
+
+    def close_all(self):
+        """Fecha todas as conexões do pool (ex.: antes de apagar o arquivo)."""
+        with self._lock:
+            connections = list(self._all)
+            self._all = weakref.WeakSet()
+        for conn in connections:
+            try:
+                conn._close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_connections = len(self._all)
+        return dict(self.stats, open=open_connections, idle_in_thread=len(self._idle()))
+
+    def _create(self) -> PooledConnection:
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            factory=PooledConnection,
+            cached_statements=self.cached_statements,
+            # A afinidade de thread é garantida pelo pool; isso só permite close_all()
+            check_same_thread=False,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+
+        conn._pool = self
+        conn._file_id = self._file_id()
+        with self._lock:
+            self._all.add(conn)
+        self.stats['created'] += 1
+        return conn
+
+    def _release(self, conn: PooledConnection):
+        conn._checked_out = False
+        try:
+            # Mesmo efeito do close() original: transação não confirmada é descartada
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            conn.text_factory = str
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        idle = self._idle()
+        if len(idle) < self.max_idle_per_thread:
+            idle.append(conn)
+            self.stats['released'] += 1
+        else:
+            self._discard(conn)
+
+    def _discard(self, conn: PooledConnection):
+        with self._lock:
+            self._all.discard(conn)
+        self.stats['discarded'] += 1
+        try:
+            conn._close()
+        except sqlite3.Error:
+            pass
+
+    def _idle(self) -> List[PooledConnection]:
+        idle = getattr(self._local, 'idle', None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def _file_id(self) -> Optional[Tuple[int, int]]:
+        if self.db_path == ':memory:':
+            return (0, 0)
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+
+# Pools globais por arquivo
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Union[str, Path], **options) -> SQLitePool:
+    """Obtém o pool do arquivo (um por caminho absoluto)."""
+    key = str(db_path) if str(db_path) == ':memory:' else os.path.abspath(str(db_path))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = SQLitePool(db_path, **options)
+    return pool
+
+
+def close_all_pools():
+    """Fecha as conexões de todos os pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
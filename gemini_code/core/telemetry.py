@@ -0,0 +1,238 @@
+"""
+Telemetria por chamada ao modelo: histogramas de latência, tokens e custo.
+
+Cada chamada é registrada por subsistema chamador (ex.: analysis.error_detector)
+e por modelo, em histogramas de memória limitada (baldes logarítmicos), então
+p50/p95/p99 ficam disponíveis sem guardar as amostras. Os totais alimentam o
+/cost e podem ser exportados para um arquivo JSON.
+"""
+import json
+import math
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+
+# USD por 1M tokens (entrada, saída) — estimativas de tabela pública;
+# ajuste em config.model.pricing. O prefixo mais longo que casar vale.
+DEFAULT_PRICING: Dict[str, Tuple[float, float]] = {
+    'gemini-2.5-pro': (1.25, 10.00),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-1.5-flash': (0.075, 0.30),
+}
+FALLBACK_PRICING = (0.25, 1.00)
+
+METRICS = ('queue_wait', 'ttft', 'latency', 'prompt_tokens', 'output_tokens', 'cost')
+
+# Módulos que só repassam a chamada; o subsistema é quem está acima deles
+_PASS_THROUGH = (
+    'gemini_code.core.gemini_client', 'gemini_code.core.prompt_batcher',
+    'gemini_code.core.single_flight', 'gemini_code.core.telemetry',
+)
+
+
+def caller_subsystem(default: str = 'other') -> str:
+    """Primeiro módulo do gemini_code na pilha que não seja do caminho da chamada."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('gemini_code.') and not module.startswith(_PASS_THROUGH):
+            return module[len('gemini_code.'):]
+        frame = frame.f_back
+    return default
+
+
+class Histogram:
+    """
+    Histograma com baldes logarítmicos (erro relativo ~growth/2 nos percentis).
+
+    Memória limitada: valores entre `min_value` e `min_value * growth**max_buckets`
+    caem em no máximo `max_buckets` baldes; zero e negativos têm balde próprio.
+    """
+
+    def __init__(self, min_value: float = 1e-3, growth: float = 1.05, max_buckets: int = 600):
+        self.min_value = min_value
+        self.growth = growth
+        self.max_buckets = max_buckets
+        self._log_growth = math.log(growth)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0:
+            index = -1
+        else:
+            index = int(math.log(max(value, self.min_value) / self.min_value) / self._log_growth)
+            index = min(index, self.max_buckets - 1)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Valor no percentil q (0..100), ou None sem amostras."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index < 0:
+                    return min(0.0, self.max)
+                if index == self.max_buckets - 1:
+                    return self.max  # balde de estouro: sem limite superior conhecido
+                # Ponto médio geométrico do balde, dentro do intervalo observado
+                value = self.min_value * self.growth ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+@dataclass
+class _Series:
+    """Histogramas e contadores de um par (subsistema, modelo)."""
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    histograms: Dict[str, Histogram] = field(default_factory=lambda: {
+        'queue_wait': Histogram(),
+        'ttft': Histogram(),
+        'latency': Histogram(),
+        'prompt_tokens': Histogram(min_value=1, growth=1.1, max_buckets=200),
+        'output_tokens': Histogram(min_value=1, growth=1.1, max_buckets=200),
+        'cost': Histogram(min_value=1e-7, growth=1.1, max_buckets=300),
+    })
+
+
+class ModelTelemetry:
+    """
+    Registro das chamadas ao modelo, agregado por subsistema e modelo.
+
+    telemetry.record('analysis.error_detector', 'gemini-2.5-flash',
+                     queue_wait=0.2, latency=1.4, prompt_tokens=900, output_tokens=120)
+    """
+
+    def __init__(self, pricing: Optional[Dict[str, Iterable[float]]] = None):
+        self.pricing = {**DEFAULT_PRICING, **{k: tuple(v) for k, v in (pricing or {}).items()}}
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def price(self, model: str) -> Tuple[float, float]:
+        """Preço (entrada, saída) em USD por 1M tokens."""
+        matches = [prefix for prefix in self.pricing if model.startswith(prefix)]
+        return self.pricing[max(matches, key=len)] if matches else FALLBACK_PRICING
+
+    def cost(self, model: str, prompt_tokens: int, output_tokens: int) -> float:
+        input_price, output_price = self.price(model)
+        return (prompt_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def _get_series(self, subsystem: str, model: str) -> _Series:
+        key = (subsystem, model)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def record(self, subsystem: str, model: str, latency: float, queue_wait: float = 0.0,
+               ttft: Optional[float] = None, prompt_tokens: int = 0, output_tokens: int = 0,
+               error: bool = False) -> float:
+        """Registra uma chamada ao modelo e devolve o custo calculado."""
+        cost = 0.0 if error else self.cost(model, prompt_tokens, output_tokens)
+        with self._lock:
+            series = self._get_series(subsystem, model)
+            series.calls += 1
+            histograms = series.histograms
+            histograms['queue_wait'].record(queue_wait)
+            histograms['latency'].record(latency)
+            if ttft is not None:
+                histograms['ttft'].record(ttft)
+            if error:
+                series.errors += 1
+            else:
+                histograms['prompt_tokens'].record(prompt_tokens)
+                histograms['output_tokens'].record(output_tokens)
+                histograms['cost'].record(cost)
+        return cost
+
+    def record_cache_hit(self, subsystem: str, model: str):
+        """Resposta servida sem chamar o modelo."""
+        with self._lock:
+            self._get_series(subsystem, model).cache_hits += 1
+
+    def summary(self, by: str = 'subsystem') -> Dict[str, Any]:
+        """Percentis e totais agrupados por 'subsystem', 'model' ou 'series' (os dois)."""
+        with self._lock:
+            groups: Dict[str, list] = {}
+            for (subsystem, model), series in self._series.items():
+                name = {'subsystem': subsystem, 'model': model}.get(by, f"{subsystem}|{model}")
+                groups.setdefault(name, []).append(series)
+            return {
+                'groups': {name: self._merge(items) for name, items in sorted(groups.items())},
+                'total': self._merge(list(self._series.values())),
+                'since': self.started_at,
+            }
+
+    @staticmethod
+    def _merge(items) -> Dict[str, Any]:
+        merged = _Series()
+        for series in items:
+            merged.calls += series.calls
+            merged.errors += series.errors
+            merged.cache_hits += series.cache_hits
+            for metric, histogram in series.histograms.items():
+                target = merged.histograms[metric]
+                target.count += histogram.count
+                target.total += histogram.total
+                if histogram.count:
+                    target.min = histogram.min if target.min is None else min(target.min, histogram.min)
+                    target.max = histogram.max if target.max is None else max(target.max, histogram.max)
+                for index, count in histogram.buckets.items():
+                    target.buckets[index] = target.buckets.get(index, 0) + count
+        return {
+            'calls': merged.calls,
+            'errors': merged.errors,
+            'cache_hits': merged.cache_hits,
+            'cost_total': merged.histograms['cost'].total,
+            'prompt_tokens_total': int(merged.histograms['prompt_tokens'].total),
+            'output_tokens_total': int(merged.histograms['output_tokens'].total),
+            **{metric: merged.histograms[metric].summary() for metric in METRICS},
+        }
+
+    def export(self, path: Union[str, Path]) -> Path:
+        """Grava as métricas (por subsistema, por modelo e total) em JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'exported_at': time.time(),
+            'pricing_per_million_tokens': {k: list(v) for k, v in self.pricing.items()},
+            'by_subsystem': self.summary('subsystem'),
+            'by_model': self.summary('model'),
+            'by_series': self.summary('series'),
+        }
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(path)
+        return path
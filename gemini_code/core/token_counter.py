@@ -0,0 +1,192 @@
+"""
+Contagem de tokens compartilhada pelo cliente, compactador e chunking.
+
+Antes cada componente tinha a própria conta (len // 3.5, len // 4, tiktoken)
+e o mesmo texto era recontado várias vezes por turno. O TokenCounter oferece:
+
+- `estimate()`: estimativa rápida por caracteres/token, calibrada com as
+  contagens exatas já feitas;
+- `count()`: contagem exata com o tokenizador (tiktoken), quando instalado;
+
+ambas memorizadas pelo hash do conteúdo. Estimativas ficam presas à
+calibração em que foram feitas: ao recalibrar, o mesmo texto passa a ter a
+estimativa nova, nunca uma mistura de antes e depois.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from .lazy_loader import is_available, lazy_import
+
+
+TIKTOKEN_AVAILABLE = is_available('tiktoken')
+tiktoken = lazy_import('tiktoken')
+
+# Textos curtos são a própria chave; acima disso, usa-se um digest
+_INLINE_KEY_LIMIT = 512
+_CODE_INDICATORS = ('def ', 'class ', 'import ', 'from ', '{\n', 'function')
+# Proporções iniciais (caracteres por token), recalibradas pelas contagens exatas
+DEFAULT_CHARS_PER_TOKEN = {'code': 3.5, 'text': 4.5}
+
+
+class _ApproximateEncoding:
+    """Substituto do tiktoken: ~4 caracteres por token, decode exato."""
+
+    _PIECE = re.compile(r'.{1,4}', re.DOTALL)
+
+    def encode(self, text: str) -> List[str]:
+        return self._PIECE.findall(text)
+
+    def decode(self, tokens: List[str]) -> str:
+        return ''.join(tokens)
+
+
+class TokenCounter:
+    """
+    Serviço único de contagem de tokens com cache LRU por conteúdo.
+
+    Use `estimate()` para decisões frequentes de orçamento (custo O(n) sem
+    tokenizar) e `count()` quando o número precisa ser exato, como ao
+    dividir arquivos em chunks.
+    """
+
+    def __init__(self, max_entries: int = 8192, model: str = "gpt-4",
+                 calibration_weight: float = 0.2, min_calibration_chars: int = 200):
+        self.max_entries = max_entries
+        self.model = model
+        self.calibration_weight = calibration_weight
+        self.min_calibration_chars = min_calibration_chars
+        self.chars_per_token = dict(DEFAULT_CHARS_PER_TOKEN)
+        # Muda a cada recalibração; estimativas antigas saem do cache pelo LRU
+        self._calibration = 0
+
+        self._cache: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._encoding = None
+        self.stats = {'hits': 0, 'misses': 0, 'exact_counts': 0, 'estimates': 0, 'calibrations': 0}
+
+    @property
+    def exact_available(self) -> bool:
+        return TIKTOKEN_AVAILABLE
+
+    @property
+    def encoding(self):
+        """Tokenizador (tiktoken ou aproximação), carregado no primeiro uso."""
+        if self._encoding is None:
+            if TIKTOKEN_AVAILABLE:
+                self._encoding = tiktoken.encoding_for_model(self.model)  # Aproximação
+            else:
+                self._encoding = _ApproximateEncoding()
+        return self._encoding
+
+    def estimate(self, text: str) -> int:
+        """Estimativa rápida e calibrada."""
+        if not text:
+            return 0
+        key = self._key(f'e{self._calibration}', text)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        self.stats['estimates'] += 1
+        tokens = self._estimate(text)
+        self._put(key, tokens)
+        return tokens
+
+    def count(self, text: str) -> int:
+        """Contagem exata com o tokenizador; sem tiktoken, recai na estimativa."""
+        if not text:
+            return 0
+        if not self.exact_available:
+            return self.estimate(text)
+        key = self._key('x', text)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        self.stats['exact_counts'] += 1
+        tokens = len(self.encoding.encode(text, disallowed_special=()))
+        self._put(key, tokens)
+        self._calibrate(text, tokens)
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, Any]], exact: bool = False) -> int:
+        """Soma os tokens do conteúdo de mensagens {'role', 'content'}."""
+        counter = self.count if exact else self.estimate
+        return sum(counter(str(msg.get('content', ''))) for msg in messages)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._cache),
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'exact_available': self.exact_available,
+            'chars_per_token': {k: round(v, 3) for k, v in self.chars_per_token.items()},
+        }
+
+    def _estimate(self, text: str) -> int:
+        ratio = self.chars_per_token[self._kind(text)]
+        return max(1, int(len(text) / ratio))
+
+    @staticmethod
+    def _kind(text: str) -> str:
+        return 'code' if any(indicator in text for indicator in _CODE_INDICATORS) else 'text'
+
+    def _calibrate(self, text: str, tokens: int):
+        """Aproxima a proporção caracteres/token da estimativa da contagem real."""
+        if len(text) < self.min_calibration_chars or tokens <= 0:
+            return
+        kind = self._kind(text)
+        observed = len(text) / tokens
+        with self._lock:
+            current = self.chars_per_token[kind]
+            self.chars_per_token[kind] = current + self.calibration_weight * (observed - current)
+            self._calibration += 1
+        self.stats['calibrations'] += 1
+
+    @staticmethod
+    def _key(mode: str, text: str) -> Hashable:
+        if len(text) <= _INLINE_KEY_LIMIT:
+            return (mode, text)
+        digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return (mode, len(text), digest)
+
+    def _get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is None:
+                self.stats['misses'] += 1
+                return None
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return tokens
+
+    def _put(self, key: Hashable, tokens: int):
+        with self._lock:
+            self._cache[key] = tokens
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+
+# Contador global
+_token_counter: Optional[TokenCounter] = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Obtém o contador de tokens compartilhado."""
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = TokenCounter()
+    return _token_counter
@@ -2,9 +2,14 @@
 Módulo de gerenciamento de banco de dados do Gemini Code.
 """
 
-from .database_manager import DatabaseManager
-from .schema_manager import SchemaManager
-from .migration_system import MigrationSystem
+from ..core.lazy_loader import lazy_exports
+
+# Submódulos importados no primeiro acesso
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'DatabaseManager': '.database_manager',
+    'SchemaManager': '.schema_manager',
+    'MigrationSystem': '.migration_system',
+})
 
 __all__ = [
     'DatabaseManager',
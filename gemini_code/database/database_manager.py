@@ -8,9 +8,13 @@ import asyncio
 from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
 
 from ..core.gemini_client import GeminiClient
+from ..core.lazy_loader import lazy_import
+from ..core.sqlite_pool import get_pool
+
+# pandas só é carregado na primeira consulta que o usa
+pd = lazy_import('pandas')
 
 
 class DatabaseManager:
@@ -24,7 +28,7 @@ class DatabaseManager:
     def _ensure_db_exists(self):
         """Garante que o banco existe."""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         conn.close()
     
     async def natural_query(self, command: str) -> Dict[str, Any]:
@@ -98,7 +102,7 @@ class DatabaseManager:
     
     def _execute_sql(self, sql: str) -> Dict[str, Any]:
         """Executa SQL e retorna resultado."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -135,7 +139,7 @@ class DatabaseManager:
     
     def _get_schema(self) -> Dict[str, List[Dict[str, str]]]:
         """Obtém schema do banco."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         schema = {}
@@ -256,6 +260,8 @@ class DatabaseManager:
         backup_path = backup_dir / backup_name
         
         import shutil
+        # Com WAL, parte dos dados confirmados pode estar só no arquivo -wal
+        get_pool(self.db_path).checkpoint()
         shutil.copy2(self.db_path, backup_path)
         
         return str(backup_path)
@@ -264,6 +270,8 @@ class DatabaseManager:
         """Restaura banco de backup."""
         try:
             import shutil
+            # Conexões abertas não podem enxergar o arquivo sendo substituído
+            get_pool(self.db_path).close_all()
             shutil.copy2(backup_path, self.db_path)
             return True
         except Exception as e:
@@ -274,7 +282,7 @@ class DatabaseManager:
         """Analisa dados de uma tabela."""
         try:
             # Carrega dados
-            conn = sqlite3.connect(self.db_path)
+            conn = get_pool(self.db_path).connect()
             df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
             conn.close()
             
@@ -308,7 +316,7 @@ class DatabaseManager:
         results = []
         schema = self._get_schema()
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -15,6 +15,7 @@ import threading
 import queue
 
 from ..core.gemini_client import GeminiClient
+from ..core.rate_limiter import RequestPriority
 
 
 @dataclass
@@ -212,7 +213,11 @@ class CommandExecutor:
             Responda apenas "SEGURO" ou "PERIGOSO"
             """
             
-            response = await self.gemini_client.generate_response(prompt)
+            # Chamada isolada e interativa: o comando não pode dividir o prompt
+            # com outros textos (injeção) nem esperar na fila de background
+            response = await self.gemini_client.generate_response(
+                prompt, priority=RequestPriority.INTERACTIVE
+            )
             
             return "SEGURO" in response.upper()
             
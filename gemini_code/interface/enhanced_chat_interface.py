@@ -24,6 +24,7 @@ from ..integration.git_manager import GitManager
 from ..development.code_generator import CodeGenerator
 from ..utils.error_humanizer import humanize_error
 from ..utils.logger import Logger
+from .stream_renderer import StreamRenderer
 
 
 class EnhancedChatInterface:
@@ -120,8 +121,11 @@ class EnhancedChatInterface:
                 
                 task = progress.add_task("🧠 Processando com memória contextual...", total=None)
                 
-                # Processa com o gerenciador de conversas
-                result = await self.conversation_manager.process_message(user_input)
+                # Processa com o gerenciador de conversas, exibindo a resposta em streaming
+                with StreamRenderer(self.console, progress=progress) as renderer:
+                    result = await self.conversation_manager.process_message(
+                        user_input, on_chunk=renderer
+                    )
                 
                 progress.update(task, description="✅ Processamento concluído")
             
@@ -664,6 +668,12 @@ class EnhancedChatInterface:
                     elif result.stdout:
                          self.console.print(f"Saída (pode conter erro):\n{result.stdout}")
 
+                # Saída entra no contexto dos próximos turnos (o modelo vê o que o comando mostrou)
+                self.conversation_manager.record_tool_output(
+                    actual_command_to_execute,
+                    result.stdout if result.success else (result.stderr or result.stdout)
+                )
+
                 # Salvar na memória
                 self.conversation_manager.memory_system.remember_conversation(
                     user_input=operation_description,
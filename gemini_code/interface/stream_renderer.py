@@ -0,0 +1,64 @@
+"""
+Renderização progressiva de respostas em streaming no terminal.
+"""
+from typing import Optional
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.progress import Progress
+from rich.text import Text
+
+
+class StreamRenderer:
+    """Exibe os trechos de uma resposta à medida que chegam.
+
+    A instância é usada como on_chunk de GeminiClient.generate_response /
+    ConversationManager.process_message. No primeiro trecho o spinner de
+    progresso (se houver) é parado, já que o rich só permite um Live ativo.
+    Com transient=True o texto parcial some ao final, para que o chamador
+    exiba a versão formatada completa.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        title: str = "🤖 Gemini Code",
+        progress: Optional[Progress] = None,
+        transient: bool = True
+    ):
+        self.console = console
+        self.title = title
+        self.progress = progress
+        self.transient = transient
+        self.text = Text()
+        self._live: Optional[Live] = None
+
+    @property
+    def started(self) -> bool:
+        """Indica se algum trecho já foi exibido."""
+        return self._live is not None
+
+    def __call__(self, chunk: str):
+        if self._live is None:
+            if self.progress is not None:
+                self.progress.stop()
+            self._live = Live(
+                Panel(self.text, title=self.title, border_style="green"),
+                console=self.console,
+                refresh_per_second=10,
+                transient=self.transient
+            )
+            self._live.start()
+        self.text.append(chunk)
+
+    def stop(self):
+        """Encerra a exibição ao vivo."""
+        if self._live is not None:
+            self._live.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
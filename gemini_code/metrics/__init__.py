@@ -2,10 +2,15 @@
 Sistema de métricas de negócio do Gemini Code.
 """
 
-from .business_metrics import BusinessMetrics
-from .analytics_engine import AnalyticsEngine
-from .dashboard_generator import DashboardGenerator
-from .kpi_tracker import KPITracker
+from ..core.lazy_loader import lazy_exports
+
+# Submódulos importados no primeiro acesso
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BusinessMetrics': '.business_metrics',
+    'AnalyticsEngine': '.analytics_engine',
+    'DashboardGenerator': '.dashboard_generator',
+    'KPITracker': '.kpi_tracker',
+})
 
 __all__ = [
     'BusinessMetrics',
@@ -3,17 +3,21 @@ Sistema de métricas de negócio com linguagem natural.
 """
 
 import json
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+from ..core.lazy_loader import is_available, lazy_import
+
+# pandas e matplotlib só são carregados no primeiro uso
+pd = lazy_import('pandas')
+
 # Importações opcionais para visualização
-try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
+if is_available('matplotlib') and is_available('seaborn'):
+    plt = lazy_import('matplotlib.pyplot')
+    sns = lazy_import('seaborn')
     PLOTTING_AVAILABLE = True
-except ImportError:
+else:
     plt = None
     sns = None
     PLOTTING_AVAILABLE = False
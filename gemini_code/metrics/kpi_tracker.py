@@ -12,6 +12,7 @@ import sqlite3
 from collections import defaultdict
 
 from ..core.gemini_client import GeminiClient
+from ..core.rate_limiter import RequestPriority
 from ..database.database_manager import DatabaseManager
 
 
@@ -277,7 +278,9 @@ class KPITracker:
         """
         
         try:
-            response = await self.gemini_client.generate_response(prompt)
+            response = await self.gemini_client.generate_response(
+                prompt, priority=RequestPriority.BACKGROUND
+            )
             
             # Extrai JSON
             import re
@@ -512,7 +515,9 @@ class KPITracker:
         """
         
         try:
-            response = await self.gemini_client.generate_response(prompt)
+            response = await self.gemini_client.generate_response(
+                prompt, priority=RequestPriority.BACKGROUND
+            )
             insights = [line.strip() for line in response.split('\n') 
                        if line.strip() and not line.startswith('#')]
             return insights[:5]
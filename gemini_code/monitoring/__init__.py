@@ -2,7 +2,12 @@
 Sistema de monitoramento contínuo 24/7 do Gemini Code.
 """
 
-from .continuous_monitor import ContinuousMonitor
+from ..core.lazy_loader import lazy_exports
+
+# Submódulos importados no primeiro acesso
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ContinuousMonitor': '.continuous_monitor',
+})
 
 __all__ = [
     'ContinuousMonitor'
@@ -15,6 +15,7 @@ from pathlib import Path
 
 from ..utils.performance_optimizer import performance_monitor
 from ..core.memory_system import MemorySystem
+from ..core.sqlite_pool import get_pool
 
 
 @dataclass
@@ -182,8 +183,7 @@ class RealTimePerformanceMonitor:
             if self.memory_system:
                 try:
                     # Contar registros na memória
-                    import sqlite3
-                    conn = sqlite3.connect(str(self.memory_system.db_path))
+                    conn = get_pool(self.memory_system.db_path).connect()
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) FROM conversations")
                     memory_records = cursor.fetchone()[0]
@@ -3,7 +3,6 @@ Permission Manager - Sistema de permissões em camadas estilo Claude Code
 """
 
 import json
-import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Set, Callable
 from pathlib import Path
@@ -11,6 +10,7 @@ from enum import Enum
 from dataclasses import dataclass, field
 
 from ..tools.base_tool import BaseTool, ToolInput, ToolResult
+from ..core.sqlite_pool import get_pool
 
 
 class PermissionLevel(Enum):
@@ -118,7 +118,7 @@ class PermissionManager:
         
     def _init_database(self):
         """Inicializa banco de permissões."""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Tabela de decisões de permissão
@@ -179,7 +179,7 @@ class PermissionManager:
         }
         
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_pool(self.db_path).connect()
             cursor = conn.cursor()
             
             cursor.execute("SELECT key, value FROM security_config")
@@ -313,7 +313,7 @@ class PermissionManager:
     def _get_persistent_decision(self, request: PermissionRequest) -> Optional[PermissionDecision]:
         """Verifica decisões persistentes no banco."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_pool(self.db_path).connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -416,7 +416,7 @@ class PermissionManager:
         # Salva no banco se deve lembrar
         if decision.remember_choice:
             try:
-                conn = sqlite3.connect(str(self.db_path))
+                conn = get_pool(self.db_path).connect()
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -445,7 +445,7 @@ class PermissionManager:
     async def _log_security_violation(self, request: PermissionRequest, violation_type: str):
         """Registra violação de segurança."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_pool(self.db_path).connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -496,7 +496,7 @@ class PermissionManager:
     def _save_security_config(self, key: str, value: Any):
         """Salva configuração de segurança."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_pool(self.db_path).connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -528,7 +528,7 @@ class PermissionManager:
     def get_security_violations(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Retorna violações de segurança recentes."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_pool(self.db_path).connect()
             cursor = conn.cursor()
             
             cursor.execute("""
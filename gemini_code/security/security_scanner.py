@@ -12,6 +12,8 @@ from datetime import datetime
 import subprocess
 
 from ..core.gemini_client import GeminiClient
+from ..core.rate_limiter import RequestPriority
+from ..core.ast_cache import get_ast_cache
 
 
 class SecurityIssue:
@@ -211,9 +213,9 @@ class SecurityScanner:
         issues = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
+            parsed = get_ast_cache().get(file_path)
+            content = parsed.source
+            lines = parsed.lines
             
             # Verifica padrões de segurança
             for category, patterns in self.security_patterns.items():
@@ -247,7 +249,7 @@ class SecurityScanner:
         issues = []
         
         try:
-            tree = ast.parse(content)
+            tree = get_ast_cache().parse_source(content, str(file_path)).get_tree()
             
             # Verifica imports perigosos
             for node in ast.walk(tree):
@@ -459,7 +461,9 @@ class SecurityScanner:
                 ]
                 """
                 
-                response = await self.gemini_client.generate_response(prompt)
+                response = await self.gemini_client.generate_response(
+                    prompt, priority=RequestPriority.BACKGROUND
+                )
                 
                 # Extrai JSON
                 import re
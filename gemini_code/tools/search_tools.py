@@ -11,6 +11,7 @@ import fnmatch
 from datetime import datetime
 
 from .base_tool import BaseTool, ToolInput, ToolResult, tool_decorator, ToolCategory, ToolPermission
+from ..core.search_index import TrigramIndex
 
 
 @tool_decorator(
@@ -170,6 +171,9 @@ class GrepTool(BaseTool):
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         self.context_lines = 0
         
+        # Índice de trigramas opcional (ver enable_index)
+        self.search_index: Optional[TrigramIndex] = None
+        
         self.configure(
             requires_confirmation=False,
             metadata={
@@ -193,6 +197,15 @@ class GrepTool(BaseTool):
         
         return True
     
+    def enable_index(self, root: Union[str, Path] = '.') -> TrigramIndex:
+        """Ativa o índice de trigramas persistente para buscas sob `root`."""
+        self.search_index = TrigramIndex(root, max_file_size=self.max_file_size)
+        return self.search_index
+    
+    def disable_index(self):
+        """Volta à busca força-bruta."""
+        self.search_index = None
+    
     async def execute(self, tool_input: ToolInput) -> ToolResult:
         """Executa busca de texto."""
         pattern = tool_input.command
@@ -201,6 +214,7 @@ class GrepTool(BaseTool):
         use_regex = tool_input.kwargs.get('regex', False)
         file_pattern = tool_input.kwargs.get('include', '*')
         exclude_pattern = tool_input.kwargs.get('exclude', None)
+        use_index = tool_input.kwargs.get('use_index', True)
         
         try:
             target_path = Path(target)
@@ -222,6 +236,14 @@ class GrepTool(BaseTool):
                     target_path, file_pattern, exclude_pattern
                 )
             
+            # Índice de trigramas descarta arquivos que não podem conter o padrão
+            files_considered = len(files_to_search)
+            indexed = bool(use_index and self.search_index is not None)
+            if indexed:
+                files_to_search = self.search_index.filter_files(
+                    files_to_search, pattern, regex=use_regex, case_sensitive=case_sensitive
+                )
+            
             for file_path in files_to_search:
                 if len(matches) >= self.max_matches:
                     break
@@ -253,6 +275,8 @@ class GrepTool(BaseTool):
                 'total_matches': len(matches),
                 'files_with_matches': len(set(m['file'] for m in matches)),
                 'files_searched': files_searched,
+                'files_considered': files_considered,
+                'indexed': indexed,
                 'use_regex': use_regex,
                 'case_sensitive': case_sensitive,
                 'truncated': len(matches) >= self.max_matches
@@ -15,47 +15,38 @@ from typing import Optional
 # Adiciona o diretório do projeto ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from gemini_code.core.gemini_client import GeminiClient
-from gemini_code.core.enhanced_capabilities import EnhancedCapabilities, enable_enhanced_gemini_code
-from gemini_code.core.nlp_enhanced import NLPEnhanced
-from gemini_code.core.project_manager import ProjectManager
-from gemini_code.core.file_manager import FileManagementSystem
-from gemini_code.core.workspace_manager import WorkspaceManager
-from gemini_code.core.memory_system import MemorySystem
-from gemini_code.core.dependency_injection import DependencyContainer, get_container
-from gemini_code.database.database_manager import DatabaseManager
-from gemini_code.monitoring.continuous_monitor import ContinuousMonitor
-from gemini_code.security.security_scanner import SecurityScanner
-from gemini_code.metrics.business_metrics import BusinessMetrics
-from gemini_code.metrics.analytics_engine import AnalyticsEngine
-from gemini_code.analysis.health_monitor import HealthMonitor
-from gemini_code.analysis.error_detector import ErrorDetector
-from gemini_code.analysis.performance import PerformanceAnalyzer
-from gemini_code.core.self_healing import SelfHealingSystem
-from gemini_code.core.ultra_executor import UltraExecutor
-# Importações condicionais para funcionalidades que dependem de matplotlib
-try:
-    from gemini_code.metrics.dashboard_generator import DashboardGenerator
-    DASHBOARD_AVAILABLE = True
-except ImportError:
-    DashboardGenerator = None
-    DASHBOARD_AVAILABLE = False
+from gemini_code.core.lazy_loader import get_startup_profiler, is_available
 
-try:
-    from gemini_code.metrics.kpi_tracker import KPITracker  
-    KPI_TRACKER_AVAILABLE = True
-except ImportError:
-    KPITracker = None
-    KPI_TRACKER_AVAILABLE = False
-from gemini_code.collaboration.team_manager import TeamManager
-from gemini_code.collaboration.project_sharing import ProjectSharing
-from gemini_code.collaboration.real_time_sync import RealTimeSync
+_profiler = get_startup_profiler()
+
+# Só o núcleo é importado na partida; os demais subsistemas (pandas, psutil,
+# matplotlib...) são carregados pelo container no primeiro uso
+with _profiler.measure('core', 'import'):
+    from gemini_code.core.gemini_client import GeminiClient
+    from gemini_code.core.enhanced_capabilities import EnhancedCapabilities, enable_enhanced_gemini_code
+    from gemini_code.core.nlp_enhanced import NLPEnhanced
+    from gemini_code.core.project_manager import ProjectManager
+    from gemini_code.core.file_manager import FileManagementSystem
+    from gemini_code.core.workspace_manager import WorkspaceManager
+    from gemini_code.core.memory_system import MemorySystem
+    from gemini_code.core.dependency_injection import DependencyContainer, get_container
+
+# Funcionalidades que dependem de matplotlib
+DASHBOARD_AVAILABLE = all(is_available(name) for name in ('pandas', 'matplotlib', 'seaborn', 'jinja2'))
 
 
 class GeminiCodeMain:
     """Classe principal do Gemini Code com capacidades aprimoradas."""
     
+    # Serviços criados pelo container no primeiro acesso ao atributo
+    LAZY_SERVICES = (
+        'db_manager', 'monitor', 'security_scanner', 'business_metrics', 'analytics_engine',
+        'dashboard_generator', 'kpi_tracker', 'team_manager', 'project_sharing', 'real_time_sync',
+        'health_monitor', 'error_detector', 'performance_analyzer', 'self_healing', 'ultra_executor',
+    )
+    
     def __init__(self):
+        self.container: Optional[DependencyContainer] = None
         self.gemini_client: Optional[GeminiClient] = None
         self.enhanced_capabilities: Optional[EnhancedCapabilities] = None
         self.nlp: Optional[NLPEnhanced] = None
@@ -63,40 +54,51 @@ class GeminiCodeMain:
         self.file_manager: Optional[FileManagementSystem] = None
         self.workspace_manager: Optional[WorkspaceManager] = None
         self.memory_system: Optional[MemorySystem] = None
-        self.db_manager: Optional[DatabaseManager] = None
-        self.monitor: Optional[ContinuousMonitor] = None
-        self.security_scanner: Optional[SecurityScanner] = None
-        self.business_metrics: Optional[BusinessMetrics] = None
-        self.analytics_engine: Optional[AnalyticsEngine] = None
-        self.dashboard_generator: Optional[DashboardGenerator] = None
-        self.kpi_tracker: Optional[KPITracker] = None
-        self.team_manager: Optional[TeamManager] = None
-        self.project_sharing: Optional[ProjectSharing] = None
-        self.real_time_sync: Optional[RealTimeSync] = None
-        self.health_monitor: Optional[HealthMonitor] = None
-        self.error_detector: Optional[ErrorDetector] = None
-        self.performance_analyzer: Optional[PerformanceAnalyzer] = None
-        self.self_healing: Optional[SelfHealingSystem] = None
-        self.ultra_executor: Optional[UltraExecutor] = None
         self.running = False
     
+    def __getattr__(self, name: str):
+        """Resolve serviços de LAZY_SERVICES no primeiro acesso."""
+        if name not in self.LAZY_SERVICES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        
+        container = self.__dict__.get('container')
+        if container is None or not container.is_registered(name):
+            return None
+        
+        print(f"🔧 Inicializando {name} sob demanda...")
+        try:
+            service = container.get(name)
+        except Exception as e:
+            print(f"⚠️ {name} indisponível: {e}")
+            service = None
+        
+        setattr(self, name, service)
+        return service
+    
+    def _loaded_service(self, name: str):
+        """Retorna o serviço apenas se já tiver sido criado."""
+        return self.__dict__.get(name)
+    
     async def initialize(self, api_key: Optional[str] = None) -> None:
-        """Inicializa todos os componentes do sistema usando injeção de dependência."""
+        """Inicializa o núcleo e registra os demais serviços para carga sob demanda."""
         print("🚀 Inicializando Gemini Code com Capacidades Aprimoradas...")
         print("🎯 Configuração: 1M tokens input | 32K tokens output | Thinking Mode Ativo")
         
         try:
             # Configura container de dependências
             container = get_container()
+            self.container = container
             
             # Registra serviços principais
             print("🔧 Configurando dependências...")
+            project_path = str(Path.cwd())
             
             # Core
             container.register('gemini_client', GeminiClient, config={'api_key': api_key})
             container.register('nlp', NLPEnhanced, dependencies={'gemini_client': 'gemini_client'})
-            container.register('memory_system', MemorySystem, config={'project_path': str(Path.cwd())})
-            container.register('db_manager', DatabaseManager, dependencies={'gemini_client': 'gemini_client'})
+            container.register('memory_system', MemorySystem, config={'project_path': project_path})
+            container.register('db_manager', 'gemini_code.database.database_manager.DatabaseManager',
+                             dependencies={'gemini_client': 'gemini_client'})
             
             # File management com logger
             import logging
@@ -109,41 +111,60 @@ class GeminiCodeMain:
             container.register('project_manager', ProjectManager, dependencies={'gemini_client': 'gemini_client'})
             
             # Monitoring
-            container.register('monitor', ContinuousMonitor, 
+            container.register('monitor', 'gemini_code.monitoring.continuous_monitor.ContinuousMonitor', 
                              dependencies={'gemini_client': 'gemini_client'},
-                             config={'project_path': str(Path.cwd())})
-            container.register('security_scanner', SecurityScanner, dependencies={'gemini_client': 'gemini_client'})
+                             config={'project_path': project_path})
+            container.register('security_scanner', 'gemini_code.security.security_scanner.SecurityScanner',
+                             dependencies={'gemini_client': 'gemini_client'})
             
             # Analytics
-            container.register('business_metrics', BusinessMetrics, 
+            container.register('business_metrics', 'gemini_code.metrics.business_metrics.BusinessMetrics', 
+                             dependencies={'gemini_client': 'gemini_client', 'db_manager': 'db_manager'})
+            container.register('analytics_engine', 'gemini_code.metrics.analytics_engine.AnalyticsEngine',
                              dependencies={'gemini_client': 'gemini_client', 'db_manager': 'db_manager'})
-            container.register('analytics_engine', AnalyticsEngine,
+            if DASHBOARD_AVAILABLE:
+                container.register('dashboard_generator', 'gemini_code.metrics.dashboard_generator.DashboardGenerator',
+                                 dependencies={'gemini_client': 'gemini_client',
+                                             'business_metrics': 'business_metrics',
+                                             'analytics_engine': 'analytics_engine'})
+            else:
+                print("⚠️ DashboardGenerator desabilitado (matplotlib não disponível)")
+            # KPITracker não tem dependências opcionais: sempre registrado
+            container.register('kpi_tracker', 'gemini_code.metrics.kpi_tracker.KPITracker',
                              dependencies={'gemini_client': 'gemini_client', 'db_manager': 'db_manager'})
             
             # Analysis modules
-            container.register('error_detector', ErrorDetector,
+            container.register('error_detector', 'gemini_code.analysis.error_detector.ErrorDetector',
                              dependencies={'gemini_client': 'gemini_client', 'file_manager': 'file_manager'})
-            container.register('performance_analyzer', PerformanceAnalyzer,
+            container.register('performance_analyzer', 'gemini_code.analysis.performance.PerformanceAnalyzer',
                              dependencies={'gemini_client': 'gemini_client', 'file_manager': 'file_manager'})
-            container.register('health_monitor', HealthMonitor,
+            container.register('health_monitor', 'gemini_code.analysis.health_monitor.HealthMonitor',
                              dependencies={'gemini_client': 'gemini_client', 'file_manager': 'file_manager'})
+            container.register('self_healing', 'gemini_code.core.self_healing.SelfHealingSystem',
+                             config={'project_path': project_path})
+            container.register('ultra_executor', 'gemini_code.core.ultra_executor.UltraExecutor',
+                             dependencies={'gemini_client': 'gemini_client'},
+                             config={'project_path': project_path})
             
-            # Team
-            container.register('team_manager', TeamManager, dependencies={'gemini_client': 'gemini_client'})
+            # Collaboration
+            container.register('team_manager', 'gemini_code.collaboration.team_manager.TeamManager',
+                             dependencies={'gemini_client': 'gemini_client'})
+            container.register('project_sharing', 'gemini_code.collaboration.project_sharing.ProjectSharing',
+                             dependencies={'gemini_client': 'gemini_client', 'team_manager': 'team_manager'})
+            container.register('real_time_sync', 'gemini_code.collaboration.real_time_sync.RealTimeSync',
+                             dependencies={'gemini_client': 'gemini_client', 'team_manager': 'team_manager'})
             
-            # Inicializa serviços
+            # Inicializa apenas o núcleo
             print("🔧 Inicializando GeminiClient...")
             self.gemini_client = container.get('gemini_client')
             
             print("🚀 Ativando Capacidades Aprimoradas...")
-            self.enhanced_capabilities = enable_enhanced_gemini_code(self.gemini_client)
+            with _profiler.measure('enhanced_capabilities'):
+                self.enhanced_capabilities = enable_enhanced_gemini_code(self.gemini_client)
             
             print("🔧 Inicializando NLPEnhanced...")
             self.nlp = container.get('nlp')
             
-            print("🔧 Inicializando DatabaseManager...")
-            self.db_manager = container.get('db_manager')
-            
             print("🔧 Inicializando FileManagementSystem...")
             self.file_manager = container.get('file_manager')
             
@@ -156,68 +177,8 @@ class GeminiCodeMain:
             print("🔧 Inicializando ProjectManager...")
             self.project_manager = container.get('project_manager')
             
-            print("🔧 Inicializando ContinuousMonitor...")
-            self.monitor = container.get('monitor')
-            
-            print("🔧 Inicializando SecurityScanner...")
-            self.security_scanner = container.get('security_scanner')
-            
-            print("🔧 Inicializando BusinessMetrics...")
-            self.business_metrics = container.get('business_metrics')
-            
-            print("🔧 Inicializando AnalyticsEngine...")
-            self.analytics_engine = container.get('analytics_engine')
-            
-            print("🔧 Inicializando ErrorDetector...")
-            self.error_detector = container.get('error_detector')
-            
-            print("🔧 Inicializando PerformanceAnalyzer...")
-            self.performance_analyzer = container.get('performance_analyzer')
-            
-            print("🔧 Inicializando HealthMonitor...")
-            self.health_monitor = container.get('health_monitor')
-            
-            print("🔧 Inicializando SelfHealingSystem...")
-            self.self_healing = SelfHealingSystem(str(Path.cwd()))
-            
-            print("🚀 Inicializando UltraExecutor...")
-            self.ultra_executor = UltraExecutor(str(Path.cwd()), self.gemini_client)
-            
-            # Componentes opcionais
-            if DASHBOARD_AVAILABLE:
-                print("🔧 Inicializando DashboardGenerator...")
-                container.register('dashboard_generator', DashboardGenerator,
-                                 dependencies={'gemini_client': 'gemini_client',
-                                             'business_metrics': 'business_metrics',
-                                             'analytics_engine': 'analytics_engine'})
-                self.dashboard_generator = container.get('dashboard_generator')
-            else:
-                self.dashboard_generator = None
-                print("⚠️ DashboardGenerator desabilitado (matplotlib não disponível)")
-            
-            if KPI_TRACKER_AVAILABLE:
-                print("🔧 Inicializando KPITracker...")
-                container.register('kpi_tracker', KPITracker,
-                                 dependencies={'gemini_client': 'gemini_client', 'db_manager': 'db_manager'})
-                self.kpi_tracker = container.get('kpi_tracker')
-            else:
-                self.kpi_tracker = None
-                print("⚠️ KPITracker desabilitado (matplotlib não disponível)")
-            
-            # Collaboration
-            print("🔧 Inicializando TeamManager...")
-            self.team_manager = container.get('team_manager')
-            
-            print("🔧 Inicializando ProjectSharing...")
-            container.register('project_sharing', ProjectSharing,
-                             dependencies={'gemini_client': 'gemini_client', 'team_manager': 'team_manager'})
-            self.project_sharing = container.get('project_sharing')
-            
-            print("🔧 Inicializando RealTimeSync...")
-            container.register('real_time_sync', RealTimeSync,
-                             dependencies={'gemini_client': 'gemini_client', 'team_manager': 'team_manager'})
-            self.real_time_sync = container.get('real_time_sync')
-            
+            lazy_count = sum(1 for name in self.LAZY_SERVICES if container.is_registered(name))
+            print(f"⏳ {lazy_count} serviços serão carregados sob demanda")
             print("✅ Gemini Code inicializado com sucesso!")
             
         except Exception as e:
@@ -251,21 +212,24 @@ class GeminiCodeMain:
         
         try:
             # Verificar se os métodos existem antes de chamar
-            if self.monitor and hasattr(self.monitor, 'stop_monitoring'):
+            monitor = self._loaded_service('monitor')
+            if monitor and hasattr(monitor, 'stop_monitoring'):
                 try:
-                    await self.monitor.stop_monitoring()
+                    await monitor.stop_monitoring()
                 except Exception as e:
                     print(f"⚠️ Aviso ao parar monitor: {e}")
             
-            if self.kpi_tracker and hasattr(self.kpi_tracker, 'stop_monitoring'):
+            kpi_tracker = self._loaded_service('kpi_tracker')
+            if kpi_tracker and hasattr(kpi_tracker, 'stop_monitoring'):
                 try:
-                    await self.kpi_tracker.stop_monitoring()
+                    await kpi_tracker.stop_monitoring()
                 except Exception as e:
                     print(f"⚠️ Aviso ao parar KPI tracker: {e}")
             
-            if self.real_time_sync and hasattr(self.real_time_sync, 'stop_sync'):
+            real_time_sync = self._loaded_service('real_time_sync')
+            if real_time_sync and hasattr(real_time_sync, 'stop_sync'):
                 try:
-                    await self.real_time_sync.stop_sync()
+                    await real_time_sync.stop_sync()
                 except Exception as e:
                     print(f"⚠️ Aviso ao parar sync: {e}")
             
@@ -1288,6 +1252,12 @@ Exemplos de uso:
         help='Consulta de métricas em linguagem natural'
     )
     
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Mostra o tempo de importação e inicialização de cada etapa'
+    )
+    
     args = parser.parse_args()
     
     # Inicializa sistema
@@ -1296,6 +1266,7 @@ Exemplos de uso:
     try:
         await gemini_code.initialize(api_key=args.api_key)
         await gemini_code.start_services()
+        _profiler.mark_ready()
         
         # Processa comando específico
         if args.command:
@@ -1331,6 +1302,8 @@ Exemplos de uso:
     
     finally:
         await gemini_code.stop_services()
+        if args.profile_startup:
+            print(_profiler.format_report())
     
     return 0
 
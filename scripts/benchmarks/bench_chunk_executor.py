@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ChunkExecutor sequencial vs. paralelo.
+
+Roda inteiramente no modo de simulação do GeminiClient (sem rede). Como a
+resposta simulada é instantânea, uma latência artificial por chamada
+(--latency) representa o tempo de ida e volta ao modelo.
+
+Uso:
+    python scripts/benchmarks/bench_chunk_executor.py --files 400 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core import gemini_client as gemini_client_module
+from gemini_code.core.chunking_system import ChunkingSystem, ChunkExecutor, make_gemini_worker
+from gemini_code.core.config import ConfigManager
+
+
+def generate_project(root: Path, file_count: int):
+    """Gera arquivos Python sintéticos."""
+    for i in range(file_count):
+        body = "\n".join(f"def handler_{i}_{j}(value):\n    return value * {j}\n" for j in range(40))
+        (root / f"module_{i:05d}.py").write_text(body)
+
+
+def make_client(root: Path):
+    # Força o modo simulação mesmo se google-generativeai estiver instalado
+    gemini_client_module.GENAI_AVAILABLE = False
+    client = gemini_client_module.GeminiClient(config_manager=ConfigManager(root))
+    client.response_cache = None
+    return client
+
+
+async def run_once(tasks, client, concurrency: int, latency: float):
+    base_worker = make_gemini_worker(client)
+
+    async def worker(task):
+        await asyncio.sleep(latency)
+        return await base_worker(task)
+
+    executor = ChunkExecutor(worker, max_concurrency=concurrency)
+    merged = await executor.run(tasks)
+    assert merged['success'], merged['errors']
+    return executor.stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--chunk-size", type=int, default=8000, help="tokens por chunk")
+    parser.add_argument("--latency", type=float, default=0.5, help="latência simulada por chamada (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="gemini_chunk_bench_"))
+    try:
+        project = root / "project"
+        project.mkdir()
+        generate_project(project, args.files)
+        files = sorted(project.glob("*.py"))
+
+        chunking = ChunkingSystem(max_chunk_size=args.chunk_size)
+        start = time.perf_counter()
+        tasks = chunking.create_chunk_tasks(files, "Explique a arquitetura deste repositório")
+        print(f"📦 {len(files):,} arquivos -> {len(tasks)} tarefas "
+              f"(leitura + tokenização em {time.perf_counter() - start:.2f}s)")
+
+        client = make_client(root)
+        print(f"\n{'concorrência':>12} {'tempo':>9} {'speedup':>8} {'pico':>5}")
+        baseline = None
+        for concurrency in args.concurrency:
+            stats = await run_once(tasks, client, concurrency, args.latency)
+            baseline = baseline or stats.elapsed
+            print(f"{concurrency:>12} {stats.elapsed:>8.2f}s {baseline / stats.elapsed:>7.1f}x "
+                  f"{stats.max_parallel:>5}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
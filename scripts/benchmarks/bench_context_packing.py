@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: contexto enviado por turno, "últimas 10 mensagens" vs. ContextPacker.
+
+Monta uma conversa sintética com vários assuntos (histórico longo, memórias,
+arquivos e saídas de ferramentas) e, para perguntas sobre cada assunto,
+compara tokens enviados, cobertura do material relevante e o tempo gasto
+para montar o contexto.
+
+Uso:
+    python scripts/benchmarks/bench_context_packing.py --turns 60 --budgets 1024 4096 16384
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.context_packer import ContextCandidate, ContextPacker
+from gemini_code.core.token_counter import get_token_counter
+
+TOPICS = {
+    'autenticacao': "login jwt token sessão senha middleware autenticação",
+    'banco': "postgres migração tabela índice consulta transação banco",
+    'deploy': "docker kubernetes pipeline deploy container imagem cluster",
+    'interface': "botão tela layout css componente formulário interface",
+    'testes': "pytest fixture mock cobertura asserção teste unitário",
+}
+NOISE = "ok entendi vamos seguir com isso depois vemos os detalhes restantes".split()
+
+
+def sentence(rng, topic, words=40):
+    vocabulary = TOPICS[topic].split() + NOISE
+    return f"[{topic}] " + " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def build_session(rng, turns):
+    history, extra = [], []
+    for i in range(turns):
+        topic = rng.choice(list(TOPICS))
+        history.append({'role': 'user', 'content': sentence(rng, topic, 15), 'topic': topic})
+        history.append({'role': 'assistant', 'content': sentence(rng, topic, rng.randint(80, 400)), 'topic': topic})
+    for topic in TOPICS:
+        extra.append(('memory', topic, sentence(rng, topic, 120)))
+        extra.append(('file', topic, sentence(rng, topic, 1500)))
+        extra.append(('tool', topic, sentence(rng, topic, 300)))
+    return history, extra
+
+
+def old_strategy(history):
+    return [{'role': m['role'], 'content': m['content'][:500]} for m in history[-10:]]
+
+
+def candidates_for(history, extra):
+    total = len(history)
+    candidates = [
+        ContextCandidate(m['content'], kind='history', role=m['role'],
+                         recency=0.5 ** ((total - 1 - i) / 4), pinned=i >= total - 2, truncatable=True)
+        for i, m in enumerate(history)
+    ]
+    candidates += [ContextCandidate(content, kind=kind, truncatable=True) for kind, _, content in extra]
+    return candidates
+
+
+def coverage(messages, topic, history, extra):
+    """Fração dos tokens relevantes disponíveis que chegaram ao prompt."""
+    counter = get_token_counter()
+    available = sum(counter.estimate(m['content']) for m in history if m['topic'] == topic)
+    available += sum(counter.estimate(content) for _, t, content in extra if t == topic)
+    sent = sum(counter.estimate(m['content']) for m in messages if f"[{topic}]" in m['content'])
+    return min(1.0, sent / available) if available else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    history, extra = build_session(rng, args.turns)
+    counter = get_token_counter()
+    packer = ContextPacker()
+
+    rows = {'últimas 10 (500 chars)': []}
+    rows.update({f"packer {budget:,} tokens": [] for budget in args.budgets})
+
+    for _ in range(args.queries):
+        topic = rng.choice(list(TOPICS))
+        query = "como resolver " + " ".join(rng.sample(TOPICS[topic].split(), 3))
+
+        start = time.perf_counter()
+        messages = old_strategy(history)
+        elapsed = time.perf_counter() - start
+        rows['últimas 10 (500 chars)'].append(
+            (counter.count_messages(messages), coverage(messages, topic, history, extra), elapsed)
+        )
+
+        for budget in args.budgets:
+            start = time.perf_counter()
+            packed = packer.pack(query, candidates_for(history, extra), budget)
+            elapsed = time.perf_counter() - start
+            rows[f"packer {budget:,} tokens"].append(
+                (packed.tokens, coverage(packed.messages, topic, history, extra), elapsed)
+            )
+
+    print(f"📚 {len(history)} mensagens + {len(extra)} memórias/arquivos/ferramentas, {args.queries} perguntas\n")
+    print(f"{'estratégia':<26} {'tokens/turno':>12} {'cobertura':>10} {'relevantes':>11} {'montagem':>10}")
+    for name, samples in rows.items():
+        tokens = statistics.mean(s[0] for s in samples)
+        cover = statistics.mean(s[1] for s in samples)
+        print(f"{name:<26} {tokens:>12,.0f} {cover:>9.0%} {cover / max(tokens, 1) * 1e5:>11.1f} "
+              f"{statistics.median(s[2] for s in samples) * 1000:>8.2f}ms")
+    print("\nrelevantes = cobertura por 100k tokens enviados (maior é melhor)")
+
+
+if __name__ == "__main__":
+    main()
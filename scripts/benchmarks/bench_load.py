@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: carga na pilha do GeminiClient sem rede.
+
+Dispara requisições concorrentes contra o SyntheticBackend (ou uma gravação
+com --replay) passando pelo cliente completo: cache, single-flight, limite
+de taxa e novas tentativas. Mostra vazão, percentis de latência e erros.
+
+Uso:
+    python scripts/benchmarks/bench_load.py --requests 200 --concurrency 32 --time-scale 0.1
+    python scripts/benchmarks/bench_load.py --replay .gemini_code/recordings/session.jsonl
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+from gemini_code.core.local_backend import ReplayBackend, SyntheticBackend
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def run_load(client: GeminiClient, requests: int, concurrency: int, stream_ratio: float):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            response = await client.generate_response(
+                f"tarefa {i}: analisar módulo {i % 17}", use_cache=False,
+                stream=(i % 100) < stream_ratio * 100
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.startswith("❌"):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--time-scale", type=float, default=0.1, help="1.0 = latências reais")
+    parser.add_argument("--p50", type=float, default=0.8)
+    parser.add_argument("--p95", type=float, default=2.5)
+    parser.add_argument("--tps", type=float, default=80.0, help="tokens de saída por segundo")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--quota-rate", type=float, default=0.05)
+    parser.add_argument("--stream-ratio", type=float, default=0.25)
+    parser.add_argument("--rpm", type=int, default=100_000)
+    parser.add_argument("--replay", type=Path, help="reproduz uma gravação em vez de sintetizar")
+    args = parser.parse_args()
+
+    if args.replay:
+        backend = ReplayBackend(args.replay, time_scale=args.time_scale)
+    else:
+        backend = SyntheticBackend(
+            time_scale=args.time_scale, latency_p50=args.p50, latency_p95=args.p95,
+            tokens_per_second=args.tps, error_rate=args.error_rate, quota_error_rate=args.quota_rate
+        )
+
+    with tempfile.TemporaryDirectory(prefix="gemini_load_") as tmp:
+        config_manager = ConfigManager(Path(tmp))
+        config_manager.config.model.requests_per_minute = args.rpm
+        config_manager.config.model.max_concurrent_requests = args.concurrency
+        client = GeminiClient(api_key="local", config_manager=config_manager, backend=backend)
+
+        elapsed, latencies, errors = asyncio.run(
+            run_load(client, args.requests, args.concurrency, args.stream_ratio)
+        )
+        stats = client.get_performance_stats()
+
+    print(f"📊 {args.requests} requisições, concorrência {args.concurrency}, escala de tempo {args.time_scale}")
+    print(f"  ⏱️ Tempo total: {elapsed:.2f}s | Vazão: {args.requests / elapsed:.1f} req/s")
+    print(f"  📈 Latência p50: {statistics.median(latencies):.3f}s | "
+          f"p95: {percentile(latencies, 0.95):.3f}s | p99: {percentile(latencies, 0.99):.3f}s")
+    print(f"  ❌ Erros finais: {errors} | 🔁 Novas tentativas: {stats['rate_limiter']['retries']}")
+    print(f"  🧪 Backend: {backend.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gravações da memória síncronas vs. fila write-behind.
+
+Simula os turnos de conversa gravando conversa, preferência e padrão no
+memory.db e compara o tempo que cada turno passa gravando (o que o usuário
+sente) e a vazão total até tudo estar confirmado no banco.
+
+Uso:
+    python scripts/benchmarks/bench_memory_writes.py --turns 2000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.memory_system import MemorySystem
+
+
+def run(project_path, turns, write_behind):
+    memory = MemorySystem(project_path, write_behind=write_behind)
+    per_turn = []
+    start = time.perf_counter()
+    for i in range(turns):
+        turn_start = time.perf_counter()
+        memory.remember_conversation(
+            f"pergunta {i} sobre deploy com docker", f"resposta {i} " * 40,
+            intent={'intent': 'create_feature', 'entities': {'language': 'python'}},
+            files_affected=['app.py'],
+        )
+        memory.learn_preference('communication', 'style', 'concise' if i % 2 else 'detailed', 0.7)
+        memory.detect_pattern('user_behavior', f"intent_{i % 7}", "Usuário frequentemente usa comando")
+        per_turn.append(time.perf_counter() - turn_start)
+    memory.flush()
+    total = time.perf_counter() - start
+    stats = memory.writer.get_stats() if memory.writer else None
+    memory.close()
+    return per_turn, total, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"💾 {args.turns} turnos (3 gravações cada)\n")
+    print(f"{'modo':<14} {'p50/turno':>10} {'p99/turno':>10} {'total':>9} {'gravações/s':>12} {'commits':>8}")
+    for name, write_behind in (('síncrono', False), ('write-behind', True)):
+        with tempfile.TemporaryDirectory() as project_path:
+            per_turn, total, stats = run(project_path, args.turns, write_behind)
+        per_turn.sort()
+        commits = stats['transactions'] if stats else args.turns * 3
+        print(f"{name:<14} {statistics.median(per_turn) * 1000:>8.3f}ms "
+              f"{per_turn[int(len(per_turn) * 0.99)] * 1000:>8.3f}ms {total:>8.2f}s "
+              f"{args.turns * 3 / total:>12,.0f} {commits:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latência por complexidade com e sem roteamento entre modelos.
+
+Usa o SyntheticBackend com um perfil de latência por tier (rápido/profundo)
+e dispara uma mistura de pedidos simples e complexos pelo GeminiClient,
+com model.routing ligado e desligado. Mostra p50/p95 por complexidade e
+quantas chamadas foram para cada tier.
+
+Uso:
+    python scripts/benchmarks/bench_routing.py --requests 60 --time-scale 0.2
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+
+PROMPTS = {
+    'simple': ["listar arquivos {i}", "mostrar status {i}", "ajuda com o comando {i}"],
+    'complex': ["refatorar a arquitetura completa do sistema {i} com migração do banco",
+                "análise profunda de performance crítica no módulo {i} e otimização completa"],
+}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def run(client, requests, latency_budget):
+    latencies = {kind: [] for kind in PROMPTS}
+    for i in range(requests):
+        kind = 'simple' if i % 3 else 'complex'
+        prompt = PROMPTS[kind][i % len(PROMPTS[kind])].format(i=i)
+        start = time.perf_counter()
+        await client.generate_response(prompt, use_cache=False, latency_budget=latency_budget)
+        latencies[kind].append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--time-scale", type=float, default=0.2, help="1.0 = latências reais")
+    parser.add_argument("--latency-budget", type=float, default=None, help="segundos (escala real)")
+    args = parser.parse_args()
+
+    for routing in (False, True):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_manager = ConfigManager(Path(temp_dir))
+            config_manager.config.model.backend = 'synthetic'
+            config_manager.config.model.routing = routing
+            config_manager.config.model.response_cache = False
+            config_manager.config.model.backend_options = {'time_scale': args.time_scale, 'output_tokens': 300}
+            client = GeminiClient(api_key=None, config_manager=config_manager)
+
+            latencies = asyncio.run(run(client, args.requests, args.latency_budget))
+            tiers = client.get_performance_stats()['routing']['tiers']
+
+        print(f"\n🧭 roteamento {'LIGADO' if routing else 'DESLIGADO'}")
+        for kind, values in latencies.items():
+            print(f"  {kind:<8} n={len(values):>3} p50={percentile(values, 0.5) * 1000:>7.0f}ms "
+                  f"p95={percentile(values, 0.95) * 1000:>7.0f}ms média={statistics.mean(values) * 1000:>7.0f}ms")
+        if routing:
+            print("  chamadas: " + ", ".join(f"{name}={t['calls']}" for name, t in tiers.items()))
+
+
+if __name__ == "__main__":
+    main()
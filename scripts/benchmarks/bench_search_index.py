@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca com índice de trigramas vs. força-bruta.
+
+Gera um corpus sintético (100k arquivos por padrão), constrói o índice e
+compara o GrepTool com e sem índice para algumas consultas típicas.
+
+Uso:
+    python scripts/benchmarks/bench_search_index.py --files 100000
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.tools.base_tool import ToolInput
+from gemini_code.tools.search_tools import GrepTool
+
+
+WORDS = [
+    "user", "order", "payment", "invoice", "client", "session", "token", "cache",
+    "render", "config", "handler", "request", "response", "service", "model", "queue",
+]
+
+QUERIES = [
+    ("literal comum", "return", False),
+    ("literal raro", "rare_marker_42", False),
+    ("regex", r"def\s+process_invoice_\d+", True),
+    ("alternância", r"PaymentService|InvoiceQueue", True),
+]
+
+
+def generate_corpus(root: Path, file_count: int, seed: int = 42):
+    """Gera arquivos Python sintéticos em subdiretórios."""
+    rng = random.Random(seed)
+    for i in range(file_count):
+        directory = root / f"pkg_{i // 1000:03d}"
+        directory.mkdir(exist_ok=True)
+        a, b = rng.sample(WORDS, 2)
+        lines = [
+            f"class {a.title()}{b.title()}{i}:",
+            f"    def process_{a}_{i}(self, {b}):",
+            f"        return self.{b}_{rng.randint(0, 999)}",
+        ]
+        if i % 5000 == 0:
+            lines.append("# rare_marker_42")
+        (directory / f"module_{i}.py").write_text("\n".join(lines) + "\n")
+
+
+async def time_query(tool: GrepTool, target: Path, pattern: str, regex: bool):
+    tool_input = ToolInput(command=pattern, kwargs={'target': str(target), 'regex': regex})
+    start = time.perf_counter()
+    result = await tool.execute(tool_input)
+    return time.perf_counter() - start, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--keep", action="store_true", help="não apaga o corpus gerado")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="gemini_search_bench_"))
+    corpus = root / "corpus"
+    corpus.mkdir()
+
+    try:
+        print(f"📦 Gerando {args.files:,} arquivos em {corpus}...")
+        start = time.perf_counter()
+        generate_corpus(corpus, args.files)
+        print(f"   ok em {time.perf_counter() - start:.1f}s")
+
+        brute = GrepTool()
+        brute.max_matches = 10**9
+
+        indexed = GrepTool()
+        indexed.max_matches = 10**9
+        index = indexed.enable_index(root)
+        # O índice fica fora do corpus para não entrar na busca
+        files = [p for p in corpus.rglob("*") if p.is_file()]
+
+        start = time.perf_counter()
+        index.refresh(files)
+        print(f"🏗️  Índice construído em {time.perf_counter() - start:.1f}s "
+              f"({index.get_stats()['trigrams']:,} trigramas)")
+
+        start = time.perf_counter()
+        indexed.enable_index(root)
+        print(f"💾 Índice recarregado do disco em {time.perf_counter() - start:.2f}s")
+
+        print(f"\n{'consulta':<14} {'força-bruta':>12} {'indexado':>10} {'speedup':>8} "
+              f"{'candidatos':>11} {'matches':>8}")
+        for name, pattern, regex in QUERIES:
+            brute_time, brute_result = await time_query(brute, corpus, pattern, regex)
+            index_time, index_result = await time_query(indexed, corpus, pattern, regex)
+
+            assert index_result.data['matches'] == brute_result.data['matches'], name
+            print(f"{name:<14} {brute_time:>11.2f}s {index_time:>9.2f}s "
+                  f"{brute_time / max(index_time, 1e-9):>7.1f}x "
+                  f"{index_result.metadata['files_searched']:>11,} "
+                  f"{index_result.metadata['total_matches']:>8,}")
+    finally:
+        if args.keep:
+            print(f"\n📁 Corpus mantido em {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
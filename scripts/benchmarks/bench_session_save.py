@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: autosave de sessão regravando tudo vs. gravação incremental.
+
+Simula uma sessão longa em que cada turno acrescenta uma pergunta e uma
+resposta ao contexto, registra um comando e chama save_session. O modo
+"regrava tudo" reproduz o save antigo (DELETE de todo o contexto e um
+INSERT por item, um commit por comando).
+
+Uso:
+    python scripts/benchmarks/bench_session_save.py --turns 2000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.cli.session_manager import SessionManager
+from gemini_code.core.sqlite_pool import get_pool
+
+
+def full_rewrite(manager, session_id, context):
+    """save_session + log_command como eram antes da gravação incremental."""
+    conn = get_pool(manager.db_path).connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO session_commands (session_id, command, command_type, result, "
+                   "execution_time_ms, success) VALUES (?, ?, ?, ?, ?, ?)",
+                   (session_id, "cmd", 'natural', 'ok', 10, True))
+    cursor.execute("UPDATE sessions SET command_count = command_count + 1, last_active = ? WHERE id = ?",
+                   (datetime.now(), session_id))
+    conn.commit()
+    cursor.execute("UPDATE sessions SET last_active = ?, context_size = ? WHERE id = ?",
+                   (datetime.now(), len(context), session_id))
+    cursor.execute("DELETE FROM session_context WHERE session_id = ?", (session_id,))
+    for item in context:
+        cursor.execute("""
+            INSERT INTO session_context (session_id, timestamp, message_type, content, metadata, token_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (session_id, item['timestamp'], item['type'], item.get('input') or item.get('output'),
+              json.dumps({}), 0))
+    conn.commit()
+    conn.close()
+
+
+async def run(turns, incremental):
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SessionManager(Path(tmp))
+        session_id = (await manager.create_session())['id']
+        context = []
+        per_save = []
+        for i in range(turns):
+            context.append({'timestamp': datetime.now(), 'input': f"pergunta {i} " * 10, 'type': 'user'})
+            context.append({'timestamp': datetime.now(), 'output': f"resposta {i} " * 60, 'type': 'assistant'})
+            start = time.perf_counter()
+            if incremental:
+                await manager.log_command(session_id, "cmd", 'natural', 'ok', 10, True)
+                await manager.save_session(session_id, context)
+            else:
+                full_rewrite(manager, session_id, context)
+            per_save.append(time.perf_counter() - start)
+        get_pool(manager.db_path).close_all()
+    return per_save
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"💾 {args.turns} turnos, autosave a cada turno\n")
+    print(f"{'modo':<16} {'p50/save':>10} {'último save':>12} {'total':>9}")
+    for name, incremental in (('regrava tudo', False), ('incremental', True)):
+        per_save = asyncio.run(run(args.turns, incremental))
+        last = statistics.mean(per_save[-20:])
+        print(f"{name:<16} {statistics.median(per_save) * 1000:>8.3f}ms {last * 1000:>10.3f}ms "
+              f"{sum(per_save):>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca e listagem de sessões com muitas sessões salvas.
+
+Cria N sessões com contexto sintético e compara:
+- busca de um termo comum e de um termo raro: LIKE '%termo%' com JOIN
+  (implementação antiga) vs. FTS5 ranqueado;
+- listagem: página profunda via OFFSET vs. paginação por chave (cursor);
+- retomada: contexto inteiro vs. só o fim (carregamento preguiçoso).
+
+Uso:
+    python scripts/benchmarks/bench_session_search.py --sessions 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.cli.session_manager import SessionManager
+from gemini_code.core.sqlite_pool import get_pool
+
+TOPICS = ["deploy kubernetes", "conexão postgres", "componente react", "testes pytest",
+          "cache redis", "fila rabbitmq", "migração banco", "login oauth"]
+
+
+async def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def like_search(manager, query, limit=10):
+    conn = get_pool(manager.db_path).connect()
+    try:
+        return conn.execute("""
+            SELECT DISTINCT s.id, s.name, s.created_at, s.last_active, s.command_count
+            FROM sessions s
+            LEFT JOIN session_context sc ON s.id = sc.session_id
+            WHERE s.name LIKE ? OR sc.content LIKE ?
+            ORDER BY s.last_active DESC
+            LIMIT ?
+        """, (f'%{query}%', f'%{query}%', limit)).fetchall()
+    finally:
+        conn.close()
+
+
+def offset_page(manager, page, limit=20):
+    conn = get_pool(manager.db_path).connect()
+    try:
+        return conn.execute("""
+            SELECT id, name, created_at, last_active, command_count, status, context_size
+            FROM sessions ORDER BY last_active DESC LIMIT ? OFFSET ?
+        """, (limit, page * limit)).fetchall()
+    finally:
+        conn.close()
+
+
+async def build(manager, sessions, items, rng):
+    for i in range(sessions):
+        session_id = (await manager.create_session(f"sessão {i} {rng.choice(TOPICS)}"))['id']
+        context = [{'content': f"{rng.choice(TOPICS)} passo {j} " + "detalhe " * 30, 'type': 'user'}
+                   for j in range(items)]
+        if i % 500 == 0:
+            context[-1]['content'] += " flamegraph"
+        await manager.save_session(session_id, context)
+    return session_id
+
+
+async def run(args):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SessionManager(Path(tmp))
+        start = time.perf_counter()
+        last_session = await build(manager, args.sessions, args.items, rng)
+        print(f"🗂️ {args.sessions:,} sessões x {args.items} itens criadas em "
+              f"{time.perf_counter() - start:.1f}s\n")
+
+        deep_page = args.sessions // 20 - 1
+        cursor = None
+        for _ in range(deep_page):
+            cursor = (await manager.list_sessions(limit=20, after=cursor))[-1]['cursor']
+        manager.context_page_size = 10
+
+        rows = [
+            ("busca termo comum", lambda: like_search(manager, "rabbitmq"),
+             lambda: manager.search_sessions("rabbitmq")),
+            ("busca termo raro", lambda: like_search(manager, "flamegraph"),
+             lambda: manager.search_sessions("flamegraph")),
+            (f"página {deep_page + 1} da lista", lambda: offset_page(manager, deep_page),
+             lambda: manager.list_sessions(limit=20, after=cursor)),
+            ("retomar sessão", lambda: manager.load_session(last_session, full_context=True),
+             lambda: manager.load_session(last_session)),
+        ]
+        print(f"{'operação':<24} {'antes':>10} {'agora':>10}")
+        for name, before, after in rows:
+            print(f"{name:<24} {await timed(before):>8.2f}ms {await timed(after):>8.2f}ms")
+        get_pool(manager.db_path).close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=40, help="itens de contexto por sessão")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
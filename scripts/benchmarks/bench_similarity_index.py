@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: índice de similaridade (inserção, busca top-k e recall de paráfrases).
+
+Gera descrições sintéticas de problemas, indexa N entradas e mede o tempo
+de inserção, a latência da busca top-k e quantas paráfrases (mesmo
+problema com outras palavras/flexões) voltam em primeiro lugar, comparando
+com a busca antiga por palavra-chave (primeira palavra em comum).
+
+Uso:
+    python scripts/benchmarks/bench_similarity_index.py --entries 10000 100000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.similarity_index import SimilarityIndex, np
+
+PROBLEMS = [
+    ("conexão recusada ao acessar o banco postgres", "o postgres recusou a conectar"),
+    ("timeout no deploy do cluster kubernetes", "deploy demorando até estourar tempo no kubernetes"),
+    ("importação do numpy falhando no ambiente virtual", "falha ao importar numpy na venv"),
+    ("consultas lentas na tabela de pedidos", "lentidão consultando pedidos"),
+    ("vazamento de memória no worker de filas", "worker das filas vazando memória"),
+    ("token jwt expirado no login", "login falha com jwt expirando"),
+]
+
+
+def random_text(rng, vocabulary, words=12):
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+                  for _ in range(30000)]
+    print(f"🔎 numpy: {'sim' if np is not None else 'não (somas em Python)'}\n")
+    print(f"{'entradas':>10} {'inserção':>12} {'p50 busca':>10} {'p99 busca':>10} "
+          f"{'paráfrase@1':>12} {'palavra-chave@1':>16} {'arquivo':>9}")
+
+    for total in args.entries:
+        index = SimilarityIndex()
+        texts = {}
+        start = time.perf_counter()
+        for key in range(total):
+            if key < len(PROBLEMS):
+                text = PROBLEMS[key][0]
+            else:
+                text = random_text(rng, vocabulary)
+            texts[key] = text
+            index.add(key, text)
+        insert_us = (time.perf_counter() - start) / total * 1e6
+
+        latencies = []
+        for _ in range(args.queries):
+            query = random_text(rng, vocabulary, 8)
+            start = time.perf_counter()
+            index.search(query, k=10)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        semantic = sum(1 for key, (_, paraphrase) in enumerate(PROBLEMS)
+                       if [hit.key for hit in index.search(paraphrase, k=1)] == [key])
+        # Busca antiga: primeira palavra da consulta contida no texto (LIKE '%palavra%')
+        keyword = sum(1 for key, (_, paraphrase) in enumerate(PROBLEMS)
+                      if next((k for k, t in texts.items() if paraphrase.split()[0] in t), None) == key)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = index.save(Path(tmp) / 'bench.simidx')
+            size_mb = path.stat().st_size / (1024 * 1024)
+
+        print(f"{total:>10,} {insert_us:>10.1f}µs {statistics.median(latencies) * 1000:>8.3f}ms "
+              f"{latencies[int(len(latencies) * 0.99)] * 1000:>8.3f}ms "
+              f"{semantic:>6}/{len(PROBLEMS):<5} {keyword:>10}/{len(PROBLEMS):<5} {size_mb:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
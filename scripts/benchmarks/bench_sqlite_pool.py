@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: custo por chamada de um store SQLite, sqlite3.connect vs. pool.
+
+Reproduz o padrão dos stores (abrir, uma consulta, fechar) e mede também
+leituras concorrentes enquanto uma thread em segundo plano grava.
+
+Uso:
+    python scripts/benchmarks/bench_sqlite_pool.py --calls 20000
+"""
+
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gemini_code.core.sqlite_pool import SQLitePool
+
+
+QUERY = "SELECT value FROM kv WHERE key = ?"
+
+
+def setup(db_path: Path):
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany("INSERT INTO kv VALUES (?, ?)", ((f"k{i}", "v" * 200) for i in range(5000)))
+    conn.commit()
+    conn.close()
+
+
+def per_call(connect, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        conn = connect()
+        conn.execute(QUERY, (f"k{i % 5000}",)).fetchone()
+        conn.close()
+    return (time.perf_counter() - start) / calls
+
+
+def reads_during_writes(connect, duration: float) -> int:
+    """Leituras completadas enquanto outra thread grava continuamente."""
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            conn = connect()
+            try:
+                conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?)", (f"w{i % 100}", "x" * 200))
+                time.sleep(0.001)  # transação aberta, como um store em segundo plano
+                conn.commit()
+            except sqlite3.OperationalError:
+                pass
+            conn.close()
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        conn = connect()
+        try:
+            conn.execute(QUERY, (f"k{reads % 5000}",)).fetchone()
+            reads += 1
+        except sqlite3.OperationalError:
+            pass
+        conn.close()
+    stop.set()
+    thread.join()
+    return reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--duration", type=float, default=2.0, help="segundos do teste concorrente")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="gemini_sqlite_bench_"))
+    try:
+        raw_db = root / "raw.db"
+        pooled_db = root / "pooled.db"
+        setup(raw_db)
+        setup(pooled_db)
+
+        pool = SQLitePool(pooled_db)
+        raw = lambda: sqlite3.connect(str(raw_db))  # noqa: E731
+
+        raw_call = per_call(raw, args.calls // 10)
+        pooled_call = per_call(pool.connect, args.calls)
+        print(f"{'versão':<16} {'por chamada':>12}")
+        print(f"{'sqlite3.connect':<16} {raw_call * 1e6:>10.1f}µs")
+        print(f"{'pool (WAL)':<16} {pooled_call * 1e6:>10.1f}µs")
+        print(f"⚡ Speedup: {raw_call / pooled_call:.1f}x\n")
+
+        raw_reads = reads_during_writes(raw, args.duration)
+        pooled_reads = reads_during_writes(pool.connect, args.duration)
+        print(f"Leituras em {args.duration:.0f}s com gravação concorrente:")
+        print(f"{'sqlite3.connect':<16} {raw_reads:>12,}")
+        print(f"{'pool (WAL)':<16} {pooled_reads:>12,}")
+        pool.close_all()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
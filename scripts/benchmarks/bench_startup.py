@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tempo de partida a frio (importação em processo novo).
+
+Mede, em processos Python novos, quanto tempo leva importar cada ponto de
+entrada e quais bibliotecas pesadas acabam carregadas.
+
+Uso:
+    python scripts/benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+TARGETS = [
+    "gemini_code",
+    "gemini_code.core.master_system",
+    "gemini_code.metrics",
+    "main",
+]
+HEAVY_MODULES = ["pandas", "numpy", "sklearn", "matplotlib", "seaborn", "networkx", "tiktoken", "psutil"]
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, len(sys.modules), ",".join(heavy) or "-")
+"""
+
+
+def measure(target: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(target=target, heavy=HEAVY_MODULES)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None, 0, result.stderr.strip().splitlines()[-1]
+        elapsed, modules, heavy = result.stdout.strip().splitlines()[-1].split()
+        timings.append(float(elapsed))
+    return statistics.median(timings), int(modules), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'alvo':<34} {'mediana':>9} {'módulos':>8}  pesados")
+    for target in TARGETS:
+        elapsed, modules, heavy = measure(target, args.runs)
+        if elapsed is None:
+            print(f"{target:<34} {'erro':>9} {'':>8}  {heavy}")
+        else:
+            print(f"{target:<34} {elapsed:>8.3f}s {modules:>8}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão da contagem de tokens em arquivos grandes.
+
+Conta os arquivos .py do projeto (concatenados em blocos grandes) como um
+turno faria: várias vezes o mesmo texto. Compara a tokenização sem cache
+com o TokenCounter (estimativa e contagem exata memorizadas).
+
+Uso:
+    python scripts/benchmarks/bench_token_counter.py --passes 3 --block-kb 512
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from gemini_code.core.token_counter import TokenCounter
+
+
+def load_blocks(block_bytes: int):
+    text = "\n".join(p.read_text(encoding="utf-8", errors="ignore")
+                     for p in sorted((PROJECT_ROOT / "gemini_code").rglob("*.py")))
+    return [text[i:i + block_bytes] for i in range(0, len(text), block_bytes)]
+
+
+def throughput(func, blocks, passes: int):
+    total_chars = sum(len(b) for b in blocks) * passes
+    start = time.perf_counter()
+    for _ in range(passes):
+        for block in blocks:
+            func(block)
+    elapsed = time.perf_counter() - start
+    return total_chars / elapsed / 1e6, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passes", type=int, default=3, help="contagens do mesmo texto por turno")
+    parser.add_argument("--block-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    blocks = load_blocks(args.block_kb * 1024)
+    print(f"📄 {len(blocks)} blocos, {sum(len(b) for b in blocks) / 1e6:.1f}M caracteres, {args.passes} passadas\n")
+
+    counter = TokenCounter()
+    encoding = counter.encoding
+    rows = [
+        ("tokenizar sempre", lambda text: len(encoding.encode(text))),
+        ("count() memorizado", counter.count),
+        ("estimate() memorizado", TokenCounter().estimate),
+    ]
+
+    print(f"{'versão':<24} {'Mchar/s':>10} {'tempo':>9}")
+    for name, func in rows:
+        rate, elapsed = throughput(func, blocks, args.passes)
+        print(f"{name:<24} {rate:>10.1f} {elapsed:>8.3f}s")
+
+    print(f"\nTokenizador exato: {'tiktoken' if counter.exact_available else 'indisponível (estimativa)'}")
+
+
+if __name__ == "__main__":
+    main()
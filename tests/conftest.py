@@ -0,0 +1,27 @@
+"""
+Shared fixtures for tests that drive GeminiClient against a local model.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    """Builds a GeminiClient that sends every call to `model` instead of the API.
+
+    `model` only needs the SDK surface the local backends implement:
+    `generate_content(prompt, generation_config=None, stream=False)` returning
+    objects with `.text` (see gemini_code.core.local_backend).
+    """
+    def make(model):
+        return GeminiClient(api_key="test", config_manager=ConfigManager(tmp_path), backend=model)
+    return make
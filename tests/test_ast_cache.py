@@ -0,0 +1,160 @@
+"""
+Unit tests for the shared AST cache.
+"""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.ast_cache import ASTCache
+
+
+class TestASTCache:
+    """Test suite for ASTCache."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory."""
+        temp_dir = tempfile.mkdtemp()
+        yield Path(temp_dir)
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def source_file(self, temp_dir):
+        """Python file with a couple of definitions."""
+        path = temp_dir / "module.py"
+        path.write_text("def foo():\n    return 1\n\nclass Bar:\n    pass\n", encoding='utf-8')
+        return path
+
+    def test_parse_file(self, temp_dir, source_file):
+        """Test parsing returns tree, source and line table."""
+        cache = ASTCache(cache_dir=temp_dir / "cache")
+        parsed = cache.get(source_file)
+
+        assert parsed.ok
+        assert parsed.tree.body[0].name == "foo"
+        assert parsed.lines[0] == "def foo():"
+        assert parsed.line_offsets[1] == len("def foo():\n")
+        assert parsed.line_of_offset(parsed.line_offsets[3]) == 4
+
+    def test_memory_hit(self, temp_dir, source_file):
+        """Test second request for same content does not re-parse."""
+        cache = ASTCache(cache_dir=temp_dir / "cache")
+        first = cache.get(source_file)
+        second = cache.get(source_file)
+
+        stats = cache.get_stats()
+        assert stats['misses'] == 1
+        assert stats['memory_hits'] == 1
+        assert second.tree is first.tree
+
+    def test_warm_run_from_disk(self, temp_dir, source_file):
+        """Test a new cache instance reuses trees persisted on disk."""
+        ASTCache(cache_dir=temp_dir / "cache").get(source_file)
+
+        warm = ASTCache(cache_dir=temp_dir / "cache")
+        parsed = warm.get(source_file)
+
+        stats = warm.get_stats()
+        assert parsed.ok
+        assert stats['misses'] == 0
+        assert stats['disk_hits'] == 1
+        assert stats['hit_rate'] == 1.0
+
+    def test_content_change_invalidates(self, temp_dir, source_file):
+        """Test modified content is parsed again."""
+        cache = ASTCache(cache_dir=temp_dir / "cache")
+        cache.get(source_file)
+        source_file.write_text("x = 1\n", encoding='utf-8')
+        parsed = cache.get(source_file)
+
+        assert cache.get_stats()['misses'] == 2
+        assert len(parsed.tree.body) == 1
+
+    def test_syntax_error_is_cached(self, temp_dir):
+        """Test syntax errors are cached and re-raised like ast.parse."""
+        cache = ASTCache(cache_dir=temp_dir / "cache")
+        broken = temp_dir / "broken.py"
+        broken.write_text("def broken(:\n", encoding='utf-8')
+
+        parsed = cache.get(broken)
+        assert not parsed.ok
+        with pytest.raises(SyntaxError) as exc_info:
+            parsed.get_tree()
+        assert exc_info.value.lineno == 1
+
+        warm = ASTCache(cache_dir=temp_dir / "cache")
+        assert not warm.get(broken).ok
+        assert warm.get_stats()['misses'] == 0
+
+    def test_parse_source_shares_key_with_file(self, temp_dir, source_file):
+        """Test in-memory source and file with same content share the entry."""
+        cache = ASTCache(cache_dir=temp_dir / "cache", persist=False)
+        cache.get(source_file)
+        cache.parse_source(source_file.read_text(encoding='utf-8'))
+
+        assert cache.get_stats()['misses'] == 1
+
+    def test_crlf_and_latin1_share_key_with_source(self, temp_dir):
+        """Test CRLF and non-UTF-8 files hit the entry made by parse_source."""
+        cache = ASTCache(cache_dir=temp_dir / "cache", persist=False)
+        crlf = temp_dir / "crlf.py"
+        crlf.write_bytes(b"x = 1\r\ny = 2\r\n")
+        latin = temp_dir / "latin.py"
+        latin.write_bytes("nome = 'ação'\n".encode('latin-1'))
+
+        cache.parse_source("x = 1\ny = 2\n")
+        cache.parse_source("nome = 'ação'\n")
+        cache.get(crlf)
+        cache.get(latin, encoding='latin-1')
+
+        assert cache.get_stats()['misses'] == 2
+
+    def test_unsigned_entry_is_not_unpickled(self, temp_dir, source_file):
+        """Test a planted pickle without a valid signature is ignored."""
+        import pickle
+
+        cache = ASTCache(cache_dir=temp_dir / "cache", key_path=temp_dir / "key")
+        content_hash = cache.hash_content(source_file.read_text(encoding='utf-8'))
+        planted = cache._entry_path(content_hash)
+        planted.parent.mkdir(parents=True)
+        planted.write_bytes(b"\0" * 32 + pickle.dumps((None, ValueError("planted"))))
+
+        parsed = cache.get(source_file)
+        assert parsed.ok
+        assert cache.get_stats()['misses'] == 1
+
+    def test_entries_need_the_user_key(self, temp_dir, source_file):
+        """Test entries signed with another key are not trusted."""
+        ASTCache(cache_dir=temp_dir / "cache", key_path=temp_dir / "key1").get(source_file)
+        other = ASTCache(cache_dir=temp_dir / "cache", key_path=temp_dir / "key2")
+        other.get(source_file)
+        assert other.get_stats()['disk_hits'] == 0
+
+    @pytest.mark.skipif(not hasattr(__import__('os'), 'getuid'), reason="POSIX permissions")
+    def test_shared_key_disables_persistence(self, temp_dir):
+        """Test a key readable by other users is not used."""
+        key = temp_dir / "key"
+        key.write_bytes(b"k" * 32)
+        key.chmod(0o644)
+        assert ASTCache(cache_dir=temp_dir / "cache", key_path=key).persist is False
+
+    def test_default_dir_is_outside_project(self, temp_dir, monkeypatch):
+        """Test the default cache lives under the user cache dir."""
+        monkeypatch.setenv('XDG_CACHE_HOME', str(temp_dir / "xdg"))
+        cache = ASTCache()
+        assert cache.cache_dir.is_relative_to(temp_dir / "xdg")
+        assert cache.key_path.is_relative_to(temp_dir / "xdg")
+
+    def test_memory_bound(self, temp_dir):
+        """Test LRU bound on in-memory entries."""
+        cache = ASTCache(cache_dir=temp_dir / "cache", max_memory_entries=2, persist=False)
+        for i in range(5):
+            cache.parse_source(f"x = {i}\n")
+
+        assert cache.get_stats()['memory_entries'] == 2
@@ -0,0 +1,253 @@
+"""
+Unit tests for ChunkingSystem and the map-reduce ChunkExecutor.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.chunking_system import ChunkingSystem, ChunkExecutor, ChunkResultMerger, make_gemini_worker
+from gemini_code.core.enhanced_capabilities import EnhancedCapabilities
+
+
+class TestChunkingSystem:
+    """Test suite for chunk creation and merging."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        for i in range(12):
+            (temp_dir / f"module_{i:02d}.py").write_text(f"def f{i}():\n    return {i}\n" * 20)
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_chunk_files_keeps_order_and_covers_all_files(self, temp_dir):
+        """Test parallel loading preserves file order and grouping."""
+        files = sorted(temp_dir.glob("*.py"))
+        chunking = ChunkingSystem(max_chunk_size=400, io_workers=4)
+
+        grouped = [path for chunk, _ in chunking.chunk_files(files) for path in chunk]
+
+        assert grouped == files
+
+    def test_create_chunk_tasks_adds_reduce_step(self, temp_dir):
+        """Test map tasks are followed by a consolidation task."""
+        chunking = ChunkingSystem(max_chunk_size=400)
+        tasks = chunking.create_chunk_tasks(sorted(temp_dir.glob("*.py")), "Resumo do projeto")
+
+        assert len(tasks) > 2
+        assert all(t['total_chunks'] == len(tasks) - 1 for t in tasks[:-1])
+        assert tasks[-1]['consolidate'] is True
+
+    def test_merger_matches_merge_chunk_results(self):
+        """Test incremental merging equals the batch merge."""
+        results = [
+            {'type': 'analysis', 'success': True, 'chunk_id': 2, 'issues': ['b'], 'recommendations': ['x']},
+            {'type': 'analysis', 'success': False, 'chunk_id': 1, 'issues': ['a'],
+             'recommendations': ['x', 'y'], 'errors': ['falhou']},
+        ]
+        merger = ChunkResultMerger()
+        for result in results:
+            merger.add(result)
+
+        merged = ChunkingSystem.merge_chunk_results(ChunkingSystem.__new__(ChunkingSystem), results)
+        assert merger.snapshot() == merged
+        assert merged['success'] is False
+        assert merged['processed_chunks'] == 1
+        assert merged['analysis']['issues'] == ['b', 'a']
+        assert merged['analysis']['recommendations'] == ['x', 'y']
+        assert [r['chunk_id'] for r in merged['results']] == [1, 2]
+        assert merged['errors'] == ['falhou']
+
+
+class TestChunkExecutor:
+    """Test suite for ChunkExecutor."""
+
+    def _tasks(self, count):
+        return [{'type': 'analysis_chunk', 'chunk_id': i + 1} for i in range(count)]
+
+    def test_runs_concurrently_with_bound(self):
+        """Test chunks overlap in time but never exceed max_concurrency."""
+        active = 0
+        peak = 0
+
+        async def worker(task):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return {'type': 'analysis', 'success': True, 'issues': [task['chunk_id']]}
+
+        executor = ChunkExecutor(worker, max_concurrency=3)
+        merged = asyncio.run(executor.run(self._tasks(9)))
+
+        assert peak == 3
+        assert merged['success'] is True
+        assert sorted(merged['analysis']['issues']) == list(range(1, 10))
+        assert executor.stats.elapsed < 9 * 0.02
+
+    def test_incremental_results_and_reduce_step(self):
+        """Test on_result sees growing partials and consolidation runs last."""
+        partial_sizes = []
+
+        async def worker(task):
+            if task.get('consolidate'):
+                return {'type': 'analysis', 'success': True,
+                        'summary_of': len(task['partial']['results'])}
+            await asyncio.sleep(0.01 * task['chunk_id'])
+            return {'type': 'analysis', 'success': True}
+
+        tasks = self._tasks(4) + [{'type': 'analysis_summary', 'chunk_id': 5, 'consolidate': True}]
+        executor = ChunkExecutor(worker, max_concurrency=4)
+        merged = asyncio.run(executor.run(
+            tasks, on_result=lambda result, partial: partial_sizes.append(partial['processed_chunks'])
+        ))
+
+        assert partial_sizes == [1, 2, 3, 4, 5]
+        assert merged['results'][-1]['summary_of'] == 4
+
+    def test_dependencies_are_respected(self):
+        """Test tasks with 'input' wait for the producer of that output."""
+        order = []
+
+        async def worker(task):
+            await asyncio.sleep(0.03 if task['chunk_id'] == 1 else 0)
+            order.append(task['chunk_id'])
+            return {'type': 'feature', 'success': True, 'components': task['chunk_id'],
+                    'saw_inputs': task.get('inputs')}
+
+        tasks = [
+            {'type': 'feature_design', 'chunk_id': 1, 'output': 'design_doc'},
+            {'type': 'feature_backend', 'chunk_id': 2, 'input': 'design_doc', 'output': 'backend_code'},
+            {'type': 'feature_tests', 'chunk_id': 3, 'input': ['backend_code']},
+        ]
+        merged = asyncio.run(ChunkExecutor(worker, max_concurrency=3).run(tasks))
+
+        assert order == [1, 2, 3]
+        assert merged['results'][1]['saw_inputs']['design_doc']['chunk_id'] == 1
+        assert merged['feature']['components'] == [1, 2, 3]
+
+    def test_retry_per_chunk(self):
+        """Test a flaky chunk is retried and a broken one reported."""
+        attempts = {}
+
+        async def worker(task):
+            attempts[task['chunk_id']] = attempts.get(task['chunk_id'], 0) + 1
+            if task['chunk_id'] == 1 and attempts[1] < 2:
+                raise RuntimeError("instável")
+            if task['chunk_id'] == 2:
+                raise RuntimeError("quebrado")
+            return {'type': 'analysis', 'success': True}
+
+        executor = ChunkExecutor(worker, max_retries=2, retry_delay=0.001)
+        merged = asyncio.run(executor.run(self._tasks(3)))
+
+        assert attempts == {1: 2, 2: 3, 3: 1}
+        assert merged['success'] is False
+        assert merged['processed_chunks'] == 2
+        assert any('quebrado' in error for error in merged['errors'])
+
+    def test_gemini_worker_error_responses_are_retried(self):
+        """Test error strings from generate_response are retried and reported per chunk."""
+        class FailingClient:
+            def __init__(self):
+                self.calls = []
+
+            async def generate_response(self, prompt, **kwargs):
+                self.calls.append(prompt)
+                # chunk 1 falha uma vez; chunk 2 falha sempre
+                if "chunk 2" in prompt or self.calls.count(prompt) == 1:
+                    return "❌ Erro ao gerar resposta: 500"
+                return "ok"
+
+        client = FailingClient()
+        tasks = [dict(task, description=f"chunk {task['chunk_id']}") for task in self._tasks(2)]
+        executor = ChunkExecutor(make_gemini_worker(client), max_retries=2, retry_delay=0.001)
+        merged = asyncio.run(executor.run(tasks))
+
+        assert len(client.calls) == 5
+        assert executor.stats.retries == 3
+        assert merged['success'] is False
+        assert merged['processed_chunks'] == 1
+        assert merged['errors'] == ["Chunk 2: ❌ Erro ao gerar resposta: 500"]
+
+    def test_cancel_stops_pending_chunks(self):
+        """Test cancel() returns a partial result promptly."""
+        async def worker(task):
+            await asyncio.sleep(0.01 if task['chunk_id'] == 1 else 10)
+            return {'type': 'analysis', 'success': True}
+
+        executor = ChunkExecutor(worker, max_concurrency=2)
+
+        async def scenario():
+            return await executor.run(self._tasks(6), on_result=lambda result, partial: executor.cancel())
+
+        merged = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+        assert merged['cancelled'] is True
+        assert merged['success'] is False
+        assert merged['processed_chunks'] == 1
+        assert executor.stats.cancelled == 5
+
+
+class FakeGeminiClient:
+    """Counts prompts and answers each one with its chunk marker."""
+
+    def __init__(self, context_budget_tokens):
+        self.context_budget_tokens = context_budget_tokens
+        self.prompts = []
+
+    def enable_massive_context_mode(self):
+        pass
+
+    def estimate_tokens(self, text):
+        return len(text) // 4
+
+    async def generate_response(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if "Resultados parciais" in prompt:
+            return "consolidado"
+        return f"parcial {len(self.prompts)}"
+
+
+class TestProjectAnalysisInChunks:
+    """Test EnhancedCapabilities.analyze_entire_project uses the executor for large projects."""
+
+    @pytest.fixture
+    def project(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        for i in range(12):
+            (temp_dir / f"module_{i:02d}.py").write_text(f"def f{i}():\n    return {i}\n" * 20)
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_large_project_is_map_reduced(self, project):
+        """Test a project over the context budget is analyzed per chunk and consolidated."""
+        client = FakeGeminiClient(context_budget_tokens=1000)
+        capabilities = EnhancedCapabilities(client)
+        capabilities.chunking = ChunkingSystem(max_chunk_size=400)
+
+        result = asyncio.run(capabilities.analyze_entire_project(str(project)))
+
+        chunks = result['project_stats']['chunks']
+        assert chunks['chunks'] > 2
+        assert len(client.prompts) == chunks['chunks']
+        assert chunks['max_parallel'] > 1
+        assert result['detailed_analysis'] == "consolidado"
+
+    def test_small_project_uses_one_call(self, project):
+        """Test a project that fits the budget keeps the single massive-context call."""
+        client = FakeGeminiClient(context_budget_tokens=10 ** 6)
+        result = asyncio.run(EnhancedCapabilities(client).analyze_entire_project(str(project)))
+
+        assert len(client.prompts) == 1
+        assert 'chunks' not in result['project_stats']
+
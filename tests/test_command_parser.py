@@ -0,0 +1,42 @@
+"""
+Tests for CommandParser slash command parsing.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.cli.command_parser import CommandParser
+
+
+class TestSessionsCommand:
+    """Test suite for /sessions parsing."""
+
+    @pytest.fixture
+    def parser(self):
+        return CommandParser()
+
+    def test_search_query_skips_flag_values(self, parser):
+        """Test --limit and its value stay out of the search query."""
+        parsed = asyncio.run(parser.parse_slash_command("/sessions search foo --limit 5 bar"))
+        assert parsed['action'] == 'search'
+        assert parsed['query'] == "foo bar"
+        assert parsed['limit'] == 5
+
+    def test_flags_before_session_id(self, parser):
+        """Test a leading flag is not taken as the session id."""
+        parsed = asyncio.run(parser.parse_slash_command("/sessions switch --limit=3 abc123"))
+        assert parsed['session_id'] == "abc123"
+
+        parsed = asyncio.run(parser.parse_slash_command("/sessions list --limit 5"))
+        assert parsed['session_id'] is None
+        assert parsed['query'] == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
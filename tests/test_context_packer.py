@@ -0,0 +1,169 @@
+"""
+Unit tests for relevance-ranked context packing.
+"""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.context_packer import ContextCandidate, ContextPacker
+from gemini_code.core.token_counter import TokenCounter
+
+
+FILLER = "conversa sobre assuntos gerais do dia a dia " * 20
+
+
+class TestContextPacker:
+    """Test suite for ContextPacker."""
+
+    @pytest.fixture
+    def packer(self):
+        return ContextPacker(TokenCounter())
+
+    def test_relevant_items_win_under_a_tight_budget(self, packer):
+        """Test the item matching the query is chosen over irrelevant ones."""
+        candidates = [
+            ContextCandidate(FILLER, kind='memory'),
+            ContextCandidate("erro no login: token JWT expirado no middleware de autenticação", kind='memory'),
+            ContextCandidate(FILLER + " fim", kind='memory'),
+        ]
+
+        packed = packer.pack("corrigir erro de login com JWT", candidates, budget_tokens=60)
+
+        assert [c.content[:10] for c in packed.selected] == ["erro no lo"]
+        assert packed.tokens <= 60
+
+    def test_budget_is_respected_and_irrelevant_items_dropped(self, packer):
+        """Test the total never exceeds the budget and zero-value items stay out."""
+        candidates = [ContextCandidate(f"banco de dados postgres índice {i} " * 30, kind='file')
+                      for i in range(20)]
+        candidates.append(ContextCandidate("receita de bolo de cenoura", kind='memory'))
+
+        packed = packer.pack("otimizar índice do banco de dados", candidates, budget_tokens=500)
+
+        assert packed.tokens <= 500
+        assert all("bolo" not in c.content for c in packed.selected)
+        assert any("bolo" in c.content for c in packed.dropped)
+
+    def test_pinned_items_survive_without_relevance(self, packer):
+        """Test the latest turn is kept even when it shares no terms with the query."""
+        candidates = [
+            ContextCandidate("mensagem antiga qualquer", kind='history', role='user'),
+            ContextCandidate("última resposta do assistente", kind='history', role='assistant', pinned=True),
+        ]
+
+        packed = packer.pack("e agora?", candidates, budget_tokens=1000)
+
+        assert [m['content'] for m in packed.messages] == ["última resposta do assistente"]
+
+    def test_large_relevant_item_is_truncated_around_the_match(self, packer):
+        """Test a big file is cut to a window around the query term."""
+        content = ("linha irrelevante\n" * 400) + "def calcular_imposto(valor):\n" + ("outra linha\n" * 400)
+        candidates = [ContextCandidate(content, kind='file', truncatable=True)]
+
+        packed = packer.pack("onde fica calcular_imposto?", candidates, budget_tokens=200)
+
+        assert packed.selected[0].truncated
+        assert "calcular_imposto" in packed.messages[0]['content']
+        assert packed.tokens <= 200
+
+    def test_output_keeps_sections_and_chronology(self, packer):
+        """Test system/memory items come first and history stays in order."""
+        candidates = [
+            ContextCandidate("cache redis primeira", kind='history', role='user', recency=0.5),
+            ContextCandidate("cache redis segunda", kind='history', role='assistant', recency=1.0),
+            ContextCandidate("memória sobre cache redis", kind='memory'),
+        ]
+
+        packed = packer.pack("cache redis", candidates, budget_tokens=1000)
+
+        assert [m['content'] for m in packed.messages] == [
+            "memória sobre cache redis", "cache redis primeira", "cache redis segunda"
+        ]
+
+    def test_pack_messages_shortcut(self, packer):
+        """Test plain message lists are packed with the last turn pinned."""
+        messages = [{'role': 'user', 'content': f"assunto {i} " * 50} for i in range(30)]
+        messages[3]['content'] = "deploy kubernetes falhou " * 5
+
+        packed = packer.pack_messages("por que o deploy kubernetes falhou", messages, budget_tokens=300)
+
+        contents = [m['content'] for m in packed]
+        assert contents == [messages[3]['content'], messages[-2]['content'], messages[-1]['content']]
+
+
+class TestConversationIntegration:
+    """Test suite for ConversationManager and GeminiClient packing."""
+
+    @pytest.fixture
+    def manager(self):
+        from gemini_code.core.conversation_manager import ConversationManager
+
+        temp_dir = tempfile.mkdtemp()
+        (Path(temp_dir) / "pagamentos.py").write_text("def processar_pagamento(pedido):\n    return True\n")
+        manager = ConversationManager(temp_dir, Mock(), context_budget_tokens=4000)
+        yield manager
+        shutil.rmtree(temp_dir)
+
+    def test_turn_budget_depends_on_intent(self, manager):
+        """Test simple turns get a quarter of the budget."""
+        assert manager._context_budget({'intent': 'refactor'}) == 4000
+        assert manager._context_budget({'intent': 'general'}) == 1000
+
+    def test_long_relevant_history_and_active_files_are_used(self, manager):
+        """Test relevant turns are not cut at 500 chars and mentioned files are included."""
+        long_answer = "A função processar_pagamento valida o pedido. " * 30
+        manager.current_context.messages = [
+            {'role': 'user', 'content': 'como funciona processar_pagamento?'},
+            {'role': 'assistant', 'content': long_answer},
+        ] + [{'role': 'user', 'content': f'outro assunto {i}'} for i in range(6)]
+        manager._track_active_files(["pagamentos.py", "../fora.py", "nao_existe.py"])
+
+        context = manager._prepare_context_for_gemini(
+            "refatorar processar_pagamento", {'intent': 'refactor'},
+            {'similar_conversations': [], 'error_solutions': [], 'user_preferences': {}, 'project_patterns': []}
+        )
+
+        contents = [m['content'] for m in context]
+        assert long_answer in contents
+        assert any(c.startswith("📄 pagamentos.py") for c in contents)
+        assert manager.current_context.active_files == ["pagamentos.py"]
+        assert manager.last_context_pack.tokens <= 4000
+
+    def test_recorded_tool_output_reaches_next_turn(self, manager):
+        """Test command output recorded by the REPL is a context candidate on later turns."""
+        manager.record_tool_output("pytest -q", "FAILED test_pagamentos.py::test_processar_pagamento")
+
+        context = manager._prepare_context_for_gemini(
+            "por que test_processar_pagamento falhou?", {'intent': 'debug'},
+            {'similar_conversations': [], 'error_solutions': [], 'user_preferences': {}, 'project_patterns': []}
+        )
+
+        assert any(m['content'].startswith("🛠️ Saída de pytest -q") for m in context)
+
+    def test_client_packs_context_that_overflows_its_budget(self, monkeypatch):
+        """Test _build_prompt keeps the relevant message when the context is too big."""
+        from gemini_code.core import gemini_client as gemini_client_module
+        from gemini_code.core.config import ConfigManager
+        from gemini_code.core.gemini_client import GeminiClient
+
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            monkeypatch.setattr(gemini_client_module, 'GENAI_AVAILABLE', False)
+            client = GeminiClient(api_key="test", config_manager=ConfigManager(temp_dir))
+            client.context_budget_tokens = 300
+            context = [{'role': 'user', 'content': FILLER} for _ in range(20)]
+            context.insert(5, {'role': 'user', 'content': 'a migração do banco quebrou a tabela clientes'})
+
+            prompt = client._build_prompt("por que a migração quebrou a tabela clientes?", context)
+
+            assert 'a migração do banco quebrou a tabela clientes' in prompt
+            assert prompt.count("conversa sobre assuntos gerais") < 20 * 20
+        finally:
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,140 @@
+"""
+Unit tests for end-to-end streaming in GeminiClient.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.conversation_manager import ConversationManager
+from gemini_code.core.local_backend import LocalChunk, LocalResponse
+
+
+class FakeStreamingModel:
+    """Modelo que produz trechos com atraso, bloqueando a thread chamadora."""
+
+    def __init__(self, chunks, delay=0.05, fail_after=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.fail_after = fail_after
+        self.produced = 0
+        self.stream_calls = []
+        self._generation_config = {}
+
+    def generate_content(self, prompt, stream=False, generation_config=None):
+        if not stream:
+            return LocalResponse("".join(self.chunks))
+        self.stream_calls.append(generation_config)
+        return self._iterate()
+
+    def _iterate(self):
+        for i, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("conexão perdida")
+            time.sleep(self.delay)
+            self.produced += 1
+            yield LocalChunk(chunk)
+
+
+class TestGeminiStreaming:
+    """Test suite for GeminiClient.stream_response and its callers."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def client(self, make_client):
+        return make_client(FakeStreamingModel(["Olá", ", ", "mundo", "!"]))
+
+    def test_chunks_arrive_incrementally_without_blocking_loop(self, client):
+        """Test chunks are yielded one by one while the loop keeps running."""
+        async def scenario():
+            ticks = 0
+            stop = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not stop.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            ticker_task = asyncio.create_task(ticker())
+            received = []
+            async for chunk in client.stream_response("explicar"):
+                received.append((chunk, ticks))
+            stop.set()
+            await ticker_task
+            return received
+
+        received = asyncio.run(scenario())
+
+        assert [chunk for chunk, _ in received] == ["Olá", ", ", "mundo", "!"]
+        # O ticker avançou entre os trechos: o event loop não ficou bloqueado
+        tick_values = [tick for _, tick in received]
+        assert tick_values == sorted(tick_values)
+        assert tick_values[-1] > tick_values[0]
+
+    def test_time_to_first_token_is_recorded(self, client):
+        """Test TTFT is measured and exposed in performance stats."""
+        asyncio.run(client.generate_response("explicar", stream=True))
+
+        stats = client.get_performance_stats()['streaming']
+        assert stats['streams'] == 1
+        assert stats['last_time_to_first_token'] >= 0.04
+        assert stats['avg_time_to_first_token'] == stats['last_time_to_first_token']
+        assert client.model.stream_calls[0]['max_output_tokens'] == client.max_output_tokens
+
+    def test_generate_response_stream_returns_text_and_calls_on_chunk(self, client):
+        """Test stream=True returns the full text and forwards every chunk."""
+        seen = []
+
+        async def async_callback(chunk):
+            seen.append(chunk)
+
+        text = asyncio.run(client.generate_response("explicar", stream=True, on_chunk=async_callback))
+
+        assert text == "Olá, mundo!"
+        assert seen == ["Olá", ", ", "mundo", "!"]
+
+    def test_errors_are_reported_as_final_chunk(self, client):
+        """Test a failure mid-stream ends the iterator with an error chunk."""
+        client.model = FakeStreamingModel(["a", "b", "c"], delay=0, fail_after=2)
+
+        text = asyncio.run(client.generate_response("explicar", stream=True))
+
+        assert text.startswith("ab❌ Erro no streaming")
+
+    def test_early_exit_stops_worker(self, client):
+        """Test abandoning the iterator tells the worker thread to stop."""
+        client.model = FakeStreamingModel([str(i) for i in range(50)], delay=0.01)
+
+        async def scenario():
+            stream = client.stream_response("explicar")
+            async for _ in stream:
+                break
+            await stream.aclose()
+            await asyncio.sleep(0.1)
+
+        asyncio.run(scenario())
+        assert client.model.produced < 50
+
+    def test_conversation_manager_streams_through_on_chunk(self, client, temp_dir):
+        """Test ConversationManager forwards chunks and stores the full response."""
+        manager = ConversationManager(str(temp_dir), client)
+        seen = []
+
+        result = asyncio.run(manager.process_message("explicar o projeto", on_chunk=seen.append))
+
+        assert seen == ["Olá", ", ", "mundo", "!"]
+        assert result['response'] == "Olá, mundo!"
+        assert result['success'] is True
@@ -0,0 +1,82 @@
+"""
+Stress tests for per-request generation config isolation in GeminiClient.
+"""
+
+import pytest
+import asyncio
+import random
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.local_backend import LocalResponse
+from gemini_code.core.rate_limiter import RateLimiter
+
+
+class EchoModel:
+    """Backend simulado que devolve a configuração recebida em cada chamada."""
+
+    def __init__(self):
+        self._generation_config = {"max_output_tokens": 8192, "temperature": 0.3}
+        self.calls = 0
+
+    def _echo(self, prompt, generation_config):
+        request_id = prompt.rsplit("req-", 1)[1].split()[0]
+        config = generation_config or {}
+        return f"req-{request_id} max={config.get('max_output_tokens')} temp={config.get('temperature')}"
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        time.sleep(random.uniform(0, 0.005))
+        text = self._echo(prompt, generation_config)
+        if stream:
+            return iter([LocalResponse(text[:5]), LocalResponse(text[5:])])
+        return LocalResponse(text)
+
+
+class TestGenerationConfigIsolation:
+    """Test suite for concurrent requests with different settings."""
+
+    @pytest.fixture
+    def client(self, make_client):
+        client = make_client(EchoModel())
+        client._base_generation_config = dict(client.model._generation_config)
+        client.rate_limiter = RateLimiter(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9,
+                                          max_concurrency=64)
+        return client
+
+    def test_hundreds_of_overlapping_requests_keep_their_config(self, client):
+        """Test each concurrent request receives exactly its own settings."""
+        requests = []
+        for i in range(300):
+            budget = random.choice([2048, 8192, 16384, 30000])
+            requests.append((i, budget, 256 + i, i % 4 == 0))
+
+        async def one(i, budget, max_tokens, stream):
+            response = await client.generate_response(
+                f"req-{i} listar", thinking_budget=budget, use_cache=False, stream=stream,
+                generation_config={"max_output_tokens": max_tokens}
+            )
+            return i, budget, max_tokens, response
+
+        async def scenario():
+            return await asyncio.gather(*(one(*request) for request in requests))
+
+        for i, budget, max_tokens, response in asyncio.run(scenario()):
+            temperature = 0.05 if budget > 24576 else client.config.model.temperature
+            assert response == f"req-{i} max={max_tokens} temp={temperature}"
+
+        assert client.model.calls == 300
+        assert client.model._generation_config == {"max_output_tokens": 8192, "temperature": 0.3}
+
+    def test_request_config_is_immutable(self, client):
+        """Test the prepared per-call config cannot be modified."""
+        *_, config = client._prepare_generation("oi", None, 2048, False, {"top_k": 1})
+
+        assert config["top_k"] == 1
+        with pytest.raises(TypeError):
+            config["max_output_tokens"] = 1
+        assert "top_k" not in client._base_generation_config
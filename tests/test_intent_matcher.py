@@ -0,0 +1,101 @@
+"""
+Unit tests for the compiled intent matcher and single-pass normalization.
+"""
+
+import pytest
+import re
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.nlp_enhanced import NLPEnhanced, IntentType, IntentMatcher
+
+
+MESSAGES = [
+    "cria um agente chamado vendas",
+    "preciso de um agente para atender clientes",
+    "adiciona um botão de exportar relatório",
+    "crie uma api rest completa com autenticação jwt",
+    "corrige o erro no login agora",
+    "faz deploy urgente",
+    "mostra os arquivos da pasta src",
+    "vai para a pasta /home/user/projeto",
+    "roda os testes",
+    "executar pytest",
+    "como faço para criar uma tabela?",
+    "acho que talvez precise refatorar o módulo de pagamentos",
+    "commit e push das alterações",
+    "o que é clean architecture?",
+    "ajuda",
+    "otimiza a performance do dashboard",
+    "faz backup do banco de dados",
+    "quero um sistema tipo Uber mas para entregas",
+    "analisa o projeto inteiro",
+    "qualquer coisa sem sentido xyz",
+    "KELVIN e Kafka no AGENTE Novo",
+]
+
+
+def reference_matches(nlp, text, skip):
+    """Avaliação original: re.search de cada padrão de cada intenção."""
+    results = []
+    for intent_type, patterns in nlp.patterns.items():
+        if intent_type in skip:
+            continue
+        matched = [base for pattern, base in patterns if re.search(pattern, text, re.IGNORECASE)]
+        if matched:
+            results.append((intent_type, max(matched)))
+    return results
+
+
+class TestIntentMatcher:
+    """Test suite for IntentMatcher."""
+
+    @pytest.fixture
+    def nlp(self):
+        return NLPEnhanced()
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_matches_equal_reference(self, nlp, message):
+        """Test the prefiltered matcher finds exactly the same intents."""
+        text = nlp._normalize_text(message)
+        assert nlp.matcher.matches(text) == reference_matches(nlp, text, set())
+
+    def test_prefilter_handles_literal_prefixes(self):
+        """Test literals that are prefixes of other literals are still detected."""
+        matcher = IntentMatcher({
+            IntentType.CREATE_AGENT: [(r'agente\s+novo', 0.9)],
+            IntentType.CREATE_FILE: [(r'agent\b', 0.8)],
+            IntentType.DELETE: [(r'gente', 0.7)],
+        })
+
+        assert matcher.matches("um agente novo") == [
+            (IntentType.CREATE_AGENT, 0.9), (IntentType.DELETE, 0.7)
+        ]
+        assert matcher.matches("AGENT") == [(IntentType.CREATE_FILE, 0.8)]
+
+    def test_matcher_is_shared_between_instances(self):
+        """Test patterns are compiled once per pattern table."""
+        assert NLPEnhanced().matcher is NLPEnhanced().matcher
+
+
+class TestNormalization:
+    """Test suite for single-pass _normalize_text."""
+
+    @pytest.fixture
+    def nlp(self):
+        return NLPEnhanced()
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Vc   TÁ aí?", "você está aí?"),
+        ("Manda PRA mim q eu vejo", "manda para mim que eu vejo"),
+        ("n sei", "não sei"),
+        ("Abre o Config.PY pra mim", "abre o Config.PY para mim"),
+        ("pra pasta C:\\Projetos\\App", "para pasta C:\\Projetos\\App"),
+        ("Vai pro /Home/User", "vai para o /Home/User"),
+    ])
+    def test_normalize(self, nlp, text, expected):
+        """Test abbreviations expand while paths keep their original case."""
+        assert nlp._normalize_text(text) == expected
@@ -0,0 +1,175 @@
+"""
+Unit tests for lazy subsystem loading and the startup profile.
+"""
+
+import pytest
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.dependency_injection import DependencyContainer
+from gemini_code.core.lazy_loader import (
+    LazyModule, StartupProfiler, import_object, is_available, lazy_import
+)
+from gemini_code.core.master_system import GeminiCodeMasterSystem
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ['pandas', 'numpy', 'sklearn', 'matplotlib', 'seaborn', 'networkx', 'tiktoken', 'psutil']
+
+
+def loaded_modules(code):
+    """Roda `code` num processo novo e retorna os módulos importados."""
+    script = f"import sys\n{code}\nprint('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_ROOT,
+        capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    """Test suite for lazy package exports and LazyModule."""
+
+    def test_package_import_is_cheap(self):
+        """Test `import gemini_code` loads no subsystem or heavy library."""
+        modules = loaded_modules("import gemini_code")
+
+        assert not [m for m in modules if m.startswith('gemini_code.') and m != 'gemini_code.core'
+                    and m != 'gemini_code.core.lazy_loader']
+        assert not modules & set(HEAVY_MODULES)
+
+    def test_heavy_libraries_deferred_until_used(self):
+        """Test modules that use pandas/networkx import them only on first use."""
+        modules = loaded_modules(
+            "import gemini_code.cognition.architectural_reasoning\n"
+            "import gemini_code.database.database_manager\n"
+            "import gemini_code.core.master_system"
+        )
+
+        assert not modules & set(HEAVY_MODULES)
+
+    def test_package_attributes_resolve_on_access(self):
+        """Test lazy exports return the real classes and cache them."""
+        import gemini_code
+        from gemini_code.core.nlp_enhanced import NLPEnhanced
+
+        assert gemini_code.NLPEnhanced is NLPEnhanced
+        assert 'NLPEnhanced' in vars(gemini_code)
+        assert set(gemini_code.__all__) <= set(dir(gemini_code))
+        with pytest.raises(AttributeError):
+            gemini_code.DoesNotExist
+
+    def test_lazy_module_loads_on_first_attribute(self):
+        """Test the proxy imports once and records the import time."""
+        profiler = StartupProfiler()
+        module = LazyModule('colorsys', stage='import colorsys')
+
+        from gemini_code.core import lazy_loader
+        original = lazy_loader._startup_profiler
+        lazy_loader._startup_profiler = profiler
+        try:
+            assert module.is_loaded is False
+            assert module.rgb_to_hsv(1, 0, 0)[0] == 0.0
+            assert module.is_loaded is True
+        finally:
+            lazy_loader._startup_profiler = original
+
+        assert 'import colorsys' in profiler.stages
+        assert lazy_import('sys') is sys
+
+    def test_availability_and_import_object(self):
+        """Test availability checks do not import and dotted paths resolve."""
+        assert is_available('json')
+        assert not is_available('modulo_que_nao_existe')
+        assert import_object('gemini_code.core.lazy_loader.StartupProfiler') is StartupProfiler
+        with pytest.raises(ModuleNotFoundError):
+            import_object('modulo_que_nao_existe.Classe')
+
+
+class TestStartupProfiler:
+    """Test suite for StartupProfiler and the container integration."""
+
+    def test_nested_measurements_are_exclusive(self):
+        """Test import time inside a stage is not counted as init time too."""
+        profiler = StartupProfiler()
+        with profiler.measure('core'):
+            time.sleep(0.02)
+            with profiler.measure('core', 'import'):
+                time.sleep(0.03)
+        profiler.mark_ready()
+        with profiler.measure('monitoring'):
+            pass
+
+        report = profiler.report()
+        core, monitoring = report['stages']
+        assert core['import_seconds'] >= 0.03
+        assert 0.02 <= core['init_seconds'] < 0.03
+        assert core['deferred'] is False
+        assert monitoring['deferred'] is True
+        assert "monitoring (sob demanda)" in profiler.format_report()
+
+    def test_container_imports_string_services_on_first_get(self):
+        """Test services registered by path are imported and timed when first used."""
+        profiler = StartupProfiler()
+        container = DependencyContainer(profiler=profiler)
+        container.register('profiler_service', 'gemini_code.core.lazy_loader.StartupProfiler')
+
+        assert container.is_registered('profiler_service')
+        assert not container.is_loaded('profiler_service')
+
+        service = container.get('profiler_service')
+
+        assert isinstance(service, StartupProfiler)
+        assert container.get('profiler_service') is service
+        assert 'profiler_service' in profiler.stages
+
+
+class TestDeferredStages:
+    """Test suite for GeminiCodeMasterSystem deferred stages."""
+
+    @pytest.fixture
+    def system(self, tmp_path):
+        system = GeminiCodeMasterSystem(str(tmp_path), profiler=StartupProfiler())
+        system.loads = []
+
+        def load_monitoring():
+            system.loads.append('monitoring')
+            system.health_monitor = "monitor"
+
+        system._load_monitoring = load_monitoring
+        return system
+
+    def test_attributes_are_none_before_initialize(self, system):
+        """Test deferred attributes keep the old None default."""
+        assert system.health_monitor is None
+        assert system.mcp_client is None
+        assert system.loads == []
+        with pytest.raises(AttributeError):
+            system.not_a_component
+
+    def test_stage_loads_once_on_first_access(self, system):
+        """Test the first access loads the stage and others reuse it."""
+        system._pending_stages.add('monitoring')
+
+        assert system._stage_available('health_monitor')
+        assert system.health_monitor == "monitor"
+        assert system.error_detector is None
+        assert system.health_monitor == "monitor"
+        assert system.loads == ['monitoring']
+        assert [s['name'] for s in system.get_startup_profile()['stages']] == ['monitoring']
+
+    def test_health_check_does_not_force_deferred_stages(self, system):
+        """Test the health check reports pending stages without loading them."""
+        system._pending_stages.add('monitoring')
+
+        health = asyncio.run(system.comprehensive_health_check())
+
+        assert health['systems']['monitoring'] == {'status': 'healthy', 'deferred': True}
+        assert system.loads == []
+        assert system.get_startup_profile()['pending_stages'] == ['monitoring']
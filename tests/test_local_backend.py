@@ -0,0 +1,180 @@
+"""
+Unit tests for the local record/replay/synthetic model backends.
+"""
+
+import pytest
+import asyncio
+import statistics
+import tempfile
+import shutil
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core import gemini_client as gemini_client_module
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+from gemini_code.core.local_backend import (
+    LocalBackendError, RecordingBackend, ReplayBackend, SyntheticBackend, create_backend
+)
+from gemini_code.core.rate_limiter import RateLimiter, is_quota_error
+
+
+class TestSyntheticBackend:
+    """Test suite for SyntheticBackend."""
+
+    def test_responses_are_deterministic_per_request(self):
+        """Test the same seed and prompt sequence always yields the same text."""
+        first = SyntheticBackend(time_scale=0, seed=7)
+        second = SyntheticBackend(time_scale=0, seed=7)
+
+        texts = [first.generate_content("p").text for _ in range(3)]
+        assert texts == [second.generate_content("p").text for _ in range(3)]
+        assert len(set(texts)) == 3  # cada ocorrência é sorteada de novo
+
+    def test_occurrence_tracking_is_bounded(self):
+        """Test long runs with distinct prompts keep a bounded occurrence table."""
+        backend = SyntheticBackend(time_scale=0, max_tracked_prompts=50)
+        for i in range(500):
+            backend._plan(f"prompt {i}", None)
+        backend._plan("prompt 499", None)
+
+        assert len(backend._occurrences) == 50
+        assert list(backend._occurrences.values())[-1] == 2
+
+    def test_latency_follows_configured_percentiles(self):
+        """Test sampled time-to-first-token matches p50/p95."""
+        backend = SyntheticBackend(time_scale=0, latency_p50=0.5, latency_p95=2.0)
+        samples = sorted(backend._plan(f"prompt {i}", None)['ttft'] for i in range(4000))
+
+        assert statistics.median(samples) == pytest.approx(0.5, rel=0.1)
+        assert samples[int(len(samples) * 0.95)] == pytest.approx(2.0, rel=0.15)
+
+    def test_output_respects_max_output_tokens_and_streams_in_chunks(self):
+        """Test generation limits and chunked streaming."""
+        backend = SyntheticBackend(time_scale=0, output_tokens=500, chunk_tokens=10)
+
+        text = backend.generate_content("p", generation_config={'max_output_tokens': 30}).text
+        assert len(text.split()) <= 30
+
+        chunks = list(backend.generate_content("longo", stream=True))
+        assert len(chunks) > 1
+        assert all(len(chunk.text.split()) <= 10 for chunk in chunks)
+
+    def test_real_time_cadence(self):
+        """Test non-stream latency is ttft plus output at tokens_per_second."""
+        backend = SyntheticBackend(latency_p50=0.02, latency_p95=0.02, tokens_per_second=1000,
+                                   output_tokens=20)
+        start = time.perf_counter()
+        text = backend.generate_content("p").text
+        elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.02 + len(text.split()) / 1000 * 0.9
+
+    def test_fault_injection_looks_like_quota_errors(self):
+        """Test injected 429s are recognised by the rate limiter."""
+        backend = SyntheticBackend(time_scale=0, quota_error_rate=1.0)
+
+        with pytest.raises(LocalBackendError) as excinfo:
+            backend.generate_content("p")
+        assert type(excinfo.value).__name__ == 'ResourceExhausted'
+        assert is_quota_error(excinfo.value)
+        assert backend.get_stats()['quota_errors'] == 1
+
+
+class TestRecordReplay:
+    """Test suite for RecordingBackend and ReplayBackend."""
+
+    @pytest.fixture
+    def recording(self, tmp_path):
+        path = tmp_path / "session.jsonl"
+        recorder = RecordingBackend(SyntheticBackend(time_scale=0, seed=3, chunk_tokens=5), path)
+        texts = [recorder.generate_content("a").text, recorder.generate_content("a").text]
+        chunks = [c.text for c in recorder.generate_content("b", {'temperature': 0.1}, stream=True)]
+
+        recorder.inner = SyntheticBackend(time_scale=0, error_rate=1.0)
+        with pytest.raises(LocalBackendError):
+            recorder.generate_content("c")
+        return path, texts, chunks
+
+    def test_replay_reproduces_texts_chunks_and_errors(self, recording):
+        """Test a recording replays identically and in order."""
+        path, texts, chunks = recording
+        replay = ReplayBackend(path, time_scale=0, strict=True)
+
+        assert [replay.generate_content("a").text for _ in range(3)] == texts + texts[:1]
+        assert [c.text for c in replay.generate_content("b", {'temperature': 0.1}, stream=True)] == chunks
+        with pytest.raises(LocalBackendError) as excinfo:
+            replay.generate_content("c")
+        assert type(excinfo.value).__name__ == 'InternalServerError'
+
+    def test_unknown_requests(self, recording):
+        """Test strict replay rejects unrecorded prompts; lenient replay is deterministic."""
+        path, _, _ = recording
+        with pytest.raises(LocalBackendError):
+            ReplayBackend(path, time_scale=0, strict=True).generate_content("novo")
+
+        def outcome(backend, prompt):
+            try:
+                return backend.generate_content(prompt).text
+            except LocalBackendError as e:
+                return type(e).__name__
+
+        lenient = ReplayBackend(path, time_scale=0)
+        for prompt in ("x", "y", "z"):
+            assert outcome(lenient, prompt) == outcome(ReplayBackend(path, time_scale=0), prompt)
+        assert lenient.get_stats()['unmatched'] == 3
+
+    def test_replay_keeps_recorded_timing(self, tmp_path):
+        """Test replay waits the recorded latency, scaled by time_scale."""
+        path = tmp_path / "slow.jsonl"
+        recorder = RecordingBackend(SyntheticBackend(latency_p50=0.05, latency_p95=0.05, output_tokens=1), path)
+        recorder.generate_content("p")
+
+        start = time.perf_counter()
+        ReplayBackend(path, time_scale=0.5).generate_content("p")
+        assert time.perf_counter() - start >= 0.02
+
+
+class TestClientBackends:
+    """Test suite for GeminiClient backend selection."""
+
+    @pytest.fixture
+    def config_manager(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield ConfigManager(temp_dir)
+        shutil.rmtree(temp_dir)
+
+    def test_configured_synthetic_backend_needs_no_network(self, config_manager, monkeypatch):
+        """Test model.backend='synthetic' works without the SDK or an API key."""
+        monkeypatch.setattr(gemini_client_module, 'GENAI_AVAILABLE', False)
+        monkeypatch.delenv('GEMINI_CODE_BACKEND', raising=False)
+        config_manager.config.model.backend = 'synthetic'
+        config_manager.config.model.backend_options = {'time_scale': 0, 'output_tokens': 50}
+
+        client = GeminiClient(api_key=None, config_manager=config_manager)
+        response = asyncio.run(client.generate_response("listar arquivos", use_cache=False))
+
+        assert isinstance(client.model, SyntheticBackend)
+        assert "MODO SIMULAÇÃO" not in response
+        assert len(response.split()) > 1
+
+    def test_injected_faults_are_retried_through_the_stack(self, config_manager):
+        """Test the client recovers from synthetic 429s under concurrent load."""
+        backend = create_backend('synthetic', time_scale=0, quota_error_rate=0.3, seed=1)
+        client = GeminiClient(api_key="test", config_manager=config_manager, backend=backend)
+        client.rate_limiter = RateLimiter(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9,
+                                          base_delay=0.001, max_retries=10)
+
+        async def scenario():
+            return await asyncio.gather(*(
+                client.generate_response(f"tarefa {i}", use_cache=False) for i in range(40)
+            ))
+
+        responses = asyncio.run(scenario())
+
+        assert not [r for r in responses if r.startswith("❌")]
+        assert client.rate_limiter.get_stats()['retries'] == backend.get_stats()['quota_errors'] > 0
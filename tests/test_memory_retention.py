@@ -0,0 +1,224 @@
+"""
+Tests for tiered retention and compaction of memory.db.
+"""
+
+import gzip
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.memory_retention import MemoryRetention, RetentionPolicy
+from gemini_code.core import memory_system as memory_system_module
+from gemini_code.core.memory_system import MemorySystem
+
+
+def _insert_conversations(memory, count, days_ago=0, intent='create_feature'):
+    """Insert conversations directly with a fixed timestamp."""
+    timestamp = (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(str(memory.db_path))
+    with conn:
+        conn.executemany("""
+            INSERT INTO conversations (timestamp, user_input, assistant_response, intent, files_affected, success)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (timestamp, f"pergunta {days_ago}-{i} sobre deploy", "resposta " * 50,
+             json.dumps({'intent': intent}), json.dumps(['app.py']), i % 4 != 0)
+            for i in range(count)
+        ])
+    conn.close()
+
+
+def _count(memory, table):
+    conn = sqlite3.connect(str(memory.db_path))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestMemoryRetention:
+    """Test suite for MemoryRetention through MemorySystem."""
+
+    @pytest.fixture
+    def memory(self, tmp_path):
+        memory = MemorySystem(str(tmp_path), retention=RetentionPolicy(hot_days=30, auto_every_writes=0))
+        yield memory
+        memory.close()
+
+    def test_new_database_uses_incremental_vacuum(self, memory):
+        """Test fresh memory.db files are created with auto_vacuum=INCREMENTAL."""
+        conn = sqlite3.connect(str(memory.db_path))
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.close()
+        assert memory.schema_version == 2
+
+    def test_old_conversations_move_to_cold_tier(self, memory):
+        """Test conversations past hot_days are summarized and archived."""
+        _insert_conversations(memory, 40, days_ago=90)
+        _insert_conversations(memory, 10, days_ago=1)
+
+        result = memory.compact_memory()
+
+        assert result['archived'] == 40
+        assert _count(memory, 'conversations') == 10
+        cold = memory.get_cold_summaries()
+        assert len(cold) == 1
+        assert cold[0]['conversations'] == 40
+        assert cold[0]['successes'] == 30
+        assert cold[0]['intents'] == {'create_feature': 40}
+        assert cold[0]['files'] == {'app.py': 40}
+        assert len(cold[0]['samples']) == 5
+
+        archives = list((memory.memory_dir / 'archive').glob('*.jsonl.gz'))
+        assert len(archives) == 1
+        with gzip.open(archives[0], 'rt', encoding='utf-8') as f:
+            archived = [json.loads(line) for line in f]
+        assert len(archived) == 40
+        assert archived[0]['user_input'].startswith("pergunta 90-0")
+
+    def test_hot_tier_is_capped(self, memory):
+        """Test max_entries keeps only the newest conversations hot."""
+        _insert_conversations(memory, 120, days_ago=2)
+        result = memory.compact_memory(max_entries=50)
+        assert result['archived'] == 70
+        assert _count(memory, 'conversations') == 50
+        assert memory.get_memory_stats()['conversations_count'] == 120
+
+    def test_cold_summary_merges_across_passes(self, tmp_path):
+        """Test small batches fold into the same daily summary."""
+        memory = MemorySystem(str(tmp_path), retention=RetentionPolicy(batch_rows=7, auto_every_writes=0))
+        _insert_conversations(memory, 30, days_ago=60)
+        result = memory.compact_memory()
+        assert result['passes'] >= 5
+        assert memory.get_cold_summaries()[0]['conversations'] == 30
+        memory.close()
+
+    def test_archived_conversations_leave_recall(self, memory):
+        """Test recall only scans the hot tier after compaction."""
+        _insert_conversations(memory, 5, days_ago=100)
+        memory.remember_conversation("Como configurar o kubernetes", "Use helm")
+        memory.compact_memory()
+        results = memory.recall_similar_conversations("deploy kubernetes")
+        assert [r['user_input'] for r in results] == ["Como configurar o kubernetes"]
+
+    def test_repeated_decisions_are_deduplicated(self, memory):
+        """Test identical decisions collapse into one row with an occurrence count."""
+        for _ in range(4):
+            memory.remember_error_solution("ImportError: no module named x", "pip install x", True)
+        memory.remember_error_solution("KeyError: 'y'", "use dict.get", True)
+
+        result = memory.compact_memory()
+
+        assert result['decisions_deduplicated'] == 3
+        conn = sqlite3.connect(str(memory.db_path))
+        rows = conn.execute("SELECT reason, occurrences FROM decisions ORDER BY id").fetchall()
+        conn.close()
+        assert sorted(rows) == [("ImportError: no module named x", 4), ("KeyError: 'y'", 1)]
+        assert memory.get_error_solutions("ImportError module")[0]['solution'] == "pip install x"
+
+    def test_compaction_frees_pages(self, memory):
+        """Test deleted rows give space back through incremental vacuum."""
+        _insert_conversations(memory, 2000, days_ago=200)
+        size_before = memory.get_memory_stats()['db_size_mb']
+        memory.compact_memory()
+        stats = memory.get_memory_stats()
+        assert stats['free_pages'] == 0
+        assert stats['db_size_mb'] < size_before
+
+    def test_legacy_database_is_converted(self, tmp_path):
+        """Test memory.db files without auto_vacuum are converted on first compaction."""
+        db_path = tmp_path / '.gemini_code' / 'memory' / 'memory.db'
+        db_path.parent.mkdir(parents=True)
+        sqlite3.connect(str(db_path)).execute("CREATE TABLE placeholder (x)").connection.close()
+
+        memory = MemorySystem(str(tmp_path), retention=RetentionPolicy(auto_every_writes=0))
+        result = memory.compact_memory()
+        assert result['vacuumed'] is True
+        conn = sqlite3.connect(str(memory.db_path))
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.close()
+        memory.close()
+
+    def test_automatic_pass_runs_in_background(self, tmp_path):
+        """Test a compaction pass is queued after auto_every_writes writes."""
+        memory = MemorySystem(str(tmp_path), retention=RetentionPolicy(auto_every_writes=10))
+        _insert_conversations(memory, 20, days_ago=45)
+        for i in range(10):
+            memory.learn_preference('test', f"p{i}", 'v')
+        memory.flush()
+        assert memory.last_compaction is not None
+        assert memory.last_compaction['archived'] == 20
+        assert _count(memory, 'conversations') == 0
+        memory.close()
+
+    def test_archive_is_written_only_after_commit(self, tmp_path):
+        """Test a rolled-back pass leaves no archive and a publish is not repeated."""
+        memory = MemorySystem(str(tmp_path), write_behind=False,
+                              retention=RetentionPolicy(auto_every_writes=0))
+        _insert_conversations(memory, 5, days_ago=40)
+        retention = MemoryRetention(RetentionPolicy(), archive_dir=tmp_path / 'archive')
+        conn = sqlite3.connect(str(memory.db_path))
+        conn.execute("BEGIN")
+        retention.compact(conn)
+        conn.rollback()
+        assert not (tmp_path / 'archive').exists()
+
+        archived_ids = []
+        with conn:
+            result = retention.compact(conn)
+        retention.publish(result, on_archived=archived_ids.extend)
+        retention.publish(result, on_archived=archived_ids.extend)
+        conn.close()
+
+        with gzip.open(next((tmp_path / 'archive').glob('*.jsonl.gz')), 'rt', encoding='utf-8') as f:
+            assert len(f.readlines()) == 5
+        assert len(archived_ids) == 5
+        assert _count(memory, 'conversations') == 0
+
+    def test_retention_works_without_fts5(self, tmp_path, monkeypatch):
+        """Test a SQLite without FTS5 still gets the retention schema and FTS arrives later."""
+        migrations = list(memory_system_module.MEMORY_MIGRATIONS)
+        migrations[0] = ["CREATE VIRTUAL TABLE conversations_fts USING sem_fts5(user_input)"]
+        monkeypatch.setattr(memory_system_module, 'MEMORY_MIGRATIONS', migrations)
+        memory = MemorySystem(str(tmp_path), write_behind=False,
+                              retention=RetentionPolicy(auto_every_writes=0))
+        assert memory.schema_version == 2
+        assert not memory.fts_enabled
+
+        _insert_conversations(memory, 10, days_ago=45)
+        result = memory.compact_memory()
+        assert 'error' not in result
+        assert result['archived'] == 10
+        memory.close()
+
+        monkeypatch.undo()
+        memory = MemorySystem(str(tmp_path), write_behind=False)
+        assert memory.fts_enabled
+        memory.remember_conversation("configurar nginx", "ok", success=True)
+        assert memory.recall_similar_conversations("nginx")[0]['user_input'] == "configurar nginx"
+        memory.close()
+
+    def test_compact_pass_respects_batch_rows(self, tmp_path):
+        """Test a single pass is bounded by batch_rows and reports remaining work."""
+        memory = MemorySystem(str(tmp_path), write_behind=False,
+                              retention=RetentionPolicy(auto_every_writes=0))
+        _insert_conversations(memory, 25, days_ago=40)
+        retention = MemoryRetention(RetentionPolicy(batch_rows=10))
+        conn = sqlite3.connect(str(memory.db_path))
+        with conn:
+            result = retention.compact(conn)
+        conn.close()
+        assert result['archived'] == 10
+        assert result['remaining'] is True
+        assert _count(memory, 'conversations') == 15
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
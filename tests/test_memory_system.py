@@ -28,7 +28,9 @@ class TestMemorySystem:
     @pytest.fixture
     def memory_system(self, temp_project_path):
         """MemorySystem instance with temporary directory."""
-        return MemorySystem(temp_project_path)
+        memory = MemorySystem(temp_project_path)
+        yield memory
+        memory.close()
     
     def test_initialization(self, memory_system, temp_project_path):
         """Test MemorySystem initialization."""
@@ -83,7 +85,8 @@ class TestMemorySystem:
         assert memory_item['intent'] == intent
         assert memory_item['success'] is True
         
-        # Check database storage
+        # Check database storage (writes are queued write-behind)
+        memory_system.flush()
         import sqlite3
         conn = sqlite3.connect(str(memory_system.db_path))
         cursor = conn.cursor()
@@ -104,6 +107,7 @@ class TestMemorySystem:
         )
         
         # Check database
+        memory_system.flush()
         import sqlite3
         conn = sqlite3.connect(str(memory_system.db_path))
         cursor = conn.cursor()
@@ -191,6 +195,54 @@ class TestMemorySystem:
         found_solution = solutions[0]
         assert 'requests' in found_solution['solution'].lower()
     
+    def test_recall_ranked_by_relevance(self, memory_system):
+        """Test FTS recall ranks the most relevant conversation first."""
+        memory_system.remember_conversation("Fix database migration", "Done", success=True)
+        memory_system.remember_conversation("Create REST endpoint", "Endpoint created", success=True)
+        memory_system.remember_conversation("Database connection pool for database access", "Pool added", success=True)
+        
+        assert memory_system.fts_enabled
+        similar = memory_system.recall_similar_conversations("database pool", limit=3)
+        
+        assert len(similar) == 2
+        assert similar[0]['user_input'].startswith("Database connection pool")
+    
+    def test_recall_empty_query_returns_recent(self, memory_system):
+        """Test empty recall query returns most recent conversations."""
+        for i in range(3):
+            memory_system.remember_conversation(f"Message {i}", "ok", success=True)
+        
+        recent = memory_system.recall_similar_conversations("", limit=2)
+        assert [c['user_input'] for c in recent] == ["Message 2", "Message 1"]
+    
+    def test_fts_query_drops_noise_terms(self):
+        """Test stopwords and short terms are dropped and short terms get no prefix."""
+        query = MemorySystem._fts_query("Como criar uma API com os testes de login no app")
+        assert query == '"criar"* OR "api" OR "testes"* OR "login"* OR "app"*'
+        assert MemorySystem._fts_query("de a o é") == ""
+        assert MemorySystem._fts_query("conexão recusada") == '"conexao"* OR "recusada"*'
+
+    def test_fts_migration_for_existing_database(self, temp_project_path):
+        """Test pre-FTS memory.db files are migrated and backfilled."""
+        import sqlite3
+        legacy = MemorySystem.__new__(MemorySystem)
+        legacy.project_path = Path(temp_project_path)
+        legacy.memory_dir = legacy.project_path / '.gemini_code' / 'memory'
+        legacy.memory_dir.mkdir(parents=True, exist_ok=True)
+        legacy.db_path = legacy.memory_dir / 'memory.db'
+        legacy._init_database()
+        
+        conn = sqlite3.connect(str(legacy.db_path))
+        conn.execute("INSERT INTO conversations (user_input, assistant_response) VALUES (?, ?)",
+                     ("Legacy deployment question", "Legacy answer"))
+        conn.commit()
+        conn.close()
+        
+        migrated = MemorySystem(temp_project_path)
+        similar = migrated.recall_similar_conversations("deployment")
+        assert len(similar) == 1
+        assert similar[0]['user_input'] == "Legacy deployment question"
+    
     def test_context_summary(self, memory_system):
         """Test context summary generation."""
         # Add some data
@@ -282,6 +334,7 @@ class TestMemorySystem:
             thread.join()
         
         # Check that all conversations were stored
+        memory_system.flush()
         import sqlite3
         conn = sqlite3.connect(str(memory_system.db_path))
         cursor = conn.cursor()
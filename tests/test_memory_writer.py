@@ -0,0 +1,216 @@
+"""
+Tests for the write-behind queue used by MemorySystem.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.memory_system import MemorySystem
+from gemini_code.core.memory_writer import WriteBehindQueue
+from gemini_code.core.sqlite_pool import get_pool
+
+
+def _insert(value):
+    return lambda conn: conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+
+
+def _values(db_path):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return [row[0] for row in conn.execute("SELECT value FROM items ORDER BY id")]
+    finally:
+        conn.close()
+
+
+class TestWriteBehindQueue:
+    """Test suite for WriteBehindQueue."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        path = tmp_path / 'writes.db'
+        with get_pool(path).connection() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, value TEXT UNIQUE)")
+        return path
+
+    @pytest.fixture
+    def writer(self, db_path):
+        queue = WriteBehindQueue(db_path, flush_interval_ms=20)
+        yield queue
+        queue.close()
+
+    def test_submit_returns_before_write(self, db_path):
+        """Test submit does not wait for the database."""
+        writer = WriteBehindQueue(db_path, flush_interval_ms=200)
+        writer.submit(_insert('a'))
+        assert writer.pending == 1
+        assert _values(db_path) == []
+        writer.close()
+        assert _values(db_path) == ['a']
+
+    def test_flush_preserves_order(self, writer, db_path):
+        """Test queued writes land in submission order."""
+        for i in range(500):
+            writer.submit(_insert(f"v{i}"))
+        assert writer.flush(timeout=10)
+        assert _values(db_path) == [f"v{i}" for i in range(500)]
+        assert writer.pending == 0
+
+    def test_writes_are_grouped_into_transactions(self, writer):
+        """Test many writes share a few commits."""
+        for i in range(300):
+            writer.submit(_insert(f"v{i}"))
+        writer.flush()
+        stats = writer.get_stats()
+        assert stats['written'] == 300
+        assert stats['transactions'] < 30
+        assert stats['avg_batch'] > 10
+
+    def test_failing_operation_does_not_drop_batch(self, writer, db_path, capsys):
+        """Test a bad write is isolated and the rest keep their order."""
+        writer.submit(_insert('a'))
+        writer.submit(_insert('a'))  # viola UNIQUE
+        writer.submit(_insert('b'))
+        writer.flush()
+        assert _values(db_path) == ['a', 'b']
+        assert writer.get_stats()['failed'] == 1
+        assert "falhou" in capsys.readouterr().out
+
+    def test_flush_reports_failed_writes(self, writer):
+        """Test flush returns False once after a write failed and keeps the error."""
+        writer.submit(_insert('a'))
+        assert writer.flush() is True
+        writer.submit(_insert('a'))  # viola UNIQUE
+        assert writer.flush() is False
+        assert "UNIQUE" in writer.get_stats()['last_error']
+        assert writer.flush() is True
+
+    def test_on_commit_runs_once_after_retried_batch(self, writer, db_path):
+        """Test commit callbacks run once per committed write, even when the batch is redone."""
+        committed = []
+        writer.submit(_insert('a'), on_commit=lambda: committed.append('a'))
+        writer.submit(_insert('a'), on_commit=lambda: committed.append('dup'))  # viola UNIQUE
+        writer.submit(_insert('b'), on_commit=lambda: committed.append('b'))
+        writer.flush()
+        assert committed == ['a', 'b']
+        assert writer.get_stats()['retried_batches'] == 1
+
+    def test_bounded_queue_applies_backpressure(self, db_path):
+        """Test submit waits for the writer when the queue is full."""
+        writer = WriteBehindQueue(db_path, max_pending=5, batch_size=5, flush_interval_ms=50)
+        for i in range(50):
+            writer.submit(_insert(f"v{i}"))
+            assert len(writer._queue) <= 5
+        writer.close()
+        assert len(_values(db_path)) == 50
+        assert writer.stats['backpressure_waits'] > 0
+
+    def test_close_flushes_and_later_writes_are_synchronous(self, db_path):
+        """Test shutdown drains the queue and the queue keeps working after it."""
+        writer = WriteBehindQueue(db_path, flush_interval_ms=500)
+        writer.submit(_insert('a'))
+        assert writer.close()
+        writer.submit(_insert('b'))
+        assert _values(db_path) == ['a', 'b']
+
+    def test_idle_writer_thread_exits_and_restarts(self, db_path):
+        """Test the background thread stops when idle and comes back on demand."""
+        writer = WriteBehindQueue(db_path, flush_interval_ms=0, idle_timeout=0.05)
+        writer.submit(_insert('a'))
+        writer.flush()
+        deadline = time.monotonic() + 2
+        while writer.get_stats()['writer_alive'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not writer.get_stats()['writer_alive']
+
+        writer.submit(_insert('b'))
+        writer.flush()
+        assert _values(db_path) == ['a', 'b']
+        writer.close()
+
+    def test_background_operations_do_not_block_foreground_flush(self, writer, db_path):
+        """Test maintenance runs after queued writes and flush(background=False) skips it."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def maintenance(conn):
+            started.set()
+            release.wait(5)
+            conn.execute("INSERT INTO items (value) VALUES ('bg')")
+
+        writer.submit(_insert('a'))
+        writer.submit(maintenance, background=True)
+        writer.submit(_insert('b'))
+        assert started.wait(2)
+        assert writer.flush(timeout=1, background=False) is True
+        assert _values(db_path) == ['a', 'b']
+        assert writer.pending == 1
+
+        release.set()
+        assert writer.flush() is True
+        assert _values(db_path) == ['a', 'b', 'bg']
+
+    def test_concurrent_producers(self, writer, db_path):
+        """Test writes from several threads are all persisted."""
+        def produce(prefix):
+            for i in range(100):
+                writer.submit(_insert(f"{prefix}{i}"))
+
+        threads = [threading.Thread(target=produce, args=(name,)) for name in 'abc']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.flush()
+        values = _values(db_path)
+        assert len(values) == 300
+        for prefix in 'abc':
+            own = [v for v in values if v.startswith(prefix)]
+            assert own == [f"{prefix}{i}" for i in range(100)]
+
+
+class TestMemorySystemWriteBehind:
+    """Test MemorySystem with and without the write-behind queue."""
+
+    def test_reads_see_queued_writes(self, tmp_path):
+        """Test recall flushes pending writes first."""
+        memory = MemorySystem(str(tmp_path))
+        memory.remember_conversation("How to deploy with docker", "Use compose")
+        memory.learn_preference('communication', 'style', 'concise', 0.9)
+        memory.detect_pattern('user_behavior', 'deploy', 'Deploys often')
+        memory.detect_pattern('user_behavior', 'deploy', 'Deploys often')
+
+        assert memory.recall_similar_conversations("docker")[0]['assistant_response'] == "Use compose"
+        assert memory.get_preferences('communication')['communication']['style']['value'] == 'concise'
+        assert memory.get_project_patterns('user_behavior')[0]['frequency'] == 2
+        memory.close()
+
+    def test_intent_is_captured_at_call_time(self, tmp_path):
+        """Test later mutation of the caller's dict does not leak into the queued write."""
+        memory = MemorySystem(str(tmp_path))
+        intent = {'intent': 'create_feature', 'entities': {}}
+        memory.remember_conversation("create feature", "done", intent=intent)
+        intent['intent'] = 'changed'
+        assert '"create_feature"' in memory.recall_similar_conversations("feature")[0]['intent']
+        memory.close()
+
+    def test_synchronous_mode(self, tmp_path):
+        """Test write_behind=False commits on the calling thread."""
+        memory = MemorySystem(str(tmp_path), write_behind=False)
+        assert memory.writer is None
+        memory.remember_decision('architecture', 'db', 'fast', ['a', 'b'], 'a')
+        conn = sqlite3.connect(str(memory.db_path))
+        assert conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0] == 1
+        conn.close()
+        assert memory.flush()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
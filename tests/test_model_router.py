@@ -0,0 +1,181 @@
+"""
+Unit tests for latency-aware routing between fast and deep model tiers.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core import gemini_client as gemini_client_module
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+from gemini_code.core.local_backend import SyntheticBackend
+from gemini_code.core.model_router import ModelRouter, ModelTier
+
+
+SIMPLE_PROMPT = "listar arquivos"
+COMPLEX_PROMPT = "refatorar a arquitetura completa do sistema com migração e integração completa"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestModelRouter:
+    """Test suite for ModelRouter."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def router(self, clock):
+        return ModelRouter([
+            ModelTier('fast', 'modelo-rapido', 'medium', expected_latency=1.5),
+            ModelTier('deep', 'modelo-profundo', 'very_complex', expected_latency=8.0),
+        ], cooldown=30, clock=clock)
+
+    def test_complexity_picks_the_cheapest_capable_tier(self, router):
+        """Test simple work goes to the fast tier and complex work to the deep one."""
+        assert router.route('simple').tier.name == 'fast'
+        assert router.route('medium').tier.name == 'fast'
+        decision = router.route('very_complex')
+        assert decision.tier.name == 'deep'
+        assert [t.name for t in decision.fallbacks] == ['fast']
+
+    def test_latency_budget_uses_observed_latencies(self, router):
+        """Test a budget moves work to a tier whose recent p90 fits it."""
+        decision = router.route('complex', latency_budget=2.0)
+        assert (decision.tier.name, decision.reason) == ('fast', 'latency_budget')
+
+        for _ in range(10):
+            router.observe('deep', latency=1.0)
+            router.observe('fast', latency=3.0)
+        decision = router.route('simple', latency_budget=2.0)
+        assert (decision.tier.name, decision.reason) == ('deep', 'latency_budget')
+
+    def test_errors_degrade_a_tier_until_the_cooldown_ends(self, router, clock):
+        """Test consecutive failures route around a tier, then it recovers."""
+        for _ in range(3):
+            router.observe('fast', error=True)
+
+        decision = router.route('simple')
+        assert (decision.tier.name, decision.reason) == ('deep', 'degraded')
+        assert decision.fallbacks == []
+
+        clock.now += 31
+        assert router.route('simple').tier.name == 'fast'
+        assert router.get_stats()['degradations'] == 1
+
+    def test_slow_tier_is_degraded(self, router):
+        """Test a p90 far above the expected latency counts as degradation."""
+        for _ in range(5):
+            router.observe('fast', latency=10.0)
+
+        assert router.get_stats()['tiers']['fast']['degraded']
+        assert router.route('simple').tier.name == 'deep'
+
+    def test_forced_and_unavailable_tiers(self, router):
+        """Test model_tier forces a tier and unavailable tiers are never chosen."""
+        assert router.route('simple', tier='deep').reason == 'forced'
+        assert router.route('simple', available=['deep']).tier.name == 'deep'
+
+
+class TestClientRouting:
+    """Test suite for GeminiClient routing with local backends."""
+
+    @pytest.fixture
+    def config_manager(self, monkeypatch):
+        monkeypatch.setattr(gemini_client_module, 'GENAI_AVAILABLE', False)
+        monkeypatch.delenv('GEMINI_CODE_BACKEND', raising=False)
+        temp_dir = Path(tempfile.mkdtemp())
+        config_manager = ConfigManager(temp_dir)
+        config_manager.config.model.response_cache = False
+        config_manager.config.model.routing = True
+        yield config_manager
+        shutil.rmtree(temp_dir)
+
+    def test_synthetic_tiers_have_their_own_latency_profiles(self, config_manager):
+        """Test the synthetic backend builds a faster model for the fast tier."""
+        config_manager.config.model.backend = 'synthetic'
+        config_manager.config.model.backend_options = {'time_scale': 0, 'tiers': {'fast': {'output_tokens': 5}}}
+        client = GeminiClient(api_key=None, config_manager=config_manager)
+
+        fast = client._tier_models['fast']
+        assert isinstance(fast, SyntheticBackend)
+        assert fast.profile.latency_p50 < client.model.profile.latency_p50
+        assert fast.profile.output_tokens == 5
+
+        async def scenario():
+            await client.generate_response(SIMPLE_PROMPT)
+            await client.generate_response(COMPLEX_PROMPT)
+
+        asyncio.run(scenario())
+
+        tiers = client.get_performance_stats()['routing']['tiers']
+        assert tiers['fast']['calls'] == 1 and tiers['deep']['calls'] == 1
+        assert fast.get_stats()['calls'] == 1
+
+    def test_failing_tier_falls_back_and_is_skipped(self, config_manager):
+        """Test calls fail over to the next tier and a degraded tier stops being used."""
+        fast = SyntheticBackend(time_scale=0, error_rate=1.0)
+        deep = SyntheticBackend(time_scale=0, output_tokens=10)
+        client = GeminiClient(api_key="test", config_manager=config_manager, backend={'fast': fast, 'deep': deep})
+
+        async def scenario():
+            return [await client.generate_response(f"{SIMPLE_PROMPT} {i}") for i in range(5)]
+
+        responses = asyncio.run(scenario())
+
+        assert not [r for r in responses if r.startswith("❌")]
+        assert fast.get_stats()['calls'] == 3  # degradado após 3 erros seguidos
+        assert deep.get_stats()['calls'] == 5
+        assert client.router.get_stats()['fallbacks'] == 2
+
+    def test_fallback_response_is_cached_under_its_model(self, config_manager):
+        """Test a fallback answer is cached for the model that produced it."""
+        config_manager.config.model.response_cache = True
+        fast = SyntheticBackend(time_scale=0, error_rate=1.0)
+        deep = SyntheticBackend(time_scale=0, output_tokens=10)
+        client = GeminiClient(api_key="test", config_manager=config_manager, backend={'fast': fast, 'deep': deep})
+
+        async def scenario():
+            first = await client.generate_response(SIMPLE_PROMPT)
+            forced_deep = await client.generate_response(SIMPLE_PROMPT, model_tier='deep')
+            return first, forced_deep
+
+        first, forced_deep = asyncio.run(scenario())
+
+        assert forced_deep == first
+        assert deep.get_stats()['calls'] == 1
+        assert fast.get_stats()['calls'] == 1
+
+    def test_routing_is_off_by_default(self):
+        """Test a fresh config never sends prompts to another model."""
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            assert ConfigManager(temp_dir).config.model.routing is False
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_routing_can_be_disabled(self, config_manager):
+        """Test model.routing=False always uses the configured model."""
+        config_manager.config.model.routing = False
+        fast = SyntheticBackend(time_scale=0)
+        deep = SyntheticBackend(time_scale=0)
+        client = GeminiClient(api_key="test", config_manager=config_manager, backend={'fast': fast, 'deep': deep})
+
+        asyncio.run(client.generate_response(SIMPLE_PROMPT))
+
+        assert fast.get_stats()['calls'] == 0
+        assert deep.get_stats()['calls'] == 1
@@ -0,0 +1,103 @@
+"""
+Unit tests for the incremental project index used by ProjectManager.
+"""
+
+import pytest
+import tempfile
+import shutil
+import os
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.project_manager import ProjectManager
+
+
+class TestProjectIndex:
+    """Test suite for ProjectManager.scan_project with the persistent index."""
+
+    @pytest.fixture
+    def temp_project_path(self):
+        """Create temporary project with a few source files."""
+        temp_dir = Path(tempfile.mkdtemp())
+        (temp_dir / "app.py").write_text("import os\n\nclass App:\n    pass\n\ndef run():\n    pass\n")
+        (temp_dir / "pkg").mkdir()
+        (temp_dir / "pkg" / "util.js").write_text("function helper() {}\n")
+        (temp_dir / "README.md").write_text("# Demo\n")
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _manager(self, path):
+        return ProjectManager(gemini_client=None, project_root=path)
+
+    def test_cold_scan_analyzes_everything(self, temp_project_path):
+        """Test first scan analyzes every file and fills the index."""
+        pm = self._manager(temp_project_path)
+        structure = pm.scan_project()
+
+        assert pm.last_scan_stats['analyzed'] == structure.total_files
+        assert pm.last_scan_stats['reused'] == 0
+        assert 'App' in structure.files['app.py'].classes
+
+    def test_warm_scan_reuses_index(self, temp_project_path):
+        """Test a new manager reuses unchanged records from disk."""
+        self._manager(temp_project_path).scan_project()
+
+        pm = self._manager(temp_project_path)
+        structure = pm.scan_project()
+
+        assert pm.last_scan_stats['analyzed'] == 0
+        assert pm.last_scan_stats['reused'] == structure.total_files
+        info = structure.files['app.py']
+        assert info.functions == ['run']
+        assert info.imports == ['os']
+        assert info.path == temp_project_path / 'app.py'
+
+    def test_rescan_only_touches_changed_files(self, temp_project_path):
+        """Test modified, added and removed files are detected."""
+        pm = self._manager(temp_project_path)
+        pm.scan_project()
+
+        app = temp_project_path / "app.py"
+        app.write_text("def run():\n    pass\n\ndef stop():\n    pass\n")
+        stat = app.stat()
+        os.utime(app, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (temp_project_path / "new.py").write_text("x = 1\n")
+        (temp_project_path / "README.md").unlink()
+
+        structure = pm.scan_project(force=True)
+
+        assert pm.last_scan_stats['analyzed'] == 2
+        assert pm.last_scan_stats['removed'] == 1
+        assert structure.files['app.py'].functions == ['run', 'stop']
+        assert 'README.md' not in structure.files
+
+    def test_get_file_content_detects_changes(self, temp_project_path):
+        """Test cached content is refreshed when the file changes."""
+        pm = self._manager(temp_project_path)
+        pm.scan_project()
+        assert 'class App' in pm.get_file_content('app.py')
+
+        app = temp_project_path / "app.py"
+        app.write_text("changed = True\n")
+        stat = app.stat()
+        os.utime(app, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert pm.get_file_content('app.py') == "changed = True\n"
+
+    def test_rescan_does_not_keep_stale_non_code_content(self, temp_project_path):
+        """Test a changed non-code file is re-read after a rescan."""
+        notes = temp_project_path / "notes.txt"
+        notes.write_text("v1\n")
+        pm = self._manager(temp_project_path)
+        pm.scan_project()
+        assert pm.get_file_content('notes.txt') == "v1\n"
+
+        notes.write_text("v2 changed\n")
+        stat = notes.stat()
+        os.utime(notes, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        pm.scan_project(force=True)
+
+        assert pm.get_file_content('notes.txt') == "v2 changed\n"
@@ -0,0 +1,132 @@
+"""
+Unit tests for batching small independent prompts into one model call.
+"""
+
+import pytest
+import asyncio
+import re
+import tempfile
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+from gemini_code.core.prompt_batcher import PromptBatcher, is_json_list
+
+
+class BatchModel:
+    """Fake model that answers every 'item-N' task, optionally skipping some in batches."""
+
+    def __init__(self, skip=(), fail=False):
+        self.skip = set(skip)
+        self.fail = fail
+        self.prompts = []
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("serviço indisponível")
+        items = re.findall(r'item-\d+', prompt.split("SOLICITAÇÃO ATUAL")[-1])
+        if "=== TAREFA" not in prompt:
+            return SimpleNamespace(text=f"[\"resposta {items[0]}\"]")
+        sections = [
+            f"<<<RESPOSTA {index}>>>\n[\"resposta {item}\"]\n<<<FIM {index}>>>"
+            for index, item in enumerate(items, 1) if item not in self.skip
+        ]
+        return SimpleNamespace(text="\n".join(sections))
+
+
+class TestPromptBatcher:
+    """Test suite for PromptBatcher."""
+
+    @pytest.fixture
+    def make_client(self):
+        temp_dirs = []
+
+        def factory(model, **options):
+            temp_dirs.append(Path(tempfile.mkdtemp()))
+            client = GeminiClient(api_key="test", config_manager=ConfigManager(temp_dirs[-1]), backend=model)
+            client.batcher = PromptBatcher(client, **{'window_ms': 20, **options})
+            return client
+
+        yield factory
+        for temp_dir in temp_dirs:
+            shutil.rmtree(temp_dir)
+
+    @staticmethod
+    def submit_all(client, count, validate=None):
+        async def scenario():
+            return await asyncio.gather(*(
+                client.batcher.submit(f"analise item-{i}", validate=validate) for i in range(count)
+            ))
+        return asyncio.run(scenario())
+
+    def test_concurrent_prompts_share_one_call(self, make_client):
+        """Test prompts inside the flush window go out as one request and are split back."""
+        model = BatchModel()
+        client = make_client(model)
+
+        results = self.submit_all(client, 10)
+
+        assert results == [f"[\"resposta item-{i}\"]" for i in range(10)]
+        assert len(model.prompts) == 1
+        assert client.get_performance_stats()['batching']['calls_saved'] == 9
+
+    def test_batches_respect_item_and_token_limits(self, make_client):
+        """Test max_items and max_batch_tokens split the work into several batches."""
+        model = BatchModel()
+        self.submit_all(make_client(model, max_items=4), 10)
+        assert len(model.prompts) == 3
+
+        model = BatchModel()
+        client = make_client(model)
+        client.batcher.max_batch_tokens = 2 * client.estimate_tokens("analise item-0")
+        self.submit_all(client, 10)
+        assert len(model.prompts) == 5
+        assert client.batcher.get_stats()['submitted'] == 10
+
+    def test_missing_or_invalid_items_fall_back_individually(self, make_client):
+        """Test one unparseable item is retried alone without affecting the rest."""
+        model = BatchModel(skip={'item-3'})
+        client = make_client(model)
+
+        results = self.submit_all(client, 6, validate=is_json_list)
+
+        assert results[3] == "[\"resposta item-3\"]"
+        assert len(model.prompts) == 2
+        assert client.batcher.get_stats()['fallbacks'] == 1
+
+    def test_failed_batch_returns_the_error_to_every_caller(self, make_client):
+        """Test a failing batch call behaves like failing individual calls."""
+        client = make_client(BatchModel(fail=True))
+
+        results = self.submit_all(client, 3)
+
+        assert all(r.startswith("❌") for r in results)
+        assert client.batcher.get_stats()['failed_batches'] == 1
+
+    def test_disabled_batcher_and_item_cache(self, make_client):
+        """Test enabled=False sends one call per prompt and answers are cached per item."""
+        model = BatchModel()
+        client = make_client(model, enabled=False)
+        self.submit_all(client, 3)
+        assert len(model.prompts) == 3
+
+        model = BatchModel()
+        client = make_client(model)
+        first = self.submit_all(client, 4)
+        assert self.submit_all(client, 4) == first
+        assert len(model.prompts) == 1
+        assert client.batcher.get_stats()['cache_hits'] == 4
+
+    def test_split_response_ignores_truncated_sections(self):
+        """Test a section without its closing marker is treated as missing."""
+        response = "<<<RESPOSTA 1>>>\nok\n<<<FIM 1>>>\n<<<RESPOSTA 2>>>\ncortad"
+
+        assert PromptBatcher.split_response(response) == {1: "ok"}
+        assert is_json_list("Resultado: [1, 2]") and not is_json_list("nenhum erro")
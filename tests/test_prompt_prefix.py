@@ -0,0 +1,62 @@
+"""
+Unit tests for the stable, versioned prompt prefix.
+"""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core import gemini_client as gemini_client_module
+from gemini_code.core.config import ConfigManager
+from gemini_code.core.gemini_client import GeminiClient
+
+
+class TestPromptPrefix:
+    """Test suite for GeminiClient prompt prefix reuse."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(gemini_client_module, 'GENAI_AVAILABLE', False)
+        temp_dir = Path(tempfile.mkdtemp())
+        yield GeminiClient(api_key="test", config_manager=ConfigManager(temp_dir))
+        shutil.rmtree(temp_dir)
+
+    @pytest.mark.parametrize("mode", ["non-programmer", "technical"])
+    def test_prefix_bytes_are_identical_across_turns(self, client, mode):
+        """Test different prompts, contexts and budgets share the same leading bytes."""
+        client.config.user.mode = mode
+        first = client._build_prompt("criar api", [{'role': 'user', 'content': 'oi'}], thinking_budget=4096)
+        second = client._build_prompt("corrigir bug", None, thinking_budget=32768)
+
+        prefix = client.get_prompt_prefix()
+        assert first.startswith(prefix['text'])
+        assert second.startswith(prefix['text'])
+        assert "budget=32768" in second[len(prefix['text']):]
+
+    def test_prefix_is_built_once_and_reused(self, client):
+        """Test the prefix is built once per session and reuse is reported."""
+        for i in range(5):
+            client._build_prompt(f"pedido {i}")
+
+        stats = client.get_performance_stats()['prompt']
+        assert stats['builds'] == 5
+        assert stats['prefix_builds'] == 1
+        assert stats['prefix_reuse_rate'] == pytest.approx(0.8)
+        assert stats['prefix_hash'] == client.get_prompt_prefix()['hash']
+        assert stats['avg_build_ms'] >= 0
+
+    def test_settings_change_produces_a_new_hash(self, client):
+        """Test changing mode or limits invalidates the cached prefix."""
+        original = client.get_prompt_prefix()['hash']
+
+        client.config.user.mode = "technical" if client.config.user.mode == "non-programmer" else "non-programmer"
+        changed = client.get_prompt_prefix()['hash']
+        client.max_output_tokens += 1
+
+        assert len({original, changed, client.get_prompt_prefix()['hash']}) == 3
+        assert client.prompt_stats['prefix_builds'] == 3
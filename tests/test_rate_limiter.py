@@ -0,0 +1,197 @@
+"""
+Unit tests for the client-side rate limiter used by GeminiClient.
+"""
+
+import pytest
+import asyncio
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.local_backend import LocalResponse
+from gemini_code.core.rate_limiter import (
+    RateLimiter, RequestPriority, TokenBucket, is_quota_error, retry_after
+)
+
+
+class ResourceExhausted(Exception):
+    """Imita google.api_core.exceptions.ResourceExhausted."""
+
+
+class FakeQuotaModel:
+    """Modelo local que injeta latência e erros 429."""
+
+    def __init__(self, latency=0.01, fail_first=0, fail_every=None):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_every = fail_every
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._generation_config = {}
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            if self.calls <= self.fail_first or (self.fail_every and self.calls % self.fail_every == 0):
+                raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+            return LocalResponse(f"ok {self.calls}")
+        finally:
+            self.active -= 1
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter and its GeminiClient integration."""
+
+    def test_token_bucket_refill(self):
+        """Test bucket wait time follows the refill rate."""
+        now = [0.0]
+        bucket = TokenBucket(60, 1.0, clock=lambda: now[0])
+        bucket.consume(60)
+        assert bucket.wait_time(10) == pytest.approx(10.0)
+        now[0] = 4.0
+        assert bucket.wait_time(10) == pytest.approx(6.0)
+        now[0] = 100.0
+        assert bucket.wait_time(10) == 0.0
+        # Pedidos maiores que a capacidade não travam para sempre
+        assert bucket.wait_time(1000) == 0.0
+
+    def test_quota_error_detection(self):
+        """Test 429-style errors are recognised and retry hints parsed."""
+        assert is_quota_error(ResourceExhausted("boom"))
+        assert is_quota_error(RuntimeError("429 Too Many Requests"))
+        assert not is_quota_error(ValueError("invalid prompt"))
+        assert is_quota_error(RuntimeError("HTTP 429: slow down"))
+        assert not is_quota_error(ConnectionError("connection refused on port 4290"))
+        assert not is_quota_error(ValueError("payload of 1429 bytes, request id 429a"))
+        assert not is_quota_error(RuntimeError("403 Billing account quota not configured for this project"))
+        assert not is_quota_error(RuntimeError("400 Quota exceeded for metric: invalid key"))
+        assert retry_after(RuntimeError("quota exceeded retry_delay { seconds: 17 }")) == 17.0
+
+    def test_tokens_per_minute_throttles(self):
+        """Test a request waits for the token bucket to refill."""
+        limiter = RateLimiter(tokens_per_minute=1200)
+
+        async def scenario():
+            await limiter.run(self._noop, estimated_tokens=1200)
+            start = time.perf_counter()
+            await limiter.run(self._noop, estimated_tokens=2)
+            return time.perf_counter() - start
+
+        assert asyncio.run(scenario()) >= 0.08
+
+    def test_interactive_before_background(self):
+        """Test queued interactive requests are served before background ones."""
+        limiter = RateLimiter(max_concurrency=1)
+        order = []
+
+        async def scenario():
+            await limiter.acquire()
+
+            async def request(name, priority):
+                await limiter.acquire(priority=priority)
+                order.append(name)
+                await limiter.release(0.01)
+
+            background = asyncio.create_task(request("background", RequestPriority.BACKGROUND))
+            await asyncio.sleep(0.01)
+            interactive = asyncio.create_task(request("interactive", RequestPriority.INTERACTIVE))
+            await asyncio.sleep(0.01)
+            await limiter.release(0.01)
+            await asyncio.gather(background, interactive)
+
+        asyncio.run(scenario())
+        assert order == ["interactive", "background"]
+
+    def test_retries_quota_errors_with_backoff(self):
+        """Test 429s are retried and shrink the concurrency limit."""
+        limiter = RateLimiter(max_concurrency=8, base_delay=0.01)
+        model = FakeQuotaModel(latency=0, fail_first=2)
+
+        result = asyncio.run(limiter.run(lambda: asyncio.to_thread(model.generate_content, "p")))
+
+        assert result.text == "ok 3"
+        stats = limiter.get_stats()
+        assert stats['retries'] == 2
+        assert stats['rate_limited'] == 2
+        assert stats['concurrency_limit'] < 8
+
+    def test_gives_up_after_max_retries(self):
+        """Test the quota error is raised once retries are exhausted."""
+        limiter = RateLimiter(base_delay=0.001, max_retries=2)
+        model = FakeQuotaModel(latency=0, fail_first=100)
+
+        with pytest.raises(ResourceExhausted):
+            asyncio.run(limiter.run(lambda: asyncio.to_thread(model.generate_content, "p")))
+        assert model.calls == 3
+        assert limiter.get_stats()['gave_up'] == 1
+
+    def test_other_errors_are_not_retried(self):
+        """Test non-quota errors propagate immediately."""
+        limiter = RateLimiter(base_delay=0.001)
+
+        async def failing():
+            raise ValueError("invalid")
+
+        with pytest.raises(ValueError):
+            asyncio.run(limiter.run(failing))
+        assert limiter.get_stats()['retries'] == 0
+
+    def test_concurrency_is_bounded_and_adapts(self):
+        """Test in-flight calls never exceed the adaptive limit under 429 load."""
+        limiter = RateLimiter(max_concurrency=4, base_delay=0.005)
+        model = FakeQuotaModel(latency=0.01, fail_every=5)
+
+        async def scenario():
+            calls = [
+                limiter.run(lambda: asyncio.to_thread(model.generate_content, "p"),
+                            priority=RequestPriority.BACKGROUND)
+                for _ in range(30)
+            ]
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(scenario())
+
+        assert len(results) == 30
+        assert model.max_active <= 4
+        stats = limiter.get_stats()
+        assert stats['rate_limited'] > 0
+        assert stats['in_flight'] == 0 and stats['queued'] == 0
+
+    def test_cancelled_calls_release_their_slot(self):
+        """Test cancelled calls give the slot back so later calls still run."""
+        limiter = RateLimiter(max_concurrency=2)
+
+        async def scenario():
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(limiter.run(lambda: asyncio.sleep(10)), 0.05)
+            assert limiter.get_stats()['in_flight'] == 0
+            return await asyncio.wait_for(limiter.run(self._noop), 1.0)
+
+        assert asyncio.run(scenario()) is None
+        stats = limiter.get_stats()
+        assert stats['in_flight'] == 0
+        assert stats['errors'] == 0 and stats['concurrency_limit'] == 2
+
+    def test_client_retries_through_limiter(self, make_client):
+        """Test GeminiClient recovers from injected 429s."""
+        client = make_client(FakeQuotaModel(latency=0, fail_first=1))
+        client.rate_limiter.base_delay = 0.001
+
+        response = asyncio.run(client.generate_response(
+            "analisar", use_cache=False, priority=RequestPriority.BACKGROUND
+        ))
+
+        assert response == "ok 2"
+        assert client.get_performance_stats()['rate_limiter']['retries'] == 1
+
+    @staticmethod
+    async def _noop():
+        return None
@@ -0,0 +1,117 @@
+"""
+Unit tests for the disk-backed response cache used by GeminiClient.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.local_backend import LocalResponse
+from gemini_code.core.response_cache import ResponseCache
+
+
+class FakeModel:
+    """Modelo mínimo que conta chamadas."""
+
+    def __init__(self):
+        self.calls = 0
+        self._generation_config = {}
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return LocalResponse(f"resposta {self.calls}")
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache and its GeminiClient integration."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def client(self, make_client):
+        return make_client(FakeModel())
+
+    def test_key_depends_on_model_config_and_prompt(self):
+        """Test every key component changes the key."""
+        base = ResponseCache.make_key("m", {"temperature": 0.1}, "p")
+        assert base == ResponseCache.make_key("m", {"temperature": 0.1}, "p")
+        assert base != ResponseCache.make_key("m2", {"temperature": 0.1}, "p")
+        assert base != ResponseCache.make_key("m", {"temperature": 0.2}, "p")
+        assert base != ResponseCache.make_key("m", {"temperature": 0.1}, "p2")
+
+    def test_ttl_expiry(self, temp_dir):
+        """Test expired entries are misses."""
+        cache = ResponseCache(temp_dir / "responses.db", ttl_seconds=60)
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        assert cache.get("k") is None
+        assert cache.get_stats()['entries'] == 0
+
+    def test_lru_eviction_by_entries_and_bytes(self, temp_dir):
+        """Test size bounds evict least recently used entries."""
+        cache = ResponseCache(temp_dir / "responses.db", max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+        small = ResponseCache(temp_dir / "small.db", max_bytes=10)
+        small.set("x", "12345")
+        small.set("y", "123456")
+        assert small.get_stats()['size_bytes'] <= 10
+        assert small.get("y") == "123456"
+
+    def test_persists_across_instances(self, temp_dir):
+        """Test cached responses survive a new cache instance."""
+        ResponseCache(temp_dir / "responses.db").set("k", "v")
+        assert ResponseCache(temp_dir / "responses.db").get("k") == "v"
+
+    def test_client_serves_repeated_prompt_from_cache(self, client):
+        """Test identical prompts hit the model only once."""
+        first = asyncio.run(client.generate_response("listar arquivos"))
+        second = asyncio.run(client.generate_response("listar arquivos"))
+
+        assert first == second == "resposta 1"
+        assert client.model.calls == 1
+        assert client.request_count == 1
+        stats = client.get_performance_stats()['response_cache']
+        assert stats['hits'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_client_opt_out_and_distinct_prompts(self, client):
+        """Test use_cache=False and different prompts call the model."""
+        asyncio.run(client.generate_response("listar arquivos"))
+        bypass = asyncio.run(client.generate_response("listar arquivos", use_cache=False))
+        other = asyncio.run(client.generate_response("mostrar status"))
+
+        assert bypass == "resposta 2"
+        assert other == "resposta 3"
+        assert client.model.calls == 3
+
+    def test_client_does_not_cache_errors(self, client):
+        """Test failed generations are not stored."""
+        def boom(prompt, **kwargs):
+            raise RuntimeError("quota")
+
+        client.model.generate_content = boom
+        error = asyncio.run(client.generate_response("listar arquivos"))
+        assert error.startswith("❌")
+        assert client.response_cache.get_stats()['entries'] == 0
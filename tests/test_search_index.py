@@ -0,0 +1,102 @@
+"""
+Unit tests for the trigram search index.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+import os
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.search_index import TrigramIndex
+from gemini_code.tools.base_tool import ToolInput
+from gemini_code.tools.search_tools import GrepTool
+
+
+class TestTrigramIndex:
+    """Test suite for TrigramIndex and its GrepTool integration."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Temporary corpus with a handful of files."""
+        temp_dir = Path(tempfile.mkdtemp())
+        (temp_dir / "alpha.py").write_text("def process_payment(amount):\n    return amount\n")
+        (temp_dir / "beta.py").write_text("class PaymentGateway:\n    pass\n")
+        (temp_dir / "gamma.txt").write_text("nothing interesting here\n")
+        (temp_dir / "sub").mkdir()
+        (temp_dir / "sub" / "delta.py").write_text("def refund():\n    pass\n")
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _files(self, root):
+        return sorted(p for p in root.rglob('*') if p.is_file() and '.gemini_code' not in p.parts)
+
+    def test_literal_candidates(self, temp_dir):
+        """Test plain literal search narrows candidates."""
+        index = TrigramIndex(temp_dir)
+        index.refresh(self._files(temp_dir))
+
+        candidates = index.candidate_paths("payment", regex=False)
+        assert candidates == {str(temp_dir / "alpha.py"), str(temp_dir / "beta.py")}
+
+    def test_regex_candidates(self, temp_dir):
+        """Test required literals and alternations are extracted from regex."""
+        index = TrigramIndex(temp_dir)
+        index.refresh(self._files(temp_dir))
+
+        assert index.candidate_paths(r"def\s+refund") == {str(temp_dir / "sub" / "delta.py")}
+        assert index.candidate_paths(r"refund|Gateway") == {
+            str(temp_dir / "sub" / "delta.py"), str(temp_dir / "beta.py")
+        }
+        # Sem literais úteis o índice não restringe
+        assert index.candidate_paths(r"\w+") is None
+
+    def test_incremental_update_and_persistence(self, temp_dir):
+        """Test changed files are reindexed and index survives reload."""
+        index = TrigramIndex(temp_dir)
+        index.refresh(self._files(temp_dir))
+
+        gamma = temp_dir / "gamma.txt"
+        gamma.write_text("payment pending\n")
+        stat = gamma.stat()
+        os.utime(gamma, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert index.refresh(self._files(temp_dir))['updated'] == 1
+        assert str(gamma) in index.candidate_paths("payment", regex=False)
+
+        reloaded = TrigramIndex(temp_dir)
+        assert reloaded.refresh(self._files(temp_dir))['updated'] == 0
+        assert str(gamma) in reloaded.candidate_paths("payment", regex=False)
+
+    def test_removed_files_are_pruned(self, temp_dir):
+        """Test prune_missing drops deleted files."""
+        index = TrigramIndex(temp_dir)
+        index.refresh(self._files(temp_dir))
+        (temp_dir / "beta.py").unlink()
+
+        assert index.refresh(self._files(temp_dir), prune_missing=True)['removed'] == 1
+        assert index.candidate_paths("Gateway", regex=False) == set()
+
+    @pytest.mark.parametrize("pattern,regex", [
+        ("payment", False),
+        ("PAYMENT", False),
+        (r"def\s+\w+", True),
+        (r"(refund|process)_?", True),
+    ])
+    def test_grep_results_match_brute_force(self, temp_dir, pattern, regex):
+        """Test indexed grep returns exactly the brute-force matches."""
+        brute = GrepTool()
+        indexed = GrepTool()
+        indexed.enable_index(temp_dir)
+        tool_input = ToolInput(command=pattern, kwargs={'target': str(temp_dir), 'regex': regex})
+
+        brute_result = asyncio.run(brute.execute(tool_input))
+        indexed_result = asyncio.run(indexed.execute(tool_input))
+
+        assert indexed_result.success
+        assert indexed_result.metadata['indexed'] is True
+        assert indexed_result.data['matches'] == brute_result.data['matches']
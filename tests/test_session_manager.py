@@ -0,0 +1,289 @@
+"""
+Tests for SessionManager incremental persistence, search and pagination.
+"""
+
+import asyncio
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.cli.session_manager import SessionManager
+
+
+def _turn(i):
+    return [
+        {'timestamp': datetime.now(), 'input': f"pergunta {i}", 'type': 'user'},
+        {'timestamp': datetime.now(), 'output': f"resposta {i}", 'type': 'assistant'},
+    ]
+
+
+def _context_rows(manager, session_id):
+    conn = sqlite3.connect(str(manager.db_path))
+    try:
+        return conn.execute(
+            "SELECT id, content FROM session_context WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def _count(manager, table):
+    conn = sqlite3.connect(str(manager.db_path))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestSessionManager:
+    """Test suite for SessionManager.save_session and command logging."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return SessionManager(tmp_path)
+
+    @pytest.fixture
+    def session_id(self, manager):
+        return asyncio.run(manager.create_session("teste"))['id']
+
+    def test_append_only_inserts_delta(self, manager, session_id):
+        """Test later saves keep existing rows and insert only new items."""
+        context = _turn(0) + _turn(1)
+        asyncio.run(manager.save_session(session_id, context))
+        before = _context_rows(manager, session_id)
+
+        context.extend(_turn(2))
+        asyncio.run(manager.save_session(session_id, context))
+        after = _context_rows(manager, session_id)
+
+        assert after[:4] == before
+        assert [content for _, content in after[4:]] == ["pergunta 2", "resposta 2"]
+        assert manager.save_stats['rows_inserted'] == 6
+        assert manager.save_stats['rows_deleted'] == 0
+
+    def test_unchanged_context_skips_write(self, manager, session_id):
+        """Test saving the same context twice does not touch the database."""
+        context = _turn(0)
+        asyncio.run(manager.save_session(session_id, context))
+        asyncio.run(manager.save_session(session_id, context))
+        assert manager.save_stats['saves'] == 1
+
+    def test_compaction_deletes_only_head(self, manager, session_id):
+        """Test dropping the start of the context keeps the surviving rows."""
+        context = [item for i in range(6) for item in _turn(i)]
+        asyncio.run(manager.save_session(session_id, context))
+        kept = _context_rows(manager, session_id)[-5:]
+
+        compacted = context[-5:] + _turn(6)
+        asyncio.run(manager.save_session(session_id, compacted))
+        rows = _context_rows(manager, session_id)
+
+        assert rows[:5] == kept
+        assert [content for _, content in rows] == [
+            "resposta 3", "pergunta 4", "resposta 4", "pergunta 5", "resposta 5", "pergunta 6", "resposta 6"
+        ]
+        assert manager.save_stats['rows_deleted'] == 7
+
+    def test_changed_last_item_is_rewritten(self, manager, session_id):
+        """Test replacing the last item rewrites just that row."""
+        context = _turn(0) + _turn(1)
+        asyncio.run(manager.save_session(session_id, context))
+        first_ids = [row_id for row_id, _ in _context_rows(manager, session_id)[:3]]
+
+        context[-1] = {'output': "resposta 1 corrigida", 'type': 'assistant'}
+        asyncio.run(manager.save_session(session_id, context))
+        rows = _context_rows(manager, session_id)
+
+        assert [row_id for row_id, _ in rows[:3]] == first_ids
+        assert rows[-1][1] == "resposta 1 corrigida"
+        assert len(rows) == 4
+
+    def test_clear_current_session(self, manager, session_id):
+        """Test clearing removes the saved context."""
+        asyncio.run(manager.save_session(session_id, _turn(0)))
+        asyncio.run(manager.clear_current_session())
+        assert _context_rows(manager, session_id) == []
+
+    def test_reload_and_continue(self, manager, session_id, tmp_path):
+        """Test a loaded session keeps its rows when saved again with new items."""
+        asyncio.run(manager.save_session(session_id, _turn(0) + _turn(1)))
+        before = _context_rows(manager, session_id)
+
+        reopened = SessionManager(tmp_path)
+        session = asyncio.run(reopened.load_session(session_id))
+        assert [item['content'] for item in session['context']] == [content for _, content in before]
+
+        context = session['context'] + _turn(2)
+        asyncio.run(reopened.save_session(session_id, context))
+        assert _context_rows(reopened, session_id)[:4] == before
+        assert reopened.save_stats['rows_inserted'] == 2
+
+    def test_commands_are_batched(self, tmp_path):
+        """Test commands are buffered until the batch size is reached."""
+        manager = SessionManager(tmp_path, command_batch_size=5, checkpoint_interval=3600)
+        session_id = asyncio.run(manager.create_session())['id']
+        for i in range(4):
+            asyncio.run(manager.log_command(session_id, f"/cmd{i}", 'slash', 'ok', 3, True))
+        assert _count(manager, 'session_commands') == 0
+
+        asyncio.run(manager.log_command(session_id, "/cmd4", 'slash', 'ok', 3, True))
+        assert _count(manager, 'session_commands') == 5
+        assert manager.save_stats['checkpoints'] == 1
+
+    def test_readers_see_buffered_commands(self, tmp_path):
+        """Test stats and saves flush buffered commands first."""
+        manager = SessionManager(tmp_path, command_batch_size=100, checkpoint_interval=3600)
+        session_id = asyncio.run(manager.create_session())['id']
+        asyncio.run(manager.log_command(session_id, "/help", 'slash', 'ok', 2, True))
+        asyncio.run(manager.log_command(session_id, "criar api", 'natural', 'ok', 40, False))
+
+        stats = asyncio.run(manager.get_session_stats(session_id))
+        assert stats['total_commands'] == 2
+        assert stats['command_stats']['natural']['success_rate'] == 0
+
+        asyncio.run(manager.log_command(session_id, "/cost", 'slash', 'ok', 2, True))
+        asyncio.run(manager.save_current_session())
+        assert _count(manager, 'session_commands') == 3
+        sessions = asyncio.run(manager.list_sessions())
+        assert sessions[0]['command_count'] == 3
+
+    def test_align(self):
+        """Test context alignment for append, compaction and rewrite."""
+        saved = [('user', str(i), 0) for i in range(6)]
+        assert SessionManager._align(saved, saved + [('user', 'x', 0)]) == (0, 6)
+        assert SessionManager._align(saved, saved[2:] + [('user', 'x', 0)]) == (2, 4)
+        assert SessionManager._align(saved, saved[:3] + [('user', 'x', 0)]) == (0, 3)
+        assert SessionManager._align(saved, [('user', 'x', 0)]) == (0, 0)
+
+
+class TestSessionSearchAndPaging:
+    """Test suite for indexed search, keyset listing and lazy context loading."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return SessionManager(tmp_path)
+
+    def _session(self, manager, name, contents):
+        session_id = asyncio.run(manager.create_session(name))['id']
+        context = [{'content': content, 'type': 'user'} for content in contents]
+        asyncio.run(manager.save_session(session_id, context))
+        return session_id
+
+    def test_search_ranks_and_highlights(self, manager):
+        """Test search ranks the most relevant session first with a snippet."""
+        best = self._session(manager, "deploy", [
+            "erro de conexão recusada no postgres", "postgres recusou conexão de novo"])
+        other = self._session(manager, "frontend", ["componente react", "conexão websocket"])
+        self._session(manager, "docs", ["escrever readme"])
+
+        results = asyncio.run(manager.search_sessions("conexao"))
+
+        assert [r['id'] for r in results] == [best, other]
+        assert results[0]['matches'] == 2
+        assert "**conexão**" in results[0]['snippet']
+        assert results[0]['score'] > results[1]['score']
+
+    def test_search_matches_names_and_all_terms(self, manager):
+        """Test names are searchable and every term must match."""
+        named = self._session(manager, "migracao banco pedidos", ["ok"])
+        self._session(manager, "outra", ["banco de dados"])
+
+        assert [r['id'] for r in asyncio.run(manager.search_sessions("pedidos"))] == [named]
+        assert [r['id'] for r in asyncio.run(manager.search_sessions("banco pedidos"))] == [named]
+        assert asyncio.run(manager.search_sessions("   ")) == []
+
+    def test_search_follows_deletes(self, manager):
+        """Test deleted sessions and removed context leave the index."""
+        session_id = self._session(manager, "temporaria", ["kubernetes timeout"])
+        asyncio.run(manager.save_session(session_id, []))
+        assert asyncio.run(manager.search_sessions("kubernetes")) == []
+        asyncio.run(manager.delete_session(session_id))
+        assert asyncio.run(manager.search_sessions("temporaria")) == []
+
+    def test_existing_database_is_indexed(self, tmp_path):
+        """Test sessions saved before the FTS migration are searchable."""
+        legacy = SessionManager(tmp_path)
+        session_id = self._session(legacy, "antiga", ["configurar nginx"])
+        conn = sqlite3.connect(str(legacy.db_path))
+        with conn:
+            conn.execute("DROP TABLE session_context_fts")
+            conn.execute("DROP TABLE session_names_fts")
+            conn.execute("PRAGMA user_version = 0")
+        conn.close()
+
+        manager = SessionManager(tmp_path)
+        assert manager.schema_version == 1
+        assert [r['id'] for r in asyncio.run(manager.search_sessions("nginx"))] == [session_id]
+
+    def test_keyset_pagination(self, manager):
+        """Test pages follow the cursor without repeating or skipping sessions."""
+        created = [asyncio.run(manager.create_session(f"s{i}"))['id'] for i in range(7)]
+        seen, after = [], None
+        while True:
+            page = asyncio.run(manager.list_sessions(limit=3, after=after))
+            if not page:
+                break
+            seen.extend(session['id'] for session in page)
+            after = page[-1]['cursor']
+        assert sorted(seen) == sorted(created)
+        assert len(seen) == len(set(seen))
+        assert seen[0] == created[-1]
+
+    def test_lazy_context_loading(self, manager, tmp_path):
+        """Test resume loads the tail and older pages load on demand."""
+        session_id = self._session(manager, "longa", [f"item {i}" for i in range(10)])
+
+        reopened = SessionManager(tmp_path)
+        reopened.context_page_size = 3
+        session = asyncio.run(reopened.load_session(session_id))
+        assert [item['content'] for item in session['context']] == ["item 7", "item 8", "item 9"]
+        assert session['has_more_context'] is True
+
+        older = asyncio.run(reopened.load_context_page(session_id, before_id=session['context'][0]['id']))
+        assert [item['content'] for item in older] == ["item 4", "item 5", "item 6"]
+
+        context = session['context'] + [{'content': "item 10", 'type': 'user'}]
+        asyncio.run(reopened.save_session(session_id, context))
+        assert len(_context_rows(reopened, session_id)) == 11
+        assert asyncio.run(reopened.list_sessions())[0]['context_size'] == 11
+
+        full = asyncio.run(reopened.export_session(session_id))
+        assert len(full['context']) == 11
+
+    def test_prepended_page_keeps_unloaded_rows(self, manager, tmp_path):
+        """Test saving after prepending an older page keeps the rows never loaded."""
+        session_id = self._session(manager, "paginada", [f"item {i}" for i in range(20)])
+
+        reopened = SessionManager(tmp_path)
+        reopened.context_page_size = 5
+        session = asyncio.run(reopened.load_session(session_id))
+        older = asyncio.run(reopened.load_context_page(session_id, before_id=session['context'][0]['id']))
+        assert [item['content'] for item in older] == [f"item {i}" for i in range(10, 15)]
+
+        context = older + session['context']
+        asyncio.run(reopened.save_session(session_id, context))
+        assert [row[1] for row in _context_rows(reopened, session_id)] == [f"item {i}" for i in range(20)]
+        assert reopened.save_stats['rows_inserted'] == 0
+
+        context = context + [{'content': "item 20", 'type': 'user'}]
+        asyncio.run(reopened.save_session(session_id, context))
+        assert len(_context_rows(reopened, session_id)) == 21
+        assert asyncio.run(reopened.list_sessions())[0]['context_size'] == 21
+
+    def test_switch_by_id_prefix(self, manager):
+        """Test switching accepts the short id shown by /sessions."""
+        session_id = self._session(manager, "curta", ["ok"])
+        asyncio.run(manager.create_session("outra"))
+        assert manager.resolve_session_id(session_id[:8]) == session_id
+        assert asyncio.run(manager.switch_session(session_id[:8])) is True
+        assert manager.current_session_id == session_id
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
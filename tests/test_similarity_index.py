@@ -0,0 +1,190 @@
+"""
+Tests for the local similarity index shared by memory, learning and problem solving.
+"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.cognition.learning_engine import LearningEngine, LearningEntry, LearningType
+from gemini_code.core.memory_system import MemorySystem
+from gemini_code.core.similarity_index import HashingVectorizer, SimilarityIndex
+
+
+DOCS = {
+    1: "Erro de conexão recusada ao acessar o banco postgres",
+    2: "Como criar um componente React com hooks",
+    3: "Timeout ao fazer deploy no kubernetes",
+    4: "ImportError ao importar numpy no ambiente virtual",
+    5: "Lentidão nas consultas SQL da tabela de pedidos",
+}
+
+
+class TestHashingVectorizer:
+    """Test suite for HashingVectorizer."""
+
+    def test_vectors_are_normalized(self):
+        """Test vectors have unit length and are stable across calls."""
+        vectorizer = HashingVectorizer()
+        vector = vectorizer.transform("Conexão recusada pelo servidor")
+        assert abs(sum(w * w for w in vector.values()) - 1.0) < 1e-9
+        assert vector == vectorizer.transform("conexao RECUSADA pelo servidor")
+
+    def test_inflections_are_similar(self):
+        """Test word variants share character n-grams."""
+        vectorizer = HashingVectorizer()
+        related = vectorizer.similarity("conexão recusada ao banco", "o banco recusou a conexao")
+        unrelated = vectorizer.similarity("conexão recusada ao banco", "componente react com hooks")
+        assert related > 0.3
+        assert unrelated < 0.1
+        assert related > 5 * unrelated
+
+    def test_empty_text(self):
+        """Test texts without terms produce empty vectors."""
+        assert HashingVectorizer().transform("!!! ?? .") == {}
+
+
+class TestSimilarityIndex:
+    """Test suite for SimilarityIndex."""
+
+    @pytest.fixture
+    def index(self):
+        index = SimilarityIndex()
+        index.add_many(DOCS.items())
+        return index
+
+    def test_search_ranks_paraphrase_first(self, index):
+        """Test a paraphrased query finds the right document."""
+        hits = index.search("o postgres recusou a conexao", k=3)
+        assert hits[0].key == 1
+        assert hits[0].score > 0.3
+        assert all(a.score >= b.score for a, b in zip(hits, hits[1:]))
+
+    def test_min_score_filters(self, index):
+        """Test unrelated queries return nothing above the threshold."""
+        assert index.search("receita de bolo de cenoura", min_score=0.2) == []
+
+    def test_remove_and_reindex(self, index):
+        """Test removed keys disappear and re-adding a key replaces it."""
+        index.remove(1)
+        assert 1 not in index
+        assert all(hit.key != 1 for hit in index.search("conexão recusada postgres"))
+
+        index.add(3, "Conexão recusada no postgres de produção")
+        assert len(index) == 4
+        assert index.search("conexão recusada postgres", k=1)[0].key == 3
+
+    def test_persistence_roundtrip(self, index, tmp_path):
+        """Test save/load keeps results and watermark, dropping deleted docs."""
+        path = tmp_path / 'docs.simidx'
+        index.remove(2)
+        index.watermark = 5
+        index.save(path)
+
+        loaded = SimilarityIndex(path)
+        assert len(loaded) == 4
+        assert loaded.watermark == 5
+        assert 2 not in loaded
+        query = "deploy kubernetes demorando"
+        assert [h.key for h in loaded.search(query)] == [h.key for h in index.search(query)]
+
+    def test_incompatible_file_is_ignored(self, tmp_path, capsys):
+        """Test an index saved with another vectorizer is discarded."""
+        path = tmp_path / 'docs.simidx'
+        SimilarityIndex(vectorizer=HashingVectorizer(n_features=1024)).save(path)
+        index = SimilarityIndex(path)
+        assert len(index) == 0
+        assert "ignorado" in capsys.readouterr().out
+
+    def test_autosave(self, tmp_path):
+        """Test autosave_every writes the file after N inserts."""
+        path = tmp_path / 'auto.simidx'
+        index = SimilarityIndex(path, autosave_every=3)
+        index.add_many(list(DOCS.items())[:3])
+        assert path.exists()
+        assert len(SimilarityIndex(path)) == 3
+
+    def test_common_features_are_skipped(self):
+        """Test very frequent features do not dominate the search."""
+        index = SimilarityIndex(max_df_ratio=0.05)
+        for key in range(400):
+            index.add(key, f"erro generico numero {key}")
+        index.add(1000, "erro de memoria insuficiente no worker")
+        assert index.search("memoria insuficiente", k=1)[0].key == 1000
+
+
+class TestSimilarityConsumers:
+    """Test the index wired into MemorySystem and LearningEngine."""
+
+    def test_memory_recall_finds_paraphrase(self, tmp_path):
+        """Test recall returns conversations FTS alone would miss."""
+        memory = MemorySystem(str(tmp_path))
+        memory.remember_conversation("Erro de conexão recusada no postgres", "Verifique o pg_hba.conf")
+        memory.remember_conversation("Como criar componente React", "Use function components")
+
+        results = memory.recall_similar_conversations("o banco recusou conectar")
+        assert results
+        assert results[0]['assistant_response'] == "Verifique o pg_hba.conf"
+        memory.close()
+
+    def test_memory_index_resyncs_after_restart(self, tmp_path):
+        """Test rows written after the last index save are indexed on open."""
+        memory = MemorySystem(str(tmp_path))
+        memory.remember_conversation("Deploy no kubernetes falhou", "Aumente o timeout")
+        memory.close()
+        (memory.memory_dir / 'conversations.simidx').unlink()
+
+        reopened = MemorySystem(str(tmp_path))
+        assert len(reopened.similarity) == 1
+        assert reopened.similarity.watermark == 1
+        reopened.close()
+
+    def test_compaction_removes_archived_from_index(self, tmp_path):
+        """Test archived conversations leave the similarity index."""
+        memory = MemorySystem(str(tmp_path))
+        for i in range(5):
+            memory.remember_conversation(f"Pergunta {i} sobre deploy", "resposta")
+        memory.compact_memory(max_entries=2)
+        assert len(memory.similarity) == 2
+        memory.close()
+
+    def test_learning_engine_finds_similar_contexts(self, tmp_path):
+        """Test pattern detection groups paraphrased contexts of the same type."""
+        cwd = os.getcwd()
+        os.chdir(tmp_path)
+        try:
+            engine = LearningEngine(MagicMock(), MagicMock())
+            contexts = [
+                "executar testes unitarios do modulo de pagamento",
+                "executando os testes unitários do pagamento",
+                "rodar testes unitarios no modulo pagamentos",
+                "configurar nginx como proxy reverso",
+            ]
+            for i, context in enumerate(contexts):
+                engine._save_learning_entry(LearningEntry(
+                    id=f"learn_{i}", type=LearningType.TOOL_USAGE, context=context,
+                    observation="ok", outcome="success", confidence=0.8, timestamp=datetime.now()
+                ))
+            entry = LearningEntry(
+                id="query", type=LearningType.TOOL_USAGE, context="testes unitarios do pagamento",
+                observation="", outcome="", confidence=0.8, timestamp=datetime.now()
+            )
+            similar = engine._find_similar_entries(entry)
+            assert {e.id for e in similar} == {"learn_0", "learn_1", "learn_2"}
+
+            # Novo processo: o índice é reconstruído a partir do banco
+            reopened = LearningEngine(MagicMock(), MagicMock())
+            assert len(reopened.similarity) == 4
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
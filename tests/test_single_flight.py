@@ -0,0 +1,197 @@
+"""
+Unit tests for single-flight coalescing of identical in-flight requests.
+"""
+
+import pytest
+import asyncio
+import time
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.local_backend import LocalResponse
+from gemini_code.core.single_flight import SingleFlight
+
+
+class SlowModel:
+    """Modelo local com latência fixa que conta as chamadas."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+        self._generation_config = {}
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return LocalResponse(f"resposta {self.calls}")
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test identical concurrent keys run the factory once."""
+        flight = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.02)
+            return "shared"
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do("k", work, weight=10) for _ in range(5)))
+
+        assert asyncio.run(scenario()) == ["shared"] * 5
+        assert len(runs) == 1
+        stats = flight.get_stats()
+        assert stats['executed'] == 1
+        assert stats['coalesced'] == 4
+        assert stats['saved_tokens'] == 40
+        assert stats['in_flight'] == 0
+
+    def test_sequential_and_distinct_keys_are_not_shared(self):
+        """Test finished calls are forgotten and different keys run separately."""
+        flight = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            return len(runs)
+
+        async def scenario():
+            first = await flight.do("a", work)
+            second = await flight.do("a", work)
+            third, fourth = await asyncio.gather(flight.do("b", work), flight.do("c", work))
+            return first, second, third, fourth
+
+        assert asyncio.run(scenario()) == (1, 2, 3, 4)
+        assert flight.get_stats()['coalesced'] == 0
+
+    def test_errors_propagate_to_all_waiters(self):
+        """Test every waiter receives the leader's exception."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("quota")
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do("k", failing) for _ in range(3)),
+                                        return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.get_stats()['errors'] == 1
+
+    def test_cancelling_one_waiter_keeps_the_shared_call(self):
+        """Test a cancelled caller does not cancel the call others wait on."""
+        flight = SingleFlight()
+        finished = []
+
+        async def work():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+            return "done"
+
+        async def scenario():
+            leader = asyncio.create_task(flight.do("k", work))
+            follower = asyncio.create_task(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        assert asyncio.run(scenario()) == "done"
+        assert finished == [1]
+        assert flight.get_stats()['cancelled'] == 0
+
+    def test_call_is_cancelled_when_all_waiters_leave(self):
+        """Test the shared call stops once nobody is waiting for it."""
+        flight = SingleFlight()
+        finished = []
+
+        async def work():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+
+        async def scenario():
+            waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+            await asyncio.sleep(0.06)
+
+        asyncio.run(scenario())
+        assert finished == []
+        stats = flight.get_stats()
+        assert stats['cancelled'] == 1
+        assert stats['in_flight'] == 0
+
+
+class TestClientCoalescing:
+    """Test suite for GeminiClient request coalescing."""
+
+    @pytest.fixture
+    def client(self, make_client):
+        return make_client(SlowModel())
+
+    def test_identical_prompts_hit_the_model_once(self, client):
+        """Test concurrent identical prompts are billed once, even without cache."""
+        async def scenario():
+            return await asyncio.gather(
+                *(client.generate_response("explicar o projeto", use_cache=False) for _ in range(4)),
+                client.generate_response("outro prompt", use_cache=False)
+            )
+
+        results = asyncio.run(scenario())
+
+        assert results[:4] == [results[0]] * 4
+        assert client.model.calls == 2
+        assert client.request_count == 2
+        assert client.get_performance_stats()['single_flight']['coalesced'] == 3
+
+    def test_errors_reach_every_caller(self, client):
+        """Test a failed shared call returns the error to all callers."""
+        def boom(prompt, **kwargs):
+            time.sleep(0.02)
+            raise ValueError("invalid prompt")
+        client.model.generate_content = boom
+
+        async def scenario():
+            return await asyncio.gather(*(client.generate_response("p", use_cache=False) for _ in range(3)))
+
+        results = asyncio.run(scenario())
+        assert all(r.startswith("❌ Erro ao gerar resposta: invalid prompt") for r in results)
+
+    def test_coalescing_can_be_disabled(self, client):
+        """Test coalesce_requests=False sends every call to the model."""
+        client.coalesce_requests = False
+
+        async def scenario():
+            return await asyncio.gather(*(client.generate_response("p", use_cache=False) for _ in range(3)))
+
+        asyncio.run(scenario())
+        assert client.model.calls == 3
+
+    def test_client_serves_new_requests_after_waiters_time_out(self, client):
+        """Test timed-out callers cancel the shared call without leaking limiter slots."""
+        client.rate_limiter.max_concurrency = 2
+        client.rate_limiter.concurrency_limit = 2.0
+        client.model.latency = 0.2
+
+        async def scenario():
+            for i in range(3):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.generate_response(f"lento {i}", use_cache=False), 0.02)
+            client.model.latency = 0
+            return await asyncio.wait_for(client.generate_response("novo", use_cache=False), 2.0)
+
+        assert asyncio.run(scenario()).startswith("resposta")
+        assert client.get_performance_stats()['single_flight']['cancelled'] == 3
+        assert client.rate_limiter.get_stats()['in_flight'] == 0
@@ -0,0 +1,144 @@
+"""
+Unit tests for the pooled WAL-mode SQLite access layer.
+"""
+
+import pytest
+import os
+import sqlite3
+import tempfile
+import shutil
+import threading
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.sqlite_pool import PooledConnection, SQLitePool, get_pool
+
+
+class TestSQLitePool:
+    """Test suite for SQLitePool."""
+
+    @pytest.fixture
+    def pool(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        pool = SQLitePool(temp_dir / "store.db")
+        conn = pool.connect()
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.commit()
+        conn.close()
+        yield pool
+        pool.close_all()
+        shutil.rmtree(temp_dir)
+
+    def test_connections_are_reused_with_wal_pragmas(self, pool):
+        """Test close() returns the connection and pragmas are applied."""
+        first = pool.connect()
+        assert isinstance(first, sqlite3.Connection)
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        first.close()
+
+        second = pool.connect()
+        assert second is first
+        second.close()
+        assert pool.get_stats()['created'] == 1
+
+    def test_nested_connections_are_distinct(self, pool):
+        """Test closing an inner connection does not touch the outer transaction."""
+        outer = pool.connect()
+        outer.execute("INSERT INTO items (name) VALUES ('outer')")
+
+        inner = pool.connect()
+        assert inner is not outer
+        inner.close()
+
+        outer.commit()
+        outer.close()
+        assert pool.execute("SELECT name FROM items") == [("outer",)]
+
+    def test_close_discards_uncommitted_work_and_resets_state(self, pool):
+        """Test release behaves like the old close(): rollback, default row_factory."""
+        conn = pool.connect()
+        conn.row_factory = sqlite3.Row
+        conn.execute("INSERT INTO items (name) VALUES ('lost')")
+        conn.close()
+
+        conn = pool.connect()
+        assert conn.row_factory is None
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        conn.close()
+
+    def test_connection_context_commits(self, pool):
+        """Test connection() commits on success and rolls back on error."""
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('kept')")
+
+        with pytest.raises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('dropped')")
+                raise RuntimeError("boom")
+
+        assert pool.execute("SELECT name FROM items") == [("kept",)]
+
+    def test_thread_affinity(self, pool):
+        """Test each thread gets its own connections."""
+        main_conn = pool.connect()
+        main_conn.close()
+        seen = []
+
+        def worker():
+            conn = pool.connect()
+            seen.append(conn)
+            conn.close()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen[0] is not main_conn
+        assert pool.connect() is main_conn
+
+    def test_writer_commits_while_reader_is_open(self, pool):
+        """Test WAL lets a writer commit during a read transaction (no busy wait)."""
+        pool.execute("INSERT INTO items (name) VALUES ('committed')")
+
+        reader = pool.connect()
+        reader.execute("BEGIN")
+        assert reader.execute("SELECT name FROM items").fetchall() == [("committed",)]
+
+        writer = SQLitePool(pool.db_path, pragmas={'busy_timeout': 0}).connect()
+        writer.execute("INSERT INTO items (name) VALUES ('background')")
+        writer.commit()
+        writer._close()
+
+        # O leitor continua no seu snapshot até encerrar a transação
+        assert reader.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        reader.rollback()
+        assert reader.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        reader.close()
+
+    def test_recreated_file_is_not_served_by_stale_connection(self, pool):
+        """Test a deleted-and-recreated database gets fresh connections."""
+        pool.close_all()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(pool.db_path + suffix):
+                os.remove(pool.db_path + suffix)
+
+        conn = pool.connect()
+        conn.execute("CREATE TABLE fresh (x)")
+        conn.commit()
+        conn.close()
+        os.remove(pool.db_path)
+
+        conn = pool.connect()
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+        conn.close()
+
+    def test_get_pool_is_shared_per_path(self, tmp_path):
+        """Test stores pointing at the same file share one pool."""
+        path = tmp_path / "shared.db"
+        assert get_pool(path) is get_pool(str(path))
+        assert isinstance(get_pool(path).connect(), PooledConnection)
+        get_pool(path).close_all()
@@ -0,0 +1,135 @@
+"""
+Unit tests for per-call model telemetry (histograms, cost and /cost).
+"""
+
+import pytest
+import asyncio
+import json
+import random
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core.telemetry import Histogram, ModelTelemetry
+
+
+class UsageModel:
+    """Fake model reporting usage metadata; fails on prompts containing 'falhe'."""
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        if "falhe" in prompt:
+            raise RuntimeError("erro interno")
+        usage = SimpleNamespace(prompt_token_count=1000, candidates_token_count=200)
+        if stream:
+            return iter([SimpleNamespace(text="parte 1 "), SimpleNamespace(text="parte 2")])
+        return SimpleNamespace(text="resposta", usage_metadata=usage)
+
+
+class TestHistogram:
+    """Test suite for Histogram."""
+
+    def test_percentiles_are_close_to_exact_values(self):
+        """Test p50/p95/p99 stay within the bucket error of exact percentiles."""
+        rng = random.Random(1)
+        samples = [rng.lognormvariate(0, 1) for _ in range(20000)]
+        histogram = Histogram()
+        for value in samples:
+            histogram.record(value)
+
+        ordered = sorted(samples)
+        for q in (50, 95, 99):
+            exact = ordered[int(len(ordered) * q / 100) - 1]
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.05)
+        assert histogram.count == 20000
+
+    def test_memory_is_bounded(self):
+        """Test bucket count stays bounded for any range of values."""
+        histogram = Histogram(max_buckets=100)
+        for value in [0, -1, 1e-9, 1e9] + [i / 10 for i in range(100000)]:
+            histogram.record(value)
+
+        assert len(histogram.buckets) <= 101
+        assert histogram.percentile(100) == histogram.max == 1e9
+        assert Histogram().percentile(50) is None
+
+
+class TestModelTelemetry:
+    """Test suite for ModelTelemetry."""
+
+    def test_cost_uses_longest_prefix_and_overrides(self):
+        """Test model pricing lookup and configured overrides."""
+        telemetry = ModelTelemetry({'gemini-2.5-flash': [1.0, 2.0]})
+
+        assert telemetry.price('gemini-2.5-flash-lite') == (0.10, 0.40)
+        assert telemetry.cost('gemini-2.5-flash-preview', 1_000_000, 500_000) == pytest.approx(2.0)
+        assert telemetry.price('modelo-desconhecido') == (0.25, 1.00)
+
+    def test_summary_groups_and_export(self, tmp_path):
+        """Test grouping by subsystem/model and the exported metrics file."""
+        telemetry = ModelTelemetry()
+        for i in range(10):
+            telemetry.record('analysis.error_detector', 'gemini-2.5-flash', latency=0.1 * (i + 1),
+                             queue_wait=0.01, prompt_tokens=1000, output_tokens=100)
+        telemetry.record('interface.chat', 'gemini-2.5-pro', latency=2.0, error=True)
+
+        by_subsystem = telemetry.summary()['groups']
+        assert by_subsystem['analysis.error_detector']['calls'] == 10
+        assert by_subsystem['analysis.error_detector']['latency']['p95'] == pytest.approx(1.0, rel=0.05)
+        assert by_subsystem['interface.chat']['errors'] == 1
+        assert by_subsystem['interface.chat']['cost_total'] == 0
+
+        data = json.loads(telemetry.export(tmp_path / "m" / "calls.json").read_text())
+        assert set(data['by_model']['groups']) == {'gemini-2.5-flash', 'gemini-2.5-pro'}
+        assert data['by_subsystem']['total']['calls'] == 11
+
+
+class TestClientTelemetry:
+    """Test suite for GeminiClient call recording and /cost."""
+
+    @pytest.fixture
+    def client(self, make_client):
+        client = make_client(UsageModel())
+        client.response_cache = None
+        return client
+
+    def test_calls_are_tagged_by_calling_subsystem(self, client):
+        """Test the subsystem comes from the calling gemini_code module or the argument."""
+        namespace = {'__name__': 'gemini_code.analysis.fake_module'}
+        exec("async def run(client):\n    return await client.generate_response('oi')", namespace)
+
+        async def scenario():
+            await namespace['run'](client)
+            await client.generate_response("olá", subsystem="interface.chat")
+            await client.generate_response("falhe agora")
+
+        asyncio.run(scenario())
+
+        groups = client.telemetry.summary()['groups']
+        assert groups['analysis.fake_module']['prompt_tokens_total'] == 1000
+        assert groups['analysis.fake_module']['output_tokens_total'] == 200
+        assert groups['interface.chat']['calls'] == 1
+        assert groups['other']['errors'] == 1
+
+    def test_stream_records_time_to_first_token(self, client):
+        """Test streamed calls record TTFT and queue wait."""
+        asyncio.run(client.generate_response("conte algo", stream=True, subsystem="cli"))
+
+        cli = client.telemetry.summary()['groups']['cli']
+        assert cli['ttft']['count'] == 1
+        assert cli['queue_wait']['count'] == 1
+        assert cli['output_tokens_total'] > 0
+
+    def test_cost_command_reports_percentiles_and_exports(self, client):
+        """Test /cost shows per-subsystem cost with percentiles and writes the metrics file."""
+        from gemini_code.core.master_system import GeminiCodeMasterSystem
+
+        asyncio.run(client.generate_response("oi", subsystem="analysis.performance"))
+        result = asyncio.run(GeminiCodeMasterSystem._handle_cost_command(SimpleNamespace(gemini_client=client)))
+
+        assert result['success'] and result['type'] == 'cost'
+        assert "analysis.performance" in result['content'] and "p99" in result['content']
+        assert result['data']['total_cost'] > 0
+        assert Path(result['data']['metrics_file']).exists()
@@ -0,0 +1,131 @@
+"""
+Unit tests for the shared token-accounting service.
+"""
+
+import pytest
+import asyncio
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gemini_code.core import token_counter as token_counter_module
+from gemini_code.core.chunking_system import ChunkingSystem
+from gemini_code.core.token_counter import TokenCounter, get_token_counter
+
+
+class CountingEncoding:
+    """Tokenizador falso: 1 token a cada 2 caracteres, conta as chamadas."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, **kwargs):
+        self.calls += 1
+        return [text[i:i + 2] for i in range(0, len(text), 2)]
+
+    def decode(self, tokens):
+        return ''.join(tokens)
+
+
+class TestTokenCounter:
+    """Test suite for TokenCounter."""
+
+    @pytest.fixture
+    def exact_counter(self, monkeypatch):
+        monkeypatch.setattr(token_counter_module, 'TIKTOKEN_AVAILABLE', True)
+        counter = TokenCounter()
+        counter._encoding = CountingEncoding()
+        return counter
+
+    def test_estimate_is_int_and_distinguishes_code(self):
+        """Test the fast estimate keeps the code/prose ratios and returns ints."""
+        counter = TokenCounter()
+        prose = "uma frase comum em português " * 10
+        code = "def funcao():\n    return 1\n" * 10
+
+        assert counter.estimate("") == 0
+        assert isinstance(counter.estimate(prose), int)
+        assert counter.estimate(prose) == int(len(prose) / 4.5)
+        assert counter.estimate(code) == int(len(code) / 3.5)
+
+    def test_counts_are_memoized_by_content(self, exact_counter):
+        """Test the same content is tokenized once, even as a different object."""
+        text = "x" * 5000
+
+        assert exact_counter.count(text) == 2500
+        assert exact_counter.count("".join(["x"] * 5000)) == 2500
+        assert exact_counter.encoding.calls == 1
+        assert exact_counter.get_stats()['hits'] == 1
+
+    def test_exact_counts_calibrate_the_estimate(self, exact_counter):
+        """Test the estimate moves towards the tokenizer's chars-per-token ratio."""
+        text = "palavra " * 100
+        before = exact_counter.estimate(text)
+
+        for i in range(20):
+            exact_counter.count(f"{i} " + text)
+
+        assert exact_counter.chars_per_token['text'] == pytest.approx(2.0, abs=0.1)
+        assert exact_counter.estimate("outra " + text) > before
+        # Estimativa feita antes da calibração não fica presa no cache
+        assert exact_counter.estimate(text) == int(len(text) / exact_counter.chars_per_token['text'])
+
+    def test_falls_back_to_estimate_without_tokenizer(self, monkeypatch):
+        """Test count() uses the estimate when tiktoken is missing."""
+        monkeypatch.setattr(token_counter_module, 'TIKTOKEN_AVAILABLE', False)
+        counter = TokenCounter()
+        text = "texto " * 200
+
+        assert counter.count(text) == counter.estimate(text)
+        assert counter.get_stats()['exact_counts'] == 0
+
+    def test_lru_bound(self):
+        """Test the cache never grows past max_entries."""
+        counter = TokenCounter(max_entries=10)
+        for i in range(50):
+            counter.estimate(f"texto {i}")
+        assert counter.get_stats()['entries'] == 10
+
+    def test_components_share_the_global_counter(self, monkeypatch):
+        """Test the client and chunking system account through one service."""
+        from gemini_code.core import gemini_client as gemini_client_module
+        from gemini_code.core.config import ConfigManager
+        from gemini_code.core.gemini_client import GeminiClient
+
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            monkeypatch.setattr(gemini_client_module, 'GENAI_AVAILABLE', False)
+            client = GeminiClient(api_key="test", config_manager=ConfigManager(temp_dir))
+            assert client.token_counter is get_token_counter()
+            assert ChunkingSystem().token_counter is get_token_counter()
+            assert client.estimate_tokens("abc " * 100) == get_token_counter().estimate("abc " * 100)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestCompactorAccounting:
+    """Test suite for ContextCompactor token budgets."""
+
+    def test_should_compact_counts_unset_estimates(self):
+        """Test items without tokens_estimate still count against the budget."""
+        pytest.importorskip("gemini_code.advanced.context_compactor")
+        from gemini_code.advanced.context_compactor import ContextCompactor, ContextItem
+
+        compactor = ContextCompactor.__new__(ContextCompactor)
+        compactor.token_counter = TokenCounter()
+        compactor.max_context_tokens = 1000
+        compactor.compaction_trigger_threshold = 0.95
+        compactor.min_importance_threshold = 0.3
+        items = [
+            ContextItem(content="mensagem longa " * 200, type='user',
+                        timestamp=datetime.now(), importance_score=1.0)
+            for _ in range(3)
+        ]
+
+        assert asyncio.run(compactor.should_compact(items))
+        assert all(item.tokens_estimate > 0 for item in items)